@@ -0,0 +1,168 @@
+"""
+Benchmark of XMI serialization: ET.indent() plus ET.tostring() against
+XmiSerializer, in memory and streamed, indented and compact.
+
+Each document is a UseCases package of use cases with 50 elements each
+(message events and their PaStep applications), built with the same
+element API as the generators. Times include building the elements.
+
+Run from the python_version directory:
+
+    python benchmarks/serializer_benchmark.py
+    python benchmarks/serializer_benchmark.py --elements 1000,10000 --repeat 5
+"""
+
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import Callable, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from jaeger_uml_generator.renderer import (
+    XmiDocumentBuilder,
+    XmiWriter,
+    XmiStreamWriter,
+    XmiFormat,
+    MARTE_NAMESPACES,
+    WRITE_BUFFER_SIZE
+)
+from jaeger_uml_generator.renderer.xmi_serializer import XML_DECLARATION, INDENT
+
+
+DEFAULT_ELEMENTS = "1000,10000,100000,1000000"
+# Elements per use case: interaction, events and their PaStep applications
+ELEMENTS_PER_USE_CASE = 50
+# Sizes above this are timed once whatever --repeat says
+SINGLE_RUN_ELEMENTS = 100000
+PAM_NAMESPACE = MARTE_NAMESPACES['MARTE_PAM']
+
+
+def build_document(writer: XmiDocumentBuilder, elements: int) -> ET.Element:
+    """
+    Build a document of about `elements` elements, flushing every use case.
+    
+    Args:
+        writer: Builder the elements are created with
+        elements: Number of elements to create
+    
+    Returns:
+        Root XMI element
+    """
+    xmi_ns = writer.XMI_NAMESPACE
+    root = writer.create_xmi_document("Benchmark")
+    model = writer.get_model_element(root)
+    usecases_pkg, _ = writer.create_package(model, "UseCases")
+    writer.open_element(usecases_pkg)
+    
+    count = 0
+    case = 0
+    while count < elements:
+        usecase, _ = writer.create_packaged_element(usecases_pkg, "UseCase", f"case{case}")
+        interaction = ET.SubElement(usecase, "ownedBehavior")
+        interaction.set(f"{{{xmi_ns}}}type", "uml:Interaction")
+        interaction.set(f"{{{xmi_ns}}}id", writer.generate_id(usecase, "Interaction", f"case{case}"))
+        count += 2
+        for k in range(ELEMENTS_PER_USE_CASE // 2 - 1):
+            event, event_id = writer.create_owned_element(interaction, "fragment", name=f"msg{k}_send",
+                                                          covered="_lifeline")
+            event.set(f"{{{xmi_ns}}}type", "uml:MessageOccurrenceSpecification")
+            step = ET.SubElement(root, f"{{{PAM_NAMESPACE}}}PaStep")
+            step.set(f"{{{xmi_ns}}}id", writer.generate_id(event, "PaStep"))
+            step.set("base_NamedElement", event_id)
+            step.set("hostDemand", "(value=1.250,unit=ms)")
+            count += 2
+        writer.flush()
+        case += 1
+    
+    writer.close_element(usecases_pkg)
+    return root
+
+
+def write_element_tree(path: Path, elements: int, compact: bool):
+    """Build in memory, then serialize with ET.indent() and ET.tostring()."""
+    writer = XmiWriter(XmiFormat.PAPYRUS, compact, MARTE_NAMESPACES)
+    root = build_document(writer, elements)
+    if not compact:
+        ET.indent(root, space=INDENT)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(XML_DECLARATION + ET.tostring(root, encoding='unicode'))
+
+
+def write_tree(path: Path, elements: int, compact: bool):
+    """Build in memory, then serialize with XmiWriter.document_to_string()."""
+    writer = XmiWriter(XmiFormat.PAPYRUS, compact, MARTE_NAMESPACES)
+    root = build_document(writer, elements)
+    with open(path, 'wb', buffering=WRITE_BUFFER_SIZE) as f:
+        f.write(writer.document_to_string(root).encode('utf-8'))
+
+
+def write_stream(path: Path, elements: int, compact: bool):
+    """Stream the document to the file with XmiStreamWriter while it is built."""
+    with open(path, 'wb', buffering=WRITE_BUFFER_SIZE) as f:
+        writer = XmiStreamWriter(f, XmiFormat.PAPYRUS, compact, MARTE_NAMESPACES)
+        build_document(writer, elements)
+        writer.finish()
+
+
+def time_best(run: Callable[[], None], repeat: int) -> float:
+    """Get the best of `repeat` wall-clock times of a run, in seconds."""
+    best = None
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def parse_elements(spec: str) -> List[int]:
+    """Parse a comma-separated list of element counts."""
+    try:
+        counts = [int(item) for item in spec.split(',')]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid element counts: '{spec}'") from None
+    if any(count <= 0 for count in counts):
+        raise argparse.ArgumentTypeError(f"Element counts must be positive: '{spec}'")
+    return counts
+
+
+def main(argv=None):
+    """Run the benchmark and print one table row per document size."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--elements', type=parse_elements, default=parse_elements(DEFAULT_ELEMENTS),
+                        help=f"Comma-separated document sizes (default: {DEFAULT_ELEMENTS})")
+    parser.add_argument('--repeat', type=int, default=3,
+                        help=f"Runs per measurement up to {SINGLE_RUN_ELEMENTS} elements, "
+                             f"best time reported (default: 3)")
+    args = parser.parse_args(argv)
+    
+    writers = [
+        ('ET', write_element_tree, False),
+        ('tree', write_tree, False),
+        ('tree-c', write_tree, True),
+        ('stream', write_stream, False),
+        ('stream-c', write_stream, True)
+    ]
+    print(f"{'elements':>9} {'MB':>7} {'MB-c':>7} " + " ".join(f"{name:>8}" for name, _, _ in writers))
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "benchmark.xmi"
+        for elements in args.elements:
+            repeat = max(1, args.repeat) if elements <= SINGLE_RUN_ELEMENTS else 1
+            times, sizes = [], {}
+            for _, write, compact in writers:
+                times.append(time_best(lambda: write(path, elements, compact), repeat))
+                sizes[compact] = os.path.getsize(path)
+            print(f"{elements:>9} {sizes[False] / 1e6:>7.2f} {sizes[True] / 1e6:>7.2f} "
+                  + " ".join(f"{elapsed:>8.3f}" for elapsed in times))
+
+
+if __name__ == '__main__':
+    main()
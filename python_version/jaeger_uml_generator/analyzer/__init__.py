@@ -1,5 +1,82 @@
 """Trace aggregation and analysis."""
 
-from .trace_aggregator import TraceAggregator
+from .trace_aggregator import TraceAggregator, DEFAULT_OPERATION_CAPACITY
+from .heavy_hitters import SpaceSavingCounter
+from .trace_fingerprint import (
+    TraceGroup,
+    compute_trace_fingerprint,
+    group_traces_by_fingerprint,
+    get_entry_span,
+    get_entry_operation,
+    CallMessage,
+    get_call_messages
+)
+from .critical_path import TraceTimingAnalysis, analyze_trace_timing, get_trace_timing
+from .concurrency_analyzer import ConcurrencyAnalyzer, ConcurrencyProfile, sweep_intervals
+from .latency_sketch import LatencySketch
+from .trace_diff import TraceSetDiff, EdgeLatencyShift, mann_whitney_test
+from .window_aggregator import WindowedAggregator, parse_window_size
+from .outlier_selector import OutlierSelector, OutlierInfo, get_outlier_info
+from .clock_skew import ClockSkewAdjustment, adjust_clock_skew
+from .service_graph import ServiceGraph
+from .trace_clustering import MinHasher, cluster_traces, get_call_paths
+from .workload_analyzer import WorkloadCharacterizer, WorkloadProfile, get_mixed_closed_parameters
+from .node_resources import (
+    NodeResourceAnalyzer,
+    NodeResourceProfile,
+    INSTANCE_TAGS,
+    get_instance_name
+)
+from .mva_solver import CapacityModel, MvaResult, MVA_METHODS, parse_scale_factors
+from .simulator import CallGraphSimulator, SimulationResult, ARRIVAL_PROCESSES
+from .call_model import CallModel, get_node_name
 
-__all__ = ['TraceAggregator']
+__all__ = [
+    'TraceAggregator',
+    'DEFAULT_OPERATION_CAPACITY',
+    'SpaceSavingCounter',
+    'TraceGroup',
+    'compute_trace_fingerprint',
+    'group_traces_by_fingerprint',
+    'get_entry_span',
+    'get_entry_operation',
+    'CallMessage',
+    'get_call_messages',
+    'TraceTimingAnalysis',
+    'analyze_trace_timing',
+    'get_trace_timing',
+    'ConcurrencyAnalyzer',
+    'ConcurrencyProfile',
+    'sweep_intervals',
+    'LatencySketch',
+    'TraceSetDiff',
+    'EdgeLatencyShift',
+    'mann_whitney_test',
+    'WindowedAggregator',
+    'parse_window_size',
+    'OutlierSelector',
+    'OutlierInfo',
+    'get_outlier_info',
+    'ClockSkewAdjustment',
+    'adjust_clock_skew',
+    'ServiceGraph',
+    'MinHasher',
+    'cluster_traces',
+    'get_call_paths',
+    'WorkloadCharacterizer',
+    'get_mixed_closed_parameters',
+    'WorkloadProfile',
+    'NodeResourceAnalyzer',
+    'NodeResourceProfile',
+    'INSTANCE_TAGS',
+    'get_instance_name',
+    'CapacityModel',
+    'MvaResult',
+    'MVA_METHODS',
+    'parse_scale_factors',
+    'CallGraphSimulator',
+    'SimulationResult',
+    'ARRIVAL_PROCESSES',
+    'CallModel',
+    'get_node_name'
+]
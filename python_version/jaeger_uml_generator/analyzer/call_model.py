@@ -0,0 +1,111 @@
+"""Intermediate call model shared by all generators and reports of a run."""
+
+import logging
+from typing import List, Dict, Set, Optional, Any
+from ..models import Trace
+from ..utils import extract_base_name, stable_digest
+from .trace_aggregator import TraceAggregator, DEFAULT_OPERATION_CAPACITY
+from .trace_fingerprint import CallMessage, get_call_messages
+from .concurrency_analyzer import ConcurrencyAnalyzer, ConcurrencyProfile
+from .node_resources import NodeResourceAnalyzer, NodeResourceProfile, get_instance_name
+from .workload_analyzer import WorkloadCharacterizer, WorkloadProfile
+
+
+logger = logging.getLogger(__name__)
+
+
+def get_node_name(metadata: Dict[str, Any]) -> str:
+    """
+    Get the deployment node of a service from its metadata tags.
+    
+    Replicas of a node share their instance name up to the deployment hash.
+    
+    Args:
+        metadata: Service metadata (process tags)
+    
+    Returns:
+        Node name
+    """
+    if not metadata:
+        return "Node-Unknown"
+    
+    instance = get_instance_name(metadata)
+    if instance:
+        return extract_base_name(instance)
+    
+    return f"Node-{stable_digest(metadata)}"
+
+
+class CallModel:
+    """
+    Compiled view of a set of traces, built once per run.
+    
+    Holds the aggregate (services, operations, call edges and entry
+    statistics from a single walk over all spans) and the node of every
+    service. Per-trace message lists, workload, concurrency and resource
+    profiles are computed on first use and then shared, so every generator
+    and report of a run reads the same analysis instead of redoing it.
+    """
+    
+    def __init__(self, traces: List[Trace], operation_capacity: int = DEFAULT_OPERATION_CAPACITY):
+        """
+        Build the model.
+        
+        Args:
+            traces: List of Trace objects, already prepared (clock skew,
+                    operation templates)
+            operation_capacity: Maximum distinct operations tracked per service
+        """
+        self.traces = traces if traces else []
+        self.aggregator = TraceAggregator(self.traces, operation_capacity)
+        
+        # Map: service -> deployment node (services with metadata only)
+        self.service_nodes: Dict[str, str] = {
+            service: get_node_name(metadata)
+            for service, metadata in self.aggregator.get_service_metadata().items()
+        }
+        
+        self._workload_profiles: Optional[Dict[str, WorkloadProfile]] = None
+        self._node_concurrency: Optional[Dict[str, ConcurrencyProfile]] = None
+        self._node_resources: Optional[Dict[str, NodeResourceProfile]] = None
+        self._service_resources: Optional[Dict[str, NodeResourceProfile]] = None
+    
+    def get_node_services(self) -> Dict[str, Set[str]]:
+        """Get the services deployed on every node."""
+        node_services: Dict[str, Set[str]] = {}
+        for service, node in self.service_nodes.items():
+            node_services.setdefault(node, set()).add(service)
+        return node_services
+    
+    def get_messages(self, trace: Trace) -> List[CallMessage]:
+        """Get the cross-service calls of a trace in start time order."""
+        return get_call_messages(trace)
+    
+    def get_workload_profiles(self) -> Dict[str, WorkloadProfile]:
+        """Get the measured workload of every root entry operation."""
+        if self._workload_profiles is None:
+            characterizer = WorkloadCharacterizer()
+            characterizer.add_traces(self.traces)
+            self._workload_profiles = characterizer.finish()
+        return self._workload_profiles
+    
+    def get_node_concurrency(self) -> Dict[str, ConcurrencyProfile]:
+        """Get the concurrency profile of every node."""
+        if self._node_concurrency is None:
+            analyzer = ConcurrencyAnalyzer(self.traces, self.service_nodes)
+            self._node_concurrency = analyzer.get_node_profiles()
+        return self._node_concurrency
+    
+    def get_node_resources(self) -> Dict[str, NodeResourceProfile]:
+        """Get replicas, busy time and call overheads of every node."""
+        if self._node_resources is None:
+            analyzer = NodeResourceAnalyzer(self.traces, self.service_nodes)
+            self._node_resources = analyzer.get_profiles()
+        return self._node_resources
+    
+    def get_service_replicas(self) -> Dict[str, int]:
+        """Get the number of replicas of every service."""
+        if self._service_resources is None:
+            services = {service: service for service in self.aggregator.get_all_services()}
+            self._service_resources = NodeResourceAnalyzer(self.traces, services).get_profiles()
+        return {service: profile.replicas for service, profile in self._service_resources.items()}
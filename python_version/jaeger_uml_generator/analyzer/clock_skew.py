@@ -0,0 +1,139 @@
+"""Clock-skew adjustment of span timestamps across hosts."""
+
+import logging
+from dataclasses import dataclass, field
+from typing import Dict
+from ..models import Trace, Span
+
+
+logger = logging.getLogger(__name__)
+
+
+# Key under which the adjustment is cached in Trace.analysis_cache
+CLOCK_SKEW_CACHE_KEY = 'clock_skew'
+
+# Process tags identifying the host whose clock a span was timed with
+HOST_TAGS = ('ip', 'hostname', 'host.name', 'host.ip')
+
+
+@dataclass
+class ClockSkewAdjustment:
+    """Timestamp shifts applied to a trace."""
+    
+    # span_id -> shift applied to start_time (microseconds)
+    span_offsets: Dict[str, int] = field(default_factory=dict)
+    # host key -> shift first applied to that host's subtree (microseconds)
+    host_offsets: Dict[str, int] = field(default_factory=dict)
+    
+    def get_span_offset(self, span_id: str) -> int:
+        """Get the shift applied to a span, 0 if it was not moved."""
+        return self.span_offsets.get(span_id, 0)
+    
+    @property
+    def adjusted_span_count(self) -> int:
+        """Number of spans whose start time was shifted."""
+        return len(self.span_offsets)
+
+
+def adjust_clock_skew(trace: Trace) -> ClockSkewAdjustment:
+    """
+    Correct clock skew between hosts, in place and once per trace.
+    
+    Follows Jaeger's adjuster: walking the tree from each entry span, a span
+    on another host than its parent gets a new skew when it does not fit
+    inside its parent, centring it in the parent (half the duration gap on
+    each side as network latency). Spans on the same host as their parent
+    inherit the parent's skew. When both span kinds are known, only
+    client -> server pairs are adjusted. The walk is iterative and linear
+    in the number of spans.
+    
+    Args:
+        trace: Trace to adjust; span start times are shifted in place
+    
+    Returns:
+        The adjustment, also cached in trace.analysis_cache
+    """
+    cached = trace.analysis_cache.get(CLOCK_SKEW_CACHE_KEY)
+    if cached is not None:
+        return cached
+    
+    adjustment = ClockSkewAdjustment()
+    if trace.spans:
+        children_index = trace.get_children_index()
+        host_keys = {
+            process_id: _get_host_key(trace, process_id)
+            for process_id in {span.process_id for span in trace.spans}
+        }
+        
+        # (span, parent, host key of the current skew, skew delta)
+        stack = [(span, None, host_keys[span.process_id], 0)
+                 for span in reversed(trace.get_entry_spans())]
+        while stack:
+            span, parent, skew_host, delta = stack.pop()
+            host = host_keys[span.process_id]
+            
+            if parent is not None and (host != skew_host or not host):
+                # Another host: the parent's skew does not apply
+                skew_host = host
+                delta = _calculate_skew(span, parent) if _is_adjustable(span, parent) else 0
+                if delta:
+                    adjustment.host_offsets.setdefault(host, delta)
+            
+            if delta:
+                span.start_time += delta
+                adjustment.span_offsets[span.span_id] = delta
+            
+            for child in reversed(children_index.get(span.span_id, [])):
+                stack.append((child, span, skew_host, delta))
+    
+    if adjustment.span_offsets:
+        # Indexes are ordered by start time and earlier analyses used raw timestamps
+        trace.invalidate_indexes()
+        trace.analysis_cache.clear()
+        logger.debug(f"Adjusted clock skew of {adjustment.adjusted_span_count} span(s) "
+                    f"in trace {trace.trace_id}")
+    
+    trace.analysis_cache[CLOCK_SKEW_CACHE_KEY] = adjustment
+    return adjustment
+
+
+def _get_host_key(trace: Trace, process_id: str) -> str:
+    """Get the key of the host a process runs on, falling back to the process ID."""
+    process = trace.get_process(process_id)
+    if process:
+        for tag in HOST_TAGS:
+            value = process.get_tag(tag)
+            if value:
+                return str(value)
+    return process_id or ''
+
+
+def _is_adjustable(child: Span, parent: Span) -> bool:
+    """Check the span kinds allow adjusting a child against its parent."""
+    parent_kind = parent.get_tag('span.kind')
+    child_kind = child.get_tag('span.kind')
+    if parent_kind and child_kind:
+        return parent_kind == 'client' and child_kind == 'server'
+    return True
+
+
+def _calculate_skew(child: Span, parent: Span) -> int:
+    """
+    Get the shift that places a child span inside its (adjusted) parent.
+    
+    Returns:
+        Shift in microseconds, 0 when the child already fits
+    """
+    if child.duration > parent.duration:
+        # Not enough information; only make sure the child does not start first
+        if child.start_time < parent.start_time:
+            return parent.start_time - child.start_time
+        return 0
+    
+    child_end = child.start_time + child.duration
+    parent_end = parent.start_time + parent.duration
+    if child.start_time >= parent.start_time and child_end <= parent_end:
+        return 0
+    
+    latency = (parent.duration - child.duration) // 2
+    return parent.start_time + latency - child.start_time
@@ -0,0 +1,191 @@
+"""Sweep-line concurrency analysis of spans per service and per deployment node."""
+
+import logging
+from dataclasses import dataclass, field
+from typing import List, Dict, Optional, Tuple, Callable
+from ..models import Trace
+from .trace_fingerprint import get_entry_operation
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ConcurrencyProfile:
+    """Concurrency statistics of in-flight requests for a service or node."""
+    
+    span_count: int = 0
+    max_concurrency: int = 0
+    # Sum of request durations in microseconds
+    total_time_us: int = 0
+    # Time with at least one request in flight, in microseconds
+    busy_time_us: int = 0
+    # Observation window shared by all profiles of an analysis, in microseconds
+    window_us: int = 0
+    # Requests per entry operation of their trace (None: no entry span)
+    entry_requests: Dict[Optional[str], int] = field(default_factory=dict)
+    
+    @property
+    def avg_concurrency(self) -> float:
+        """Time-averaged number of in-flight requests over the observation window."""
+        return self.total_time_us / self.window_us if self.window_us > 0 else 0.0
+    
+    @property
+    def avg_busy_concurrency(self) -> float:
+        """Average number of in-flight requests while at least one is in flight."""
+        return self.total_time_us / self.busy_time_us if self.busy_time_us > 0 else 0.0
+    
+    @property
+    def utilization(self) -> float:
+        """Estimated utilization: fraction of the window with work in flight."""
+        return self.busy_time_us / self.window_us if self.window_us > 0 else 0.0
+    
+    @property
+    def throughput_per_s(self) -> float:
+        """Requests completed per second over the observation window."""
+        return self.span_count * 1_000_000 / self.window_us if self.window_us > 0 else 0.0
+    
+    def get_scaled_throughput_per_s(self, get_sample_rate: Callable[[Optional[str]], float]) -> float:
+        """
+        Get the throughput of the full corpus a sample of traces was drawn from.
+        
+        Each request is scaled by the inverse sample rate of its trace's entry
+        operation, so strata sampled at different rates are not biased.
+        
+        Args:
+            get_sample_rate: Sample rate of the traces of an entry operation
+        
+        Returns:
+            Requests per second over the observation window
+        """
+        if self.window_us <= 0:
+            return 0.0
+        requests = sum(count / get_sample_rate(entry_operation)
+                       for entry_operation, count in self.entry_requests.items())
+        return requests * 1_000_000 / self.window_us
+
+
+def sweep_intervals(intervals: List[Tuple[int, int]], window_us: int) -> ConcurrencyProfile:
+    """
+    Sweep start/end events in time order, O(n log n) in the number of intervals.
+    
+    Ends sort before starts at the same timestamp, so back-to-back
+    requests are not counted as concurrent.
+    
+    Args:
+        intervals: (start, end) request intervals in microseconds
+        window_us: Observation window in microseconds
+    
+    Returns:
+        ConcurrencyProfile of the intervals
+    """
+    profile = ConcurrencyProfile(span_count=len(intervals), window_us=window_us)
+    
+    events: List[Tuple[int, int]] = []
+    for start, end in intervals:
+        if end <= start:
+            # Zero-length requests never overlap anything
+            continue
+        events.append((start, 1))
+        events.append((end, -1))
+        profile.total_time_us += end - start
+    events.sort()
+    
+    in_flight = 0
+    busy_since = 0
+    for time, delta in events:
+        if delta > 0 and in_flight == 0:
+            busy_since = time
+        in_flight += delta
+        if in_flight == 0:
+            profile.busy_time_us += time - busy_since
+        if in_flight > profile.max_concurrency:
+            profile.max_concurrency = in_flight
+    
+    return profile
+
+
+class ConcurrencyAnalyzer:
+    """
+    Computes concurrency profiles with a sweep over span start/end events.
+    
+    Only spans that enter a service are counted as requests: entry spans and
+    spans whose parent belongs to another service. Nested spans inside the
+    same service are part of the request already in flight and would
+    otherwise inflate concurrency.
+    """
+    
+    def __init__(self, traces: List[Trace], service_to_node: Optional[Dict[str, str]] = None):
+        """
+        Initialize the analyzer and run the sweep.
+        
+        Args:
+            traces: List of Trace objects
+            service_to_node: Optional map of service name to deployment node name
+        """
+        self.traces = traces if traces else []
+        self.service_to_node = service_to_node or {}
+        
+        self.service_profiles: Dict[str, ConcurrencyProfile] = {}
+        self.node_profiles: Dict[str, ConcurrencyProfile] = {}
+        
+        self._analyze()
+    
+    def _analyze(self):
+        """Collect request intervals from all traces and sweep them."""
+        service_intervals: Dict[str, List[Tuple[int, int]]] = {}
+        node_intervals: Dict[str, List[Tuple[int, int]]] = {}
+        node_entry_requests: Dict[str, Dict[Optional[str], int]] = {}
+        window_start = None
+        window_end = None
+        
+        for trace in self.traces:
+            if not trace or not trace.spans:
+                continue
+            
+            span_index = trace.get_span_index()
+            entry_operation = get_entry_operation(trace)
+            for span in trace.spans:
+                start = span.start_time
+                end = span.start_time + span.duration
+                window_start = start if window_start is None else min(window_start, start)
+                window_end = end if window_end is None else max(window_end, end)
+                
+                service = trace.get_service_name(span)
+                parent_span = span_index.get(span.get_parent_span_id())
+                if parent_span and trace.get_service_name(parent_span) == service:
+                    continue
+                
+                service_intervals.setdefault(service, []).append((start, end))
+                node = self.service_to_node.get(service)
+                if node:
+                    node_intervals.setdefault(node, []).append((start, end))
+                    entry_requests = node_entry_requests.setdefault(node, {})
+                    entry_requests[entry_operation] = entry_requests.get(entry_operation, 0) + 1
+        
+        window_us = (window_end - window_start) if window_start is not None else 0
+        
+        for service, intervals in service_intervals.items():
+            self.service_profiles[service] = sweep_intervals(intervals, window_us)
+        for node, intervals in node_intervals.items():
+            self.node_profiles[node] = sweep_intervals(intervals, window_us)
+            self.node_profiles[node].entry_requests = node_entry_requests[node]
+        
+        logger.info(f"Computed concurrency profiles for {len(self.service_profiles)} service(s) "
+                   f"and {len(self.node_profiles)} node(s)")
+    
+    def get_service_profiles(self) -> Dict[str, ConcurrencyProfile]:
+        """Get concurrency profiles per service."""
+        return dict(self.service_profiles)
+    
+    def get_node_profiles(self) -> Dict[str, ConcurrencyProfile]:
+        """Get concurrency profiles per deployment node."""
+        return dict(self.node_profiles)
+    
+    def get_profile_for_service(self, service_name: str) -> Optional[ConcurrencyProfile]:
+        """Get the concurrency profile of a service."""
+        return self.service_profiles.get(service_name)
+    
+    def get_profile_for_node(self, node_name: str) -> Optional[ConcurrencyProfile]:
+        """Get the concurrency profile of a deployment node."""
+        return self.node_profiles.get(node_name)
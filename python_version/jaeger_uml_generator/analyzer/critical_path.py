@@ -0,0 +1,175 @@
+"""Self-time and critical path analysis for individual traces."""
+
+import logging
+from dataclasses import dataclass, field
+from typing import List, Dict
+from ..models import Trace, Span
+
+
+logger = logging.getLogger(__name__)
+
+
+# Key under which the analysis is cached in Trace.analysis_cache
+TIMING_CACHE_KEY = 'timing'
+
+
+@dataclass
+class TraceTimingAnalysis:
+    """Exclusive time per span and the critical path of a trace."""
+    
+    # span_id -> exclusive (self) time in microseconds
+    self_times: Dict[str, int] = field(default_factory=dict)
+    # Span IDs on the critical path, in chronological order
+    critical_path: List[str] = field(default_factory=list)
+    # span_id -> time the span contributes to the critical path (microseconds)
+    critical_times: Dict[str, int] = field(default_factory=dict)
+    
+    def get_self_time(self, span_id: str) -> int:
+        """Get the exclusive time of a span in microseconds."""
+        return self.self_times.get(span_id, 0)
+    
+    def is_on_critical_path(self, span_id: str) -> bool:
+        """Check whether a span contributes to the critical path."""
+        return span_id in self.critical_times
+    
+    def get_critical_path_duration(self) -> int:
+        """Get the total length of the critical path in microseconds."""
+        return sum(self.critical_times.values())
+
+
+def get_trace_timing(trace: Trace) -> TraceTimingAnalysis:
+    """
+    Get the timing analysis of a trace, computing it on first use.
+    
+    Args:
+        trace: Trace object
+    
+    Returns:
+        Cached TraceTimingAnalysis for the trace
+    """
+    analysis = trace.analysis_cache.get(TIMING_CACHE_KEY)
+    if analysis is None:
+        analysis = analyze_trace_timing(trace)
+        trace.analysis_cache[TIMING_CACHE_KEY] = analysis
+    return analysis
+
+
+def analyze_trace_timing(trace: Trace) -> TraceTimingAnalysis:
+    """
+    Compute self-time for every span and the critical path of a trace.
+    
+    Self-time is the span duration minus the union of its children's
+    intervals (clipped to the span), so parallel children are not
+    subtracted twice. The critical path follows, from the end of each span
+    backwards, the last child to finish before the current point in time.
+    Both passes use the trace's child index; sorting children by end time
+    keeps the total cost at O(n log n).
+    
+    Args:
+        trace: Trace object
+    
+    Returns:
+        TraceTimingAnalysis with self times and the critical path
+    """
+    analysis = TraceTimingAnalysis()
+    if not trace or not trace.spans:
+        return analysis
+    
+    children_index = trace.get_children_index()
+    
+    for span in trace.spans:
+        analysis.self_times[span.span_id] = _compute_self_time(
+            span, children_index.get(span.span_id, [])
+        )
+    
+    # The critical path starts at the entry span that finishes last
+    entry_spans = trace.get_entry_spans()
+    if entry_spans:
+        last_entry = max(entry_spans, key=lambda s: s.start_time + s.duration)
+        path: List[tuple] = []
+        _walk_critical_path(last_entry, last_entry.start_time + last_entry.duration,
+                            children_index, path)
+        
+        # Segments are collected backwards in time
+        for span_id, contribution in reversed(path):
+            if span_id not in analysis.critical_times:
+                analysis.critical_path.append(span_id)
+                analysis.critical_times[span_id] = 0
+            analysis.critical_times[span_id] += contribution
+    
+    return analysis
+
+
+def _compute_self_time(span: Span, children: List[Span]) -> int:
+    """Compute span duration minus the union of child intervals (children sorted by start)."""
+    span_start = span.start_time
+    span_end = span.start_time + span.duration
+    covered = 0
+    current_start = None
+    current_end = None
+    
+    for child in children:
+        child_start = max(child.start_time, span_start)
+        child_end = min(child.start_time + child.duration, span_end)
+        if child_end <= child_start:
+            continue
+        
+        if current_end is None or child_start > current_end:
+            if current_end is not None:
+                covered += current_end - current_start
+            current_start, current_end = child_start, child_end
+        else:
+            current_end = max(current_end, child_end)
+    
+    if current_end is not None:
+        covered += current_end - current_start
+    
+    return max(0, span.duration - covered)
+
+
+def _walk_critical_path(span: Span, end_time: int,
+                        children_index: Dict[str, List[Span]],
+                        path: List[tuple]):
+    """
+    Append (span_id, contribution) segments of the critical path below a span.
+    
+    Segments are appended from the latest to the earliest point in time.
+    Iterative depth-first walk, so deep traces do not hit the recursion limit.
+    """
+    # Frames: [span, cursor, children by end time (latest first), next child]
+    stack = [_open_critical_frame(span, end_time, children_index)]
+    while stack:
+        frame = stack[-1]
+        span, cursor, children, i = frame
+        if i < len(children):
+            child = children[i]
+            frame[3] = i + 1
+            if child.start_time >= cursor:
+                # Started after the point we are walking back from
+                continue
+            
+            child_end = min(child.start_time + child.duration, cursor)
+            if cursor > child_end:
+                path.append((span.span_id, cursor - child_end))
+            
+            # Continue before the child once its own path is walked
+            frame[1] = max(child.start_time, span.start_time)
+            if frame[1] <= span.start_time:
+                frame[3] = len(children)
+            stack.append(_open_critical_frame(child, child_end, children_index))
+            continue
+        
+        stack.pop()
+        if cursor > span.start_time:
+            path.append((span.span_id, cursor - span.start_time))
+
+
+def _open_critical_frame(span: Span, end_time: int,
+                         children_index: Dict[str, List[Span]]) -> list:
+    """Create the walk state of a span whose path ends at end_time."""
+    children = sorted(
+        children_index.get(span.span_id, []),
+        key=lambda s: s.start_time + s.duration,
+        reverse=True
+    )
+    return [span, min(end_time, span.start_time + span.duration), children, 0]
@@ -0,0 +1,114 @@
+"""Bounded-memory heavy-hitter counting with the Space-Saving algorithm."""
+
+from typing import Dict, List, Optional, Tuple, Iterator
+
+
+class SpaceSavingCounter:
+    """
+    Approximate frequency counter that keeps at most `capacity` items.
+    
+    Implements Space-Saving (Metwally et al.) over a stream-summary: items
+    are grouped in buckets by count, so each update is O(1). When the
+    counter is full, a new item replaces one with the minimum count and
+    inherits that count as its overestimation error. Any item whose true
+    frequency exceeds total / capacity is guaranteed to be tracked.
+    """
+    
+    def __init__(self, capacity: int):
+        """
+        Initialize the counter.
+        
+        Args:
+            capacity: Maximum number of distinct items tracked
+        """
+        if capacity < 1:
+            raise ValueError(f"Capacity must be at least 1, got {capacity}")
+        
+        self.capacity = capacity
+        self.total = 0
+        
+        self._counts: Dict[str, int] = {}
+        self._errors: Dict[str, int] = {}
+        # count -> insertion-ordered set of items with that count
+        self._buckets: Dict[int, Dict[str, None]] = {}
+        self._min_count = 0
+    
+    def add(self, item: str) -> Optional[str]:
+        """
+        Record one occurrence of an item.
+        
+        Returns:
+            The item evicted to make room for this one, None if none was
+        """
+        self.total += 1
+        count = self._counts.get(item)
+        
+        if count is not None:
+            self._move(item, count, count + 1)
+            return None
+        
+        if len(self._counts) < self.capacity:
+            self._counts[item] = 1
+            self._errors[item] = 0
+            self._buckets.setdefault(1, {})[item] = None
+            self._min_count = 1
+            return None
+        
+        # Evict the oldest item with the minimum count
+        min_bucket = self._buckets[self._min_count]
+        evicted = next(iter(min_bucket))
+        del self._counts[evicted]
+        del self._errors[evicted]
+        
+        self._counts[item] = self._min_count
+        self._errors[item] = self._min_count
+        min_bucket[item] = None
+        del min_bucket[evicted]
+        self._move(item, self._min_count, self._min_count + 1)
+        return evicted
+    
+    def _move(self, item: str, old_count: int, new_count: int):
+        """Move an item from one count bucket to the next."""
+        old_bucket = self._buckets[old_count]
+        del old_bucket[item]
+        if not old_bucket:
+            del self._buckets[old_count]
+            if self._min_count == old_count:
+                self._min_count = new_count
+        
+        self._counts[item] = new_count
+        self._buckets.setdefault(new_count, {})[item] = None
+    
+    def get_count(self, item: str) -> int:
+        """Get the (over)estimated count of an item, 0 if not tracked."""
+        return self._counts.get(item, 0)
+    
+    def get_error(self, item: str) -> int:
+        """Get the maximum overestimation of an item's count."""
+        return self._errors.get(item, 0)
+    
+    def top(self, k: int = None) -> List[Tuple[str, int]]:
+        """
+        Get the k most frequent items.
+        
+        Args:
+            k: Number of items (default: all tracked items)
+        
+        Returns:
+            List of (item, count) sorted by descending count, then name
+        """
+        ranked = sorted(self._counts.items(), key=lambda entry: (-entry[1], entry[0]))
+        return ranked if k is None else ranked[:k]
+    
+    def items(self) -> List[str]:
+        """Get all tracked items."""
+        return list(self._counts)
+    
+    def __contains__(self, item: str) -> bool:
+        return item in self._counts
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._counts)
+    
+    def __len__(self) -> int:
+        return len(self._counts)
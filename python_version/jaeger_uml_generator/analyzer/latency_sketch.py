@@ -0,0 +1,149 @@
+"""Mergeable, bounded-size latency distribution sketch."""
+
+import math
+from typing import List, Dict, Optional
+
+
+# Default relative accuracy of quantile estimates (1%)
+DEFAULT_RELATIVE_ACCURACY = 0.01
+
+
+class LatencySketch:
+    """
+    Log-bucketed histogram of latencies with relative-error quantiles.
+    
+    Values are mapped to buckets whose bounds grow geometrically, so any
+    quantile is estimated within the configured relative accuracy and the
+    number of buckets grows only with the log of the value range. Sketches
+    with the same accuracy share bucket boundaries, which makes them
+    mergeable and directly comparable bucket by bucket.
+    """
+    
+    def __init__(self, relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY):
+        """
+        Initialize an empty sketch.
+        
+        Args:
+            relative_accuracy: Relative accuracy of quantile estimates (0-1)
+        """
+        if not 0 < relative_accuracy < 1:
+            raise ValueError(f"Relative accuracy must be in (0, 1), got {relative_accuracy}")
+        
+        self.relative_accuracy = relative_accuracy
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        
+        # bucket index -> count; values <= 0 go to zero_count
+        self.buckets: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.sum_squares = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+    
+    def add(self, value: float, count: int = 1):
+        """Record a value (e.g. a duration in microseconds)."""
+        if value > 0:
+            index = math.ceil(math.log(value) / self._log_gamma)
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        else:
+            self.zero_count += count
+        
+        self.count += count
+        self.sum += value * count
+        self.sum_squares += value * value * count
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+    
+    def merge(self, other: 'LatencySketch'):
+        """Merge another sketch with the same accuracy into this one."""
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        self.sum_squares += other.sum_squares
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+        if other.max is not None:
+            self.max = other.max if self.max is None else max(self.max, other.max)
+    
+    def get_bucket_value(self, index: int) -> float:
+        """Get the representative value of a bucket."""
+        return 2 * self._gamma ** index / (self._gamma + 1)
+    
+    def quantile(self, q: float) -> float:
+        """
+        Estimate a quantile.
+        
+        Args:
+            q: Quantile in [0, 1] (e.g. 0.95)
+        
+        Returns:
+            Estimated value, 0.0 for an empty sketch
+        """
+        if self.count == 0:
+            return 0.0
+        
+        rank = q * (self.count - 1)
+        if rank < self.zero_count:
+            return 0.0
+        
+        seen = self.zero_count
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen > rank:
+                value = self.get_bucket_value(index)
+                return min(max(value, self.min), self.max)
+        
+        return self.max
+    
+    def get_quantile_table(self, points: int) -> List[float]:
+        """
+        Tabulate the inverse CDF at evenly spaced quantiles in one pass.
+        
+        Indexing the table with a uniform random integer draws values from
+        the recorded distribution in constant time.
+        
+        Args:
+            points: Number of quantiles, at (i + 0.5) / points
+        
+        Returns:
+            List of points values, empty for an empty sketch
+        """
+        if self.count == 0:
+            return []
+        
+        table = []
+        seen = self.zero_count
+        indexes = iter(sorted(self.buckets))
+        value = 0.0
+        for i in range(points):
+            rank = (i + 0.5) / points * self.count
+            while seen < rank:
+                index = next(indexes, None)
+                if index is None:
+                    break
+                seen += self.buckets[index]
+                value = min(max(self.get_bucket_value(index), self.min), self.max)
+            table.append(value if rank > self.zero_count else 0.0)
+        return table
+    
+    @property
+    def mean(self) -> float:
+        """Mean of recorded values."""
+        return self.sum / self.count if self.count else 0.0
+    
+    @property
+    def variance(self) -> float:
+        """Sample variance of recorded values."""
+        if self.count < 2:
+            return 0.0
+        return max(0.0, (self.sum_squares - self.sum * self.sum / self.count) / (self.count - 1))
+    
+    def __len__(self) -> int:
+        return self.count
@@ -0,0 +1,350 @@
+"""Closed queueing network model solved with Mean Value Analysis."""
+
+import logging
+from dataclasses import dataclass, field
+from itertools import product
+from typing import List, Dict, Tuple, Optional
+
+
+logger = logging.getLogger(__name__)
+
+
+MVA_METHODS = ('auto', 'exact', 'approximate')
+# Exact MVA visits every population vector; larger networks use Schweitzer's
+# approximation under method 'auto'
+EXACT_MVA_MAX_STATES = 20000
+# Calls deeper than this are ignored when propagating visits (call cycles)
+MAX_CALL_DEPTH = 64
+# Convergence tolerance (queue length) and iteration cap of approximate MVA
+APPROXIMATE_MVA_TOLERANCE = 1e-6
+APPROXIMATE_MVA_MAX_ITERATIONS = 10000
+
+
+def parse_scale_factors(spec: str) -> List[float]:
+    """
+    Parse a comma-separated list of positive factors.
+    
+    Args:
+        spec: Factors such as "1,2,3" or "0.5, 1.5"
+    
+    Returns:
+        List of factors in the given order
+    
+    Raises:
+        ValueError: If an item is not a positive number
+    """
+    factors = []
+    for item in spec.split(','):
+        try:
+            factor = float(item)
+        except ValueError:
+            raise ValueError(f"Invalid factor '{item.strip()}' in '{spec}'") from None
+        if factor <= 0:
+            raise ValueError(f"Factors must be positive: '{spec}'")
+        factors.append(factor)
+    return factors
+
+
+@dataclass
+class MvaResult:
+    """Steady-state predictions of one solution of the network."""
+    
+    method: str
+    populations: List[int]
+    # Per class: throughput (requests per second) and response time (ms)
+    throughputs: List[float] = field(default_factory=list)
+    response_times_ms: List[float] = field(default_factory=list)
+    # Per station: utilization per server and mean queue length (all classes)
+    utilizations: List[float] = field(default_factory=list)
+    queue_lengths: List[float] = field(default_factory=list)
+
+
+class CapacityModel:
+    """
+    Closed multi-class queueing network of the traced services.
+    
+    Each root entry operation is a request class with its measured
+    population and think time; each service is a queueing station. The
+    demand of a class at a station is the service's mean self time per
+    entry invocation times the visits a request of the class makes to it,
+    propagated along the mean calls per invocation of the aggregate's entry
+    call graph.
+    
+    A station with c servers (replicas) follows Seidmann's approximation: a
+    single-server queue with demand D / c in series with a delay of
+    D * (c - 1) / c, which matches the c-server queue at light and heavy load.
+    """
+    
+    def __init__(self, classes: List[str], stations: List[str],
+                 demands_ms: List[List[float]], populations: List[int],
+                 think_times_ms: List[float], unprofiled: Optional[List[str]] = None,
+                 servers: Optional[List[int]] = None):
+        """
+        Initialize the model.
+        
+        Args:
+            classes: Class names ("service:operation" of the root entry)
+            stations: Station (service) names
+            demands_ms: demands_ms[c][k] = total demand of a class c request at station k
+            populations: Number of users per class
+            think_times_ms: Think time per class
+            unprofiled: Root entries left out for lack of a measured workload
+            servers: Number of servers per station (default 1)
+        """
+        self.classes = classes
+        self.stations = stations
+        self.demands_ms = demands_ms
+        self.populations = populations
+        self.think_times_ms = think_times_ms
+        self.unprofiled = unprofiled or []
+        self.servers = [max(1, n) for n in servers] if servers else [1] * len(stations)
+    
+    @classmethod
+    def from_aggregator(cls, aggregator, workloads: Dict[str, Tuple[int, float]],
+                        servers: Optional[Dict[str, int]] = None) -> 'CapacityModel':
+        """
+        Build the model from the entry statistics of a TraceAggregator.
+        
+        Args:
+            aggregator: TraceAggregator with entry statistics
+            workloads: Map of root entry "service:operation" -> (population,
+                       think time in ms); root entries without a measured
+                       workload are left out and listed in `unprofiled`
+            servers: Map of service -> number of servers, e.g. its replicas
+                     (default 1)
+        
+        Returns:
+            CapacityModel with one class per profiled root entry
+        """
+        stations = sorted({service for service, _ in aggregator.get_entries()})
+        station_index = {service: k for k, service in enumerate(stations)}
+        
+        classes, demands_ms, populations, think_times_ms, unprofiled = [], [], [], [], []
+        for root in sorted(aggregator.get_root_entries()):
+            name = f"{root[0]}:{root[1]}"
+            if name not in workloads:
+                unprofiled.append(name)
+                continue
+            demands = [0.0] * len(stations)
+            for entry, visits in cls._propagate_visits(aggregator, root).items():
+                demands[station_index[entry[0]]] += visits * aggregator.get_entry_demand(entry) / 1000.0
+            
+            population, think_time_ms = workloads[name]
+            classes.append(name)
+            demands_ms.append(demands)
+            populations.append(population)
+            think_times_ms.append(think_time_ms)
+        
+        if unprofiled:
+            logger.warning(f"No measured workload for {len(unprofiled)} root operation(s), "
+                           f"left out of the capacity model: {', '.join(unprofiled)}")
+        servers = servers or {}
+        return cls(classes, stations, demands_ms, populations, think_times_ms, unprofiled,
+                   [servers.get(service, 1) for service in stations])
+    
+    @staticmethod
+    def _propagate_visits(aggregator, root) -> Dict[tuple, float]:
+        """Get the mean visits to every entry per request arriving through root."""
+        visits = {root: 1.0}
+        frontier = {root: 1.0}
+        for _ in range(MAX_CALL_DEPTH):
+            next_frontier: Dict[tuple, float] = {}
+            for entry, entry_visits in frontier.items():
+                for callee, mean_calls in aggregator.get_entry_calls(entry).items():
+                    next_frontier[callee] = next_frontier.get(callee, 0.0) + entry_visits * mean_calls
+            if not next_frontier:
+                break
+            for entry, entry_visits in next_frontier.items():
+                visits[entry] = visits.get(entry, 0.0) + entry_visits
+            frontier = next_frontier
+        return visits
+    
+    def solve(self, population_scale: float = 1.0, speed_factor: float = 1.0,
+              method: str = 'auto') -> MvaResult:
+        """
+        Solve the network for scaled populations and station speeds.
+        
+        Args:
+            population_scale: Factor applied to every class population
+            speed_factor: Station speed relative to the measured one; demands
+                          are divided by it
+            method: 'exact', 'approximate' (Schweitzer) or 'auto' (exact while
+                    the population state space stays small)
+        
+        Returns:
+            MvaResult with per-class and per-station predictions
+        """
+        populations = [max(1, round(n * population_scale)) for n in self.populations]
+        demands = [[d / speed_factor for d in row] for row in self.demands_ms]
+        # Seidmann: queueing demand D / c and delay D * (c - 1) / c per station
+        queueing = [[d / self.servers[k] for k, d in enumerate(row)] for row in demands]
+        delays = [[d - q for d, q in zip(*rows)] for rows in zip(demands, queueing)]
+        
+        if method == 'auto':
+            states = 1
+            for n in populations:
+                states *= n + 1
+            method = 'exact' if states <= EXACT_MVA_MAX_STATES else 'approximate'
+        
+        if method == 'exact':
+            throughputs, response_times = _exact_mva(queueing, populations, self.think_times_ms, delays)
+        else:
+            throughputs, response_times = _approximate_mva(queueing, populations, self.think_times_ms, delays)
+        
+        result = MvaResult(method=method, populations=populations)
+        result.throughputs = [x * 1000.0 for x in throughputs]
+        result.response_times_ms = [sum(r) for r in response_times]
+        for k in range(len(self.stations)):
+            result.utilizations.append(sum(
+                throughputs[c] * queueing[c][k] for c in range(len(self.classes))
+            ))
+            result.queue_lengths.append(sum(
+                throughputs[c] * response_times[c][k] for c in range(len(self.classes))
+            ))
+        return result
+    
+    def sweep(self, population_scales: List[float], speed_factors: List[float],
+              method: str = 'auto') -> List[Tuple[float, float, MvaResult]]:
+        """
+        Solve the network for every combination of population scale and speed.
+        
+        Returns:
+            List of (population scale, speed factor, result)
+        """
+        return [
+            (scale, speed, self.solve(scale, speed, method))
+            for scale in population_scales
+            for speed in speed_factors
+        ]
+    
+    def format_report(self, sweep: List[Tuple[float, float, MvaResult]],
+                      top_stations: int = 5) -> str:
+        """
+        Format sweep results as a human-readable text report.
+        
+        Args:
+            sweep: Results of sweep()
+            top_stations: Number of most utilized stations listed per solution
+        
+        Returns:
+            Report text
+        """
+        lines = [
+            "Capacity model (closed MVA)",
+            f"  {len(self.classes)} class(es), {len(self.stations)} station(s)",
+            "",
+            "Classes: measured population, think time, demand"
+        ]
+        for c, name in enumerate(self.classes):
+            lines.append(f"  {name}: N={self.populations[c]}, Z={self.think_times_ms[c]:.3f}ms, "
+                         f"D={sum(self.demands_ms[c]):.3f}ms")
+        if self.unprofiled:
+            lines.append("Left out (no measured workload): " + ", ".join(self.unprofiled))
+        
+        for scale, speed, result in sweep:
+            lines.append("")
+            lines.append(f"Population x{scale:g}, speed x{speed:g} ({result.method}):")
+            for c, name in enumerate(self.classes):
+                lines.append(f"  {name}: N={result.populations[c]}, "
+                             f"X={result.throughputs[c]:.3f}/s, "
+                             f"R={result.response_times_ms[c]:.3f}ms")
+            busiest = sorted(range(len(self.stations)), key=lambda k: -result.utilizations[k])
+            for k in busiest[:top_stations]:
+                servers = f" ({self.servers[k]} servers)" if self.servers[k] > 1 else ""
+                lines.append(f"    {self.stations[k]}: U={result.utilizations[k]:.4f}, "
+                             f"Q={result.queue_lengths[k]:.3f}{servers}")
+        
+        return "\n".join(lines) + "\n"
+
+
+def _exact_mva(demands: List[List[float]], populations: List[int], think_times: List[float],
+               delays: Optional[List[List[float]]] = None) -> Tuple[List[float], List[List[float]]]:
+    """
+    Exact multi-class MVA over all population vectors up to populations.
+    
+    Args:
+        demands: Queueing demand per class and station
+        populations: Number of users per class
+        think_times: Think time per class
+        delays: Optional delay (no queueing) per class and station, added to
+                the residence time
+    
+    Returns:
+        Tuple of (throughput per class per ms, residence time per class and station)
+    """
+    num_classes = len(populations)
+    num_stations = len(demands[0]) if demands else 0
+    delays = delays or [[0.0] * num_stations for _ in range(num_classes)]
+    # Queue length per station (queueing part) for every solved population vector
+    queues: Dict[Tuple[int, ...], List[float]] = {}
+    throughputs = [0.0] * num_classes
+    residences = [[0.0] * num_stations for _ in range(num_classes)]
+    
+    # Vectors in lexicographic order: every vector minus one user is solved first
+    for vector in product(*(range(n + 1) for n in populations)):
+        throughputs = [0.0] * num_classes
+        waits = [[0.0] * num_stations for _ in range(num_classes)]
+        residences = [[0.0] * num_stations for _ in range(num_classes)]
+        for c in range(num_classes):
+            if vector[c] == 0:
+                continue
+            previous = queues[vector[:c] + (vector[c] - 1,) + vector[c + 1:]]
+            waits[c] = [demands[c][k] * (1.0 + previous[k]) for k in range(num_stations)]
+            residences[c] = [waits[c][k] + delays[c][k] for k in range(num_stations)]
+            cycle = think_times[c] + sum(residences[c])
+            throughputs[c] = vector[c] / cycle if cycle > 0 else 0.0
+        queues[vector] = [
+            sum(throughputs[c] * waits[c][k] for c in range(num_classes))
+            for k in range(num_stations)
+        ]
+    
+    return throughputs, residences
+
+
+def _approximate_mva(demands: List[List[float]], populations: List[int], think_times: List[float],
+                     delays: Optional[List[List[float]]] = None) -> Tuple[List[float], List[List[float]]]:
+    """
+    Schweitzer's approximate MVA: fixed point on per-class queue lengths.
+    
+    Args:
+        demands: Queueing demand per class and station
+        populations: Number of users per class
+        think_times: Think time per class
+        delays: Optional delay (no queueing) per class and station, added to
+                the residence time
+    
+    Returns:
+        Tuple of (throughput per class per ms, residence time per class and station)
+    """
+    num_classes = len(populations)
+    num_stations = len(demands[0]) if demands else 0
+    delays = delays or [[0.0] * num_stations for _ in range(num_classes)]
+    # Per-class queue lengths of the queueing part of every station
+    queues = [[populations[c] / num_stations if num_stations else 0.0] * num_stations
+              for c in range(num_classes)]
+    throughputs = [0.0] * num_classes
+    residences = [[0.0] * num_stations for _ in range(num_classes)]
+    
+    for _ in range(APPROXIMATE_MVA_MAX_ITERATIONS):
+        totals = [sum(queues[c][k] for c in range(num_classes)) for k in range(num_stations)]
+        change = 0.0
+        for c in range(num_classes):
+            n = populations[c]
+            # Queue seen at arrival: everyone else, with one class c user removed
+            waits = [
+                demands[c][k] * (1.0 + totals[k] - queues[c][k] / n)
+                for k in range(num_stations)
+            ]
+            residences[c] = [waits[k] + delays[c][k] for k in range(num_stations)]
+            cycle = think_times[c] + sum(residences[c])
+            throughputs[c] = n / cycle if cycle > 0 else 0.0
+            for k in range(num_stations):
+                queue = throughputs[c] * waits[k]
+                change = max(change, abs(queue - queues[c][k]))
+                queues[c][k] = queue
+        if change < APPROXIMATE_MVA_TOLERANCE:
+            break
+    else:
+        logger.warning(f"Approximate MVA did not converge in {APPROXIMATE_MVA_MAX_ITERATIONS} iterations")
+    
+    return throughputs, residences
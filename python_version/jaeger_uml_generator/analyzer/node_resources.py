@@ -0,0 +1,182 @@
+"""Replica counts, busy time and communication overheads per deployment node."""
+
+import logging
+from dataclasses import dataclass, field
+from typing import List, Dict, Set, Optional, Any
+from ..models import Trace
+from .critical_path import get_trace_timing
+
+
+logger = logging.getLogger(__name__)
+
+
+# Process tags naming the instance a service runs on, in order of preference.
+# Their base name (deployment hash removed) is the deployment node.
+INSTANCE_TAGS = ('hostname', 'host.name', 'node.name', 'k8s.pod.name', 'pod.name')
+
+
+def get_instance_name(tags: Dict[str, Any]) -> Optional[str]:
+    """
+    Get the raw instance (host or pod) name from process tags.
+    
+    Args:
+        tags: Process or service metadata tags
+    
+    Returns:
+        Instance name, None if no instance tag is set
+    """
+    if not tags:
+        return None
+    for key in INSTANCE_TAGS:
+        value = tags.get(key)
+        if value:
+            return str(value)
+    return None
+
+
+@dataclass
+class NodeResourceProfile:
+    """Measured capacity and load of one deployment node."""
+    
+    node: str
+    # Distinct raw instance names (replicas) seen for the node
+    instances: Set[str] = field(default_factory=set)
+    # Sum of span self times on the node, waiting client spans excluded (microseconds)
+    busy_time_us: int = 0
+    # Observation window shared by all profiles of an analysis, in microseconds
+    window_us: int = 0
+    # Outgoing cross-service calls measured for communication overheads
+    call_count: int = 0
+    # Sums of the request leg (caller start -> callee start) and response leg
+    # (callee end -> caller end) of outgoing calls, in microseconds
+    request_gap_us: int = 0
+    response_gap_us: int = 0
+    
+    @property
+    def replicas(self) -> int:
+        """Resource multiplicity: number of replicas, at least 1."""
+        return max(1, len(self.instances))
+    
+    @property
+    def utilization(self) -> float:
+        """Mean busy fraction per replica over the observation window."""
+        if self.window_us <= 0:
+            return 0.0
+        return min(1.0, self.busy_time_us / (self.window_us * self.replicas))
+    
+    @property
+    def comm_tx_ms(self) -> Optional[float]:
+        """Mean request-leg overhead of outgoing calls in milliseconds."""
+        return self.request_gap_us / self.call_count / 1000.0 if self.call_count else None
+    
+    @property
+    def comm_rcv_ms(self) -> Optional[float]:
+        """Mean response-leg overhead of outgoing calls in milliseconds."""
+        return self.response_gap_us / self.call_count / 1000.0 if self.call_count else None
+    
+    def describe(self) -> str:
+        """Format the profile for annotations."""
+        text = (f"Resources: replicas={self.replicas}; "
+                f"busy time={self.busy_time_us / 1000.0:.3f}ms; "
+                f"utilization per replica={self.utilization:.4f}")
+        if self.call_count:
+            text += (f"; comm overhead over {self.call_count} call(s): "
+                     f"tx={self.comm_tx_ms:.3f}ms, rcv={self.comm_rcv_ms:.3f}ms")
+        return text
+
+
+class NodeResourceAnalyzer:
+    """
+    Measures replicas, busy time and communication overheads per node.
+    
+    Replicas are the distinct raw instance names (pod or host names before
+    their deployment hash is removed) of the processes mapped to a node.
+    Busy time is the sum of span self times; client spans with children are
+    left out since their self time is spent waiting on the wire. Communication
+    overheads come from the gaps between a client span and the child span
+    it starts in another service: the request leg before the child starts
+    is the caller's transmit overhead, the response leg after the child
+    ends is its receive overhead.
+    """
+    
+    def __init__(self, traces: List[Trace], service_to_node: Dict[str, str]):
+        """
+        Initialize the analyzer and measure all traces.
+        
+        Args:
+            traces: List of Trace objects (clock skew already adjusted)
+            service_to_node: Map of service name to deployment node name
+        """
+        self.traces = traces if traces else []
+        self.service_to_node = service_to_node or {}
+        self.profiles: Dict[str, NodeResourceProfile] = {}
+        
+        self._analyze()
+    
+    def _get_profile(self, node: str) -> NodeResourceProfile:
+        """Get the profile of a node, creating it on first use."""
+        profile = self.profiles.get(node)
+        if profile is None:
+            profile = NodeResourceProfile(node=node)
+            self.profiles[node] = profile
+        return profile
+    
+    def _analyze(self):
+        """Collect instances, self times and call gaps from all traces."""
+        window_start = None
+        window_end = None
+        
+        for trace in self.traces:
+            if not trace or not trace.spans:
+                continue
+            
+            for process in trace.processes.values():
+                node = self.service_to_node.get(process.service_name)
+                instance = get_instance_name(process.tags)
+                if node and instance:
+                    self._get_profile(node).instances.add(instance)
+            
+            timing = get_trace_timing(trace)
+            span_index = trace.get_span_index()
+            children_index = trace.get_children_index()
+            for span in trace.spans:
+                start = span.start_time
+                end = span.start_time + span.duration
+                window_start = start if window_start is None else min(window_start, start)
+                window_end = end if window_end is None else max(window_end, end)
+                
+                service = trace.get_service_name(span)
+                node = self.service_to_node.get(service)
+                is_waiting = (span.get_tag('span.kind') == 'client'
+                              and span.span_id in children_index)
+                if node and not is_waiting:
+                    self._get_profile(node).busy_time_us += timing.get_self_time(span.span_id)
+                
+                parent = span_index.get(span.get_parent_span_id())
+                if parent is None or trace.get_service_name(parent) == service:
+                    continue
+                if parent.get_tag('span.kind') not in (None, 'client'):
+                    # The gap would include the caller's own work before the call
+                    continue
+                caller_node = self.service_to_node.get(trace.get_service_name(parent))
+                request_gap = span.start_time - parent.start_time
+                response_gap = parent.start_time + parent.duration - end
+                if caller_node and request_gap >= 0 and response_gap >= 0:
+                    profile = self._get_profile(caller_node)
+                    profile.call_count += 1
+                    profile.request_gap_us += request_gap
+                    profile.response_gap_us += response_gap
+        
+        window_us = (window_end - window_start) if window_start is not None else 0
+        for profile in self.profiles.values():
+            profile.window_us = window_us
+        
+        logger.info(f"Measured resources of {len(self.profiles)} node(s)")
+    
+    def get_profiles(self) -> Dict[str, NodeResourceProfile]:
+        """Get resource profiles per deployment node."""
+        return dict(self.profiles)
+    
+    def get_profile(self, node: str) -> Optional[NodeResourceProfile]:
+        """Get the resource profile of a deployment node."""
+        return self.profiles.get(node)
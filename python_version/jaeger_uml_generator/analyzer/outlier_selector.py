@@ -0,0 +1,176 @@
+"""Streaming selection of statistically slow traces."""
+
+import heapq
+import logging
+import math
+from dataclasses import dataclass
+from typing import List, Dict, Tuple, Optional
+from ..models import Trace
+from .latency_sketch import LatencySketch
+from .trace_fingerprint import get_trace_duration, get_entry_operation
+
+
+logger = logging.getLogger(__name__)
+
+
+# Key under which the selection details are stored in Trace.analysis_cache
+OUTLIER_CACHE_KEY = 'outlier'
+
+DEFAULT_OUTLIER_QUANTILE = 0.99
+DEFAULT_MAX_OUTLIERS = 50
+# Minimum traces per entry operation before any of them can be an outlier
+DEFAULT_MIN_SAMPLES = 20
+
+
+@dataclass
+class OutlierInfo:
+    """Why a trace was selected as an outlier."""
+    
+    # "service:operation" of the trace's entry span
+    entry_operation: str
+    duration_us: int
+    threshold_us: float
+    # Number of traces in the entry operation's baseline
+    baseline_count: int
+    
+    @property
+    def severity(self) -> float:
+        """Ratio of the trace duration to the outlier threshold."""
+        return self.duration_us / self.threshold_us if self.threshold_us > 0 else math.inf
+    
+    def describe(self) -> str:
+        """Format the selection reason for annotations."""
+        return (f"Outlier of {self.entry_operation}: {self.duration_us / 1000.0:.3f}ms, "
+                f"threshold {self.threshold_us / 1000.0:.3f}ms "
+                f"({self.severity:.1f}x, baseline of {self.baseline_count} trace(s))")
+
+
+class OutlierSelector:
+    """
+    Picks the slowest traces relative to their entry operation.
+    
+    Every trace updates a LatencySketch baseline of its entry operation
+    (service and operation of the first entry span). A trace above the
+    current threshold - a quantile of the baseline, or mean + z standard
+    deviations - enters a bounded pool of candidates ranked by severity, so
+    memory stays bounded whatever the corpus size. When the stream ends,
+    pooled candidates are checked again against the final baselines.
+    """
+    
+    def __init__(self, quantile: float = DEFAULT_OUTLIER_QUANTILE,
+                 z_score: Optional[float] = None,
+                 max_selected: int = DEFAULT_MAX_OUTLIERS,
+                 min_samples: int = DEFAULT_MIN_SAMPLES):
+        """
+        Initialize the selector.
+        
+        Args:
+            quantile: Baseline quantile above which a trace is an outlier
+            z_score: If set, use mean + z_score * stddev instead of the quantile
+            max_selected: Maximum number of candidates kept (and selected)
+            min_samples: Minimum baseline size for an entry operation
+        """
+        if not 0 < quantile < 1:
+            raise ValueError(f"Outlier quantile must be in (0, 1), got {quantile}")
+        if max_selected < 1:
+            raise ValueError(f"Maximum outliers must be at least 1, got {max_selected}")
+        
+        self.quantile = quantile
+        self.z_score = z_score
+        self.max_selected = max_selected
+        self.min_samples = min_samples
+        
+        self.baselines: Dict[str, LatencySketch] = {}
+        self.trace_count = 0
+        # Min-heap of (severity, sequence, index, trace, entry_operation, duration)
+        self._pool: List[Tuple[float, int, int, Trace, str, int]] = []
+    
+    def get_threshold(self, entry_operation: str) -> float:
+        """
+        Get the current outlier threshold of an entry operation.
+        
+        Returns:
+            Threshold in microseconds, inf while the baseline is too small
+        """
+        baseline = self.baselines.get(entry_operation)
+        if baseline is None or baseline.count < self.min_samples:
+            return math.inf
+        if self.z_score is not None:
+            return baseline.mean + self.z_score * math.sqrt(baseline.variance)
+        return baseline.quantile(self.quantile)
+    
+    def add(self, trace: Trace, index: Optional[int] = None):
+        """
+        Observe a trace.
+        
+        Args:
+            trace: Trace object
+            index: Position of the trace in the input (default: arrival order)
+        """
+        entry_operation = get_entry_operation(trace)
+        if entry_operation is None:
+            return
+        
+        if index is None:
+            index = self.trace_count
+        self.trace_count += 1
+        
+        duration = get_trace_duration(trace)
+        baseline = self.baselines.get(entry_operation)
+        if baseline is None:
+            baseline = LatencySketch()
+            self.baselines[entry_operation] = baseline
+        baseline.add(duration)
+        
+        # Keep early traces of an operation too; they are re-checked at the end
+        threshold = self.get_threshold(entry_operation)
+        if threshold == math.inf:
+            severity = duration / baseline.max if baseline.max else 0.0
+        elif duration > threshold:
+            severity = duration / threshold if threshold > 0 else math.inf
+        else:
+            return
+        
+        entry = (severity, self.trace_count, index, trace, entry_operation, duration)
+        if len(self._pool) < self.max_selected:
+            heapq.heappush(self._pool, entry)
+        elif severity > self._pool[0][0]:
+            heapq.heapreplace(self._pool, entry)
+    
+    def add_traces(self, traces: List[Trace]):
+        """Observe several traces, indexed by their position in the list."""
+        for i, trace in enumerate(traces):
+            self.add(trace, i)
+    
+    def select(self) -> List[Trace]:
+        """
+        Get the outlier traces.
+        
+        Each selected trace gets an OutlierInfo in its analysis_cache under
+        OUTLIER_CACHE_KEY.
+        
+        Returns:
+            Selected traces in input order
+        """
+        selected = []
+        for _, _, index, trace, entry_operation, duration in self._pool:
+            threshold = self.get_threshold(entry_operation)
+            if duration <= threshold:
+                continue
+            trace.analysis_cache[OUTLIER_CACHE_KEY] = OutlierInfo(
+                entry_operation=entry_operation,
+                duration_us=duration,
+                threshold_us=threshold,
+                baseline_count=self.baselines[entry_operation].count
+            )
+            selected.append((index, trace))
+        
+        selected.sort(key=lambda entry: entry[0])
+        logger.info(f"Selected {len(selected)} outlier trace(s) out of {self.trace_count} "
+                   f"across {len(self.baselines)} entry operation(s)")
+        return [trace for _, trace in selected]
+
+
+def get_outlier_info(trace: Trace) -> Optional[OutlierInfo]:
+    """Get the outlier selection details of a trace, if it was selected."""
+    return trace.analysis_cache.get(OUTLIER_CACHE_KEY)
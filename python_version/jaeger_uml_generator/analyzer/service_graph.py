@@ -0,0 +1,293 @@
+"""Indexed service dependency graph and graph analytics."""
+
+import logging
+from collections import deque
+from typing import List, Dict, Set, Tuple, Optional
+
+
+logger = logging.getLogger(__name__)
+
+
+class ServiceGraph:
+    """
+    Service call graph as an indexed adjacency matrix.
+    
+    Services are indexed in sorted order. Call counts and mean latencies are
+    dense n x n matrices; the boolean structure is also kept as one integer
+    bitset per row, so reachability questions run as whole-row bitwise
+    operations instead of per-edge Python loops.
+    """
+    
+    def __init__(self, services: List[str], call_counts: List[List[int]],
+                 mean_latency_ms: Optional[List[List[float]]] = None):
+        """
+        Initialize the graph.
+        
+        Args:
+            services: Service names, in matrix index order
+            call_counts: call_counts[i][j] = calls from services[i] to services[j]
+            mean_latency_ms: Mean call latency per edge in milliseconds
+        """
+        size = len(services)
+        self.services = list(services)
+        self.index: Dict[str, int] = {service: i for i, service in enumerate(self.services)}
+        self.call_counts = call_counts
+        self.mean_latency_ms = mean_latency_ms or [[0.0] * size for _ in range(size)]
+        
+        # rows[i] has bit j set when services[i] calls services[j]
+        self.rows: List[int] = []
+        for counts in call_counts:
+            row = 0
+            for j, count in enumerate(counts):
+                if count:
+                    row |= 1 << j
+            self.rows.append(row)
+        
+        self._closure: Optional[List[int]] = None
+        self._components: Optional[List[List[int]]] = None
+    
+    def __len__(self) -> int:
+        return len(self.services)
+    
+    def _names(self, bits: int) -> Set[str]:
+        """Get the service names of the set bits of a row."""
+        names = set()
+        while bits:
+            low = bits & -bits
+            names.add(self.services[low.bit_length() - 1])
+            bits ^= low
+        return names
+    
+    def get_callees(self, service: str) -> Set[str]:
+        """Get the services a service calls directly."""
+        i = self.index.get(service)
+        return self._names(self.rows[i]) if i is not None else set()
+    
+    def get_callers(self, service: str) -> Set[str]:
+        """Get the services calling a service directly."""
+        j = self.index.get(service)
+        if j is None:
+            return set()
+        bit = 1 << j
+        return {self.services[i] for i, row in enumerate(self.rows) if row & bit}
+    
+    def transitive_closure(self) -> List[int]:
+        """
+        Get the reachability matrix (Warshall's algorithm on row bitsets).
+        
+        Returns:
+            One bitset per service: bit j set when services[j] is reachable
+            through one or more calls
+        """
+        if self._closure is None:
+            closure = list(self.rows)
+            for k in range(len(closure)):
+                bit = 1 << k
+                row_k = closure[k]
+                for i in range(len(closure)):
+                    if closure[i] & bit:
+                        closure[i] |= row_k
+            self._closure = closure
+        return self._closure
+    
+    def is_reachable(self, from_service: str, to_service: str) -> bool:
+        """Check whether one service transitively calls another."""
+        i = self.index.get(from_service)
+        j = self.index.get(to_service)
+        if i is None or j is None:
+            return False
+        return bool(self.transitive_closure()[i] >> j & 1)
+    
+    def get_downstream(self, service: str) -> Set[str]:
+        """Get all services a service depends on, directly or transitively."""
+        i = self.index.get(service)
+        return self._names(self.transitive_closure()[i]) - {service} if i is not None else set()
+    
+    def get_upstream(self, service: str) -> Set[str]:
+        """Get all services depending on a service, directly or transitively."""
+        j = self.index.get(service)
+        if j is None:
+            return set()
+        bit = 1 << j
+        return {
+            self.services[i] for i, row in enumerate(self.transitive_closure())
+            if row & bit and i != j
+        }
+    
+    def _get_component_indexes(self) -> List[List[int]]:
+        """Get strongly connected components as lists of service indexes."""
+        if self._components is None:
+            closure = self.transitive_closure()
+            size = len(closure)
+            # Column bitsets of the closure: who reaches each service
+            reached_by = [0] * size
+            for i, row in enumerate(closure):
+                bits = row
+                while bits:
+                    low = bits & -bits
+                    reached_by[low.bit_length() - 1] |= 1 << i
+                    bits ^= low
+            
+            assigned = 0
+            components = []
+            for i in range(size):
+                if assigned >> i & 1:
+                    continue
+                # Services reachable from i that also reach i, plus i itself
+                members = (closure[i] & reached_by[i]) | (1 << i)
+                assigned |= members
+                components.append([j for j in range(size) if members >> j & 1])
+            self._components = components
+        return self._components
+    
+    def strongly_connected_components(self) -> List[List[str]]:
+        """
+        Get the strongly connected components of the graph.
+        
+        Returns:
+            Components as sorted lists of service names, largest first
+        """
+        components = [
+            [self.services[i] for i in component]
+            for component in self._get_component_indexes()
+        ]
+        return sorted(components, key=lambda component: (-len(component), component))
+    
+    def get_cycles(self) -> List[List[str]]:
+        """Get the components containing call cycles (including self-calls)."""
+        return [
+            [self.services[i] for i in component]
+            for component in self._get_component_indexes()
+            if len(component) > 1 or self.rows[component[0]] >> component[0] & 1
+        ]
+    
+    def get_layer_depths(self) -> Dict[str, int]:
+        """
+        Get the layer of every service.
+        
+        Cycles are collapsed into their component first; entry points (no
+        callers outside their own component) are layer 0 and every other
+        service sits one layer below its deepest caller.
+        
+        Returns:
+            Map of service -> layer depth
+        """
+        components = self._get_component_indexes()
+        component_of = [0] * len(self.services)
+        for c, component in enumerate(components):
+            for i in component:
+                component_of[i] = c
+        
+        # Edges and in-degrees of the component DAG
+        successors: List[Set[int]] = [set() for _ in components]
+        in_degree = [0] * len(components)
+        for i, row in enumerate(self.rows):
+            bits = row
+            while bits:
+                low = bits & -bits
+                j = low.bit_length() - 1
+                bits ^= low
+                a, b = component_of[i], component_of[j]
+                if a != b and b not in successors[a]:
+                    successors[a].add(b)
+                    in_degree[b] += 1
+        
+        # Longest path from the entry components, in topological order
+        depth = [0] * len(components)
+        queue = deque(c for c in range(len(components)) if in_degree[c] == 0)
+        while queue:
+            a = queue.popleft()
+            for b in successors[a]:
+                depth[b] = max(depth[b], depth[a] + 1)
+                in_degree[b] -= 1
+                if in_degree[b] == 0:
+                    queue.append(b)
+        
+        return {service: depth[component_of[i]] for i, service in enumerate(self.services)}
+    
+    def get_layers(self) -> List[List[str]]:
+        """Get services grouped by layer depth, from the entry points down."""
+        layers: Dict[int, List[str]] = {}
+        for service, depth in self.get_layer_depths().items():
+            layers.setdefault(depth, []).append(service)
+        return [sorted(layers[depth]) for depth in sorted(layers)]
+    
+    def get_fan_in(self, service: str) -> int:
+        """Get the number of distinct direct callers of a service."""
+        return len(self.get_callers(service))
+    
+    def get_fan_out(self, service: str) -> int:
+        """Get the number of distinct services a service calls directly."""
+        i = self.index.get(service)
+        return bin(self.rows[i]).count('1') if i is not None else 0
+    
+    def rank_services(self, k: Optional[int] = None) -> List[Tuple[str, Dict[str, float]]]:
+        """
+        Rank services by how much of the mesh depends on them.
+        
+        Services are ordered by transitive fan-in (how many services are
+        affected when they fail or slow down), then by incoming call volume.
+        
+        Args:
+            k: Number of services to return (default: all)
+        
+        Returns:
+            List of (service, metrics) where metrics holds fan_in, fan_out,
+            transitive_fan_in, transitive_fan_out, calls_in, calls_out and
+            layer
+        """
+        depths = self.get_layer_depths()
+        closure = self.transitive_closure()
+        size = len(self.services)
+        
+        ranking = []
+        for j, service in enumerate(self.services):
+            bit = 1 << j
+            metrics = {
+                'fan_in': sum(1 for i in range(size) if self.rows[i] & bit),
+                'fan_out': bin(self.rows[j]).count('1'),
+                'transitive_fan_in': sum(1 for i in range(size) if i != j and closure[i] & bit),
+                'transitive_fan_out': bin(closure[j] & ~bit).count('1'),
+                'calls_in': sum(self.call_counts[i][j] for i in range(size)),
+                'calls_out': sum(self.call_counts[j]),
+                'layer': depths[service],
+            }
+            ranking.append((service, metrics))
+        
+        ranking.sort(key=lambda entry: (-entry[1]['transitive_fan_in'],
+                                        -entry[1]['calls_in'], entry[0]))
+        return ranking if k is None else ranking[:k]
+    
+    def format_report(self) -> str:
+        """
+        Format the graph analytics as a human-readable text report.
+        
+        Returns:
+            Report text
+        """
+        edge_count = sum(bin(row).count('1') for row in self.rows)
+        lines = [
+            "Service dependency graph",
+            f"  {len(self.services)} service(s), {edge_count} call edge(s)",
+            "",
+            "Layers (0 = entry points):"
+        ]
+        for depth, layer in enumerate(self.get_layers()):
+            lines.append(f"  {depth}: {', '.join(layer)}")
+        lines.append("")
+        
+        cycles = self.get_cycles()
+        lines.append(f"Call cycles ({len(cycles)}):")
+        lines.extend(f"  {' <-> '.join(cycle)}" for cycle in cycles)
+        if not cycles:
+            lines.append("  none")
+        lines.append("")
+        
+        lines.append("Services ranked by transitive fan-in:")
+        lines.append("  service: fan-in/fan-out, transitive fan-in/fan-out, calls in/out, layer")
+        for service, m in self.rank_services():
+            lines.append(f"  {service}: {m['fan_in']}/{m['fan_out']}, "
+                         f"{m['transitive_fan_in']}/{m['transitive_fan_out']}, "
+                         f"{m['calls_in']}/{m['calls_out']}, {m['layer']}")
+        
+        return "\n".join(lines) + "\n"
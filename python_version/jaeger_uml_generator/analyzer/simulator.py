@@ -0,0 +1,303 @@
+"""Discrete-event simulation of the traced call graph under synthetic load."""
+
+import heapq
+import logging
+import math
+import random
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import List, Dict, Tuple, Optional
+from .latency_sketch import LatencySketch
+
+
+logger = logging.getLogger(__name__)
+
+
+ARRIVAL_PROCESSES = ('poisson', 'deterministic')
+# Points of the inverse CDF tables service times are drawn from
+SERVICE_TIME_TABLE_SIZE = 256
+# Share of the requests simulated before latencies are recorded
+DEFAULT_WARMUP_FRACTION = 0.1
+# Quantiles listed in the report
+SIMULATION_QUANTILES = (0.5, 0.95, 0.99)
+
+# Event kinds
+_ARRIVAL = 0
+_SERVICE_DONE = 1
+
+
+@dataclass
+class SimulationResult:
+    """Simulated end-to-end latencies and station load."""
+    
+    classes: List[str]
+    stations: List[str]
+    # Per class: distribution of end-to-end latencies (microseconds)
+    latencies: List[LatencySketch] = field(default_factory=list)
+    # Per station: busy fraction of its servers over the simulated time
+    utilizations: List[float] = field(default_factory=list)
+    requests: int = 0
+    events: int = 0
+    simulated_time_us: float = 0.0
+    wall_time_s: float = 0.0
+
+
+class CallGraphSimulator:
+    """
+    Replays the traced call graph as an open network of FCFS stations.
+    
+    Every service is a station with a number of servers (e.g. its
+    replicas). A request arrives through a root entry; an invocation of an
+    entry queues for a server of its service, holds it for a self time
+    drawn from the entry's empirical distribution, then issues its calls
+    to other entries in parallel and completes when all of them have
+    completed. The number of calls to each callee is the integer part of
+    the measured mean calls per invocation plus one more with the
+    probability of its fractional part.
+    
+    The engine is a single heap of (time, sequence, kind, payload) events.
+    Invocation state lives in flat lists indexed by recycled slot numbers,
+    so memory grows only with the number of requests in flight.
+    """
+    
+    def __init__(self, aggregator, arrival_rates: Dict[str, float],
+                 servers: Optional[Dict[str, int]] = None):
+        """
+        Compile the simulation model from the entry statistics of a TraceAggregator.
+        
+        Args:
+            aggregator: TraceAggregator with entry statistics
+            arrival_rates: Map of root entry "service:operation" -> arrivals
+                           per second; roots without a rate are not driven
+            servers: Map of service -> number of servers (default 1)
+        """
+        servers = servers or {}
+        entries = aggregator.get_entries()
+        entry_index = {entry: i for i, entry in enumerate(entries)}
+        
+        self.stations: List[str] = sorted({service for service, _ in entries})
+        station_index = {service: k for k, service in enumerate(self.stations)}
+        self.servers = [max(1, servers.get(service, 1)) for service in self.stations]
+        
+        self._entry_stations = [station_index[entry[0]] for entry in entries]
+        self._service_tables = []
+        self._calls: List[List[Tuple[int, int, float]]] = []
+        for entry in entries:
+            self._service_tables.append(
+                aggregator.get_entry_self_time(entry).get_quantile_table(SERVICE_TIME_TABLE_SIZE)
+                or [0.0] * SERVICE_TIME_TABLE_SIZE
+            )
+            calls = []
+            for callee, mean_calls in sorted(aggregator.get_entry_calls(entry).items()):
+                whole = math.floor(mean_calls)
+                calls.append((entry_index[callee], whole, mean_calls - whole))
+            self._calls.append(calls)
+        
+        self.classes: List[str] = []
+        self._class_entries: List[int] = []
+        self._class_rates: List[float] = []
+        for root in sorted(aggregator.get_root_entries()):
+            name = f"{root[0]}:{root[1]}"
+            rate = arrival_rates.get(name, 0.0)
+            if rate > 0:
+                self.classes.append(name)
+                self._class_entries.append(entry_index[root])
+                # Arrivals per microsecond
+                self._class_rates.append(rate / 1_000_000)
+    
+    def run(self, requests: int, arrival_process: str = 'poisson',
+            seed: Optional[int] = None,
+            warmup_fraction: float = DEFAULT_WARMUP_FRACTION) -> SimulationResult:
+        """
+        Simulate a number of requests.
+        
+        Args:
+            requests: Total number of arriving requests, all classes together
+            arrival_process: 'poisson' (exponential inter-arrival times) or
+                             'deterministic' (fixed inter-arrival times)
+            seed: Random seed, for reproducible runs
+            warmup_fraction: Share of the requests whose latency is not recorded
+        
+        Returns:
+            SimulationResult with latency distributions per class
+        """
+        rng = random.Random(seed)
+        uniform = rng.random
+        expovariate = rng.expovariate
+        heappush = heapq.heappush
+        heappop = heapq.heappop
+        table_size = SERVICE_TIME_TABLE_SIZE
+        
+        entry_stations = self._entry_stations
+        service_tables = self._service_tables
+        calls = self._calls
+        class_entries = self._class_entries
+        class_rates = self._class_rates
+        poisson = arrival_process == 'poisson'
+        
+        result = SimulationResult(classes=list(self.classes), stations=list(self.stations))
+        result.latencies = [LatencySketch() for _ in self.classes]
+        if not self.classes or requests <= 0:
+            return result
+        
+        free_servers = list(self.servers)
+        queues = [deque() for _ in self.stations]
+        busy_time = [0.0] * len(self.stations)
+        
+        # Invocation slots: entry, parent slot (-1 for the request itself),
+        # outstanding calls, and for requests their class and arrival time
+        capacity = 1024
+        slot_entry = [0] * capacity
+        slot_parent = [0] * capacity
+        slot_pending = [0] * capacity
+        slot_class = [0] * capacity
+        slot_arrival = [0.0] * capacity
+        free_slots = list(range(capacity - 1, -1, -1))
+        
+        events = []
+        sequence = 0
+        event_count = 0
+        arrived = 0
+        warmup = int(requests * warmup_fraction)
+        now = 0.0
+        
+        def allocate() -> int:
+            nonlocal capacity, slot_entry, slot_parent, slot_pending, slot_class, slot_arrival
+            if not free_slots:
+                # Double the preallocated state
+                slot_entry += [0] * capacity
+                slot_parent += [0] * capacity
+                slot_pending += [0] * capacity
+                slot_class += [0] * capacity
+                slot_arrival += [0.0] * capacity
+                free_slots.extend(range(2 * capacity - 1, capacity - 1, -1))
+                capacity *= 2
+            return free_slots.pop()
+        
+        def next_gap(c: int) -> float:
+            return expovariate(class_rates[c]) if poisson else 1.0 / class_rates[c]
+        
+        def start(slot: int):
+            nonlocal sequence
+            entry = slot_entry[slot]
+            station = entry_stations[entry]
+            if free_servers[station]:
+                free_servers[station] -= 1
+                service_time = service_tables[entry][int(uniform() * table_size)]
+                busy_time[station] += service_time
+                sequence += 1
+                heappush(events, (now + service_time, sequence, _SERVICE_DONE, slot))
+            else:
+                queues[station].append(slot)
+        
+        def complete(slot: int):
+            # Walk up the call tree while the last outstanding call completes
+            while True:
+                parent = slot_parent[slot]
+                free_slots.append(slot)
+                if parent < 0:
+                    if slot_arrival[slot] >= 0:
+                        result.latencies[slot_class[slot]].add(now - slot_arrival[slot])
+                    return
+                slot_pending[parent] -= 1
+                if slot_pending[parent]:
+                    return
+                slot = parent
+        
+        # One pending arrival per class
+        for c in range(len(class_rates)):
+            sequence += 1
+            heappush(events, (next_gap(c), sequence, _ARRIVAL, c))
+        
+        started = time.perf_counter()
+        while events:
+            now, _, kind, payload = heappop(events)
+            event_count += 1
+            
+            if kind == _ARRIVAL:
+                if arrived >= requests:
+                    # Pending arrival of another class after the last request
+                    continue
+                c = payload
+                slot = allocate()
+                slot_entry[slot] = class_entries[c]
+                slot_parent[slot] = -1
+                slot_class[slot] = c
+                # Negative arrival time marks warm-up requests
+                slot_arrival[slot] = now if arrived >= warmup else -1.0
+                arrived += 1
+                start(slot)
+                if arrived < requests:
+                    sequence += 1
+                    heappush(events, (now + next_gap(c), sequence, _ARRIVAL, c))
+                continue
+            
+            slot = payload
+            station = entry_stations[slot_entry[slot]]
+            queue = queues[station]
+            if queue:
+                # Hand the server over to the next invocation in line
+                waiting = queue.popleft()
+                service_time = service_tables[slot_entry[waiting]][int(uniform() * table_size)]
+                busy_time[station] += service_time
+                sequence += 1
+                heappush(events, (now + service_time, sequence, _SERVICE_DONE, waiting))
+            else:
+                free_servers[station] += 1
+            
+            pending = 0
+            for callee, whole, fraction in calls[slot_entry[slot]]:
+                count = whole + (1 if fraction and uniform() < fraction else 0)
+                for _ in range(count):
+                    child = allocate()
+                    slot_entry[child] = callee
+                    slot_parent[child] = slot
+                    pending += 1
+                    start(child)
+            if pending:
+                slot_pending[slot] = pending
+            else:
+                complete(slot)
+        
+        result.requests = arrived
+        result.events = event_count
+        result.simulated_time_us = now
+        result.wall_time_s = time.perf_counter() - started
+        result.utilizations = [
+            busy_time[k] / (self.servers[k] * now) if now > 0 else 0.0
+            for k in range(len(self.stations))
+        ]
+        logger.info(f"Simulated {arrived} request(s) with {event_count} event(s) "
+                   f"in {result.wall_time_s:.2f}s")
+        return result
+    
+    def format_report(self, result: SimulationResult) -> str:
+        """
+        Format a simulation result as a human-readable text report.
+        
+        Returns:
+            Report text
+        """
+        rate = result.requests / result.wall_time_s * 60 if result.wall_time_s > 0 else 0.0
+        lines = [
+            "Call graph simulation",
+            f"  {result.requests} request(s), {result.events} event(s), "
+            f"{result.simulated_time_us / 1_000_000:.3f}s simulated "
+            f"({rate:,.0f} request(s)/min of wall-clock time)",
+            "",
+            "End-to-end latency per entry operation (ms):"
+        ]
+        for c, name in enumerate(result.classes):
+            sketch = result.latencies[c]
+            quantiles = ", ".join(
+                f"p{round(q * 100)}={sketch.quantile(q) / 1000.0:.3f}" for q in SIMULATION_QUANTILES
+            )
+            lines.append(f"  {name}: n={sketch.count}, mean={sketch.mean / 1000.0:.3f}, {quantiles}")
+        lines.append("")
+        
+        lines.append("Station utilization (servers):")
+        for k in sorted(range(len(result.stations)), key=lambda k: -result.utilizations[k]):
+            lines.append(f"  {result.stations[k]}: {result.utilizations[k]:.4f} ({self.servers[k]})")
+        
+        return "\n".join(lines) + "\n"
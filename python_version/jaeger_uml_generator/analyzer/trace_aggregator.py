@@ -1,32 +1,69 @@
 """Trace aggregator for analyzing multiple traces."""
 
 import logging
-from typing import List, Set, Dict
+from typing import List, Set, Dict, Tuple
 from ..models import Trace, Span
+from .heavy_hitters import SpaceSavingCounter
+from .latency_sketch import LatencySketch
+from .service_graph import ServiceGraph
+from .critical_path import get_trace_timing
+from .trace_fingerprint import get_entry_span
 
 
 logger = logging.getLogger(__name__)
 
 
+# Default maximum number of distinct operations tracked per service / call edge
+DEFAULT_OPERATION_CAPACITY = 1000
+
+# (service, operation) of a span entering a service
+EntryKey = Tuple[str, str]
+
+
 class TraceAggregator:
     """Aggregates and analyzes data from multiple traces."""
     
-    def __init__(self, traces: List[Trace]):
+    def __init__(self, traces: List[Trace], operation_capacity: int = DEFAULT_OPERATION_CAPACITY):
         """
         Initialize the aggregator with a list of traces.
         
         Args:
             traces: List of Trace objects
+            operation_capacity: Maximum number of distinct operations tracked per
+                                service and per call edge. Operations are counted
+                                with Space-Saving, so memory stays bounded and the
+                                most called operations are always kept.
         """
         self.traces = traces if traces else []
+        self.operation_capacity = operation_capacity
         
         # Aggregated data
         self.all_services: Set[str] = set()
-        self.service_operations: Dict[str, Set[str]] = {}
+        # Map: service -> bounded operation call counts
+        self.service_operations: Dict[str, SpaceSavingCounter] = {}
         self.service_dependencies: Dict[str, Set[str]] = {}
         self.service_metadata: Dict[str, Dict[str, any]] = {}
-        # Map: fromService -> toService -> Set of operations called
-        self.service_calls: Dict[str, Dict[str, Set[str]]] = {}
+        # Map: fromService -> toService -> bounded counts of operations called
+        self.service_calls: Dict[str, Dict[str, SpaceSavingCounter]] = {}
+        # Map: fromService -> toService -> latency distribution of calls (microseconds)
+        self.call_latencies: Dict[str, Dict[str, LatencySketch]] = {}
+        # Entries are the operations through which requests enter a service
+        # (trace roots and spans called from another service). They are
+        # bounded like operations: the statistics below are kept only for
+        # the entries tracked by the per-service Space-Saving counters.
+        # Map: service -> bounded invocation counts of its entry operations
+        self.entry_invocations: Dict[str, SpaceSavingCounter] = {}
+        # Map: entry -> invocations as a trace's entry span (see get_entry_span())
+        self.root_entries: Dict[EntryKey, int] = {}
+        # Map: entry -> distribution of the self time one invocation spends
+        # inside the service (microseconds)
+        self.entry_self_times: Dict[EntryKey, LatencySketch] = {}
+        # Map: caller entry -> callee entry -> number of calls
+        self.entry_calls: Dict[EntryKey, Dict[EntryKey, int]] = {}
+        # Map: callee entry -> caller entries (to forget evicted entries)
+        self.entry_callers: Dict[EntryKey, Set[EntryKey]] = {}
+        self.trace_count = 0
+        self.span_count = 0
         
         # Analyze all traces
         self._analyze()
@@ -41,11 +78,26 @@ class TraceAggregator:
         logger.info(f"Found {len(self.all_services)} unique service(s)")
         logger.info(f"Service list: {sorted(self.all_services)}")
     
+    def add_trace(self, trace: Trace):
+        """
+        Add a trace to the aggregate without retaining it in self.traces.
+        
+        Lets large corpora be aggregated chunk by chunk: only the bounded
+        summaries are kept in memory.
+        
+        Args:
+            trace: Trace object
+        """
+        self._analyze_trace(trace)
+    
     def _analyze_trace(self, trace: Trace):
         """Analyze a single trace."""
         if not trace or not trace.spans:
             return
         
+        self.trace_count += 1
+        self.span_count += len(trace.spans)
+        
         for span in trace.spans:
             service_name = trace.get_service_name(span)
             
@@ -54,7 +106,7 @@ class TraceAggregator:
             
             # Collect operations
             if service_name not in self.service_operations:
-                self.service_operations[service_name] = set()
+                self.service_operations[service_name] = SpaceSavingCounter(self.operation_capacity)
             self.service_operations[service_name].add(span.operation_name)
             
             # Collect metadata from process tags
@@ -81,16 +133,106 @@ class TraceAggregator:
                         if parent_service not in self.service_calls:
                             self.service_calls[parent_service] = {}
                         if service_name not in self.service_calls[parent_service]:
-                            self.service_calls[parent_service][service_name] = set()
+                            self.service_calls[parent_service][service_name] = SpaceSavingCounter(
+                                self.operation_capacity
+                            )
                         self.service_calls[parent_service][service_name].add(span.operation_name)
+                        
+                        # Track call latency distribution
+                        if parent_service not in self.call_latencies:
+                            self.call_latencies[parent_service] = {}
+                        if service_name not in self.call_latencies[parent_service]:
+                            self.call_latencies[parent_service][service_name] = LatencySketch()
+                        self.call_latencies[parent_service][service_name].add(span.duration)
+        
+        self._analyze_entries(trace)
+    
+    def _analyze_entries(self, trace: Trace):
+        """
+        Accumulate invocations, self times and calls per entry.
+        
+        Every span is charged to the entry through which the request reached
+        its service. Client spans with children are skipped for self time
+        since theirs is spent waiting on the wire; leaf client spans (calls
+        to uninstrumented backends) are the only measure of that work.
+        """
+        timing = get_trace_timing(trace)
+        children_index = trace.get_children_index()
+        
+        # Self time per invocation, keyed by the span ID of its entering span
+        invocation_entries: Dict[str, EntryKey] = {}
+        invocation_self_times: Dict[str, int] = {}
+        
+        # Only the entry span counts as an arrival (same as the workload
+        # characterization); orphan spans still count as invocations
+        root_span = get_entry_span(trace)
+        
+        # (span, entry of the enclosing request, invocation ID)
+        stack = [(span, None, None) for span in trace.get_entry_spans()]
+        while stack:
+            span, entry, invocation = stack.pop()
+            service_name = trace.get_service_name(span)
+            
+            if entry is None or entry[0] != service_name:
+                callee = (service_name, span.operation_name)
+                self._add_entry_invocation(callee)
+                if span is root_span:
+                    self.root_entries[callee] = self.root_entries.get(callee, 0) + 1
+                elif entry is not None and self._is_tracked_entry(entry):
+                    calls = self.entry_calls.setdefault(entry, {})
+                    calls[callee] = calls.get(callee, 0) + 1
+                    self.entry_callers.setdefault(callee, set()).add(entry)
+                entry = callee
+                invocation = span.span_id
+                invocation_entries[invocation] = entry
+                invocation_self_times[invocation] = 0
+            
+            children = children_index.get(span.span_id, [])
+            if not children or span.get_tag('span.kind') != 'client':
+                invocation_self_times[invocation] += timing.get_self_time(span.span_id)
+            
+            for child in children:
+                stack.append((child, entry, invocation))
+        
+        for invocation, self_time in invocation_self_times.items():
+            entry = invocation_entries[invocation]
+            if not self._is_tracked_entry(entry):
+                # Evicted by a later entry of the same trace
+                continue
+            if entry not in self.entry_self_times:
+                self.entry_self_times[entry] = LatencySketch()
+            self.entry_self_times[entry].add(self_time)
+    
+    def _add_entry_invocation(self, entry: EntryKey):
+        """Count an invocation of an entry, forgetting the entry it may evict."""
+        service_name, operation = entry
+        counter = self.entry_invocations.get(service_name)
+        if counter is None:
+            counter = self.entry_invocations[service_name] = SpaceSavingCounter(self.operation_capacity)
+        evicted = counter.add(operation)
+        if evicted is None:
+            return
+        
+        evicted_entry = (service_name, evicted)
+        self.root_entries.pop(evicted_entry, None)
+        self.entry_self_times.pop(evicted_entry, None)
+        for callee in self.entry_calls.pop(evicted_entry, {}):
+            self.entry_callers[callee].discard(evicted_entry)
+        for caller in self.entry_callers.pop(evicted_entry, set()):
+            del self.entry_calls[caller][evicted_entry]
+    
+    def _is_tracked_entry(self, entry: EntryKey) -> bool:
+        """Check whether an entry is tracked by its service's counter."""
+        counter = self.entry_invocations.get(entry[0])
+        return counter is not None and entry[1] in counter
     
     def get_all_services(self) -> Set[str]:
         """Get all unique service names."""
         return self.all_services.copy()
     
     def get_service_operations(self) -> Dict[str, Set[str]]:
-        """Get all operations for each service."""
-        return {k: v.copy() for k, v in self.service_operations.items()}
+        """Get all tracked operations for each service."""
+        return {k: set(v.items()) for k, v in self.service_operations.items()}
     
     def get_service_dependencies(self) -> Dict[str, Set[str]]:
         """Get dependencies between services."""
@@ -101,8 +243,28 @@ class TraceAggregator:
         return {k: v.copy() for k, v in self.service_metadata.items()}
     
     def get_operations_for_service(self, service_name: str) -> Set[str]:
-        """Get all operations for a specific service."""
-        return self.service_operations.get(service_name, set()).copy()
+        """Get all tracked operations for a specific service."""
+        counter = self.service_operations.get(service_name)
+        return set(counter.items()) if counter else set()
+    
+    def get_top_operations(self, service_name: str, k: int = None) -> List[Tuple[str, int]]:
+        """
+        Get the most called operations of a service.
+        
+        Args:
+            service_name: Service name
+            k: Number of operations to return (default: all tracked)
+            
+        Returns:
+            List of (operation, call count) sorted by descending call count
+        """
+        counter = self.service_operations.get(service_name)
+        return counter.top(k) if counter else []
+    
+    def get_operation_count(self, service_name: str) -> int:
+        """Get the number of distinct operations tracked for a service."""
+        counter = self.service_operations.get(service_name)
+        return len(counter) if counter else 0
     
     def get_dependencies_for_service(self, service_name: str) -> Set[str]:
         """Get all services that this service depends on."""
@@ -118,6 +280,100 @@ class TraceAggregator:
         Returns: fromService -> toService -> Set of operations called
         """
         return {
-            from_svc: {to_svc: ops.copy() for to_svc, ops in targets.items()}
+            from_svc: {to_svc: set(ops.items()) for to_svc, ops in targets.items()}
             for from_svc, targets in self.service_calls.items()
         }
+    
+    def get_top_calls(self, from_service: str, to_service: str,
+                      k: int = None) -> List[Tuple[str, int]]:
+        """
+        Get the most called operations on a call edge.
+        
+        Args:
+            from_service: Calling service
+            to_service: Called service
+            k: Number of operations to return (default: all tracked)
+            
+        Returns:
+            List of (operation, call count) sorted by descending call count
+        """
+        counter = self.service_calls.get(from_service, {}).get(to_service)
+        return counter.top(k) if counter else []
+    
+    def get_call_latency(self, from_service: str, to_service: str) -> LatencySketch:
+        """
+        Get the latency distribution of calls between two services.
+        
+        Returns:
+            LatencySketch of callee span durations in microseconds (empty if no calls)
+        """
+        return self.call_latencies.get(from_service, {}).get(to_service) or LatencySketch()
+    
+    def get_entries(self) -> List[EntryKey]:
+        """Get all tracked entries as (service, operation), sorted."""
+        return sorted(
+            (service_name, operation)
+            for service_name, counter in self.entry_invocations.items()
+            for operation in counter
+        )
+    
+    def get_root_entries(self) -> Dict[EntryKey, int]:
+        """Get the entries requests arrive through, with their arrival counts."""
+        return dict(self.root_entries)
+    
+    def get_entry_demand(self, entry: EntryKey) -> float:
+        """
+        Get the mean self-time demand of one invocation of an entry.
+        
+        Returns:
+            Mean self time in microseconds (0.0 for unknown entries)
+        """
+        sketch = self.entry_self_times.get(entry)
+        return sketch.mean if sketch else 0.0
+    
+    def get_entry_self_time(self, entry: EntryKey) -> LatencySketch:
+        """
+        Get the distribution of the self time of one invocation of an entry.
+        
+        Returns:
+            LatencySketch in microseconds (empty for unknown entries)
+        """
+        return self.entry_self_times.get(entry) or LatencySketch()
+    
+    def get_entry_calls(self, entry: EntryKey) -> Dict[EntryKey, float]:
+        """
+        Get the entries an entry calls, with mean calls per invocation.
+        
+        Returns:
+            Map of callee entry -> mean number of calls per invocation of entry
+        """
+        counter = self.entry_invocations.get(entry[0])
+        invocations = counter.get_count(entry[1]) if counter else 0
+        if not invocations:
+            return {}
+        return {
+            callee: count / invocations
+            for callee, count in self.entry_calls.get(entry, {}).items()
+        }
+    
+    def get_service_graph(self) -> ServiceGraph:
+        """
+        Export the service call graph as an indexed adjacency matrix.
+        
+        Returns:
+            ServiceGraph over all services (sorted), weighted by call counts
+            and mean call latency
+        """
+        services = sorted(self.all_services)
+        index = {service: i for i, service in enumerate(services)}
+        size = len(services)
+        call_counts = [[0] * size for _ in range(size)]
+        mean_latency_ms = [[0.0] * size for _ in range(size)]
+        
+        for from_service, targets in self.call_latencies.items():
+            for to_service, sketch in targets.items():
+                i, j = index[from_service], index[to_service]
+                call_counts[i][j] = sketch.count
+                mean_latency_ms[i][j] = sketch.mean / 1000.0
+        
+        return ServiceGraph(services, call_counts, mean_latency_ms)
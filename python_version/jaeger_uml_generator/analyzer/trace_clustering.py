@@ -0,0 +1,217 @@
+"""Similarity clustering of traces with MinHash and LSH banding."""
+
+import hashlib
+import logging
+import random
+from typing import List, Dict, Set, Tuple
+from ..models import Trace
+from ..utils import extract_simple_operation_name
+from .trace_fingerprint import TraceGroup, group_traces_by_fingerprint
+
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_NUM_PERMUTATIONS = 64
+DEFAULT_SIMILARITY_THRESHOLD = 0.6
+# Medoid search is quadratic in the shapes of a cluster; larger clusters only
+# consider their most frequent shapes as candidates
+MAX_MEDOID_CANDIDATES = 100
+
+# Mersenne prime used by the universal hash family
+_PRIME = (1 << 61) - 1
+
+
+def get_call_paths(trace: Trace) -> Set[str]:
+    """
+    Get the set of cross-service call paths of a trace.
+    
+    A path lists the (service, simple operation) of every cross-service call
+    from the entry span down to a call, so a trace with one extra optional
+    call differs from its peers by that call's path only.
+    
+    Args:
+        trace: Trace object
+    
+    Returns:
+        Set of path strings
+    """
+    paths = set()
+    children_index = trace.get_children_index()
+    
+    # (span, caller service, path of the enclosing call)
+    stack = [(span, None, '') for span in trace.get_entry_spans()]
+    while stack:
+        span, parent_service, path = stack.pop()
+        service = trace.get_service_name(span)
+        
+        if service != parent_service:
+            operation = extract_simple_operation_name(span.operation_name)
+            path = f"{path}/{service}|{operation}"
+            paths.add(path)
+        
+        for child in children_index.get(span.span_id, []):
+            stack.append((child, service, path))
+    
+    return paths
+
+
+class MinHasher:
+    """MinHash signatures of string sets, estimating Jaccard similarity."""
+    
+    def __init__(self, num_permutations: int = DEFAULT_NUM_PERMUTATIONS, seed: int = 1):
+        """
+        Initialize the hasher.
+        
+        Args:
+            num_permutations: Signature length
+            seed: Seed of the hash family, fixed so signatures are reproducible
+        """
+        rng = random.Random(seed)
+        self.num_permutations = num_permutations
+        self._coefficients = [
+            (rng.randrange(1, _PRIME), rng.randrange(0, _PRIME)) for _ in range(num_permutations)
+        ]
+    
+    def signature(self, items: Set[str]) -> Tuple[int, ...]:
+        """
+        Compute the MinHash signature of a set.
+        
+        Returns:
+            Tuple of num_permutations minimum hash values
+        """
+        values = [
+            int.from_bytes(hashlib.blake2b(item.encode('utf-8'), digest_size=8).digest(), 'big')
+            for item in items
+        ]
+        if not values:
+            return tuple([_PRIME] * self.num_permutations)
+        return tuple(
+            min((a * value + b) % _PRIME for value in values)
+            for a, b in self._coefficients
+        )
+    
+    @staticmethod
+    def similarity(signature_a: Tuple[int, ...], signature_b: Tuple[int, ...]) -> float:
+        """Estimate the Jaccard similarity of two sets from their signatures."""
+        matches = sum(1 for a, b in zip(signature_a, signature_b) if a == b)
+        return matches / len(signature_a) if signature_a else 0.0
+
+
+def choose_bands(num_permutations: int, threshold: float) -> Tuple[int, int]:
+    """
+    Choose the LSH banding whose similarity threshold is closest to a target.
+    
+    Sets with Jaccard similarity s share a bucket in at least one of b bands
+    of r rows with probability 1 - (1 - s^r)^b, which rises steepest around
+    (1/b)^(1/r).
+    
+    Returns:
+        Tuple of (bands, rows per band)
+    """
+    best = (num_permutations, 1)
+    best_error = float('inf')
+    for rows in range(1, num_permutations + 1):
+        if num_permutations % rows:
+            continue
+        bands = num_permutations // rows
+        error = abs((1.0 / bands) ** (1.0 / rows) - threshold)
+        if error < best_error:
+            best, best_error = (bands, rows), error
+    return best
+
+
+def cluster_traces(traces: List[Trace],
+                   threshold: float = DEFAULT_SIMILARITY_THRESHOLD,
+                   num_permutations: int = DEFAULT_NUM_PERMUTATIONS) -> List[TraceGroup]:
+    """
+    Cluster traces whose call paths are similar.
+    
+    Traces are first grouped by exact fingerprint; each shape gets a MinHash
+    signature of its call paths, and LSH banding proposes candidate pairs in
+    sub-quadratic time: all shapes sharing a band bucket. Candidate pairs
+    whose estimated similarity reaches the threshold are merged (single
+    linkage with union-find), so the clusters are the same in any input
+    order. Each cluster is returned as one TraceGroup whose representative
+    is the medoid shape (highest occurrence-weighted similarity to the rest
+    of the cluster) and whose counts and timings cover every member trace.
+    
+    Args:
+        traces: List of Trace objects
+        threshold: Minimum estimated Jaccard similarity of merged shapes
+        num_permutations: MinHash signature length
+    
+    Returns:
+        List of clustered TraceGroup, in order of first occurrence
+    """
+    groups = group_traces_by_fingerprint(traces)
+    if len(groups) < 2:
+        return groups
+    
+    hasher = MinHasher(num_permutations)
+    signatures = [hasher.signature(get_call_paths(group.representative)) for group in groups]
+    
+    # Union-find over shapes
+    parents = list(range(len(groups)))
+    
+    def find(i: int) -> int:
+        while parents[i] != i:
+            parents[i] = parents[parents[i]]
+            i = parents[i]
+        return i
+    
+    bands, rows = choose_bands(num_permutations, threshold)
+    for band in range(bands):
+        buckets: Dict[Tuple[int, ...], List[int]] = {}
+        for i, signature in enumerate(signatures):
+            buckets.setdefault(signature[band * rows:(band + 1) * rows], []).append(i)
+        
+        # Every pair of a bucket is a candidate, so clusters do not depend on input order
+        for bucket in buckets.values():
+            for k, i in enumerate(bucket):
+                for j in bucket[k + 1:]:
+                    root_i, root_j = find(i), find(j)
+                    if root_i != root_j and MinHasher.similarity(signatures[i], signatures[j]) >= threshold:
+                        parents[root_j] = root_i
+    
+    members: Dict[int, List[int]] = {}
+    for i in range(len(groups)):
+        members.setdefault(find(i), []).append(i)
+    
+    clusters = []
+    for indexes in sorted(members.values(), key=lambda indexes: indexes[0]):
+        clusters.append(_merge_cluster([groups[i] for i in indexes],
+                                       [signatures[i] for i in indexes]))
+    
+    logger.info(f"Clustered {len(groups)} distinct shape(s) into {len(clusters)} cluster(s) "
+               f"(similarity >= {threshold}, {bands} bands of {rows})")
+    return clusters
+
+
+def _merge_cluster(groups: List[TraceGroup], signatures: List[Tuple[int, ...]]) -> TraceGroup:
+    """Merge the shapes of a cluster into one group represented by its medoid."""
+    if len(groups) == 1:
+        return groups[0]
+    
+    candidates = sorted(range(len(groups)), key=lambda i: -groups[i].count)[:MAX_MEDOID_CANDIDATES]
+    medoid = max(candidates, key=lambda i: sum(
+        groups[j].count * MinHasher.similarity(signatures[i], signatures[j])
+        for j in range(len(groups))
+    ))
+    
+    merged = TraceGroup(
+        fingerprint=groups[medoid].fingerprint,
+        representative=groups[medoid].representative,
+        representative_index=groups[medoid].representative_index,
+        shape_count=len(groups)
+    )
+    for group in groups:
+        merged.count += group.count
+        merged.durations_us.extend(group.durations_us)
+        for entry_operation, count in group.entry_counts.items():
+            merged.entry_counts[entry_operation] = merged.entry_counts.get(entry_operation, 0) + count
+        for key, totals in group.call_totals.items():
+            merged_totals = merged.call_totals.setdefault(key, [0, 0, 0])
+            for k in range(3):
+                merged_totals[k] += totals[k]
+    return merged
@@ -0,0 +1,261 @@
+"""Comparison of a baseline and a candidate trace corpus."""
+
+import logging
+import math
+from dataclasses import dataclass, field
+from typing import List, Dict, Set, Tuple, Optional
+from .trace_aggregator import TraceAggregator
+from .latency_sketch import LatencySketch
+
+
+logger = logging.getLogger(__name__)
+
+
+# Quantiles compared for every call edge
+DIFF_QUANTILES = (0.5, 0.95, 0.99)
+
+
+@dataclass
+class EdgeLatencyShift:
+    """Latency comparison of one call edge between baseline and candidate."""
+    
+    caller: str
+    callee: str
+    baseline_count: int
+    candidate_count: int
+    # quantile -> value in milliseconds
+    baseline_quantiles: Dict[float, float] = field(default_factory=dict)
+    candidate_quantiles: Dict[float, float] = field(default_factory=dict)
+    # Mann-Whitney z-score; positive when the candidate is slower
+    z_score: float = 0.0
+    p_value: float = 1.0
+    significant: bool = False
+    
+    def get_relative_shift(self, q: float) -> float:
+        """Get the relative change of a quantile (0.1 = 10% slower)."""
+        baseline = self.baseline_quantiles.get(q, 0.0)
+        candidate = self.candidate_quantiles.get(q, 0.0)
+        if baseline <= 0:
+            return 0.0
+        return (candidate - baseline) / baseline
+    
+    @property
+    def is_regression(self) -> bool:
+        """Check if the edge got significantly slower."""
+        return self.significant and self.z_score > 0
+
+
+def mann_whitney_test(baseline: LatencySketch, candidate: LatencySketch) -> Tuple[float, float]:
+    """
+    Two-sided Mann-Whitney U test computed from two sketches.
+    
+    Values sharing a sketch bucket are treated as ties, so the test runs in
+    O(buckets) regardless of how many spans the sketches summarize.
+    
+    Args:
+        baseline: Baseline latency sketch
+        candidate: Candidate latency sketch (same relative accuracy)
+    
+    Returns:
+        Tuple of (z_score, p_value); z > 0 means the candidate is slower
+    """
+    n_a = baseline.count
+    n_b = candidate.count
+    total = n_a + n_b
+    if n_a == 0 or n_b == 0 or total < 3:
+        return 0.0, 1.0
+    
+    # Rank groups in ascending order: the zero bucket, then log buckets
+    groups = [(baseline.zero_count, candidate.zero_count)]
+    for index in sorted(set(baseline.buckets) | set(candidate.buckets)):
+        groups.append((baseline.buckets.get(index, 0), candidate.buckets.get(index, 0)))
+    
+    rank_sum_b = 0.0
+    tie_term = 0.0
+    rank_start = 0
+    for count_a, count_b in groups:
+        tied = count_a + count_b
+        if tied == 0:
+            continue
+        mid_rank = rank_start + (tied + 1) / 2.0
+        rank_sum_b += count_b * mid_rank
+        tie_term += tied ** 3 - tied
+        rank_start += tied
+    
+    u_b = rank_sum_b - n_b * (n_b + 1) / 2.0
+    mean_u = n_a * n_b / 2.0
+    variance_u = n_a * n_b / 12.0 * ((total + 1) - tie_term / (total * (total - 1)))
+    if variance_u <= 0:
+        return 0.0, 1.0
+    
+    z_score = (u_b - mean_u) / math.sqrt(variance_u)
+    p_value = math.erfc(abs(z_score) / math.sqrt(2))
+    return z_score, p_value
+
+
+class TraceSetDiff:
+    """
+    Structural and latency differences between two aggregated corpora.
+    
+    Works purely on TraceAggregator summaries (services, bounded operation
+    counters, per-edge latency sketches), so corpora of millions of spans
+    can be compared without keeping any span in memory.
+    """
+    
+    def __init__(self, baseline: TraceAggregator, candidate: TraceAggregator,
+                 alpha: float = 0.01, min_relative_shift: float = 0.1):
+        """
+        Compare two aggregates.
+        
+        Args:
+            baseline: Aggregate of the baseline corpus
+            candidate: Aggregate of the candidate corpus
+            alpha: Significance level of the Mann-Whitney test
+            min_relative_shift: Minimum relative p50 or p95 change for a shift
+                                to be flagged, so huge samples do not flag
+                                negligible differences
+        """
+        self.baseline = baseline
+        self.candidate = candidate
+        self.alpha = alpha
+        self.min_relative_shift = min_relative_shift
+        
+        self.added_services: Set[str] = set()
+        self.removed_services: Set[str] = set()
+        self.added_operations: Dict[str, Set[str]] = {}
+        self.removed_operations: Dict[str, Set[str]] = {}
+        self.added_edges: Set[Tuple[str, str]] = set()
+        self.removed_edges: Set[Tuple[str, str]] = set()
+        self.edge_shifts: List[EdgeLatencyShift] = []
+        self._shifts_by_edge: Dict[Tuple[str, str], EdgeLatencyShift] = {}
+        
+        self._compare()
+    
+    def _compare(self):
+        """Compute all differences."""
+        baseline_services = self.baseline.get_all_services()
+        candidate_services = self.candidate.get_all_services()
+        self.added_services = candidate_services - baseline_services
+        self.removed_services = baseline_services - candidate_services
+        
+        baseline_ops = self.baseline.get_service_operations()
+        candidate_ops = self.candidate.get_service_operations()
+        for service in baseline_services & candidate_services:
+            added = candidate_ops.get(service, set()) - baseline_ops.get(service, set())
+            removed = baseline_ops.get(service, set()) - candidate_ops.get(service, set())
+            if added:
+                self.added_operations[service] = added
+            if removed:
+                self.removed_operations[service] = removed
+        
+        baseline_edges = self._get_edges(self.baseline)
+        candidate_edges = self._get_edges(self.candidate)
+        self.added_edges = candidate_edges - baseline_edges
+        self.removed_edges = baseline_edges - candidate_edges
+        
+        for caller, callee in sorted(baseline_edges & candidate_edges):
+            shift = self._compare_edge(caller, callee)
+            self.edge_shifts.append(shift)
+            self._shifts_by_edge[(caller, callee)] = shift
+        
+        logger.info(f"Diff: +{len(self.added_services)}/-{len(self.removed_services)} services, "
+                   f"+{len(self.added_edges)}/-{len(self.removed_edges)} edges, "
+                   f"{len(self.get_regressions())} latency regression(s)")
+    
+    @staticmethod
+    def _get_edges(aggregator: TraceAggregator) -> Set[Tuple[str, str]]:
+        """Get all (caller, callee) call edges of an aggregate."""
+        return {
+            (caller, callee)
+            for caller, callees in aggregator.get_service_calls().items()
+            for callee in callees
+        }
+    
+    def _compare_edge(self, caller: str, callee: str) -> EdgeLatencyShift:
+        """Compare the latency distributions of one edge."""
+        baseline = self.baseline.get_call_latency(caller, callee)
+        candidate = self.candidate.get_call_latency(caller, callee)
+        
+        shift = EdgeLatencyShift(
+            caller=caller,
+            callee=callee,
+            baseline_count=baseline.count,
+            candidate_count=candidate.count,
+            baseline_quantiles={q: baseline.quantile(q) / 1000.0 for q in DIFF_QUANTILES},
+            candidate_quantiles={q: candidate.quantile(q) / 1000.0 for q in DIFF_QUANTILES}
+        )
+        shift.z_score, shift.p_value = mann_whitney_test(baseline, candidate)
+        
+        large_enough = max(abs(shift.get_relative_shift(0.5)),
+                           abs(shift.get_relative_shift(0.95))) >= self.min_relative_shift
+        shift.significant = shift.p_value < self.alpha and large_enough
+        return shift
+    
+    def get_regressions(self) -> List[EdgeLatencyShift]:
+        """Get edges that got significantly slower."""
+        return [shift for shift in self.edge_shifts if shift.is_regression]
+    
+    def get_edge_shift(self, caller: str, callee: str) -> Optional[EdgeLatencyShift]:
+        """Get the latency comparison of an edge present in both corpora."""
+        return self._shifts_by_edge.get((caller, callee))
+    
+    def has_changes(self) -> bool:
+        """Check whether any structural change or significant shift was found."""
+        return bool(
+            self.added_services or self.removed_services or
+            self.added_operations or self.removed_operations or
+            self.added_edges or self.removed_edges or
+            any(shift.significant for shift in self.edge_shifts)
+        )
+    
+    def format_report(self) -> str:
+        """
+        Format the diff as a human-readable text report.
+        
+        Returns:
+            Report text
+        """
+        lines = [
+            "Trace diff report",
+            f"  Baseline:  {self.baseline.trace_count} trace(s), {self.baseline.span_count} span(s)",
+            f"  Candidate: {self.candidate.trace_count} trace(s), {self.candidate.span_count} span(s)",
+            ""
+        ]
+        
+        def section(title: str, items: List[str]):
+            lines.append(f"{title} ({len(items)}):")
+            lines.extend(f"  {item}" for item in items)
+            if not items:
+                lines.append("  none")
+            lines.append("")
+        
+        section("New services", sorted(self.added_services))
+        section("Removed services", sorted(self.removed_services))
+        section("New operations", [
+            f"{service}: {op}"
+            for service in sorted(self.added_operations)
+            for op in sorted(self.added_operations[service])
+        ])
+        section("Removed operations", [
+            f"{service}: {op}"
+            for service in sorted(self.removed_operations)
+            for op in sorted(self.removed_operations[service])
+        ])
+        section("New call edges", [f"{a} -> {b}" for a, b in sorted(self.added_edges)])
+        section("Removed call edges", [f"{a} -> {b}" for a, b in sorted(self.removed_edges)])
+        
+        shifted = []
+        for shift in self.edge_shifts:
+            if not shift.significant:
+                continue
+            marker = "REGRESSION" if shift.z_score > 0 else "improvement"
+            quantiles = ", ".join(
+                f"p{int(q * 100)} {shift.baseline_quantiles[q]:.3f} -> "
+                f"{shift.candidate_quantiles[q]:.3f}ms ({shift.get_relative_shift(q):+.1%})"
+                for q in DIFF_QUANTILES
+            )
+            shifted.append(f"[{marker}] {shift.caller} -> {shift.callee}: {quantiles}; "
+                           f"p={shift.p_value:.2e}, n={shift.baseline_count}/{shift.candidate_count}")
+        section(f"Significant latency shifts (alpha={self.alpha})", shifted)
+        
+        return "\n".join(lines).rstrip() + "\n"
@@ -0,0 +1,241 @@
+"""Structural fingerprinting of traces for sequence diagram deduplication."""
+
+import hashlib
+import logging
+from dataclasses import dataclass, field
+from typing import List, Dict, Tuple, Optional
+from ..models import Trace, Span
+from ..utils import extract_simple_operation_name
+from .critical_path import get_trace_timing
+
+
+logger = logging.getLogger(__name__)
+
+
+# Key of a cross-service call: (caller service, callee service, simple operation)
+CallKey = Tuple[str, str, str]
+
+
+def compute_trace_fingerprint(trace: Trace) -> str:
+    """
+    Compute a canonical structural fingerprint for a trace.
+    
+    The fingerprint is a hash of the ordered cross-service call tree over
+    (service, simple operation). Spans calling into the same service are
+    transparent: their cross-service descendants are attached to the nearest
+    cross-service ancestor, exactly as they appear in a sequence diagram.
+    Each span is visited once, so the cost is linear in the number of spans
+    once the trace's child index is built.
+    
+    Args:
+        trace: Trace object
+    
+    Returns:
+        Hex digest identifying the shape of the trace
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    children_index = trace.get_children_index()
+    
+    # Iterative pre-order walk; None on the stack closes a call node
+    stack: List = list(reversed(trace.get_entry_spans()))
+    parent_services: Dict[str, str] = {}
+    
+    while stack:
+        span = stack.pop()
+        if span is None:
+            digest.update(b')')
+            continue
+        
+        service = trace.get_service_name(span)
+        parent_service = parent_services.get(span.span_id)
+        
+        if parent_service != service:
+            # Root or cross-service call: opens a node in the call tree
+            operation = extract_simple_operation_name(span.operation_name)
+            digest.update(f"({service}|{operation}".encode('utf-8'))
+            stack.append(None)
+        
+        children = children_index.get(span.span_id, [])
+        for child in reversed(children):
+            parent_services[child.span_id] = service
+            stack.append(child)
+    
+    return digest.hexdigest()
+
+
+# Key under which the cross-service calls are cached in Trace.analysis_cache
+CALL_MESSAGES_CACHE_KEY = 'call_messages'
+
+
+@dataclass
+class CallMessage:
+    """A cross-service call: the callee span and the span calling it."""
+    
+    caller: str
+    callee: str
+    span: Span
+    parent: Span
+    
+    @property
+    def operation(self) -> str:
+        """Simple name of the called operation."""
+        return extract_simple_operation_name(self.span.operation_name)
+    
+    @property
+    def key(self) -> CallKey:
+        """Key of the call: (caller service, callee service, simple operation)."""
+        return (self.caller, self.callee, self.operation)
+
+
+def get_call_messages(trace: Trace) -> List[CallMessage]:
+    """
+    Get the cross-service calls of a trace in start time order.
+    
+    These are the messages of the trace's sequence diagram. The list is
+    computed once per trace and cached in trace.analysis_cache; operation
+    names are read from the spans on access, so templating them later
+    needs no invalidation.
+    
+    Args:
+        trace: Trace object
+    
+    Returns:
+        List of CallMessage
+    """
+    messages = trace.analysis_cache.get(CALL_MESSAGES_CACHE_KEY)
+    if messages is not None:
+        return messages
+    
+    messages = []
+    span_index = trace.get_span_index()
+    for span in trace.get_spans_sorted_by_time():
+        parent_span_id = span.get_parent_span_id()
+        parent_span = span_index.get(parent_span_id) if parent_span_id else None
+        if not parent_span:
+            continue
+        
+        caller = trace.get_service_name(parent_span)
+        callee = trace.get_service_name(span)
+        if caller != callee:
+            messages.append(CallMessage(caller, callee, span, parent_span))
+    
+    trace.analysis_cache[CALL_MESSAGES_CACHE_KEY] = messages
+    return messages
+
+
+def get_trace_duration(trace: Trace) -> int:
+    """Get the end-to-end duration of a trace in microseconds."""
+    if not trace.spans:
+        return 0
+    start = min(span.start_time for span in trace.spans)
+    end = max(span.start_time + span.duration for span in trace.spans)
+    return end - start
+
+
+def get_entry_span(trace: Trace) -> Optional[Span]:
+    """
+    Get the span through which the request of a trace arrives.
+    
+    This is the first entry span; later entry spans are orphans whose
+    parent was not recorded and are not counted as arrivals.
+    """
+    if not trace or not trace.spans:
+        return None
+    entry_spans = trace.get_entry_spans()
+    return entry_spans[0] if entry_spans else None
+
+
+def get_entry_operation(trace: Trace) -> Optional[str]:
+    """Get "service:operation" of the entry span of a trace (see get_entry_span())."""
+    entry_span = get_entry_span(trace)
+    if entry_span is None:
+        return None
+    return f"{trace.get_service_name(entry_span)}:{entry_span.operation_name}"
+
+
+@dataclass
+class TraceGroup:
+    """A set of traces sharing the same structural fingerprint."""
+    
+    fingerprint: str
+    representative: Trace
+    representative_index: int
+    count: int = 0
+    durations_us: List[int] = field(default_factory=list)
+    # Per cross-service call: [total duration, total self time (microseconds), occurrences]
+    call_totals: Dict[CallKey, List[int]] = field(default_factory=dict)
+    # Number of distinct shapes merged into the group (see cluster_traces)
+    shape_count: int = 1
+    # Member traces per entry operation ("service:operation")
+    entry_counts: Dict[str, int] = field(default_factory=dict)
+    
+    def add(self, trace: Trace):
+        """Add a trace's timings to the group."""
+        self.count += 1
+        self.durations_us.append(get_trace_duration(trace))
+        entry_operation = get_entry_operation(trace)
+        if entry_operation is not None:
+            self.entry_counts[entry_operation] = self.entry_counts.get(entry_operation, 0) + 1
+        
+        timing = get_trace_timing(trace)
+        for message in get_call_messages(trace):
+            totals = self.call_totals.setdefault(message.key, [0, 0, 0])
+            totals[0] += message.span.duration
+            totals[1] += timing.get_self_time(message.span.span_id)
+            totals[2] += 1
+    
+    def get_mean_call_duration(self, key: CallKey) -> float:
+        """Get the mean duration of a cross-service call in microseconds."""
+        totals = self.call_totals.get(key)
+        if not totals or totals[2] == 0:
+            return 0.0
+        return totals[0] / totals[2]
+    
+    def get_mean_call_self_time(self, key: CallKey) -> float:
+        """Get the mean self-time of a cross-service call in microseconds."""
+        totals = self.call_totals.get(key)
+        if not totals or totals[2] == 0:
+            return 0.0
+        return totals[1] / totals[2]
+    
+    def get_duration_stats_ms(self) -> Dict[str, float]:
+        """Get min/mean/max/p95 end-to-end durations in milliseconds."""
+        if not self.durations_us:
+            return {'min': 0.0, 'mean': 0.0, 'max': 0.0, 'p95': 0.0}
+        
+        ordered = sorted(self.durations_us)
+        p95_index = min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))
+        return {
+            'min': ordered[0] / 1000.0,
+            'mean': sum(ordered) / len(ordered) / 1000.0,
+            'max': ordered[-1] / 1000.0,
+            'p95': ordered[p95_index] / 1000.0,
+        }
+
+
+def group_traces_by_fingerprint(traces: List[Trace]) -> List[TraceGroup]:
+    """
+    Group traces by structural fingerprint.
+    
+    Args:
+        traces: List of Trace objects
+    
+    Returns:
+        List of TraceGroup, in order of first occurrence
+    """
+    groups: Dict[str, TraceGroup] = {}
+    
+    for i, trace in enumerate(traces):
+        fingerprint = compute_trace_fingerprint(trace)
+        group = groups.get(fingerprint)
+        if group is None:
+            group = TraceGroup(
+                fingerprint=fingerprint,
+                representative=trace,
+                representative_index=i
+            )
+            groups[fingerprint] = group
+        group.add(trace)
+    
+    logger.info(f"Grouped {len(traces)} trace(s) into {len(groups)} distinct shape(s)")
+    return list(groups.values())
@@ -0,0 +1,163 @@
+"""Time-windowed aggregation of cross-service calls for trend analysis."""
+
+import csv
+import logging
+import re
+from datetime import datetime, timezone
+from typing import List, Dict, Tuple, TextIO
+from ..models import Trace
+from .latency_sketch import LatencySketch
+
+
+logger = logging.getLogger(__name__)
+
+
+# Window size units, in microseconds
+WINDOW_UNITS = {
+    's': 1_000_000,
+    'm': 60 * 1_000_000,
+    'h': 60 * 60 * 1_000_000,
+    'd': 24 * 60 * 60 * 1_000_000,
+}
+
+# Quantiles reported for every window and edge
+WINDOW_QUANTILES = (0.5, 0.95, 0.99)
+
+
+def parse_window_size(spec: str) -> int:
+    """
+    Parse a window size such as '30s', '5m', '1h' or '1d'.
+    
+    Args:
+        spec: Window size specification
+    
+    Returns:
+        Window size in microseconds
+    
+    Raises:
+        ValueError: If the specification is invalid
+    """
+    match = re.fullmatch(r'\s*(\d+)\s*([smhd])\s*', spec or '')
+    if not match or int(match.group(1)) == 0:
+        raise ValueError(f"Invalid window size (expected e.g. 30s, 5m, 1h): {spec}")
+    return int(match.group(1)) * WINDOW_UNITS[match.group(2)]
+
+
+class WindowedAggregator:
+    """
+    Buckets cross-service calls by span start time into fixed windows.
+    
+    Each window keeps a call count and a LatencySketch per (caller, callee)
+    edge, so memory depends on windows x edges, not on the number of spans.
+    Traces can be added in any order; with time-ordered input a single pass
+    over the corpus is enough.
+    """
+    
+    def __init__(self, window_us: int):
+        """
+        Initialize the aggregator.
+        
+        Args:
+            window_us: Window size in microseconds
+        """
+        if window_us <= 0:
+            raise ValueError(f"Window size must be positive, got {window_us}")
+        
+        self.window_us = window_us
+        # window start (microseconds) -> (caller, callee) -> latency sketch
+        self.windows: Dict[int, Dict[Tuple[str, str], LatencySketch]] = {}
+    
+    def add_trace(self, trace: Trace):
+        """Add the cross-service calls of a trace to their windows."""
+        if not trace or not trace.spans:
+            return
+        
+        span_index = trace.get_span_index()
+        for span in trace.spans:
+            parent_span_id = span.get_parent_span_id()
+            parent_span = span_index.get(parent_span_id) if parent_span_id else None
+            if not parent_span:
+                continue
+            
+            caller = trace.get_service_name(parent_span)
+            callee = trace.get_service_name(span)
+            if caller == callee:
+                continue
+            
+            window_start = span.start_time - span.start_time % self.window_us
+            edges = self.windows.setdefault(window_start, {})
+            sketch = edges.get((caller, callee))
+            if sketch is None:
+                sketch = LatencySketch()
+                edges[(caller, callee)] = sketch
+            sketch.add(span.duration)
+    
+    def add_traces(self, traces: List[Trace]):
+        """Add several traces."""
+        for trace in traces:
+            self.add_trace(trace)
+    
+    def get_edges(self) -> List[Tuple[str, str]]:
+        """Get all edges seen in any window, sorted."""
+        edges = set()
+        for window_edges in self.windows.values():
+            edges.update(window_edges)
+        return sorted(edges)
+    
+    def get_series(self, caller: str, callee: str) -> List[Dict[str, float]]:
+        """
+        Get the per-window series of an edge.
+        
+        Windows without calls on the edge are reported with a zero count,
+        so series of all edges share the same time axis.
+        
+        Args:
+            caller: Calling service
+            callee: Called service
+        
+        Returns:
+            List of dicts with window_start, count, throughput_per_s,
+            mean_ms and p50_ms / p95_ms / p99_ms, ordered by time
+        """
+        series = []
+        for window_start in sorted(self.windows):
+            sketch = self.windows[window_start].get((caller, callee))
+            point = {
+                'window_start': window_start,
+                'count': sketch.count if sketch else 0,
+                'throughput_per_s': (sketch.count if sketch else 0) * 1_000_000 / self.window_us,
+                'mean_ms': sketch.mean / 1000.0 if sketch else 0.0,
+            }
+            for q in WINDOW_QUANTILES:
+                point[f"p{int(q * 100)}_ms"] = sketch.quantile(q) / 1000.0 if sketch else 0.0
+            series.append(point)
+        return series
+    
+    def write_csv(self, output: TextIO) -> int:
+        """
+        Write the series of all edges as CSV.
+        
+        Args:
+            output: Text stream to write to
+        
+        Returns:
+            Number of data rows written
+        """
+        quantile_columns = [f"p{int(q * 100)}_ms" for q in WINDOW_QUANTILES]
+        writer = csv.writer(output)
+        writer.writerow(['window_start', 'caller', 'callee', 'count',
+                         'throughput_per_s', 'mean_ms'] + quantile_columns)
+        
+        rows = 0
+        for caller, callee in self.get_edges():
+            for point in self.get_series(caller, callee):
+                window_start = datetime.fromtimestamp(
+                    point['window_start'] / 1_000_000, tz=timezone.utc
+                ).isoformat()
+                writer.writerow(
+                    [window_start, caller, callee, point['count'],
+                     f"{point['throughput_per_s']:.4f}", f"{point['mean_ms']:.3f}"] +
+                    [f"{point[column]:.3f}" for column in quantile_columns]
+                )
+                rows += 1
+        return rows
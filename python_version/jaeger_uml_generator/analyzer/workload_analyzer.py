@@ -0,0 +1,244 @@
+"""Workload characterization per root entry operation."""
+
+import heapq
+import logging
+import math
+from dataclasses import dataclass, field
+from typing import List, Dict, Tuple, Optional
+from ..models import Trace
+from .latency_sketch import LatencySketch
+from .concurrency_analyzer import ConcurrencyProfile
+from .trace_fingerprint import get_entry_operation
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class WorkloadProfile:
+    """Arrival process and concurrency of one root entry operation."""
+    
+    entry_operation: str
+    count: int = 0
+    # Observation window shared by all profiles of an analysis, in microseconds
+    window_us: int = 0
+    # Running count, mean and sum of squared deviations (Welford) of the gaps
+    # between consecutive arrivals, in microseconds
+    inter_arrival_count: int = 0
+    inter_arrival_mean_us: float = 0.0
+    inter_arrival_m2: float = 0.0
+    # Distribution of the gaps, for quantiles
+    inter_arrivals: LatencySketch = field(default_factory=LatencySketch)
+    # Concurrency of in-flight requests (end-to-end trace intervals)
+    concurrency: ConcurrencyProfile = field(default_factory=ConcurrencyProfile)
+    
+    @property
+    def arrival_rate_per_s(self) -> float:
+        """Mean arrival rate over the observation window."""
+        return self.count * 1_000_000 / self.window_us if self.window_us > 0 else 0.0
+    
+    @property
+    def mean_response_ms(self) -> float:
+        """Mean end-to-end response time in milliseconds."""
+        return self.concurrency.total_time_us / self.count / 1000.0 if self.count else 0.0
+    
+    @property
+    def mean_inter_arrival_ms(self) -> float:
+        """Mean time between consecutive arrivals in milliseconds."""
+        return self.inter_arrival_mean_us / 1000.0
+    
+    @property
+    def inter_arrival_cv(self) -> float:
+        """Coefficient of variation of inter-arrival times (1.0 for Poisson arrivals)."""
+        mean = self.inter_arrival_mean_us
+        if self.inter_arrival_count < 2 or mean <= 0:
+            return 0.0
+        return math.sqrt(self.inter_arrival_m2 / (self.inter_arrival_count - 1)) / mean
+    
+    def add_inter_arrival(self, gap_us: int):
+        """Record the gap between two consecutive arrivals."""
+        self.inter_arrival_count += 1
+        delta = gap_us - self.inter_arrival_mean_us
+        self.inter_arrival_mean_us += delta / self.inter_arrival_count
+        self.inter_arrival_m2 += delta * (gap_us - self.inter_arrival_mean_us)
+        self.inter_arrivals.add(gap_us)
+    
+    def get_closed_parameters(self, scale: float = 1.0) -> Tuple[int, float]:
+        """
+        Estimate closed-model parameters.
+        
+        The population is the peak observed concurrency and the think time
+        follows from Little's law, N = X * (R + Z).
+        
+        Args:
+            scale: Factor applied to the arrival stream, e.g. the share of a
+                   sub-class of requests or 1 / sample rate
+        
+        Returns:
+            Tuple of (population, think time in milliseconds)
+        """
+        return get_mixed_closed_parameters([(self, scale)])
+    
+    def describe(self) -> str:
+        """Format the characterization for annotations."""
+        return (f"Workload of {self.entry_operation}: {self.count} arrival(s), "
+                f"rate={self.arrival_rate_per_s:.3f}/s; inter-arrival (ms): "
+                f"mean={self.mean_inter_arrival_ms:.3f}, "
+                f"p50={self.inter_arrivals.quantile(0.5) / 1000.0:.3f}, "
+                f"p95={self.inter_arrivals.quantile(0.95) / 1000.0:.3f}, "
+                f"cv={self.inter_arrival_cv:.2f}; concurrency: "
+                f"avg={self.concurrency.avg_concurrency:.3f}, "
+                f"max={self.concurrency.max_concurrency}")
+
+
+def get_mixed_closed_parameters(shares: List[Tuple[WorkloadProfile, float]]) -> Tuple[int, float]:
+    """
+    Estimate closed-model parameters of a mix of entry operations.
+    
+    The population is the sum of the scaled peak concurrencies, and the think
+    time follows from Little's law with the throughput-weighted mean response
+    time of the mix. A single share gives WorkloadProfile.get_closed_parameters().
+    
+    Args:
+        shares: (profile, scale) per entry operation of the mix
+    
+    Returns:
+        Tuple of (population, think time in milliseconds)
+    """
+    population = max(1, round(sum(profile.concurrency.max_concurrency * scale
+                                  for profile, scale in shares)))
+    rate = sum(profile.arrival_rate_per_s * scale for profile, scale in shares)
+    if rate <= 0:
+        return population, 0.0
+    response_ms = sum(profile.arrival_rate_per_s * scale * profile.mean_response_ms
+                      for profile, scale in shares) / rate
+    return population, max(0.0, population / rate * 1000.0 - response_ms)
+
+
+class _ArrivalStream:
+    """One-pass state of the arrivals of one entry operation, in start time order."""
+    
+    __slots__ = ('profile', 'last_start', 'in_flight', 'busy_start', 'busy_end')
+    
+    def __init__(self, entry_operation: str):
+        self.profile = WorkloadProfile(entry_operation=entry_operation)
+        self.last_start: Optional[int] = None
+        # End times of the requests in flight at the last arrival (min-heap)
+        self.in_flight: List[int] = []
+        self.busy_start = 0
+        self.busy_end: Optional[int] = None
+    
+    def add(self, start: int, end: int):
+        """Record a request arriving no earlier than the previous one."""
+        profile = self.profile
+        concurrency = profile.concurrency
+        profile.count += 1
+        concurrency.span_count += 1
+        if self.last_start is not None:
+            profile.add_inter_arrival(start - self.last_start)
+        self.last_start = start
+        
+        if end <= start:
+            # Zero-length requests never overlap anything
+            return
+        concurrency.total_time_us += end - start
+        
+        # Requests ending at this arrival are not concurrent with it
+        in_flight = self.in_flight
+        while in_flight and in_flight[0] <= start:
+            heapq.heappop(in_flight)
+        heapq.heappush(in_flight, end)
+        concurrency.max_concurrency = max(concurrency.max_concurrency, len(in_flight))
+        
+        if self.busy_end is None or start >= self.busy_end:
+            self.close_busy_period()
+            self.busy_start = start
+            self.busy_end = end
+        else:
+            self.busy_end = max(self.busy_end, end)
+    
+    def close_busy_period(self):
+        """Add the current busy period to the busy time."""
+        if self.busy_end is not None:
+            self.profile.concurrency.busy_time_us += self.busy_end - self.busy_start
+            self.busy_end = None
+
+
+class WorkloadCharacterizer:
+    """
+    Characterizes the arrival process of each root entry operation in one pass.
+    
+    Traces are added in order of their start time, keyed by the
+    "service:operation" of their entry span. Per entry operation only
+    running statistics are kept: the arrival count, Welford's running mean
+    and variance of inter-arrival gaps (plus a sketch for their quantiles),
+    and a sweep over the requests still in flight, which yields peak
+    concurrency, busy time and total request time. finish() derives arrival
+    rates and concurrency (population) estimates from them.
+    """
+    
+    def __init__(self):
+        self._streams: Dict[str, _ArrivalStream] = {}
+        self._window_start: Optional[int] = None
+        self._window_end: Optional[int] = None
+        self._last_start = 0
+        self.profiles: Dict[str, WorkloadProfile] = {}
+    
+    def add_trace(self, trace: Trace):
+        """
+        Record the arrival of a trace.
+        
+        Raises:
+            ValueError: If the trace started before the previously added one
+        """
+        entry_operation = get_entry_operation(trace)
+        if entry_operation is None:
+            return
+        
+        start, end = get_trace_interval(trace)
+        if self._window_start is not None and start < self._last_start:
+            raise ValueError("Traces must be added in order of their start time")
+        self._last_start = start
+        
+        stream = self._streams.get(entry_operation)
+        if stream is None:
+            stream = self._streams[entry_operation] = _ArrivalStream(entry_operation)
+        stream.add(start, end)
+        
+        self._window_start = start if self._window_start is None else self._window_start
+        self._window_end = end if self._window_end is None else max(self._window_end, end)
+    
+    def add_traces(self, traces: List[Trace]):
+        """Record the arrivals of several traces, in any order."""
+        for trace in sorted(traces, key=lambda trace: get_trace_interval(trace)[0] if trace.spans else 0):
+            self.add_trace(trace)
+    
+    def finish(self) -> Dict[str, WorkloadProfile]:
+        """
+        Compute the workload profiles.
+        
+        Returns:
+            Map of entry operation -> WorkloadProfile
+        """
+        window_us = (self._window_end - self._window_start) if self._window_start is not None else 0
+        
+        for entry_operation, stream in self._streams.items():
+            stream.close_busy_period()
+            profile = stream.profile
+            profile.window_us = window_us
+            profile.concurrency.window_us = window_us
+            self.profiles[entry_operation] = profile
+        
+        logger.info(f"Characterized workload of {len(self.profiles)} entry operation(s)")
+        return dict(self.profiles)
+    
+    def get_profile(self, entry_operation: str) -> Optional[WorkloadProfile]:
+        """Get the workload profile of an entry operation."""
+        return self.profiles.get(entry_operation)
+
+
+def get_trace_interval(trace: Trace) -> Tuple[int, int]:
+    """Get the (start, end) time of a trace in microseconds."""
+    start = min(span.start_time for span in trace.spans)
+    end = max(span.start_time + span.duration for span in trace.spans)
+    return start, end
@@ -3,7 +3,12 @@
 import argparse
 import sys
 from pathlib import Path
-from typing import Optional
+from typing import Optional, List, Tuple, Dict, Any
+
+from ..utils import parse_operation_pattern
+from ..analyzer import parse_window_size, parse_scale_factors, MVA_METHODS, ARRIVAL_PROCESSES
+from ..input import SAMPLING_METHODS
+from ..renderer import get_compression, strip_xmi_extension
 
 
 class CommandLine:
@@ -94,6 +99,24 @@ Examples:
             help='XMI output format: papyrus (Eclipse) or magicdraw (default: papyrus)'
         )
         
+        # Compact output
+        parser.add_argument(
+            '--compact',
+            action='store_true',
+            help='Write XMI files without indentation (smaller files; '
+                 'default: pretty-printed)'
+        )
+        
+        # Compressed output
+        parser.add_argument(
+            '--compress',
+            type=str,
+            choices=['gz', 'xz'],
+            default=None,
+            help='Write XMI files compressed as .xmi.gz or .xmi.xz (default: uncompressed, '
+                 'or the compression of a --model-name ending in .xmi.gz/.xmi.xz)'
+        )
+        
         # Merge traces option
         parser.add_argument(
             '--merge-traces',
@@ -101,12 +124,249 @@ Examples:
             help='Merge all traces into a single unified XMI file (default: one XMI per trace)'
         )
         
+        # Parallel per-trace output
+        parser.add_argument(
+            '--jobs',
+            type=int,
+            default=1,
+            help='Generate the per-trace XMI files (without --merge-traces) or the shard '
+                 'files (with --shard-size) in this many worker processes (default: 1)'
+        )
+        
+        # Incremental builds
+        parser.add_argument(
+            '--no-build-cache',
+            action='store_true',
+            help='Regenerate all outputs instead of skipping input files whose outputs '
+                 'are recorded as up to date in the build manifest of the output directory'
+        )
+        
         # Model name for merged output
         parser.add_argument(
             '--model-name',
             type=str,
             default='UnifiedModel',
-            help='Name for the unified model when using --merge-traces (default: UnifiedModel)'
+            help='Name for the unified model when using --merge-traces; a name ending in '
+                 '.xmi.gz or .xmi.xz compresses the file (default: UnifiedModel)'
+        )
+        
+        # Sharded merged output
+        parser.add_argument(
+            '--shard-size',
+            type=int,
+            default=None,
+            help='With --merge-traces, write the components, dependencies and deployment '
+                 'to <model-name>-core.xmi and the Use Cases to shard files of at most this '
+                 'many Use Cases each, which reference the core by href and are listed in '
+                 '<model-name>-index.json; the files are not compressed (default: one '
+                 'unified XMI file)'
+        )
+        
+        # Sequence deduplication for merged output
+        parser.add_argument(
+            '--dedupe-sequences',
+            action='store_true',
+            help='With --merge-traces, emit one sequence diagram per distinct trace shape '
+                 'annotated with occurrence count and aggregated timings'
+        )
+        parser.add_argument(
+            '--cluster-sequences',
+            action='store_true',
+            help='With --merge-traces, emit one sequence diagram per cluster of similar '
+                 'traces (MinHash over call paths), using the medoid trace of each cluster'
+        )
+        parser.add_argument(
+            '--cluster-threshold',
+            type=float,
+            default=0.6,
+            help='With --cluster-sequences, minimum call path similarity (0-1) of '
+                 'clustered traces (default: 0.6)'
+        )
+        
+        # MARTE workload model
+        parser.add_argument(
+            '--workload-pattern',
+            choices=['closed', 'open'],
+            default='closed',
+            help='Arrival pattern of the GaWorkloadEvent applied to interactions: closed '
+                 '(population from observed concurrency) or open (measured inter-arrival '
+                 'time) (default: closed)'
+        )
+        
+        # Dependency graph analytics
+        parser.add_argument(
+            '--graph-report',
+            action='store_true',
+            help='Also write dependency-graph.txt with service layers, call cycles '
+                 'and services ranked by fan-in/fan-out'
+        )
+        parser.add_argument(
+            '--lqn',
+            action='store_true',
+            help='Also write a Layered Queueing Network model (<model-name>.lqn) '
+                 'with services as tasks and entry operations as entries'
+        )
+        
+        # Capacity what-if analysis
+        parser.add_argument(
+            '--mva',
+            action='store_true',
+            help='Also write capacity-report.txt with Mean Value Analysis predictions of '
+                 'throughput, response time and utilization per root operation'
+        )
+        parser.add_argument(
+            '--mva-populations',
+            default='1,2,3',
+            help='With --mva, comma-separated factors applied to the measured user '
+                 'populations (default: 1,2,3)'
+        )
+        parser.add_argument(
+            '--mva-speeds',
+            default='1',
+            help='With --mva, comma-separated service speed factors relative to the '
+                 'measured speed (default: 1)'
+        )
+        parser.add_argument(
+            '--mva-method',
+            choices=MVA_METHODS,
+            default='auto',
+            help='With --mva, exact MVA, approximate (Schweitzer) MVA or auto (exact '
+                 'for small populations) (default: auto)'
+        )
+        parser.add_argument(
+            '--simulate',
+            type=int,
+            metavar='REQUESTS',
+            help='Also write simulation-report.txt with end-to-end latency percentiles '
+                 'from a discrete-event simulation of REQUESTS requests over the traced '
+                 'call graph'
+        )
+        parser.add_argument(
+            '--sim-arrivals',
+            choices=ARRIVAL_PROCESSES,
+            default='poisson',
+            help='With --simulate, arrival process of requests (default: poisson)'
+        )
+        parser.add_argument(
+            '--sim-load',
+            type=float,
+            default=1.0,
+            help='With --simulate, factor applied to the measured arrival rates (default: 1.0)'
+        )
+        parser.add_argument(
+            '--sim-seed',
+            type=int,
+            help='With --simulate, random seed for reproducible runs'
+        )
+        
+        # Timestamp correction
+        parser.add_argument(
+            '--no-clock-skew-adjustment',
+            action='store_true',
+            help='Do not shift span timestamps to correct clock skew between hosts'
+        )
+        
+        # Sampling at ingestion
+        parser.add_argument(
+            '--sample',
+            choices=SAMPLING_METHODS,
+            help='Sample traces while reading: hash (deterministic on trace ID, see '
+                 '--sample-rate), reservoir (uniform, see --sample-size) or stratified '
+                 '(reservoir per root service and operation)'
+        )
+        parser.add_argument(
+            '--sample-rate',
+            type=float,
+            default=0.1,
+            help='Fraction of traces kept by hash sampling (default: 0.1)'
+        )
+        parser.add_argument(
+            '--sample-size',
+            type=int,
+            default=1000,
+            help='Traces kept by reservoir sampling, per stratum when stratified (default: 1000)'
+        )
+        parser.add_argument(
+            '--sample-seed',
+            type=int,
+            help='Random seed for reproducible reservoir and stratified samples'
+        )
+        
+        # Outlier selection for sequence diagrams
+        parser.add_argument(
+            '--outliers-only',
+            action='store_true',
+            help='Only emit sequence diagrams for traces that are slow relative to their '
+                 'entry operation; components and deployment still use all traces'
+        )
+        parser.add_argument(
+            '--outlier-quantile',
+            type=float,
+            default=0.99,
+            help='With --outliers-only, latency quantile of the entry operation above '
+                 'which a trace is an outlier (default: 0.99)'
+        )
+        parser.add_argument(
+            '--outlier-zscore',
+            type=float,
+            help='With --outliers-only, use mean + Z standard deviations as the threshold '
+                 'instead of --outlier-quantile'
+        )
+        parser.add_argument(
+            '--max-outliers',
+            type=int,
+            default=50,
+            help='With --outliers-only, maximum number of outlier traces kept (default: 50)'
+        )
+        
+        # Bounded operation tracking
+        parser.add_argument(
+            '--operation-capacity',
+            type=int,
+            default=1000,
+            help='Maximum number of distinct operations tracked per service; '
+                 'the most called operations are kept (default: 1000)'
+        )
+        
+        # Operation name templating
+        parser.add_argument(
+            '--template-operations',
+            action='store_true',
+            help='Collapse numeric, UUID and hex path segments of operation names into '
+                 'placeholders (e.g. /api/users/{id}) before aggregation'
+        )
+        parser.add_argument(
+            '--operation-pattern',
+            type=str,
+            action='append',
+            default=[],
+            metavar='REGEX=REPLACEMENT',
+            help='Additional operation name template rule, applied before the built-in '
+                 'ones (implies --template-operations, can be repeated)'
+        )
+        
+        # Baseline comparison (diff mode)
+        parser.add_argument(
+            '--baseline',
+            type=str,
+            help='JSON file or directory of baseline traces: compare the input traces '
+                 'against it and write a diff report instead of diagrams'
+        )
+        parser.add_argument(
+            '--diff-xmi',
+            action='store_true',
+            help='With --baseline, also write the input traces as a unified XMI '
+                 'annotated with the differences'
+        )
+        
+        # Trend analysis (window mode)
+        parser.add_argument(
+            '--window',
+            type=str,
+            metavar='SIZE',
+            help='Bucket calls into time windows of SIZE (e.g. 1m, 5m, 1h) and write '
+                 'per-window throughput and latency percentiles per call edge '
+                 'instead of diagrams'
         )
         
         # Logging
@@ -160,12 +420,90 @@ Examples:
                 print(f"Error: Input path is not a directory: {self.args.input_dir}", file=sys.stderr)
                 return False
         
+        if self.args.baseline and not Path(self.args.baseline).exists():
+            print(f"Error: Baseline path does not exist: {self.args.baseline}", file=sys.stderr)
+            return False
+        
+        if self.args.window:
+            try:
+                parse_window_size(self.args.window)
+            except ValueError as e:
+                print(f"Error: {e}", file=sys.stderr)
+                return False
+        
         # Validate Jaeger API options
         if self.args.jaeger_url:
             if not self.args.jaeger_url.startswith(('http://', 'https://')):
                 print("Error: Jaeger URL must start with http:// or https://", file=sys.stderr)
                 return False
         
+        for spec in self.args.operation_pattern:
+            try:
+                parse_operation_pattern(spec)
+            except ValueError as e:
+                print(f"Error: {e}", file=sys.stderr)
+                return False
+        
+        if self.args.operation_capacity < 1:
+            print("Error: --operation-capacity must be at least 1", file=sys.stderr)
+            return False
+        
+        if not 0 < self.args.cluster_threshold <= 1:
+            print("Error: --cluster-threshold must be greater than 0 and at most 1", file=sys.stderr)
+            return False
+        
+        if not 0 < self.args.sample_rate <= 1:
+            print("Error: --sample-rate must be greater than 0 and at most 1", file=sys.stderr)
+            return False
+        
+        if self.args.sample_size < 1:
+            print("Error: --sample-size must be at least 1", file=sys.stderr)
+            return False
+        
+        if not 0 < self.args.outlier_quantile < 1:
+            print("Error: --outlier-quantile must be between 0 and 1", file=sys.stderr)
+            return False
+        
+        if self.args.max_outliers < 1:
+            print("Error: --max-outliers must be at least 1", file=sys.stderr)
+            return False
+        
+        if self.args.shard_size is not None and self.args.shard_size < 1:
+            print("Error: --shard-size must be at least 1", file=sys.stderr)
+            return False
+        
+        if self.args.jobs < 1:
+            print("Error: --jobs must be at least 1", file=sys.stderr)
+            return False
+        
+        if self.args.simulate is not None and self.args.simulate < 1:
+            print("Error: --simulate must be at least 1", file=sys.stderr)
+            return False
+        
+        if self.args.sim_load <= 0:
+            print("Error: --sim-load must be positive", file=sys.stderr)
+            return False
+        
+        for option, spec in (('--mva-populations', self.args.mva_populations),
+                             ('--mva-speeds', self.args.mva_speeds)):
+            try:
+                parse_scale_factors(spec)
+            except ValueError as e:
+                print(f"Error: {option}: {e}", file=sys.stderr)
+                return False
+        
+        name_compression = get_compression(self.args.model_name)
+        if self.args.compress and name_compression not in ('none', self.args.compress):
+            print(f"Error: --compress {self.args.compress} conflicts with the extension of "
+                  f"--model-name {self.args.model_name}", file=sys.stderr)
+            return False
+        
+        # Modeling tools cannot resolve the shards' references into a compressed core
+        sharded = self.args.merge_traces and self.args.shard_size is not None
+        if sharded and self.get_compression() != 'none':
+            print("Error: --shard-size cannot be combined with compressed output", file=sys.stderr)
+            return False
+        
         # Create output directory if it doesn't exist
         output_path = Path(self.args.output_dir)
         try:
@@ -221,5 +559,162 @@ Examples:
         return self.args.merge_traces if self.args else False
     
     def get_model_name(self) -> str:
-        """Get the model name for unified XMI output."""
-        return self.args.model_name if self.args else 'UnifiedModel'
+        """Get the model name for unified XMI output, without a compressed file extension."""
+        if not self.args:
+            return 'UnifiedModel'
+        if get_compression(self.args.model_name) != 'none':
+            return strip_xmi_extension(self.args.model_name)
+        return self.args.model_name
+    
+    def is_dedupe_sequences(self) -> bool:
+        """Check if merged sequence diagrams should be deduplicated by trace shape."""
+        return self.args.dedupe_sequences if self.args else False
+    
+    def get_operation_capacity(self) -> int:
+        """Get the maximum number of distinct operations tracked per service."""
+        return self.args.operation_capacity if self.args else 1000
+    
+    def is_template_operations(self) -> bool:
+        """Check if operation names should be templated before aggregation."""
+        if not self.args:
+            return False
+        return self.args.template_operations or bool(self.args.operation_pattern)
+    
+    def get_operation_patterns(self) -> List[Tuple[str, str]]:
+        """Get user-defined operation name template rules as (regex, replacement)."""
+        if not self.args:
+            return []
+        return [parse_operation_pattern(spec) for spec in self.args.operation_pattern]
+    
+    def get_baseline(self) -> Optional[str]:
+        """Get the baseline traces path for diff mode."""
+        return self.args.baseline if self.args else None
+    
+    def is_diff_xmi(self) -> bool:
+        """Check if diff mode should also write an annotated XMI."""
+        return self.args.diff_xmi if self.args else False
+    
+    def get_window(self) -> Optional[int]:
+        """Get the trend window size in microseconds, None if window mode is off."""
+        if not self.args or not self.args.window:
+            return None
+        return parse_window_size(self.args.window)
+    
+    def is_outliers_only(self) -> bool:
+        """Check if sequence diagrams are restricted to outlier traces."""
+        return self.args.outliers_only if self.args else False
+    
+    def get_outlier_quantile(self) -> float:
+        """Get the outlier latency quantile."""
+        return self.args.outlier_quantile if self.args else 0.99
+    
+    def get_outlier_zscore(self) -> Optional[float]:
+        """Get the outlier z-score threshold, None to use the quantile."""
+        return self.args.outlier_zscore if self.args else None
+    
+    def get_max_outliers(self) -> int:
+        """Get the maximum number of outlier traces."""
+        return self.args.max_outliers if self.args else 50
+    
+    def get_sampling_method(self) -> Optional[str]:
+        """Get the ingestion sampling method, None if sampling is off."""
+        return self.args.sample if self.args else None
+    
+    def get_sample_rate(self) -> float:
+        """Get the hash sampling rate."""
+        return self.args.sample_rate if self.args else 0.1
+    
+    def get_sample_size(self) -> int:
+        """Get the reservoir sample size."""
+        return self.args.sample_size if self.args else 1000
+    
+    def get_sample_seed(self) -> Optional[int]:
+        """Get the sampling random seed."""
+        return self.args.sample_seed if self.args else None
+    
+    def is_adjust_clock_skew(self) -> bool:
+        """Check if span timestamps should be corrected for clock skew."""
+        return not self.args.no_clock_skew_adjustment if self.args else True
+    
+    def is_graph_report(self) -> bool:
+        """Check if the dependency graph report should be written."""
+        return self.args.graph_report if self.args else False
+    
+    def get_cluster_threshold(self) -> Optional[float]:
+        """Get the sequence clustering similarity threshold, None if clustering is off."""
+        if not self.args or not self.args.cluster_sequences:
+            return None
+        return self.args.cluster_threshold
+    
+    def get_workload_pattern(self) -> str:
+        """Get the GaWorkloadEvent arrival pattern."""
+        return self.args.workload_pattern if self.args else 'closed'
+    
+    def is_lqn_export(self) -> bool:
+        """Check if the LQN model should be written."""
+        return self.args.lqn if self.args else False
+    
+    def is_mva(self) -> bool:
+        """Check if the MVA capacity report should be written."""
+        return self.args.mva if self.args else False
+    
+    def get_mva_populations(self) -> List[float]:
+        """Get the population scale factors of the MVA sweep."""
+        return parse_scale_factors(self.args.mva_populations) if self.args else [1.0]
+    
+    def get_mva_speeds(self) -> List[float]:
+        """Get the speed factors of the MVA sweep."""
+        return parse_scale_factors(self.args.mva_speeds) if self.args else [1.0]
+    
+    def get_mva_method(self) -> str:
+        """Get the MVA solution method."""
+        return self.args.mva_method if self.args else 'auto'
+    
+    def get_simulated_requests(self) -> Optional[int]:
+        """Get the number of requests to simulate, None if simulation is off."""
+        return self.args.simulate if self.args else None
+    
+    def get_sim_arrivals(self) -> str:
+        """Get the arrival process of the simulation."""
+        return self.args.sim_arrivals if self.args else 'poisson'
+    
+    def get_sim_load(self) -> float:
+        """Get the factor applied to measured arrival rates in the simulation."""
+        return self.args.sim_load if self.args else 1.0
+    
+    def get_sim_seed(self) -> Optional[int]:
+        """Get the random seed of the simulation."""
+        return self.args.sim_seed if self.args else None
+    
+    def get_jobs(self) -> int:
+        """Get the number of worker processes for per-trace generation."""
+        return self.args.jobs if self.args else 1
+    
+    def is_build_cache(self) -> bool:
+        """Check if outputs of unchanged inputs should be skipped."""
+        return not self.args.no_build_cache if self.args else False
+    
+    def get_build_options(self) -> Dict[str, Any]:
+        """
+        Get the options the generated outputs depend on.
+        
+        Input and output locations, parallelism and logging are left out.
+        """
+        if not self.args:
+            return {}
+        ignored = ('input_file', 'input_dir', 'output_dir', 'jobs', 'verbose', 'no_build_cache')
+        return {name: value for name, value in vars(self.args).items() if name not in ignored}
+    
+    def is_compact(self) -> bool:
+        """Check if XMI files should be written without indentation."""
+        return self.args.compact if self.args else False
+    
+    def get_compression(self) -> str:
+        """Get the compression of XMI files: 'none', 'gz' or 'xz'."""
+        if not self.args:
+            return 'none'
+        return self.args.compress or get_compression(self.args.model_name)
+    
+    def get_shard_size(self) -> Optional[int]:
+        """Get the maximum number of Use Cases per shard file, None for a single unified file."""
+        return self.args.shard_size if self.args else None
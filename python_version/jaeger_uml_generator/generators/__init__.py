@@ -5,11 +5,20 @@ from .sequence_diagram_generator import SequenceDiagramGenerator
 from .component_diagram_generator import ComponentDiagramGenerator
 from .deployment_diagram_generator import DeploymentDiagramGenerator
 from .unified_generator import UnifiedXmiGenerator
+from .trace_batch import TraceBatchGenerator, TraceBatchResult, TraceOutputSettings, plan_trace_outputs
+from .unified_shards import UnifiedShardWriter, ShardedModelResult, plan_shards
 
 __all__ = [
     'DiagramGenerator',
     'SequenceDiagramGenerator',
     'ComponentDiagramGenerator',
     'DeploymentDiagramGenerator',
-    'UnifiedXmiGenerator'
+    'UnifiedXmiGenerator',
+    'TraceBatchGenerator',
+    'TraceBatchResult',
+    'TraceOutputSettings',
+    'plan_trace_outputs',
+    'UnifiedShardWriter',
+    'ShardedModelResult',
+    'plan_shards'
 ]
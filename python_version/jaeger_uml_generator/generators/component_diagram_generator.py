@@ -2,10 +2,10 @@
 
 import logging
 import xml.etree.ElementTree as ET
-from typing import List, Dict, Set
+from typing import List, Dict, Set, Tuple, Optional
 from .diagram_generator import DiagramGenerator
 from ..models import Trace
-from ..analyzer import TraceAggregator
+from ..analyzer import TraceAggregator, CallModel, DEFAULT_OPERATION_CAPACITY
 from ..renderer import XmiWriter, XmiFormat
 from ..utils import extract_simple_operation_name
 
@@ -40,37 +40,48 @@ class ComponentDiagramGenerator(DiagramGenerator):
         'memcache': 'DataLayer',
     }
     
-    def __init__(self, xmi_format: str = "papyrus"):
+    # Maximum number of operations shown per component (most called first)
+    MAX_OPERATIONS = 20
+    
+    def __init__(self, xmi_format: str = "papyrus",
+                 operation_capacity: int = DEFAULT_OPERATION_CAPACITY,
+                 compact: bool = False):
         """Initialize generator with XMI format.
         
         Args:
             xmi_format: Output format ('papyrus' or 'magicdraw')
+            operation_capacity: Maximum distinct operations tracked per service
+            compact: Write XMI without indentation
         """
         format_enum = XmiFormat(xmi_format)
-        self.xmi_writer = XmiWriter(format_enum)
+        self.xmi_writer = XmiWriter(format_enum, compact)
+        self.operation_capacity = operation_capacity
     
     def get_diagram_type(self) -> str:
         return "component"
     
-    def generate_xmi(self, traces: List[Trace]) -> str:
+    def generate_xmi(self, traces: List[Trace], call_model: Optional[CallModel] = None) -> str:
         """
         Generate XMI for component diagram from multiple traces.
         
         Args:
             traces: List of Trace objects
+            call_model: Call model of `traces` shared with other outputs (optional)
             
         Returns:
             XMI content as string
         """
-        result = self.generate_xmi_with_ids(traces)
+        result = self.generate_xmi_with_ids(traces, call_model)
         return result.get('xmi_content', '')
     
-    def generate_xmi_with_ids(self, traces: List[Trace]) -> Dict[str, any]:
+    def generate_xmi_with_ids(self, traces: List[Trace],
+                              call_model: Optional[CallModel] = None) -> Dict[str, any]:
         """
         Generate XMI for component diagram and return element IDs for cross-referencing.
         
         Args:
             traces: List of Trace objects
+            call_model: Call model of `traces` shared with other outputs (optional)
             
         Returns:
             Dictionary with 'xmi_content', 'component_ids', 'operation_ids'
@@ -80,7 +91,10 @@ class ComponentDiagramGenerator(DiagramGenerator):
             return {'xmi_content': '', 'component_ids': {}, 'operation_ids': {}}
         
         try:
-            aggregator = TraceAggregator(traces)
+            if call_model is not None:
+                aggregator = call_model.aggregator
+            else:
+                aggregator = TraceAggregator(traces, self.operation_capacity)
             
             # Determine model name
             model_name = "ComponentDiagram"
@@ -95,7 +109,6 @@ class ComponentDiagramGenerator(DiagramGenerator):
             services = aggregator.get_all_services()
             service_metadata = aggregator.get_service_metadata()
             service_calls = aggregator.get_service_calls()
-            service_operations = aggregator.get_service_operations()
             
             # Organize services into packages by category
             categorized_services = self._categorize_services(services)
@@ -111,15 +124,16 @@ class ComponentDiagramGenerator(DiagramGenerator):
                     package_elem, package_id = self.xmi_writer.create_package(model, category)
                     
                     # Create components inside the package
-                    for service in category_services:
+                    for service in sorted(category_services):
                         metadata = service_metadata.get(service, {})
                         
-                        # Get operations for this service directly from aggregator
-                        service_ops = service_operations.get(service, set())
+                        # Get the most called operations for this service
+                        top_ops = aggregator.get_top_operations(service, self.MAX_OPERATIONS)
+                        total_ops = aggregator.get_operation_count(service)
                         
                         # Create component with operations
                         component_id, ops_ids = self._create_component_with_operations(
-                            package_elem, service, metadata, service_ops
+                            package_elem, service, metadata, top_ops, total_ops
                         )
                         component_ids[service] = component_id
                         operation_ids[service] = ops_ids
@@ -128,8 +142,8 @@ class ComponentDiagramGenerator(DiagramGenerator):
             dependencies_package, _ = self.xmi_writer.create_package(model, "Dependencies")
             
             created_deps: Set[str] = set()
-            for caller_service, callee_map in service_calls.items():
-                for callee_service, operations in callee_map.items():
+            for caller_service, callee_map in sorted(service_calls.items()):
+                for callee_service in sorted(callee_map):
                     caller_id = component_ids.get(caller_service)
                     callee_id = component_ids.get(callee_service)
                     
@@ -196,7 +210,8 @@ class ComponentDiagramGenerator(DiagramGenerator):
     
     def _create_component_with_operations(self, parent: ET.Element, service_name: str, 
                                           metadata: Dict[str, any], 
-                                          operations: Set[str]) -> tuple:
+                                          operations: List[Tuple[str, int]],
+                                          total_operations: int) -> tuple:
         """
         Create a UML Component element with ownedOperation elements.
         
@@ -204,7 +219,8 @@ class ComponentDiagramGenerator(DiagramGenerator):
             parent: Parent element (package)
             service_name: Service name
             metadata: Service metadata
-            operations: Set of operation names
+            operations: (operation name, call count) pairs, most called first
+            total_operations: Number of distinct operations tracked for the service
             
         Returns:
             Tuple of (component_id, operation_ids_dict)
@@ -221,11 +237,10 @@ class ComponentDiagramGenerator(DiagramGenerator):
         if stereotype:
             self.xmi_writer.add_comment(component, f"«{stereotype}»")
         
-        # Add operations directly to component
+        # Add operations directly to component, by descending call volume
         operation_ids: Dict[str, str] = {}
-        ops_list = list(operations)[:20]  # Limit to 20 for readability
         
-        for op_name in ops_list:
+        for op_name, _ in operations:
             clean_op = extract_simple_operation_name(op_name)
             op_elem, op_id = self.xmi_writer.create_owned_element(
                 component, "ownedOperation",
@@ -236,10 +251,10 @@ class ComponentDiagramGenerator(DiagramGenerator):
             operation_ids[clean_op] = op_id
         
         # Add comment if more operations exist
-        if len(operations) > 20:
+        if total_operations > len(operations):
             self.xmi_writer.add_comment(
                 component,
-                f"+{len(operations) - 20} more operations"
+                f"+{total_operations - len(operations)} more operations"
             )
         
         return component_id, operation_ids
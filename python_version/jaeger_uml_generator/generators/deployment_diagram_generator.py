@@ -2,12 +2,12 @@
 
 import logging
 import xml.etree.ElementTree as ET
-from typing import List, Dict, Set
+from typing import List, Dict, Set, Optional
 from .diagram_generator import DiagramGenerator
 from ..models import Trace
-from ..analyzer import TraceAggregator
+from ..analyzer import TraceAggregator, CallModel
 from ..renderer import XmiWriter, XmiFormat
-from ..utils import extract_base_name
+from ..utils import extract_base_name, stable_digest
 
 
 logger = logging.getLogger(__name__)
@@ -16,24 +16,26 @@ logger = logging.getLogger(__name__)
 class DeploymentDiagramGenerator(DiagramGenerator):
     """Generates UML Deployment Diagrams in XMI 2.5.1 format from aggregated Jaeger traces."""
     
-    def __init__(self, xmi_format: str = "papyrus"):
+    def __init__(self, xmi_format: str = "papyrus", compact: bool = False):
         """Initialize generator with XMI format.
         
         Args:
             xmi_format: Output format ('papyrus' or 'magicdraw')
+            compact: Write XMI without indentation
         """
         format_enum = XmiFormat(xmi_format)
-        self.xmi_writer = XmiWriter(format_enum)
+        self.xmi_writer = XmiWriter(format_enum, compact)
     
     def get_diagram_type(self) -> str:
         return "deployment"
     
-    def generate_xmi(self, traces: List[Trace]) -> str:
+    def generate_xmi(self, traces: List[Trace], call_model: Optional[CallModel] = None) -> str:
         """
         Generate XMI for deployment diagram from multiple traces.
         
         Args:
             traces: List of Trace objects
+            call_model: Call model of `traces` shared with other outputs (optional)
             
         Returns:
             XMI content as string
@@ -43,7 +45,10 @@ class DeploymentDiagramGenerator(DiagramGenerator):
             return ""
         
         try:
-            aggregator = TraceAggregator(traces)
+            if call_model is not None:
+                aggregator = call_model.aggregator
+            else:
+                aggregator = TraceAggregator(traces)
             
             # Determine model name
             model_name = "DeploymentDiagram"
@@ -69,7 +74,7 @@ class DeploymentDiagramGenerator(DiagramGenerator):
             # Create nodes and deploy artifacts
             artifact_ids: Dict[str, str] = {}
             
-            for node_name, services in node_services.items():
+            for node_name, services in sorted(node_services.items()):
                 # Create node
                 node_elem, node_id = self.xmi_writer.create_packaged_element(
                     model, "Node", node_name
@@ -77,7 +82,7 @@ class DeploymentDiagramGenerator(DiagramGenerator):
                 node_ids[node_name] = node_id
                 
                 # Create artifacts and deployments for services on this node
-                for service in services:
+                for service in sorted(services):
                     artifact_elem, artifact_id = self.xmi_writer.create_packaged_element(
                         model, "Artifact", service
                     )
@@ -93,13 +98,18 @@ class DeploymentDiagramGenerator(DiagramGenerator):
             # Create communication paths between nodes
             dependencies = aggregator.get_service_dependencies()
             created_paths: Set[str] = set()
+            service_nodes = {
+                service: node_name
+                for node_name, services in node_services.items()
+                for service in services
+            }
             
-            for from_service, to_services in dependencies.items():
+            for from_service, to_services in sorted(dependencies.items()):
                 # Find node for from_service
-                from_node = self._find_node_for_service(from_service, node_services)
+                from_node = service_nodes.get(from_service)
                 
-                for to_service in to_services:
-                    to_node = self._find_node_for_service(to_service, node_services)
+                for to_service in sorted(to_services):
+                    to_node = service_nodes.get(to_service)
                     
                     if from_node and to_node and from_node != to_node:
                         path_key = f"{from_node}_to_{to_node}"
@@ -164,30 +174,15 @@ class DeploymentDiagramGenerator(DiagramGenerator):
         
         # Create member ends (using ownedEnd instead of memberEnd for better compatibility)
         end1 = ET.SubElement(comm_path, "ownedEnd")
-        end1.set(f"{{{self.xmi_writer.XMI_NAMESPACE}}}id", self.xmi_writer.generate_uuid())
+        end1.set(f"{{{self.xmi_writer.XMI_NAMESPACE}}}id",
+                 self.xmi_writer.generate_id(comm_path, "ownedEnd", "source"))
         end1.set("type", source_node_id)
         
         end2 = ET.SubElement(comm_path, "ownedEnd")
-        end2.set(f"{{{self.xmi_writer.XMI_NAMESPACE}}}id", self.xmi_writer.generate_uuid())
+        end2.set(f"{{{self.xmi_writer.XMI_NAMESPACE}}}id",
+                 self.xmi_writer.generate_id(comm_path, "ownedEnd", "target"))
         end2.set("type", target_node_id)
     
-    def _find_node_for_service(self, service: str, 
-                               node_services: Dict[str, Set[str]]) -> str:
-        """
-        Find the node where a service is deployed.
-        
-        Args:
-            service: Service name
-            node_services: Map of node names to services
-            
-        Returns:
-            Node name or None
-        """
-        for node_name, services in node_services.items():
-            if service in services:
-                return node_name
-        return None
-    
     def _extract_node(self, metadata: Dict[str, any]) -> str:
         """
         Extract node/host information from metadata tags.
@@ -243,4 +238,4 @@ class DeploymentDiagramGenerator(DiagramGenerator):
             return f"Host-{host_ip}"
         
         # Generic fallback
-        return f"Node-{abs(hash(str(metadata)) % 10000)}"
+        return f"Node-{stable_digest(metadata)}"
@@ -23,6 +23,9 @@ class DiagramGenerator(ABC):
         """
         Generate XMI content for the given traces.
         
+        Generators built from aggregates may also accept a shared CallModel
+        of the traces as optional `call_model` argument.
+        
         Args:
             traces: List of Trace objects
             
@@ -5,6 +5,7 @@ import xml.etree.ElementTree as ET
 from typing import List, Dict
 from .diagram_generator import DiagramGenerator
 from ..models import Trace, Span
+from ..analyzer import get_call_messages
 from ..renderer import XmiWriter, XmiFormat
 from ..utils import clean_operation_name
 
@@ -15,14 +16,15 @@ logger = logging.getLogger(__name__)
 class SequenceDiagramGenerator(DiagramGenerator):
     """Generates UML Sequence Diagrams in XMI 2.5.1 format from Jaeger traces."""
     
-    def __init__(self, xmi_format: str = "papyrus"):
+    def __init__(self, xmi_format: str = "papyrus", compact: bool = False):
         """Initialize generator with XMI format.
         
         Args:
             xmi_format: Output format ('papyrus' or 'magicdraw')
+            compact: Write XMI without indentation
         """
         format_enum = XmiFormat(xmi_format)
-        self.xmi_writer = XmiWriter(format_enum)
+        self.xmi_writer = XmiWriter(format_enum, compact)
     
     def get_diagram_type(self) -> str:
         return "sequence"
@@ -108,43 +110,27 @@ class SequenceDiagramGenerator(DiagramGenerator):
                 lifeline_id = self._create_lifeline(interaction, service, property_id)
                 service_to_lifeline_id[service] = lifeline_id
             
-            # Process spans and create messages
-            sorted_spans = trace.get_spans_sorted_by_time()
-            span_to_service: Dict[str, str] = {}
-            
-            for span in sorted_spans:
-                span_to_service[span.span_id] = trace.get_service_name(span)
-            
-            message_counter = 0
+            # Create messages from the trace's cross-service calls
             total_messages = 0
             
-            for span in sorted_spans:
-                current_service = trace.get_service_name(span)
-                parent_span_id = span.get_parent_span_id()
+            for call in get_call_messages(trace):
+                from_lifeline_id = service_to_lifeline_id.get(call.caller)
+                to_lifeline_id = service_to_lifeline_id.get(call.callee)
                 
-                if parent_span_id:
-                    parent_service = span_to_service.get(parent_span_id)
+                if from_lifeline_id and to_lifeline_id:
+                    clean_operation = clean_operation_name(call.span.operation_name)
+                    
+                    self._create_message(
+                        interaction,
+                        f"msg{total_messages}",
+                        clean_operation,
+                        from_lifeline_id,
+                        to_lifeline_id,
+                        "synchCall",
+                        call.span.duration
+                    )
                     
-                    if parent_service and parent_service != current_service:
-                        # Cross-service call
-                        from_lifeline_id = service_to_lifeline_id.get(parent_service)
-                        to_lifeline_id = service_to_lifeline_id.get(current_service)
-                        
-                        if from_lifeline_id and to_lifeline_id:
-                            clean_operation = clean_operation_name(span.operation_name)
-                            
-                            self._create_message(
-                                interaction,
-                                f"msg{message_counter}",
-                                clean_operation,
-                                from_lifeline_id,
-                                to_lifeline_id,
-                                "synchCall",
-                                span.duration
-                            )
-                            
-                            message_counter += 1
-                            total_messages += 1
+                    total_messages += 1
             
             logger.info(f"Generated sequence diagram XMI for trace {trace.trace_id} "
                        f"with {len(services)} participants and {total_messages} messages")
@@ -169,7 +155,7 @@ class SequenceDiagramGenerator(DiagramGenerator):
             Lifeline ID
         """
         lifeline = ET.SubElement(interaction, "lifeline")
-        lifeline_id = self.xmi_writer.generate_uuid()
+        lifeline_id = self.xmi_writer.generate_id(interaction, "lifeline", service_name)
         lifeline.set(f"{{{self.xmi_writer.XMI_NAMESPACE}}}id", lifeline_id)
         lifeline.set("name", service_name)
         lifeline.set("represents", represents_id)
@@ -194,7 +180,7 @@ class SequenceDiagramGenerator(DiagramGenerator):
         # Create send event
         send_event = ET.SubElement(interaction, "fragment")
         send_event.set(f"{{{self.xmi_writer.XMI_NAMESPACE}}}type", "uml:MessageOccurrenceSpecification")
-        send_event_id = self.xmi_writer.generate_uuid()
+        send_event_id = self.xmi_writer.generate_id(interaction, "send", message_name)
         send_event.set(f"{{{self.xmi_writer.XMI_NAMESPACE}}}id", send_event_id)
         send_event.set("name", f"{message_name}_send")
         send_event.set("covered", from_lifeline_id)
@@ -202,14 +188,15 @@ class SequenceDiagramGenerator(DiagramGenerator):
         # Create receive event
         receive_event = ET.SubElement(interaction, "fragment")
         receive_event.set(f"{{{self.xmi_writer.XMI_NAMESPACE}}}type", "uml:MessageOccurrenceSpecification")
-        receive_event_id = self.xmi_writer.generate_uuid()
+        receive_event_id = self.xmi_writer.generate_id(interaction, "receive", message_name)
         receive_event.set(f"{{{self.xmi_writer.XMI_NAMESPACE}}}id", receive_event_id)
         receive_event.set("name", f"{message_name}_receive")
         receive_event.set("covered", to_lifeline_id)
         
         # Create message
         message = ET.SubElement(interaction, "message")
-        message.set(f"{{{self.xmi_writer.XMI_NAMESPACE}}}id", self.xmi_writer.generate_uuid())
+        message.set(f"{{{self.xmi_writer.XMI_NAMESPACE}}}id",
+                    self.xmi_writer.generate_id(interaction, "message", message_name))
         message.set("name", operation_name)
         message.set("messageSort", message_sort)
         message.set("sendEvent", send_event_id)
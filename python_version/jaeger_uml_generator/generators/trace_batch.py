@@ -0,0 +1,233 @@
+"""Per-trace XMI generation, serially or in a pool of worker processes."""
+
+import logging
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Dict, Tuple, Optional, Iterator
+from ..models import Trace
+from ..analyzer import DEFAULT_OPERATION_CAPACITY
+from ..utils import clean_trace_name
+from ..renderer import get_xmi_filename, open_xmi_file, strip_xmi_extension
+from .sequence_diagram_generator import SequenceDiagramGenerator
+from .component_diagram_generator import ComponentDiagramGenerator
+from .deployment_diagram_generator import DeploymentDiagramGenerator
+from .unified_generator import UnifiedXmiGenerator
+
+
+logger = logging.getLogger(__name__)
+
+
+# File name prefix per diagram type ('all' writes the unified XMI)
+FILE_PREFIXES = {'all': '', 'sequence': 'sequence-', 'component': 'component-', 'deployment': 'deployment-'}
+# Traces sent to a worker per task
+BATCH_CHUNK_SIZE = 16
+# Share of the traces between two progress messages
+PROGRESS_STEP = 0.1
+
+
+@dataclass
+class TraceOutputSettings:
+    """Options of per-trace generation, sent once to every worker."""
+    
+    output_dir: Path
+    diagram_type: str = "all"
+    xmi_format: str = "papyrus"
+    compact: bool = False
+    compression: str = "none"
+    operation_capacity: int = DEFAULT_OPERATION_CAPACITY
+    sample_rate: float = 1.0
+    stratum_rates: Dict[str, float] = field(default_factory=dict)
+    log_level: int = logging.INFO
+
+
+@dataclass
+class TraceBatchResult:
+    """Outcome of a per-trace generation run."""
+    
+    # Written file names in trace order
+    generated: List[str]
+    # Planned (trace index, file name) of every trace to generate, in trace order
+    planned: List[Tuple[int, str]] = field(default_factory=list)
+    # Traces whose output file is overwritten by a later trace of the same name
+    superseded: int = 0
+    failed: int = 0
+    jobs: int = 1
+    elapsed_s: float = 0.0
+    
+    @property
+    def files_per_second(self) -> float:
+        """Throughput of the run."""
+        return len(self.generated) / self.elapsed_s if self.elapsed_s > 0 else 0.0
+    
+    def describe(self) -> str:
+        """Format the progress and throughput summary."""
+        text = (f"{len(self.generated)} per-trace XMI file(s) in {self.elapsed_s:.2f}s "
+                f"({self.files_per_second:.1f} file(s)/s, {self.jobs} worker(s))")
+        if self.superseded:
+            text += f", {self.superseded} trace(s) superseded by a later trace of the same name"
+        if self.failed:
+            text += f", {self.failed} failed"
+        return text
+
+
+def plan_trace_outputs(traces: List[Trace], diagram_type: str,
+                       selected_ids: Optional[set] = None,
+                       compression: str = "none") -> Tuple[List[Tuple[int, str]], int]:
+    """
+    Assign the output file of every trace to generate.
+    
+    Names are derived from the trace's source name (or its position) only,
+    so they do not depend on the order in which workers finish. When
+    several traces map to the same file, only the last one is generated,
+    which leaves the same files as writing them one after the other.
+    
+    Args:
+        traces: List of Trace objects
+        diagram_type: 'all', 'sequence', 'component' or 'deployment'
+        selected_ids: If set, ids of the only traces to generate
+        compression: Output compression ('none', 'gz' or 'xz')
+    
+    Returns:
+        Tuple of ([(trace index, file name)] in trace order, number of superseded traces)
+    """
+    prefix = FILE_PREFIXES[diagram_type]
+    last_index = {}
+    for i, trace in enumerate(traces):
+        if selected_ids is not None and id(trace) not in selected_ids:
+            continue
+        
+        # Use sourceName if available, otherwise fall back to index
+        trace_name = clean_trace_name(trace.source_name if trace.source_name else f"trace-{i + 1}")
+        last_index[get_xmi_filename(f"{prefix}{trace_name}", compression)] = i
+    
+    planned = sorted((i, filename) for filename, i in last_index.items())
+    selected = len(traces) if selected_ids is None else len(selected_ids)
+    return planned, selected - len(planned)
+
+
+# Settings of the current worker process (see _init_worker)
+_worker_settings: Optional[TraceOutputSettings] = None
+
+
+def _init_worker(settings: TraceOutputSettings):
+    """Set up a worker process once before it generates its first trace."""
+    global _worker_settings
+    _worker_settings = settings
+    logging.getLogger().setLevel(settings.log_level)
+
+
+def _generate_trace(task: Tuple[int, str, Trace]) -> Optional[str]:
+    """
+    Generate and write the XMI file of one trace.
+    
+    Args:
+        task: Tuple of (trace index, file name, trace)
+    
+    Returns:
+        File name, None if no content was generated
+    """
+    index, filename, trace = task
+    settings = _worker_settings
+    diagram_type = settings.diagram_type
+    compact = settings.compact
+    
+    if diagram_type == 'all':
+        generator = UnifiedXmiGenerator(
+            settings.xmi_format,
+            operation_capacity=settings.operation_capacity,
+            sample_rate=settings.sample_rate,
+            stratum_rates=settings.stratum_rates,
+            compact=compact
+        )
+        # Streamed straight to the file
+        if not generator.write([trace], settings.output_dir / filename, strip_xmi_extension(filename)):
+            logger.warning(f"No XMI content generated for {filename}")
+            return None
+        logger.debug(f"Saved XMI file: {filename}")
+        return filename
+    elif diagram_type == 'sequence':
+        generator = SequenceDiagramGenerator(settings.xmi_format, compact)
+        xmi_content = generator.generate_xmi_for_trace(trace, index)
+    elif diagram_type == 'component':
+        generator = ComponentDiagramGenerator(settings.xmi_format, settings.operation_capacity, compact)
+        xmi_content = generator.generate_xmi([trace])
+    else:
+        xmi_content = DeploymentDiagramGenerator(settings.xmi_format, compact).generate_xmi([trace])
+    
+    if not xmi_content or not xmi_content.strip():
+        logger.warning(f"No XMI content generated for {filename}")
+        return None
+    
+    with open_xmi_file(settings.output_dir / filename) as f:
+        f.write(xmi_content.encode('utf-8'))
+    logger.debug(f"Saved XMI file: {filename}")
+    return filename
+
+
+class TraceBatchGenerator:
+    """
+    Generates one XMI file per trace.
+    
+    With more than one job the traces are sent in chunks to a pool of
+    worker processes. Every worker is initialized once with the shared
+    settings and keeps its per-process caches (e.g. operation name
+    normalization) across all traces it generates; each worker writes its
+    files directly. File names are planned up front and results are
+    collected in trace order, so the output does not depend on the number
+    of jobs.
+    """
+    
+    def __init__(self, settings: TraceOutputSettings, jobs: int = 1):
+        """
+        Initialize the generator.
+        
+        Args:
+            settings: Per-trace generation options
+            jobs: Number of worker processes (1 generates in this process)
+        """
+        self.settings = settings
+        self.jobs = max(1, jobs)
+    
+    def generate(self, traces: List[Trace],
+                 selected_ids: Optional[set] = None) -> TraceBatchResult:
+        """
+        Generate the files of all traces.
+        
+        Args:
+            traces: List of Trace objects
+            selected_ids: If set, ids of the only traces to generate
+        
+        Returns:
+            TraceBatchResult with the written files in trace order
+        """
+        planned, superseded = plan_trace_outputs(traces, self.settings.diagram_type, selected_ids,
+                                                 self.settings.compression)
+        result = TraceBatchResult(generated=[], planned=planned, superseded=superseded,
+                                  jobs=min(self.jobs, max(1, len(planned))))
+        tasks = ((index, filename, traces[index]) for index, filename in planned)
+        
+        started = time.perf_counter()
+        progress_every = max(1, int(len(planned) * PROGRESS_STEP))
+        for done, filename in enumerate(self._run(tasks, result.jobs), 1):
+            if filename is None:
+                result.failed += 1
+            else:
+                result.generated.append(filename)
+            if done % progress_every == 0 and done < len(planned):
+                logger.info(f"Generated {done}/{len(planned)} trace(s)")
+        result.elapsed_s = time.perf_counter() - started
+        return result
+    
+    def _run(self, tasks, jobs: int) -> Iterator[Optional[str]]:
+        """Run the tasks in this process or in a pool, results in task order."""
+        if jobs == 1:
+            _init_worker(self.settings)
+            for task in tasks:
+                yield _generate_trace(task)
+            return
+        
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                                 initargs=(self.settings,)) as pool:
+            yield from pool.map(_generate_trace, tasks, chunksize=BATCH_CHUNK_SIZE)
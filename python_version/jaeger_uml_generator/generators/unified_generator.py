@@ -2,12 +2,37 @@
 
 import logging
 import xml.etree.ElementTree as ET
-from typing import List, Dict, Set
+from pathlib import Path
+from typing import Callable, List, Dict, Set, Optional, Tuple
 
 from ..models import Trace
-from ..analyzer import TraceAggregator
-from ..renderer import XmiWriter, XmiFormat, MarteProfileWriter
-from ..utils import extract_simple_operation_name, extract_base_name
+from ..analyzer import (
+    TraceAggregator,
+    DEFAULT_OPERATION_CAPACITY,
+    TraceGroup,
+    group_traces_by_fingerprint,
+    cluster_traces,
+    get_trace_timing,
+    get_call_messages,
+    CallModel,
+    ConcurrencyProfile,
+    TraceSetDiff,
+    get_outlier_info,
+    get_entry_operation,
+    WorkloadProfile,
+    get_mixed_closed_parameters,
+    NodeResourceProfile
+)
+from ..renderer import (
+    XmiDocumentBuilder,
+    XmiWriter,
+    XmiStreamWriter,
+    XmiFormat,
+    MarteProfileWriter,
+    MARTE_NAMESPACES,
+    open_xmi_file
+)
+from ..utils import extract_simple_operation_name
 
 
 logger = logging.getLogger(__name__)
@@ -22,40 +47,102 @@ class UnifiedXmiGenerator:
     
     All elements are cross-referenced using shared IDs.
     Includes MARTE profile stereotypes for performance analysis.
+    
+    Components list their MAX_OPERATIONS most called operations, as in the
+    component diagram; messages calling any other operation keep its name
+    but have no signature.
     """
     
-    def __init__(self, xmi_format: str = "papyrus", include_marte: bool = True):
+    # Maximum number of operations shown per component (most called first)
+    MAX_OPERATIONS = 20
+    
+    def __init__(self, xmi_format: str = "papyrus", include_marte: bool = True,
+                 dedupe_sequences: bool = False,
+                 operation_capacity: int = DEFAULT_OPERATION_CAPACITY,
+                 diff: Optional[TraceSetDiff] = None,
+                 sample_rate: float = 1.0,
+                 stratum_rates: Optional[Dict[str, float]] = None,
+                 cluster_threshold: Optional[float] = None,
+                 workload_pattern: str = "closed",
+                 compact: bool = False):
         """
         Initialize unified generator.
         
         Args:
             xmi_format: Output format ('papyrus' or 'magicdraw')
             include_marte: Whether to include MARTE profile annotations
+            dedupe_sequences: Emit one sequence per distinct trace shape
+                              instead of one per trace
+            operation_capacity: Maximum distinct operations tracked per service
+            diff: Optional baseline comparison used to annotate components,
+                  operations and dependencies with changes
+            sample_rate: Fraction of the corpus the traces were sampled from;
+                         measured throughputs are scaled back up by its inverse
+            stratum_rates: Sample rates of stratified sampling per "service:operation"
+                           stratum; each entry operation's workload and requests
+                           are scaled by the rate of its stratum instead
+            cluster_threshold: If set, emit one sequence per cluster of traces
+                               whose call paths have at least this estimated
+                               Jaccard similarity (takes precedence over
+                               dedupe_sequences)
+            workload_pattern: Arrival pattern of the GaWorkloadEvent applied to
+                              interactions ('closed' or 'open')
+            compact: Write XMI without indentation
         """
         format_enum = XmiFormat(xmi_format)
-        self.xmi_writer = XmiWriter(format_enum)
+        self.xmi_writer = XmiWriter(format_enum, compact, MARTE_NAMESPACES if include_marte else None)
         self.include_marte = include_marte
+        self.dedupe_sequences = dedupe_sequences
+        self.operation_capacity = operation_capacity
+        self.diff = diff
+        self.sample_rate = sample_rate
+        self.stratum_rates = dict(stratum_rates or {})
+        self.cluster_threshold = cluster_threshold
+        self.workload_pattern = workload_pattern
         
         # Initialize MARTE profile writer
-        self.marte_writer = MarteProfileWriter(self.xmi_writer.XMI_NAMESPACE)
+        self.marte_writer = MarteProfileWriter(self.xmi_writer.XMI_NAMESPACE, self.xmi_writer.ids)
         
         # Shared element IDs across all diagrams
         self.component_ids: Dict[str, str] = {}  # service -> component_id
         self.operation_ids: Dict[str, Dict[str, str]] = {}  # service -> {op_name -> op_id}
         self.artifact_ids: Dict[str, str] = {}  # service -> artifact_id
         self.node_ids: Dict[str, str] = {}  # node_name -> node_id
+        self.component_elements: Dict[str, ET.Element] = {}  # service -> component
+        self.usage_elements: Dict[tuple, ET.Element] = {}  # (caller, callee) -> usage
+        self.node_profiles: Dict[str, ConcurrencyProfile] = {}  # node_name -> concurrency
+        self.node_resources: Dict[str, NodeResourceProfile] = {}  # node_name -> replicas and load
+        
+        # MARTE stereotype applications of the interaction being generated
+        self.interaction_id: Optional[str] = None
+        self.message_ids: List[tuple] = []  # [(message_id, self_time_ms, is_async, duration_ms), ...]
+        self.interaction_workload: Dict[str, int] = {}  # entry_operation -> occurrences
+        # Number of stereotype applications per stereotype
+        self.stereotype_counts: Dict[str, int] = {}
+        
+        # Measured workload per root entry operation
+        self.workload_profiles: Dict[str, WorkloadProfile] = {}
+        
+        # Number of sequence diagrams emitted by the last generation
+        self.sequence_count = 0
         
-        # IDs for MARTE stereotype applications
-        self.interaction_ids: Dict[str, str] = {}  # trace_name -> interaction_id
-        self.message_ids: List[tuple] = []  # [(message_id, duration_ms), ...]
+        # File of the core model that messages reference operations in (by
+        # href), None when the operations are in the same document
+        self.core_file: Optional[str] = None
     
-    def generate(self, traces: List[Trace], model_name: str = "UnifiedModel") -> str:
+    def generate(self, traces: List[Trace], model_name: str = "UnifiedModel",
+                 sequence_traces: Optional[List[Trace]] = None,
+                 call_model: Optional[CallModel] = None) -> str:
         """
         Generate unified XMI from traces.
         
         Args:
             traces: List of Trace objects
             model_name: Name for the UML model
+            sequence_traces: Traces rendered as sequence diagrams (default: all).
+                             Components and deployment always aggregate `traces`.
+            call_model: Call model of `traces` shared with other outputs of
+                        the run (built here if not given)
             
         Returns:
             XMI content as string
@@ -65,43 +152,7 @@ class UnifiedXmiGenerator:
             return ""
         
         try:
-            aggregator = TraceAggregator(traces)
-            
-            # Reset IDs for new generation
-            self.component_ids.clear()
-            self.operation_ids.clear()
-            self.artifact_ids.clear()
-            self.node_ids.clear()
-            self.interaction_ids.clear()
-            self.message_ids.clear()
-            
-            # Create XMI document
-            root = self.xmi_writer.create_xmi_document(model_name)
-            model = self.xmi_writer.get_model_element(root)
-            
-            # Add MARTE profile application to model
-            if self.include_marte:
-                self.marte_writer.add_profile_application(model)
-            
-            # Step 1: Generate Components with operations
-            self._generate_components(model, aggregator)
-            
-            # Step 2: Generate Deployment (Nodes, Artifacts with manifestations)
-            self._generate_deployment(model, aggregator)
-            
-            # Step 3: Generate Sequences inside Use Cases
-            self._generate_sequences(model, traces)
-            
-            # Step 4: Apply MARTE stereotypes (after all elements are created)
-            if self.include_marte:
-                self._apply_marte_stereotypes(root)
-            
-            logger.info(f"Generated unified XMI with {len(self.component_ids)} components")
-            if self.include_marte:
-                logger.info(f"Applied MARTE stereotypes: {len(self.interaction_ids)} GaAnalysisContext, "
-                           f"{len(self.message_ids)} PaStep, {len(self.node_ids)} GaExecHost, "
-                           f"{len(self.component_ids)} RtUnit")
-            
+            root = self._build_document(traces, model_name, sequence_traces, call_model)
             return self.xmi_writer.document_to_string(root)
             
         except Exception as e:
@@ -110,11 +161,233 @@ class UnifiedXmiGenerator:
             traceback.print_exc()
             return ""
     
+    def write(self, traces: List[Trace], file_path: Path, model_name: str = "UnifiedModel",
+              sequence_traces: Optional[List[Trace]] = None,
+              call_model: Optional[CallModel] = None) -> bool:
+        """
+        Generate unified XMI from traces and stream it to a file.
+        
+        Packages are written as soon as they are complete and every use case
+        right after its interaction is generated, so memory does not grow
+        with the number of sequence diagrams (see XmiStreamWriter).
+        
+        Args:
+            traces: List of Trace objects
+            file_path: Output file path (.xmi, or .xmi.gz/.xmi.xz to compress it)
+            model_name: Name for the UML model
+            sequence_traces: Traces rendered as sequence diagrams (default: all)
+            call_model: Call model of `traces` shared with other outputs of the run
+        
+        Returns:
+            True if the file was written
+        """
+        if not traces:
+            logger.warning("No traces provided for unified XMI generation")
+            return False
+        
+        return self._stream(
+            file_path,
+            lambda: self._build_document(traces, model_name, sequence_traces, call_model)
+        )
+    
+    def write_shard(self, sequences: List[Tuple[Trace, str, Optional[TraceGroup]]],
+                    file_path: Path, model_name: str, core_file: str) -> bool:
+        """
+        Stream a model holding only Use Cases to a file.
+        
+        The messages of its interactions reference the operations of a core
+        model written before by write() (with no sequence traces) through
+        `href`s to core_file. operation_ids and workload_profiles must be
+        the ones of that core model.
+        
+        Args:
+            sequences: Sequence diagrams to generate, see plan_sequences()
+            file_path: Output file path (.xmi, or .xmi.gz/.xmi.xz to compress it)
+            model_name: Name for the UML model of the shard
+            core_file: Name of the core model file, relative to the shard
+        
+        Returns:
+            True if the file was written
+        """
+        self.core_file = core_file
+        try:
+            return self._stream(file_path, lambda: self._build_shard_document(sequences, model_name))
+        finally:
+            self.core_file = None
+    
+    def _stream(self, file_path: Path, build: Callable[[], ET.Element]) -> bool:
+        """Build a document with a writer streaming it to a file."""
+        tree_writer = self.xmi_writer
+        try:
+            with open_xmi_file(file_path) as f:
+                self._set_writer(XmiStreamWriter(
+                    f, tree_writer.format, tree_writer.compact, tree_writer.namespaces
+                ))
+                build()
+                self.xmi_writer.finish()
+            return True
+        
+        except Exception as e:
+            logger.error(f"Failed to generate unified XMI: {e}")
+            import traceback
+            traceback.print_exc()
+            Path(file_path).unlink(missing_ok=True)
+            return False
+        finally:
+            self._set_writer(tree_writer)
+    
+    def _set_writer(self, xmi_writer: XmiDocumentBuilder):
+        """Build documents with another writer (and its ID generator)."""
+        self.xmi_writer = xmi_writer
+        self.marte_writer.ids = xmi_writer.ids
+    
+    def _build_document(self, traces: List[Trace], model_name: str,
+                        sequence_traces: Optional[List[Trace]],
+                        call_model: Optional[CallModel]) -> ET.Element:
+        """
+        Create the unified model with the current writer.
+        
+        Completed packages and use cases are handed to the writer with
+        flush()/close_element() as generation proceeds; stereotypes are
+        applied as soon as their elements exist.
+        
+        Returns:
+            Root XMI element
+        """
+        if call_model is None:
+            call_model = CallModel(traces, self.operation_capacity)
+        aggregator = call_model.aggregator
+        self.workload_profiles = call_model.get_workload_profiles()
+        
+        # Reset IDs for new generation
+        self.component_ids.clear()
+        self.operation_ids.clear()
+        self.artifact_ids.clear()
+        self.node_ids.clear()
+        self.component_elements.clear()
+        self.usage_elements.clear()
+        self.node_profiles.clear()
+        self.node_resources.clear()
+        self.stereotype_counts.clear()
+        self.sequence_count = 0
+        
+        # Create XMI document
+        root = self.xmi_writer.create_xmi_document(model_name)
+        model = self.xmi_writer.get_model_element(root)
+        
+        # Add MARTE profile application to model
+        if self.include_marte:
+            self.marte_writer.add_profile_application(model)
+        
+        # Record sampling so frequencies can be scaled back to the full corpus
+        if self.stratum_rates:
+            self.xmi_writer.add_comment(
+                model,
+                f"Stratified trace sample: {len(self.stratum_rates)} stratum rate(s) from "
+                f"{min(self.stratum_rates.values()):.6f} to {max(self.stratum_rates.values()):.6f} "
+                f"({len(traces)} sampled trace(s)); MARTE throughputs and workloads are scaled "
+                f"by 1/rate of each entry operation's stratum"
+            )
+        elif self.sample_rate < 1.0:
+            self.xmi_writer.add_comment(
+                model,
+                f"Trace sample rate: {self.sample_rate:.6f} ({len(traces)} sampled trace(s)); "
+                f"MARTE throughputs and workloads are scaled by 1/{self.sample_rate:.6f}"
+            )
+        
+        # Step 1: Generate Components with operations
+        self._generate_components(model, aggregator)
+        
+        # Annotate changes against the baseline corpus
+        if self.diff is not None:
+            self._apply_diff_annotations()
+        self.xmi_writer.flush()
+        
+        # Step 2: Generate Deployment (Nodes, Artifacts with manifestations)
+        self._generate_deployment(model, call_model)
+        
+        # Step 3: Apply MARTE stereotypes to components and nodes
+        if self.include_marte:
+            self._apply_structure_stereotypes(root)
+        self.xmi_writer.flush()
+        
+        # Step 4: Generate Sequences inside Use Cases (MARTE stereotypes are
+        # applied to every interaction when it is complete)
+        sequence_traces = traces if sequence_traces is None else sequence_traces
+        self._generate_sequences(model, self.plan_sequences(sequence_traces), len(sequence_traces), root)
+        
+        if self.diff is not None:
+            self._annotate_removed_elements(model)
+        
+        logger.info(f"Generated unified XMI with {len(self.component_ids)} components")
+        if self.include_marte:
+            counts = self.stereotype_counts
+            logger.info(f"Applied MARTE stereotypes: {counts.get('GaAnalysisContext', 0)} GaAnalysisContext, "
+                       f"{counts.get('GaWorkloadEvent', 0)} GaWorkloadEvent, "
+                       f"{counts.get('PaStep', 0)} PaStep, {counts.get('GaExecHost', 0)} GaExecHost, "
+                       f"{counts.get('RtUnit', 0)} RtUnit")
+        
+        return root
+    
+    def _build_shard_document(self, sequences: List[Tuple[Trace, str, Optional[TraceGroup]]],
+                              model_name: str) -> ET.Element:
+        """
+        Create a model with a UseCases package of the given sequence diagrams.
+        
+        Returns:
+            Root XMI element
+        """
+        self.stereotype_counts.clear()
+        self.sequence_count = 0
+        
+        root = self.xmi_writer.create_xmi_document(model_name)
+        model = self.xmi_writer.get_model_element(root)
+        if self.include_marte:
+            self.marte_writer.add_profile_application(model)
+        
+        usecases_pkg, _ = self.xmi_writer.create_package(model, "UseCases")
+        self.xmi_writer.open_element(usecases_pkg)
+        for trace, trace_name, group in sequences:
+            self._generate_sequence(usecases_pkg, trace, trace_name, root, group)
+        self.xmi_writer.close_element(usecases_pkg)
+        
+        logger.debug(f"Generated {len(sequences)} sequence(s) in {model_name}")
+        return root
+    
+    def plan_sequences(self, traces: List[Trace]) -> List[Tuple[Trace, str, Optional[TraceGroup]]]:
+        """
+        Get the sequence diagrams to generate for traces.
+        
+        With dedupe_sequences or cluster_threshold there is one per group of
+        traces, rendered from the group's representative; otherwise one per trace.
+        
+        Args:
+            traces: Traces rendered as sequence diagrams
+        
+        Returns:
+            List of (trace, Use Case name, group or None)
+        """
+        if self.dedupe_sequences or self.cluster_threshold is not None:
+            if self.cluster_threshold is not None:
+                groups = cluster_traces(traces, self.cluster_threshold)
+            else:
+                groups = group_traces_by_fingerprint(traces)
+            sequences = []
+            for group in groups:
+                trace = group.representative
+                trace_name = trace.source_name if trace.source_name else f"Trace_{group.representative_index + 1}"
+                sequences.append((trace, trace_name, group))
+            return sequences
+        
+        return [
+            (trace, trace.source_name if trace.source_name else f"Trace_{i+1}", None)
+            for i, trace in enumerate(traces)
+        ]
+    
     def _generate_components(self, model: ET.Element, aggregator: TraceAggregator):
         """Generate Component diagram elements."""
         services = aggregator.get_all_services()
         service_metadata = aggregator.get_service_metadata()
-        service_operations = aggregator.get_service_operations()
         service_calls = aggregator.get_service_calls()
         
         # Create Components package
@@ -123,17 +396,18 @@ class UnifiedXmiGenerator:
         # Create components with operations
         for service in sorted(services):
             metadata = service_metadata.get(service, {})
-            operations = service_operations.get(service, set())
             
             # Create component
             component, component_id = self.xmi_writer.create_packaged_element(
                 components_pkg, "Component", service, visibility="public"
             )
             self.component_ids[service] = component_id
+            self.component_elements[service] = component
             self.operation_ids[service] = {}
             
-            # Add operations
-            for op_name in sorted(operations):
+            # Add the most called operations, by descending call volume
+            top_ops = aggregator.get_top_operations(service, self.MAX_OPERATIONS)
+            for op_name, _ in top_ops:
                 clean_op = extract_simple_operation_name(op_name)
                 op_elem, op_id = self.xmi_writer.create_owned_element(
                     component, "ownedOperation",
@@ -141,6 +415,10 @@ class UnifiedXmiGenerator:
                 )
                 op_elem.set(f"{{{self.xmi_writer.XMI_NAMESPACE}}}type", "uml:Operation")
                 self.operation_ids[service][clean_op] = op_id
+            
+            total_ops = aggregator.get_operation_count(service)
+            if total_ops > len(top_ops):
+                self.xmi_writer.add_comment(component, f"+{total_ops - len(top_ops)} more operations")
         
         # Create dependencies between components
         deps_pkg, _ = self.xmi_writer.create_package(model, "Dependencies")
@@ -154,27 +432,24 @@ class UnifiedXmiGenerator:
                 if caller_id and callee_id:
                     dep_key = f"{caller}_to_{callee}"
                     if dep_key not in created_deps:
-                        self.xmi_writer.create_usage(
+                        usage, _ = self.xmi_writer.create_usage(
                             deps_pkg, dep_key, caller_id, callee_id
                         )
+                        self.usage_elements[(caller, callee)] = usage
                         created_deps.add(dep_key)
         
         logger.info(f"Generated {len(self.component_ids)} components with operations")
     
-    def _generate_deployment(self, model: ET.Element, aggregator: TraceAggregator):
+    def _generate_deployment(self, model: ET.Element, call_model: CallModel):
         """Generate Deployment diagram elements with manifestations to components."""
-        service_metadata = aggregator.get_service_metadata()
-        
         # Create Deployment package
         deployment_pkg, _ = self.xmi_writer.create_package(model, "Deployment")
         
-        # Group services by node
-        node_services: Dict[str, Set[str]] = {}
-        for service, metadata in service_metadata.items():
-            node = self._extract_node(metadata)
-            if node not in node_services:
-                node_services[node] = set()
-            node_services[node].add(service)
+        # Services grouped by node, with measured concurrency, replicas, busy
+        # time and call overheads per node
+        node_services = call_model.get_node_services()
+        self.node_profiles.update(call_model.get_node_concurrency())
+        self.node_resources.update(call_model.get_node_resources())
         
         # Create nodes
         for node_name in sorted(node_services.keys()):
@@ -182,6 +457,20 @@ class UnifiedXmiGenerator:
                 deployment_pkg, "Node", node_name
             )
             self.node_ids[node_name] = node_id
+            
+            profile = self.node_profiles.get(node_name)
+            if profile:
+                self.xmi_writer.add_comment(
+                    node_elem,
+                    f"Concurrency: max={profile.max_concurrency}, "
+                    f"avg={profile.avg_concurrency:.3f}; "
+                    f"busy time={profile.busy_time_us / 1000.0:.3f}ms; "
+                    f"utilization={profile.utilization:.4f}"
+                )
+            
+            resource = self.node_resources.get(node_name)
+            if resource:
+                self.xmi_writer.add_comment(node_elem, resource.describe())
         
         # Create artifacts with manifestations to components
         for node_name, services in node_services.items():
@@ -199,126 +488,243 @@ class UnifiedXmiGenerator:
                 if component_id:
                     manifestation = ET.SubElement(artifact, "manifestation")
                     manifestation.set(f"{{{self.xmi_writer.XMI_NAMESPACE}}}type", "uml:Manifestation")
-                    manifestation.set(f"{{{self.xmi_writer.XMI_NAMESPACE}}}id", self.xmi_writer.generate_uuid())
+                    manifestation.set(f"{{{self.xmi_writer.XMI_NAMESPACE}}}id",
+                                      self.xmi_writer.generate_id(artifact, "Manifestation", service))
                     manifestation.set("name", f"manifest_{service}")
                     manifestation.set("supplier", component_id)
                     manifestation.set("client", artifact_id)
                 
                 # Create Deployment relationship (Node deploys Artifact)
-                deployment = self.xmi_writer.create_packaged_element(
+                self.xmi_writer.create_packaged_element(
                     deployment_pkg, "Deployment", f"deploy_{service}",
                     location=node_id, deployedArtifact=artifact_id
                 )
         
         logger.info(f"Generated deployment with {len(self.node_ids)} nodes and {len(self.artifact_ids)} artifacts")
     
-    def _generate_sequences(self, model: ET.Element, traces: List[Trace]):
+    def _generate_sequences(self, model: ET.Element,
+                            sequences: List[Tuple[Trace, str, Optional[TraceGroup]]],
+                            trace_count: int, root: ET.Element):
         """Generate Sequence diagrams inside Use Cases, referencing Components."""
         # Create UseCases package
         usecases_pkg, _ = self.xmi_writer.create_package(model, "UseCases")
+        self.xmi_writer.open_element(usecases_pkg)
         
-        for i, trace in enumerate(traces):
-            trace_name = trace.source_name if trace.source_name else f"Trace_{i+1}"
-            
-            # Create UseCase containing this sequence
-            usecase, usecase_id = self.xmi_writer.create_packaged_element(
-                usecases_pkg, "UseCase", trace_name
+        # Characterize the measured workload of every entry operation
+        for entry_operation in sorted(self.workload_profiles):
+            self.xmi_writer.add_comment(usecases_pkg, self.workload_profiles[entry_operation].describe())
+        
+        # Grouped interactions are annotated with group timings
+        for trace, trace_name, group in sequences:
+            self._generate_sequence(usecases_pkg, trace, trace_name, root, group)
+        
+        self.xmi_writer.close_element(usecases_pkg)
+        if self.dedupe_sequences or self.cluster_threshold is not None:
+            logger.info(f"Generated {len(sequences)} sequence(s) inside Use Cases "
+                       f"from {trace_count} trace(s)")
+        else:
+            logger.info(f"Generated {len(sequences)} sequence(s) inside Use Cases")
+    
+    def _generate_sequence(self, usecases_pkg: ET.Element, trace: Trace, trace_name: str,
+                           root: ET.Element, group: Optional[TraceGroup] = None):
+        """
+        Generate a single Sequence diagram inside its own Use Case.
+        
+        The Use Case is complete when this returns: its MARTE stereotypes are
+        applied and it is flushed to the writer.
+        
+        Args:
+            usecases_pkg: UseCases package element
+            trace: Trace to render
+            trace_name: Name of the Use Case
+            root: Root XMI element (stereotype applications go here)
+            group: Fingerprint group the trace represents (optional). When set,
+                   the interaction is annotated with the occurrence count and
+                   message timings are averaged over the whole group.
+        """
+        # Create UseCase containing this sequence
+        usecase, usecase_id = self.xmi_writer.create_packaged_element(
+            usecases_pkg, "UseCase", trace_name
+        )
+        # IDs inside the Use Case are needed only until it is flushed
+        self.xmi_writer.ids.begin_scope()
+        
+        # Create Interaction inside the UseCase
+        interaction = ET.SubElement(usecase, "ownedBehavior")
+        interaction.set(f"{{{self.xmi_writer.XMI_NAMESPACE}}}type", "uml:Interaction")
+        interaction_id = self.xmi_writer.generate_id(usecase, "Interaction", trace_name)
+        interaction.set(f"{{{self.xmi_writer.XMI_NAMESPACE}}}id", interaction_id)
+        interaction.set("name", f"{trace_name}_Interaction")
+        
+        # Track interaction ID for MARTE GaAnalysisContext
+        self.interaction_id = interaction_id
+        self.message_ids.clear()
+        self.sequence_count += 1
+        
+        # Track the arrival streams the interaction stands for (GaWorkloadEvent):
+        # members of a group are credited to their own entry operations
+        if group is not None:
+            occurrences = group.entry_counts
+        else:
+            entry_operation = get_entry_operation(trace)
+            occurrences = {entry_operation: 1} if entry_operation is not None else {}
+        self.interaction_workload = {
+            entry_operation: count for entry_operation, count in occurrences.items()
+            if entry_operation in self.workload_profiles
+        }
+        
+        # Annotate deduplicated interactions with occurrence count and timings
+        if group is not None:
+            stats = group.get_duration_stats_ms()
+            shapes = f"; similar shapes: {group.shape_count}" if group.shape_count > 1 else ""
+            self.xmi_writer.add_comment(
+                interaction,
+                f"Occurrences: {group.count}{shapes}; response time (ms): "
+                f"min={stats['min']:.3f}, mean={stats['mean']:.3f}, "
+                f"p95={stats['p95']:.3f}, max={stats['max']:.3f}"
             )
+        
+        # Explain why an outlier trace was selected
+        outlier = get_outlier_info(trace)
+        if outlier is not None:
+            self.xmi_writer.add_comment(interaction, outlier.describe())
+        
+        # Get services for this trace
+        services = trace.get_all_service_names()
+        
+        # Create lifelines (without 'represents' to avoid Papyrus IllegalValueException)
+        lifeline_ids: Dict[str, str] = {}
+        for service in sorted(services):
+            lifeline = ET.SubElement(interaction, "lifeline")
+            lifeline_id = self.xmi_writer.generate_id(interaction, "lifeline", service)
+            lifeline.set(f"{{{self.xmi_writer.XMI_NAMESPACE}}}id", lifeline_id)
+            lifeline.set("name", service)
             
-            # Create Interaction inside the UseCase
-            interaction = ET.SubElement(usecase, "ownedBehavior")
-            interaction.set(f"{{{self.xmi_writer.XMI_NAMESPACE}}}type", "uml:Interaction")
-            interaction_id = self.xmi_writer.generate_uuid()
-            interaction.set(f"{{{self.xmi_writer.XMI_NAMESPACE}}}id", interaction_id)
-            interaction.set("name", f"{trace_name}_Interaction")
+            # Note: We intentionally don't set 'represents' attribute
+            # as it causes IllegalValueException in Papyrus when referencing
+            # components from a different package. The lifeline name is 
+            # sufficient to identify the corresponding component.
             
-            # Track interaction ID for MARTE GaAnalysisContext
-            self.interaction_ids[trace_name] = interaction_id
+            lifeline_ids[service] = lifeline_id
+        
+        # Create messages from the trace's cross-service calls
+        timing = get_trace_timing(trace)
+        msg_counter = 0
+        for call in get_call_messages(trace):
+            from_lifeline = lifeline_ids.get(call.caller)
+            to_lifeline = lifeline_ids.get(call.callee)
+            if not from_lifeline or not to_lifeline:
+                continue
             
-            # Get services for this trace
-            services = trace.get_all_service_names()
+            # Create send/receive events
+            send_event = ET.SubElement(interaction, "fragment")
+            send_event.set(f"{{{self.xmi_writer.XMI_NAMESPACE}}}type", "uml:MessageOccurrenceSpecification")
+            send_id = self.xmi_writer.generate_id(interaction, "send", f"msg{msg_counter}")
+            send_event.set(f"{{{self.xmi_writer.XMI_NAMESPACE}}}id", send_id)
+            send_event.set("name", f"msg{msg_counter}_send")
+            send_event.set("covered", from_lifeline)
             
-            # Create lifelines (without 'represents' to avoid Papyrus IllegalValueException)
-            lifeline_ids: Dict[str, str] = {}
-            for service in sorted(services):
-                lifeline = ET.SubElement(interaction, "lifeline")
-                lifeline_id = self.xmi_writer.generate_uuid()
-                lifeline.set(f"{{{self.xmi_writer.XMI_NAMESPACE}}}id", lifeline_id)
-                lifeline.set("name", service)
-                
-                # Note: We intentionally don't set 'represents' attribute
-                # as it causes IllegalValueException in Papyrus when referencing
-                # components from a different package. The lifeline name is 
-                # sufficient to identify the corresponding component.
-                
-                lifeline_ids[service] = lifeline_id
+            recv_event = ET.SubElement(interaction, "fragment")
+            recv_event.set(f"{{{self.xmi_writer.XMI_NAMESPACE}}}type", "uml:MessageOccurrenceSpecification")
+            recv_id = self.xmi_writer.generate_id(interaction, "receive", f"msg{msg_counter}")
+            recv_event.set(f"{{{self.xmi_writer.XMI_NAMESPACE}}}id", recv_id)
+            recv_event.set("name", f"msg{msg_counter}_recv")
+            recv_event.set("covered", to_lifeline)
             
-            # Create messages from spans
-            sorted_spans = trace.get_spans_sorted_by_time()
-            span_to_service: Dict[str, str] = {}
+            # Create message
+            clean_op = call.operation
+            message = ET.SubElement(interaction, "message")
+            message_id = self.xmi_writer.generate_id(interaction, "message", f"msg{msg_counter}")
+            message.set(f"{{{self.xmi_writer.XMI_NAMESPACE}}}id", message_id)
+            message.set("name", clean_op)
+            message.set("messageSort", "synchCall")
+            message.set("sendEvent", send_id)
+            message.set("receiveEvent", recv_id)
             
-            for span in sorted_spans:
-                span_to_service[span.span_id] = trace.get_service_name(span)
+            # Reference the operation on the target component
+            target_ops = self.operation_ids.get(call.callee, {})
+            if clean_op in target_ops:
+                if self.core_file is None:
+                    message.set("signature", target_ops[clean_op])
+                else:
+                    signature = ET.SubElement(message, "signature")
+                    signature.set("href", f"{self.core_file}#{target_ops[clean_op]}")
             
-            msg_counter = 0
-            for span in sorted_spans:
-                current_service = trace.get_service_name(span)
-                parent_span_id = span.get_parent_span_id()
-                
-                if parent_span_id:
-                    parent_service = span_to_service.get(parent_span_id)
-                    
-                    if parent_service and parent_service != current_service:
-                        from_lifeline = lifeline_ids.get(parent_service)
-                        to_lifeline = lifeline_ids.get(current_service)
-                        
-                        if from_lifeline and to_lifeline:
-                            # Create send/receive events
-                            send_event = ET.SubElement(interaction, "fragment")
-                            send_event.set(f"{{{self.xmi_writer.XMI_NAMESPACE}}}type", "uml:MessageOccurrenceSpecification")
-                            send_id = self.xmi_writer.generate_uuid()
-                            send_event.set(f"{{{self.xmi_writer.XMI_NAMESPACE}}}id", send_id)
-                            send_event.set("name", f"msg{msg_counter}_send")
-                            send_event.set("covered", from_lifeline)
-                            
-                            recv_event = ET.SubElement(interaction, "fragment")
-                            recv_event.set(f"{{{self.xmi_writer.XMI_NAMESPACE}}}type", "uml:MessageOccurrenceSpecification")
-                            recv_id = self.xmi_writer.generate_uuid()
-                            recv_event.set(f"{{{self.xmi_writer.XMI_NAMESPACE}}}id", recv_id)
-                            recv_event.set("name", f"msg{msg_counter}_recv")
-                            recv_event.set("covered", to_lifeline)
-                            
-                            # Create message
-                            clean_op = extract_simple_operation_name(span.operation_name)
-                            message = ET.SubElement(interaction, "message")
-                            message_id = self.xmi_writer.generate_uuid()
-                            message.set(f"{{{self.xmi_writer.XMI_NAMESPACE}}}id", message_id)
-                            message.set("name", clean_op)
-                            message.set("messageSort", "synchCall")
-                            message.set("sendEvent", send_id)
-                            message.set("receiveEvent", recv_id)
-                            
-                            # Reference the operation on the target component
-                            target_ops = self.operation_ids.get(current_service, {})
-                            if clean_op in target_ops:
-                                message.set("signature", target_ops[clean_op])
-                            
-                            # Track message ID and duration for MARTE PaStep
-                            # Duration is in microseconds, convert to milliseconds
-                            duration_ms = span.duration / 1000.0
-                            is_async = span.get_tag('span.kind') == 'producer'
-                            self.message_ids.append((message_id, duration_ms, is_async))
-                            
-                            msg_counter += 1
-        
-        logger.info(f"Generated {len(traces)} sequence(s) inside Use Cases")
+            # Track message ID and timing for MARTE PaStep:
+            # hostDemand is the span's self-time, respT its full duration
+            # (microseconds, converted to milliseconds)
+            if group is not None:
+                duration_us = group.get_mean_call_duration(call.key)
+                self_time_us = group.get_mean_call_self_time(call.key)
+            else:
+                duration_us = call.span.duration
+                self_time_us = timing.get_self_time(call.span.span_id)
+            is_async = call.span.get_tag('span.kind') == 'producer'
+            self.message_ids.append(
+                (message_id, self_time_us / 1000.0, is_async, duration_us / 1000.0)
+            )
+            
+            msg_counter += 1
+        
+        if self.include_marte:
+            self._apply_interaction_stereotypes(root)
+        self.xmi_writer.flush()
+        self.xmi_writer.ids.end_scope()
+    
+    def _apply_diff_annotations(self):
+        """Annotate components and dependencies with the changes of self.diff."""
+        diff = self.diff
+        
+        for service in diff.added_services:
+            component = self.component_elements.get(service)
+            if component is not None:
+                self.xmi_writer.add_comment(component, "Diff: new service")
+        
+        for service, operations in diff.added_operations.items():
+            component = self.component_elements.get(service)
+            if component is not None:
+                self.xmi_writer.add_comment(
+                    component, f"Diff: new operations: {', '.join(sorted(operations))}"
+                )
+        
+        for (caller, callee), usage in self.usage_elements.items():
+            if (caller, callee) in diff.added_edges:
+                self.xmi_writer.add_comment(usage, "Diff: new call edge")
+                continue
+            
+            shift = diff.get_edge_shift(caller, callee)
+            if shift and shift.significant:
+                kind = "regression" if shift.is_regression else "improvement"
+                self.xmi_writer.add_comment(
+                    usage,
+                    f"Diff: latency {kind}: p50 {shift.get_relative_shift(0.5):+.1%}, "
+                    f"p95 {shift.get_relative_shift(0.95):+.1%} (p={shift.p_value:.2e})"
+                )
+    
+    def _annotate_removed_elements(self, model: ET.Element):
+        """List the services and call edges self.diff removed on the model."""
+        diff = self.diff
+        
+        # Removed elements have no counterpart in the model: list them on the model
+        removed = [f"service {service}" for service in sorted(diff.removed_services)]
+        removed += [f"call edge {a} -> {b}" for a, b in sorted(diff.removed_edges)]
+        if removed:
+            self.xmi_writer.add_comment(model, f"Diff: removed {'; '.join(removed)}")
+    
+    def get_sample_rate(self, entry_operation: Optional[str]) -> float:
+        """Get the sample rate of the traces of an entry operation ("service:operation")."""
+        return self.stratum_rates.get(entry_operation, self.sample_rate)
     
-    def _apply_marte_stereotypes(self, root: ET.Element):
+    def _count_stereotype(self, stereotype: str, count: int = 1):
+        """Count applied stereotypes for the generation summary."""
+        self.stereotype_counts[stereotype] = self.stereotype_counts.get(stereotype, 0) + count
+    
+    def _apply_structure_stereotypes(self, root: ET.Element):
         """
-        Apply MARTE stereotypes to all collected elements.
+        Apply MARTE stereotypes to all components and nodes.
         
-        This method adds stereotype applications at the XMI root level,
-        after all UML elements have been created.
+        Stereotype applications are added at the XMI root level, after the
+        Components and Deployment elements have been created.
         """
         # Apply <<RtUnit>> to all components
         for service, component_id in self.component_ids.items():
@@ -327,42 +733,72 @@ class UnifiedXmiGenerator:
                 component_id,
                 is_active=True
             )
+            self._count_stereotype('RtUnit')
         
-        # Apply <<GaExecHost>> to all nodes
+        # Apply <<GaExecHost>> to all nodes, with replicas and measured load
+        # where available (speed factor stays at the reference speed: traces
+        # carry no processor speed information)
         for node_name, node_id in self.node_ids.items():
+            profile = self.node_profiles.get(node_name)
+            resource = self.node_resources.get(node_name)
             self.marte_writer.apply_ga_exec_host(
                 root,
                 node_id,
-                speed_factor=1.0
+                res_mult=resource.replicas if resource else 1,
+                comm_tx_ovh=resource.comm_tx_ms if resource else None,
+                comm_rcv_ovh=resource.comm_rcv_ms if resource else None,
+                utilization=resource.utilization if resource else None,
+                throughput=profile.get_scaled_throughput_per_s(self.get_sample_rate) if profile else None
             )
+            self._count_stereotype('GaExecHost')
+    
+    def _apply_interaction_stereotypes(self, root: ET.Element):
+        """Apply MARTE stereotypes to the interaction just generated and its messages."""
+        interaction_id = self.interaction_id
         
-        # Apply <<GaAnalysisContext>> to all interactions
-        for trace_name, interaction_id in self.interaction_ids.items():
-            self.marte_writer.apply_ga_analysis_context(
-                root,
-                interaction_id,
-                context_params={'isSingleMode': True}
-            )
+        # Apply <<GaAnalysisContext>> to the interaction
+        self.marte_writer.apply_ga_analysis_context(
+            root,
+            interaction_id,
+            context_params={'isSingleMode': True}
+        )
+        self._count_stereotype('GaAnalysisContext')
+        
+        # Apply <<GaWorkloadEvent>> to the interaction, scaled to the share of
+        # each entry operation's arrivals it represents and to the full corpus
+        if self.interaction_workload:
+            shares = []
+            for entry_operation, occurrences in sorted(self.interaction_workload.items()):
+                profile = self.workload_profiles[entry_operation]
+                sample_rate = self.get_sample_rate(entry_operation)
+                shares.append((profile, occurrences / profile.count / sample_rate))
+            if self.workload_pattern == "open":
+                rate = sum(profile.arrival_rate_per_s * scale for profile, scale in shares)
+                self.marte_writer.apply_ga_workload_event(
+                    root,
+                    interaction_id,
+                    pattern="open",
+                    inter_arrival_ms=1000.0 / rate if rate > 0 else None
+                )
+            else:
+                population, think_time_ms = get_mixed_closed_parameters(shares)
+                self.marte_writer.apply_ga_workload_event(
+                    root,
+                    interaction_id,
+                    pattern="closed",
+                    population=population,
+                    ext_delay_ms=think_time_ms
+                )
+            self._count_stereotype('GaWorkloadEvent')
         
         # Apply <<PaStep>> to all messages with timing
-        for message_id, duration_ms, is_async in self.message_ids:
+        for message_id, self_time_ms, is_async, duration_ms in self.message_ids:
             self.marte_writer.apply_pa_step(
                 root,
                 message_id,
-                host_demand_ms=duration_ms,
+                host_demand_ms=self_time_ms,
                 prob=1.0,
-                no_sync=is_async
+                no_sync=is_async,
+                resp_t_ms=duration_ms
             )
-    
-    def _extract_node(self, metadata: Dict[str, any]) -> str:
-        """Extract node name from service metadata."""
-        if not metadata:
-            return "Node-Unknown"
-        
-        # Try various metadata keys
-        for key in ['hostname', 'host.name', 'node.name', 'k8s.pod.name', 'pod.name']:
-            value = metadata.get(key)
-            if value:
-                return extract_base_name(str(value))
-        
-        return f"Node-{abs(hash(str(metadata)) % 10000)}"
+        self._count_stereotype('PaStep', len(self.message_ids))
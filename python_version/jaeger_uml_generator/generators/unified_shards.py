@@ -0,0 +1,249 @@
+"""Unified model split into a core file and Use Case shard files."""
+
+import json
+import logging
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Iterator
+from ..models import Trace
+from ..analyzer import CallModel, TraceGroup, WorkloadProfile
+from ..renderer import get_xmi_filename
+from .unified_generator import UnifiedXmiGenerator
+
+
+logger = logging.getLogger(__name__)
+
+
+# Suffixes of the file names derived from the model name
+CORE_SUFFIX = "-core"
+SHARD_SUFFIX = "-usecases-"
+INDEX_SUFFIX = "-index.json"
+
+# (trace, Use Case name, group or None), see UnifiedXmiGenerator.plan_sequences()
+PlannedSequence = Tuple[Trace, str, Optional[TraceGroup]]
+
+
+@dataclass
+class ShardSettings:
+    """Options of shard generation, sent once to every worker."""
+    
+    output_dir: Path
+    core_file: str
+    xmi_format: str = "papyrus"
+    include_marte: bool = True
+    compact: bool = False
+    sample_rate: float = 1.0
+    stratum_rates: Dict[str, float] = field(default_factory=dict)
+    workload_pattern: str = "closed"
+    # Of the core model: service -> {operation -> ID}
+    operation_ids: Dict[str, Dict[str, str]] = field(default_factory=dict)
+    workload_profiles: Dict[str, WorkloadProfile] = field(default_factory=dict)
+    log_level: int = logging.INFO
+
+
+@dataclass
+class ShardedModelResult:
+    """Outcome of writing a sharded unified model."""
+    
+    core_file: Optional[str] = None
+    index_file: Optional[str] = None
+    # Written shard file names in shard order
+    shard_files: List[str] = field(default_factory=list)
+    sequence_count: int = 0
+    failed: int = 0
+    jobs: int = 1
+    elapsed_s: float = 0.0
+    
+    @property
+    def files(self) -> List[str]:
+        """All written files: core, shards and index."""
+        files = [self.core_file] if self.core_file else []
+        files += self.shard_files
+        if self.index_file:
+            files.append(self.index_file)
+        return files
+    
+    def describe(self) -> str:
+        """Format the shard summary."""
+        text = (f"{len(self.shard_files)} shard file(s) with {self.sequence_count} sequence(s) "
+                f"in {self.elapsed_s:.2f}s ({self.jobs} worker(s))")
+        if self.failed:
+            text += f", {self.failed} failed"
+        return text
+
+
+def plan_shards(sequences: List[PlannedSequence], shard_size: int) -> List[List[PlannedSequence]]:
+    """
+    Split sequence diagrams into consecutive shards.
+    
+    Args:
+        sequences: Sequence diagrams in model order
+        shard_size: Maximum number of sequence diagrams per shard
+    
+    Returns:
+        List of shards, each a list of sequence diagrams
+    """
+    shard_size = max(1, shard_size)
+    return [sequences[i:i + shard_size] for i in range(0, len(sequences), shard_size)]
+
+
+# Settings and generator of the current worker process (see _init_worker)
+_worker_settings: Optional[ShardSettings] = None
+_worker_generator: Optional[UnifiedXmiGenerator] = None
+
+
+def _init_worker(settings: ShardSettings):
+    """Set up a worker process once before it writes its first shard."""
+    global _worker_settings, _worker_generator
+    _worker_settings = settings
+    logging.getLogger().setLevel(settings.log_level)
+    
+    generator = UnifiedXmiGenerator(
+        settings.xmi_format,
+        include_marte=settings.include_marte,
+        sample_rate=settings.sample_rate,
+        stratum_rates=settings.stratum_rates,
+        workload_pattern=settings.workload_pattern,
+        compact=settings.compact
+    )
+    generator.operation_ids = settings.operation_ids
+    generator.workload_profiles = settings.workload_profiles
+    _worker_generator = generator
+
+
+def _write_shard(task: Tuple[str, str, List[PlannedSequence]]) -> Optional[str]:
+    """
+    Generate and write one shard file.
+    
+    Args:
+        task: Tuple of (file name, model name, sequence diagrams)
+    
+    Returns:
+        File name, None if the shard could not be written
+    """
+    filename, model_name, sequences = task
+    settings = _worker_settings
+    if not _worker_generator.write_shard(sequences, settings.output_dir / filename, model_name,
+                                         settings.core_file):
+        logger.warning(f"No XMI content generated for shard {filename}")
+        return None
+    logger.debug(f"Saved XMI file: {filename}")
+    return filename
+
+
+class UnifiedShardWriter:
+    """
+    Writes a unified model as a core file, Use Case shards and an index.
+    
+    The core file (<model>-core.xmi) holds the Components, Dependencies and
+    Deployment packages with their stereotypes, exactly as in the single
+    unified model, and an empty UseCases package with the workload
+    comments. The sequence diagrams are split into shards of at most
+    shard_size Use Cases (<model>-usecases-0001.xmi, ...); their messages
+    reference the core operations by `href`, so a tool can open the core
+    alone or together with only the shards it needs. Shards are generated
+    and written in a pool of worker processes. The index
+    (<model>-index.json) lists the core and, per shard, its Use Cases.
+    
+    All files are uncompressed: modeling tools resolve a shard's `href`
+    only to a plain XMI file.
+    """
+    
+    def __init__(self, generator: UnifiedXmiGenerator, output_dir: Path, shard_size: int,
+                 jobs: int = 1):
+        """
+        Initialize the writer.
+        
+        Args:
+            generator: Configured generator of the unified model
+            output_dir: Directory the files are written to
+            shard_size: Maximum number of Use Cases per shard file
+            jobs: Number of worker processes (1 writes the shards in this process)
+        """
+        self.generator = generator
+        self.output_dir = output_dir
+        self.shard_size = max(1, shard_size)
+        self.jobs = max(1, jobs)
+    
+    def write(self, traces: List[Trace], model_name: str = "UnifiedModel",
+              sequence_traces: Optional[List[Trace]] = None,
+              call_model: Optional[CallModel] = None) -> ShardedModelResult:
+        """
+        Write the core, shard and index files.
+        
+        Args:
+            traces: List of Trace objects
+            model_name: Name of the UML model, also the prefix of all file names
+            sequence_traces: Traces rendered as sequence diagrams (default: all)
+            call_model: Call model of `traces` shared with other outputs of the run
+        
+        Returns:
+            ShardedModelResult with the written files (none if the core failed)
+        """
+        result = ShardedModelResult()
+        generator = self.generator
+        core_file = get_xmi_filename(f"{model_name}{CORE_SUFFIX}")
+        if not generator.write(traces, self.output_dir / core_file, model_name, [], call_model):
+            return result
+        result.core_file = core_file
+        
+        sequences = generator.plan_sequences(traces if sequence_traces is None else sequence_traces)
+        shards = plan_shards(sequences, self.shard_size)
+        tasks = []
+        for number, shard in enumerate(shards, 1):
+            shard_name = f"{model_name}{SHARD_SUFFIX}{number:04d}"
+            tasks.append((get_xmi_filename(shard_name), shard_name, shard))
+        settings = ShardSettings(
+            output_dir=self.output_dir,
+            core_file=core_file,
+            xmi_format=generator.xmi_writer.format.value,
+            include_marte=generator.include_marte,
+            compact=generator.xmi_writer.compact,
+            sample_rate=generator.sample_rate,
+            stratum_rates=generator.stratum_rates,
+            workload_pattern=generator.workload_pattern,
+            operation_ids=generator.operation_ids,
+            workload_profiles=generator.workload_profiles,
+            log_level=logging.getLogger().level
+        )
+        
+        result.jobs = min(self.jobs, max(1, len(tasks)))
+        started = time.perf_counter()
+        index_shards = []
+        for (filename, _, shard), written in zip(tasks, self._run(settings, tasks, result.jobs)):
+            if written is None:
+                result.failed += 1
+                continue
+            result.shard_files.append(filename)
+            result.sequence_count += len(shard)
+            index_shards.append({'file': filename, 'use_cases': [name for _, name, _ in shard]})
+        result.elapsed_s = time.perf_counter() - started
+        
+        result.index_file = f"{model_name}{INDEX_SUFFIX}"
+        index = {
+            'model': model_name,
+            'format': settings.xmi_format,
+            'core': core_file,
+            'shard_size': self.shard_size,
+            'shards': index_shards
+        }
+        with open(self.output_dir / result.index_file, 'w', encoding='utf-8') as f:
+            json.dump(index, f, indent=1)
+        
+        logger.info(f"Wrote {result.describe()}")
+        return result
+    
+    def _run(self, settings: ShardSettings, tasks: List[Tuple[str, str, List[PlannedSequence]]],
+             jobs: int) -> Iterator[Optional[str]]:
+        """Write the shards in this process or in a pool, results in shard order."""
+        if jobs == 1:
+            _init_worker(settings)
+            for task in tasks:
+                yield _write_shard(task)
+            return
+        
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                                 initargs=(settings,)) as pool:
+            yield from pool.map(_write_shard, tasks)
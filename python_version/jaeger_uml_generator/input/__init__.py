@@ -3,5 +3,25 @@
 from .trace_reader import TraceReader
 from .json_file_reader import JsonFileReader
 from .jaeger_api_client import JaegerApiClient
+from .trace_sampler import (
+    TraceSampler,
+    HashTraceSampler,
+    ReservoirTraceSampler,
+    StratifiedTraceSampler,
+    SamplingTraceReader,
+    SAMPLING_METHODS,
+    create_sampler
+)
 
-__all__ = ['TraceReader', 'JsonFileReader', 'JaegerApiClient']
+__all__ = [
+    'TraceReader',
+    'JsonFileReader',
+    'JaegerApiClient',
+    'TraceSampler',
+    'HashTraceSampler',
+    'ReservoirTraceSampler',
+    'StratifiedTraceSampler',
+    'SamplingTraceReader',
+    'SAMPLING_METHODS',
+    'create_sampler'
+]
@@ -3,7 +3,7 @@
 import json
 import logging
 from pathlib import Path
-from typing import List
+from typing import List, Iterator
 from .trace_reader import TraceReader
 from ..models import Trace
 
@@ -32,17 +32,45 @@ class JsonFileReader(TraceReader):
         """
         traces = []
         
-        if self.path.is_file():
-            traces.extend(self._read_file(self.path))
-        elif self.path.is_dir():
-            traces.extend(self._read_directory(self.path))
-        else:
-            logger.error(f"Path does not exist: {self.path}")
-            raise FileNotFoundError(f"Path not found: {self.path}")
+        if self.path.is_dir():
+            logger.info(f"Reading trace files from directory: {self.path}")
+        for json_file in self.list_files():
+            traces.extend(self.read_file(json_file))
         
         return traces
     
-    def _read_file(self, file_path: Path) -> List[Trace]:
+    def iter_traces(self) -> Iterator[List[Trace]]:
+        """
+        Read traces one JSON file at a time.
+        
+        Yields:
+            Traces of each file
+        """
+        for json_file in self.list_files():
+            yield self.read_file(json_file)
+    
+    def list_files(self) -> List[Path]:
+        """
+        Get the JSON files read by this reader.
+        
+        Returns:
+            The input file, or the JSON files of the input directory
+        
+        Raises:
+            FileNotFoundError: If the path does not exist
+        """
+        if self.path.is_file():
+            return [self.path]
+        if self.path.is_dir():
+            json_files = sorted(self.path.glob('*.json'))
+            if not json_files:
+                logger.warning(f"No JSON files found in directory: {self.path}")
+            return json_files
+        
+        logger.error(f"Path does not exist: {self.path}")
+        raise FileNotFoundError(f"Path not found: {self.path}")
+    
+    def read_file(self, file_path: Path) -> List[Trace]:
         """Read traces from a single JSON file."""
         logger.info(f"Reading trace file: {file_path}")
         
@@ -68,22 +96,6 @@ class JsonFileReader(TraceReader):
             logger.error(f"Error reading file {file_path}: {e}")
             return []
     
-    def _read_directory(self, dir_path: Path) -> List[Trace]:
-        """Read traces from all JSON files in a directory."""
-        logger.info(f"Reading trace files from directory: {dir_path}")
-        
-        all_traces = []
-        json_files = list(dir_path.glob('*.json'))
-        
-        if not json_files:
-            logger.warning(f"No JSON files found in directory: {dir_path}")
-            return all_traces
-        
-        for json_file in json_files:
-            all_traces.extend(self._read_file(json_file))
-        
-        return all_traces
-    
     def _parse_json_data(self, data: dict) -> List[Trace]:
         """
         Parse JSON data into Trace objects.
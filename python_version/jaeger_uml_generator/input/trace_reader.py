@@ -1,7 +1,7 @@
 """Abstract base class for trace readers."""
 
 from abc import ABC, abstractmethod
-from typing import List
+from typing import List, Iterator
 from ..models import Trace
 
 
@@ -17,3 +17,16 @@ class TraceReader(ABC):
             List of Trace objects
         """
         pass
+    
+    def iter_traces(self) -> Iterator[List[Trace]]:
+        """
+        Read traces in chunks, so callers can process a corpus without
+        holding all of it in memory.
+        
+        The default implementation yields everything as a single chunk;
+        readers that can stream (e.g. one file at a time) override it.
+        
+        Yields:
+            Lists of Trace objects
+        """
+        yield self.read_traces()
@@ -0,0 +1,262 @@
+"""Trace sampling applied while traces are read."""
+
+import hashlib
+import logging
+import random
+from abc import ABC, abstractmethod
+from typing import List, Dict, Iterator, Optional, Callable
+from .trace_reader import TraceReader
+from ..models import Trace
+
+
+logger = logging.getLogger(__name__)
+
+
+# Supported sampling methods
+SAMPLING_METHODS = ('hash', 'reservoir', 'stratified')
+
+
+class TraceSampler(ABC):
+    """
+    Base class for streaming trace samplers.
+    
+    Traces are offered one at a time; a sampler either releases kept traces
+    immediately or holds a bounded sample until the stream ends. Unsampled
+    traces are dropped as soon as they are rejected or evicted.
+    """
+    
+    def __init__(self):
+        self.seen = 0
+        self.kept = 0
+    
+    @abstractmethod
+    def offer(self, trace: Trace) -> List[Trace]:
+        """
+        Offer a trace to the sampler.
+        
+        Args:
+            trace: Trace object
+        
+        Returns:
+            Traces released by the sampler now (possibly empty)
+        """
+        pass
+    
+    def finish(self) -> List[Trace]:
+        """
+        End the stream.
+        
+        Returns:
+            Traces still held by the sampler
+        """
+        return []
+    
+    @property
+    def effective_rate(self) -> float:
+        """Fraction of offered traces that were kept."""
+        return self.kept / self.seen if self.seen else 1.0
+    
+    def get_stratum_rates(self) -> Dict[str, float]:
+        """Get the effective sample rate of each stratum, empty when one rate applies to all traces."""
+        return {}
+    
+    def describe(self) -> str:
+        """Describe the sampling outcome for reports and annotations."""
+        return (f"{type(self).__name__}: kept {self.kept} of {self.seen} trace(s) "
+                f"(effective rate {self.effective_rate:.4f})")
+
+
+class HashTraceSampler(TraceSampler):
+    """
+    Deterministic sampling on a hash of the trace ID.
+    
+    The same trace is kept or dropped on every run and on every input that
+    contains it, so samples of different corpora stay comparable.
+    """
+    
+    def __init__(self, rate: float):
+        """
+        Initialize the sampler.
+        
+        Args:
+            rate: Fraction of trace IDs to keep (0-1]
+        """
+        super().__init__()
+        if not 0 < rate <= 1:
+            raise ValueError(f"Sample rate must be in (0, 1], got {rate}")
+        
+        self.rate = rate
+        self._bound = int(rate * 2 ** 64)
+    
+    def offer(self, trace: Trace) -> List[Trace]:
+        self.seen += 1
+        digest = hashlib.blake2b(trace.trace_id.encode('utf-8'), digest_size=8).digest()
+        if int.from_bytes(digest, 'big') < self._bound:
+            self.kept += 1
+            return [trace]
+        return []
+
+
+class ReservoirTraceSampler(TraceSampler):
+    """Uniform sample of a fixed number of traces (Vitter's Algorithm R)."""
+    
+    def __init__(self, size: int, seed=None):
+        """
+        Initialize the sampler.
+        
+        Args:
+            size: Number of traces to keep
+            seed: Random seed for reproducible samples
+        """
+        super().__init__()
+        if size < 1:
+            raise ValueError(f"Sample size must be at least 1, got {size}")
+        
+        self.size = size
+        self._random = random.Random(seed)
+        self._reservoir: List[Trace] = []
+    
+    def offer(self, trace: Trace) -> List[Trace]:
+        self.seen += 1
+        if len(self._reservoir) < self.size:
+            self._reservoir.append(trace)
+        else:
+            slot = self._random.randrange(self.seen)
+            if slot < self.size:
+                self._reservoir[slot] = trace
+        return []
+    
+    def finish(self) -> List[Trace]:
+        sample = self._reservoir
+        self._reservoir = []
+        self.kept = len(sample)
+        return sample
+
+
+class StratifiedTraceSampler(TraceSampler):
+    """
+    Reservoir sample per stratum of root service and operation.
+    
+    Every stratum keeps up to `size` traces, so rare entry points stay
+    represented next to dominant ones. Per-stratum rates differ; they are
+    available from get_stratum_rates().
+    """
+    
+    def __init__(self, size: int, seed=None,
+                 normalize_operation: Optional[Callable[[str], str]] = None):
+        """
+        Initialize the sampler.
+        
+        Args:
+            size: Number of traces to keep per stratum
+            seed: Random seed for reproducible samples
+            normalize_operation: Optional mapping applied to root operation
+                                 names (e.g. templating), so high-cardinality
+                                 names do not each form their own stratum
+        """
+        super().__init__()
+        if size < 1:
+            raise ValueError(f"Sample size must be at least 1, got {size}")
+        
+        self.size = size
+        self.normalize_operation = normalize_operation
+        self._seed = seed
+        self._strata: Dict[str, ReservoirTraceSampler] = {}
+    
+    def offer(self, trace: Trace) -> List[Trace]:
+        self.seen += 1
+        stratum = self.get_stratum(trace)
+        sampler = self._strata.get(stratum)
+        if sampler is None:
+            seed = None if self._seed is None else f"{self._seed}:{stratum}"
+            sampler = ReservoirTraceSampler(self.size, seed)
+            self._strata[stratum] = sampler
+        return sampler.offer(trace)
+    
+    def finish(self) -> List[Trace]:
+        sample = []
+        for stratum in sorted(self._strata):
+            sample.extend(self._strata[stratum].finish())
+        self.kept = len(sample)
+        return sample
+    
+    def get_stratum_rates(self) -> Dict[str, float]:
+        """Get the effective sample rate of each "service:operation" stratum."""
+        return {stratum: sampler.effective_rate for stratum, sampler in self._strata.items()}
+    
+    def get_stratum(self, trace: Trace) -> str:
+        """Get the stratum of a trace: "service:operation" of its root span."""
+        entry_spans = trace.get_entry_spans() if trace.spans else []
+        if not entry_spans:
+            return "unknown:unknown"
+        root = entry_spans[0]
+        operation = root.operation_name
+        if self.normalize_operation is not None:
+            operation = self.normalize_operation(operation)
+        return f"{trace.get_service_name(root)}:{operation}"
+
+
+def create_sampler(method: str, rate: float = 0.1, size: int = 1000,
+                   seed: Optional[int] = None,
+                   normalize_operation: Optional[Callable[[str], str]] = None) -> TraceSampler:
+    """
+    Create a sampler by method name.
+    
+    Args:
+        method: One of SAMPLING_METHODS
+        rate: Sample rate for hash sampling
+        size: Sample size for reservoir sampling (per stratum when stratified)
+        seed: Random seed for reservoir and stratified sampling
+        normalize_operation: Root operation name mapping for stratified sampling
+    
+    Returns:
+        TraceSampler instance
+    """
+    if method == 'hash':
+        return HashTraceSampler(rate)
+    if method == 'reservoir':
+        return ReservoirTraceSampler(size, seed)
+    if method == 'stratified':
+        return StratifiedTraceSampler(size, seed, normalize_operation)
+    raise ValueError(f"Unknown sampling method: {method}")
+
+
+class SamplingTraceReader(TraceReader):
+    """Wraps a reader and samples its traces as they are streamed."""
+    
+    def __init__(self, reader: TraceReader, sampler: TraceSampler):
+        """
+        Initialize the sampling reader.
+        
+        Args:
+            reader: Underlying trace reader
+            sampler: Sampler applied to each trace
+        """
+        self.reader = reader
+        self.sampler = sampler
+    
+    def read_traces(self) -> List[Trace]:
+        traces = []
+        for chunk in self.iter_traces():
+            traces.extend(chunk)
+        return traces
+    
+    def iter_traces(self) -> Iterator[List[Trace]]:
+        """
+        Sample the underlying reader chunk by chunk.
+        
+        Yields:
+            Kept traces of each chunk, then the traces held by the sampler
+        """
+        for chunk in self.reader.iter_traces():
+            kept = []
+            for trace in chunk:
+                kept.extend(self.sampler.offer(trace))
+            if kept:
+                yield kept
+        
+        remaining = self.sampler.finish()
+        if remaining:
+            yield remaining
+        
+        logger.info(self.sampler.describe())
@@ -6,18 +6,30 @@ Orchestrates reading traces and generating XMI diagrams.
 import logging
 import sys
 from pathlib import Path
-from typing import List
+from typing import List, Dict, Tuple, Optional
 
 from .models import Trace
-from .input import JsonFileReader, JaegerApiClient, TraceReader
+from .input import JsonFileReader, JaegerApiClient, TraceReader, SamplingTraceReader, create_sampler
 from .generators import (
-    SequenceDiagramGenerator,
-    ComponentDiagramGenerator,
-    DeploymentDiagramGenerator,
-    UnifiedXmiGenerator
+    UnifiedXmiGenerator,
+    TraceBatchGenerator,
+    TraceOutputSettings,
+    UnifiedShardWriter
 )
+from .analyzer import (
+    TraceAggregator,
+    TraceSetDiff,
+    WindowedAggregator,
+    OutlierSelector,
+    CallModel,
+    CapacityModel,
+    CallGraphSimulator,
+    adjust_clock_skew
+)
+from .renderer import LqnWriter, get_xmi_filename
 from .cli import CommandLine
-from .utils import clean_trace_name
+from .utils import OperationNameTemplater, BuildManifest, CORPUS_UNIT, hash_files
+from . import __version__
 
 
 # Configure logging
@@ -39,6 +51,20 @@ class JaegerUmlGenerator:
             cli: Command-line interface object
         """
         self.cli = cli
+        self._templater = None
+        # Effective sample rate of the last sampled read (1.0 when not sampling),
+        # and the rate of every "service:operation" stratum when stratified
+        self._sample_rate = 1.0
+        self._stratum_rates: Dict[str, float] = {}
+        # Call model of the prepared traces, shared by all outputs of a run
+        self._call_model: Optional[CallModel] = None
+        # Incremental builds: content hash of every input file, the traces
+        # of the files whose per-trace outputs are rebuilt, whether outputs
+        # of all traces together are rebuilt, and the planned per-trace files
+        self._input_hashes: Dict[str, str] = {}
+        self._changed_files: Optional[Dict[str, List[Trace]]] = None
+        self._rebuild_corpus = True
+        self._planned_outputs: List[Tuple[int, str]] = []
         
         # Set logging level
         if cli.is_verbose():
@@ -48,21 +74,208 @@ class JaegerUmlGenerator:
         """Main generation logic."""
         logger.info("Starting Jaeger UML Generator")
         
-        # Step 1: Read traces
-        traces = self._read_traces()
+        # Diff mode: compare against a baseline corpus instead of generating diagrams
+        if self.cli.get_baseline():
+            self._generate_diff()
+            logger.info("Diff generation complete")
+            return
+        
+        # Window mode: write per-window trend series instead of diagrams
+        if self.cli.get_window():
+            self._generate_window_series()
+            logger.info("Window series generation complete")
+            return
+        
+        # Step 1: Read traces, skipping input files whose outputs are up to date
+        manifest = self._open_build_manifest()
+        if manifest is not None:
+            traces = self._read_changed_traces(manifest)
+            if traces is None:
+                print("  All outputs are up to date")
+                logger.info("Nothing to generate")
+                return
+        else:
+            traces = self._read_traces()
         
         if not traces:
             raise Exception("No traces found")
         
         logger.info(f"Loaded {len(traces)} trace(s)")
         
+        # Correct clock skew and collapse high-cardinality operation names
+        # before any aggregation
+        self._prepare_traces(traces)
+        
         # Step 2: Generate diagrams
-        self._generate_diagrams(traces)
+        diagram_outputs = self._generate_diagrams(traces)
+        
+        # Reports of all traces together, unless only per-trace outputs of
+        # some input files are rebuilt
+        report_outputs = []
+        if self._rebuild_corpus:
+            if self.cli.is_graph_report():
+                report_outputs.append(self._generate_graph_report(traces))
+            
+            if self.cli.is_lqn_export():
+                report_outputs.append(self._generate_lqn_model(traces))
+            
+            if self.cli.is_mva():
+                report_outputs.append(self._generate_capacity_report(traces))
+            
+            if self.cli.get_simulated_requests():
+                report_outputs.append(self._generate_simulation_report(traces))
+        
+        if manifest is not None:
+            self._record_build(manifest, traces, diagram_outputs, report_outputs)
         
         logger.info("Diagram generation complete")
     
+    def _is_merged_output(self) -> bool:
+        """Check if diagrams go to a single unified XMI of all traces."""
+        return self.cli.is_merge_traces() and self.cli.get_diagram_type().lower() == 'all'
+    
+    def _has_corpus_outputs(self) -> bool:
+        """Check if any output is built from all traces together."""
+        return (self._is_merged_output() or self.cli.is_graph_report() or self.cli.is_lqn_export()
+                or self.cli.is_mva() or bool(self.cli.get_simulated_requests()))
+    
+    def _open_build_manifest(self) -> Optional[BuildManifest]:
+        """
+        Get the build manifest of the output directory, None if outputs
+        cannot be rebuilt incrementally.
+        """
+        if not self.cli.is_build_cache():
+            return None
+        if not (self.cli.get_input_file() or self.cli.get_input_dir()):
+            # Jaeger API results have no stable content to hash
+            return None
+        if self.cli.get_sampling_method():
+            # Which traces are kept depends on the whole corpus
+            return None
+        if self.cli.is_outliers_only() and not self._is_merged_output():
+            # Which per-trace files are written depends on the whole corpus
+            return None
+        return BuildManifest(self.cli.get_output_dir(), __version__, self.cli.get_build_options())
+    
+    def _read_changed_traces(self, manifest: BuildManifest) -> Optional[List[Trace]]:
+        """
+        Read the input files whose outputs must be rebuilt.
+        
+        Per-trace outputs are rebuilt for changed input files only; outputs
+        of all traces together (merged model, reports) are rebuilt, from all
+        input files, when any input changed.
+        
+        Returns:
+            Traces to generate from, None if all outputs are up to date
+        """
+        reader = self._create_reader()
+        files = reader.list_files()
+        self._input_hashes = hash_files(files)
+        
+        rebuild_corpus = (self._has_corpus_outputs()
+                          and not manifest.is_current(CORPUS_UNIT, self._input_hashes))
+        changed = []
+        if not self._is_merged_output():
+            changed = [
+                (path, digest) for path, digest in zip(files, self._input_hashes.values())
+                if not manifest.is_current(BuildManifest.get_trace_unit(str(path.resolve())),
+                                           {str(path.resolve()): digest})
+            ]
+        
+        self._rebuild_corpus = rebuild_corpus
+        if not rebuild_corpus and not changed:
+            return None
+        if changed:
+            print(f"  Rebuilding per-trace outputs of {len(changed)} of {len(files)} input file(s)")
+        if rebuild_corpus:
+            print(f"  Rebuilding outputs of all traces together from {len(files)} input file(s)")
+        
+        traces = []
+        self._changed_files = {}
+        changed_paths = {path for path, _ in changed}
+        for path in files:
+            if not rebuild_corpus and path not in changed_paths:
+                continue
+            file_traces = reader.read_file(path)
+            traces.extend(file_traces)
+            if path in changed_paths:
+                self._changed_files[str(path.resolve())] = file_traces
+        return traces
+    
+    def _get_rebuilt_trace_ids(self) -> Optional[set]:
+        """Get the ids of the traces whose per-trace files must be rebuilt, None for all."""
+        if self._changed_files is None:
+            return None
+        return {id(trace) for file_traces in self._changed_files.values() for trace in file_traces}
+    
+    def _record_build(self, manifest: BuildManifest, traces: List[Trace],
+                      diagram_outputs: List[str], report_outputs: List[str]):
+        """
+        Record the outputs of this run in the build manifest.
+        
+        Args:
+            manifest: Build manifest of the output directory
+            traces: Traces generated from
+            diagram_outputs: Written XMI files
+            report_outputs: Written reports of all traces together
+        """
+        corpus_outputs = list(report_outputs)
+        if self._is_merged_output():
+            corpus_outputs += diagram_outputs
+            if not diagram_outputs:
+                manifest.forget(CORPUS_UNIT)
+                corpus_outputs = None
+        else:
+            # A file's unit is current only once all of its traces were
+            # written, under the names planned over all traces of the run
+            planned = {id(traces[index]): filename for index, filename in self._planned_outputs}
+            written = set(diagram_outputs)
+            for path, file_traces in self._changed_files.items():
+                unit = BuildManifest.get_trace_unit(path)
+                file_outputs = [planned[id(trace)] for trace in file_traces if id(trace) in planned]
+                if all(filename in written for filename in file_outputs):
+                    manifest.record(unit, {path: self._input_hashes[path]}, file_outputs)
+                else:
+                    manifest.forget(unit)
+        
+        if self._rebuild_corpus and corpus_outputs is not None and self._has_corpus_outputs():
+            manifest.record(CORPUS_UNIT, self._input_hashes, corpus_outputs)
+        manifest.save()
+    
+    def _get_templater(self) -> Optional[OperationNameTemplater]:
+        """Get the operation name templater, None if templating is disabled."""
+        if not self.cli.is_template_operations():
+            return None
+        if self._templater is None:
+            self._templater = OperationNameTemplater(self.cli.get_operation_patterns())
+        return self._templater
+    
+    def _prepare_traces(self, traces: List[Trace]):
+        """
+        Normalize traces in place before analysis: adjust clock skew and
+        template operation names, as enabled on the command line.
+        """
+        if self.cli.is_adjust_clock_skew():
+            adjusted = sum(adjust_clock_skew(trace).adjusted_span_count for trace in traces)
+            if adjusted:
+                logger.info(f"Adjusted clock skew of {adjusted} span(s)")
+        
+        templater = self._get_templater()
+        if templater is not None:
+            templater.template_traces(traces)
+    
     def _read_traces(self) -> List[Trace]:
         """Read traces from the configured input source."""
+        reader = self._create_reader()
+        traces = reader.read_traces()
+        if isinstance(reader, SamplingTraceReader):
+            self._sample_rate = reader.sampler.effective_rate
+            self._stratum_rates = reader.sampler.get_stratum_rates()
+            print(f"  Sampled input: {reader.sampler.describe()}")
+        return traces
+    
+    def _create_reader(self) -> TraceReader:
+        """Create the reader for the configured input source."""
         reader: TraceReader
         
         if self.cli.get_input_file():
@@ -85,104 +298,294 @@ class JaegerUmlGenerator:
         else:
             raise Exception("No input source specified")
         
-        return reader.read_traces()
+        if self.cli.get_sampling_method():
+            templater = self._get_templater()
+            sampler = create_sampler(
+                self.cli.get_sampling_method(),
+                rate=self.cli.get_sample_rate(),
+                size=self.cli.get_sample_size(),
+                seed=self.cli.get_sample_seed(),
+                normalize_operation=templater.template if templater else None
+            )
+            reader = SamplingTraceReader(reader, sampler)
+        
+        return reader
+    
+    def _aggregate(self, reader: TraceReader) -> TraceAggregator:
+        """
+        Aggregate all traces of a reader chunk by chunk.
+        
+        Only the aggregate summaries are kept, so corpora larger than
+        memory can be compared.
+        """
+        aggregator = TraceAggregator([], self.cli.get_operation_capacity())
+        for traces in reader.iter_traces():
+            self._prepare_traces(traces)
+            for trace in traces:
+                aggregator.add_trace(trace)
+        return aggregator
     
-    def _generate_diagrams(self, traces: List[Trace]):
-        """Generate diagrams based on CLI configuration."""
+    def _generate_diff(self):
+        """Compare the input traces against the baseline corpus and write a report."""
+        output_dir = self.cli.get_output_dir()
+        
+        logger.info(f"Aggregating baseline traces from: {self.cli.get_baseline()}")
+        baseline = self._aggregate(JsonFileReader(self.cli.get_baseline()))
+        
+        logger.info("Aggregating candidate traces")
+        candidate = self._aggregate(self._create_reader())
+        
+        if baseline.trace_count == 0 or candidate.trace_count == 0:
+            raise Exception("No traces found in baseline or candidate input")
+        
+        diff = TraceSetDiff(baseline, candidate)
+        report = diff.format_report()
+        
+        report_file = output_dir / "diff-report.txt"
+        with open(report_file, 'w', encoding='utf-8') as f:
+            f.write(report)
+        print(report)
+        print(f"  Generated diff report: {report_file.name}")
+        
+        if self.cli.is_diff_xmi():
+            traces = self._read_traces()
+            self._prepare_traces(traces)
+            
+            model_name = self.cli.get_model_name()
+            generator = UnifiedXmiGenerator(
+                self.cli.get_xmi_format(),
+                dedupe_sequences=self.cli.is_dedupe_sequences(),
+                operation_capacity=self.cli.get_operation_capacity(),
+                diff=diff,
+                cluster_threshold=self.cli.get_cluster_threshold(),
+                compact=self.cli.is_compact()
+            )
+            filename = get_xmi_filename(f"{model_name}-diff", self.cli.get_compression())
+            if generator.write(traces, output_dir / filename, model_name):
+                logger.info(f"Saved XMI file: {filename}")
+                print(f"  Generated annotated XMI: {filename}")
+            else:
+                logger.warning(f"No XMI content generated for annotated diff model: {model_name}")
+    
+    def _generate_window_series(self):
+        """Bucket the input calls into time windows and write the series as CSV."""
+        aggregator = WindowedAggregator(self.cli.get_window())
+        trace_count = 0
+        for traces in self._create_reader().iter_traces():
+            self._prepare_traces(traces)
+            aggregator.add_traces(traces)
+            trace_count += len(traces)
+        
+        if trace_count == 0:
+            raise Exception("No traces found")
+        
+        series_file = self.cli.get_output_dir() / "window-series.csv"
+        with open(series_file, 'w', encoding='utf-8', newline='') as f:
+            rows = aggregator.write_csv(f)
+        
+        print(f"  Aggregated {trace_count} trace(s) into {len(aggregator.windows)} window(s) "
+              f"over {len(aggregator.get_edges())} call edge(s)")
+        print(f"  Generated window series: {series_file.name} ({rows} row(s))")
+    
+    def _get_call_model(self, traces: List[Trace]) -> CallModel:
+        """Get the call model of the prepared traces, built on first use."""
+        if self._call_model is None or self._call_model.traces is not traces:
+            self._call_model = CallModel(traces, self.cli.get_operation_capacity())
+        return self._call_model
+    
+    def _generate_graph_report(self, traces: List[Trace]) -> str:
+        """Write dependency graph analytics of all traces as a text report."""
+        aggregator = self._get_call_model(traces).aggregator
+        report = aggregator.get_service_graph().format_report()
+        
+        report_file = self.cli.get_output_dir() / "dependency-graph.txt"
+        with open(report_file, 'w', encoding='utf-8') as f:
+            f.write(report)
+        print(f"  Generated dependency graph report: {report_file.name}")
+        return report_file.name
+    
+    def _get_closed_workloads(self, traces: List[Trace]) -> Dict[str, Tuple[int, float]]:
+        """
+        Get the measured closed workload of every root entry operation.
+        
+        Returns:
+            Map of "service:operation" -> (population, think time in ms),
+            scaled back to the full corpus when sampling
+        """
+        return {
+            entry_operation: profile.get_closed_parameters(1.0 / self._get_sample_rate(entry_operation))
+            for entry_operation, profile in self._get_call_model(traces).get_workload_profiles().items()
+        }
+    
+    def _get_sample_rate(self, entry_operation: str) -> float:
+        """Get the sample rate of the traces of an entry operation, its stratum's when stratified."""
+        return self._stratum_rates.get(entry_operation, self._sample_rate)
+    
+    def _generate_lqn_model(self, traces: List[Trace]) -> str:
+        """Write a Layered Queueing Network model of all traces."""
+        aggregator = self._get_call_model(traces).aggregator
+        
+        # Reference tasks get the measured closed workload of their entry
+        model_name = self.cli.get_model_name()
+        model = LqnWriter(model_name).generate(aggregator, self._get_closed_workloads(traces))
+        
+        model_file = self.cli.get_output_dir() / f"{model_name}.lqn"
+        with open(model_file, 'w', encoding='utf-8') as f:
+            f.write(model)
+        print(f"  Generated LQN model: {model_file.name}")
+        return model_file.name
+    
+    def _generate_capacity_report(self, traces: List[Trace]) -> str:
+        """Solve the MVA capacity model over the configured sweep and write a report."""
+        call_model = self._get_call_model(traces)
+        # Replicated services are multi-server stations
+        model = CapacityModel.from_aggregator(call_model.aggregator, self._get_closed_workloads(traces),
+                                              call_model.get_service_replicas())
+        sweep = model.sweep(self.cli.get_mva_populations(), self.cli.get_mva_speeds(),
+                            self.cli.get_mva_method())
+        
+        report_file = self.cli.get_output_dir() / "capacity-report.txt"
+        with open(report_file, 'w', encoding='utf-8') as f:
+            f.write(model.format_report(sweep))
+        print(f"  Generated capacity report: {report_file.name} ({len(sweep)} solution(s))")
+        return report_file.name
+    
+    def _generate_simulation_report(self, traces: List[Trace]) -> str:
+        """Simulate the traced call graph under the measured load and write a report."""
+        call_model = self._get_call_model(traces)
+        
+        # Measured arrival rates, scaled to the full corpus and the requested load
+        load = self.cli.get_sim_load()
+        arrival_rates = {
+            entry_operation: profile.arrival_rate_per_s * load / self._get_sample_rate(entry_operation)
+            for entry_operation, profile in call_model.get_workload_profiles().items()
+        }
+        
+        # Every replica of a service is one server
+        simulator = CallGraphSimulator(call_model.aggregator, arrival_rates,
+                                       call_model.get_service_replicas())
+        result = simulator.run(self.cli.get_simulated_requests(), self.cli.get_sim_arrivals(),
+                               self.cli.get_sim_seed())
+        
+        report_file = self.cli.get_output_dir() / "simulation-report.txt"
+        with open(report_file, 'w', encoding='utf-8') as f:
+            f.write(simulator.format_report(result))
+        print(f"  Generated simulation report: {report_file.name} "
+              f"({result.requests} simulated request(s))")
+        return report_file.name
+    
+    def _select_outliers(self, traces: List[Trace]) -> Optional[List[Trace]]:
+        """Get the outlier traces if enabled on the command line, None otherwise."""
+        if not self.cli.is_outliers_only():
+            return None
+        
+        selector = OutlierSelector(
+            quantile=self.cli.get_outlier_quantile(),
+            z_score=self.cli.get_outlier_zscore(),
+            max_selected=self.cli.get_max_outliers()
+        )
+        selector.add_traces(traces)
+        return selector.select()
+    
+    def _generate_diagrams(self, traces: List[Trace]) -> List[str]:
+        """
+        Generate diagrams based on CLI configuration.
+        
+        Returns:
+            Names of the written XMI files
+        """
         diagram_type = self.cli.get_diagram_type().lower()
         output_dir = self.cli.get_output_dir()
         xmi_format = self.cli.get_xmi_format()
         merge_traces = self.cli.is_merge_traces()
         model_name = self.cli.get_model_name()
+        operation_capacity = self.cli.get_operation_capacity()
+        sequence_traces = self._select_outliers(traces)
         
         # If --merge-traces is enabled, generate a single unified XMI for all traces
         if merge_traces and diagram_type == 'all':
             logger.info(f"Generating unified XMI for {len(traces)} traces with model name: {model_name}")
-            generator = UnifiedXmiGenerator(xmi_format)
-            xmi_content = generator.generate(traces, model_name)
+            generator = UnifiedXmiGenerator(
+                xmi_format,
+                dedupe_sequences=self.cli.is_dedupe_sequences(),
+                operation_capacity=operation_capacity,
+                sample_rate=self._sample_rate,
+                stratum_rates=self._stratum_rates,
+                cluster_threshold=self.cli.get_cluster_threshold(),
+                workload_pattern=self.cli.get_workload_pattern(),
+                compact=self.cli.is_compact()
+            )
+            if self.cli.get_shard_size() is not None:
+                return self._write_sharded_model(generator, traces, model_name, sequence_traces)
             
-            if xmi_content and xmi_content.strip():
-                filename = f"{model_name}.xmi"
-                xmi_file = output_dir / filename
-                self._save_xmi(xmi_content, xmi_file)
+            # Stream the model to the file as it is generated
+            filename = get_xmi_filename(model_name, self.cli.get_compression())
+            if generator.write(traces, output_dir / filename, model_name, sequence_traces,
+                               self._get_call_model(traces)):
+                logger.info(f"Saved XMI file: {filename}")
                 print(f"  Generated unified XMI: {filename}")
                 print(f"    - 1 Component diagram (aggregated from all traces)")
                 print(f"    - 1 Deployment diagram (aggregated from all traces)")
-                print(f"    - {len(traces)} Sequence diagram(s) (one per trace, inside Use Cases)")
-            else:
-                logger.warning(f"No XMI content generated for unified diagram: {model_name}")
-            return
+                if self.cli.get_cluster_threshold() is not None:
+                    print(f"    - {generator.sequence_count} Sequence diagram(s) "
+                          f"(one per cluster of similar traces, inside Use Cases)")
+                elif self.cli.is_dedupe_sequences():
+                    print(f"    - {generator.sequence_count} Sequence diagram(s) "
+                          f"(one per distinct trace shape, inside Use Cases)")
+                elif sequence_traces is not None:
+                    print(f"    - {generator.sequence_count} Sequence diagram(s) "
+                          f"(outlier traces only, inside Use Cases)")
+                else:
+                    print(f"    - {len(traces)} Sequence diagram(s) (one per trace, inside Use Cases)")
+                return [filename]
+            
+            logger.warning(f"No XMI content generated for unified diagram: {model_name}")
+            return []
         
         # Otherwise, generate one XMI file per trace (original behavior)
-        for i, trace in enumerate(traces):
-            # Use sourceName if available, otherwise fall back to index
-            trace_name = trace.source_name if trace.source_name else f"trace-{i + 1}"
-            
-            # Clean trace name
-            trace_name = clean_trace_name(trace_name)
-            
-            # Create a list with single trace for individual diagram generation
-            single_trace_list = [trace]
-            
-            # Generate unified XMI (all diagrams in one file)
-            if diagram_type == 'all':
-                logger.info(f"Generating unified XMI for {trace_name}")
-                generator = UnifiedXmiGenerator(xmi_format)
-                xmi_content = generator.generate(single_trace_list, trace_name)
-                
-                if xmi_content and xmi_content.strip():
-                    filename = f"{trace_name}.xmi"
-                    xmi_file = output_dir / filename
-                    self._save_xmi(xmi_content, xmi_file)
-                    print(f"  Generated: {filename}")
-                else:
-                    logger.warning(f"No XMI content generated for unified diagram: {trace_name}")
-            else:
-                # Generate individual diagram types for backward compatibility
-                if diagram_type == 'sequence':
-                    logger.info(f"Generating sequence diagram for {trace_name}")
-                    generator = SequenceDiagramGenerator(xmi_format)
-                    xmi_content = generator.generate_xmi_for_trace(trace, i)
-                    
-                    if xmi_content and xmi_content.strip():
-                        filename = f"sequence-{trace_name}.xmi"
-                        xmi_file = output_dir / filename
-                        self._save_xmi(xmi_content, xmi_file)
-                        print(f"  Generated: {filename}")
-                
-                elif diagram_type == 'component':
-                    logger.info(f"Generating component diagram for {trace_name}")
-                    generator = ComponentDiagramGenerator(xmi_format)
-                    xmi_content = generator.generate_xmi(single_trace_list)
-                    
-                    if xmi_content and xmi_content.strip():
-                        filename = f"component-{trace_name}.xmi"
-                        xmi_file = output_dir / filename
-                        self._save_xmi(xmi_content, xmi_file)
-                        print(f"  Generated: {filename}")
-                
-                elif diagram_type == 'deployment':
-                    logger.info(f"Generating deployment diagram for {trace_name}")
-                    generator = DeploymentDiagramGenerator(xmi_format)
-                    xmi_content = generator.generate_xmi(single_trace_list)
-                    
-                    if xmi_content and xmi_content.strip():
-                        filename = f"deployment-{trace_name}.xmi"
-                        xmi_file = output_dir / filename
-                        self._save_xmi(xmi_content, xmi_file)
-                        print(f"  Generated: {filename}")
-    
-    def _save_xmi(self, xmi_content: str, file_path: Path):
-        """
-        Save XMI content to a file.
+        selected_ids = {id(trace) for trace in sequence_traces} if sequence_traces is not None else None
+        if self._changed_files is not None:
+            # Only traces of input files changed since the last build
+            selected_ids = self._get_rebuilt_trace_ids()
+        settings = TraceOutputSettings(
+            output_dir=output_dir,
+            diagram_type=diagram_type,
+            xmi_format=xmi_format,
+            compact=self.cli.is_compact(),
+            compression=self.cli.get_compression(),
+            operation_capacity=operation_capacity,
+            sample_rate=self._sample_rate,
+            stratum_rates=self._stratum_rates,
+            log_level=logging.getLogger().level
+        )
+        result = TraceBatchGenerator(settings, self.cli.get_jobs()).generate(traces, selected_ids)
+        self._planned_outputs = result.planned
+        for filename in result.generated:
+            print(f"  Generated: {filename}")
+        print(f"  Generated {result.describe()}")
+        return result.generated
+    
+    def _write_sharded_model(self, generator: UnifiedXmiGenerator, traces: List[Trace],
+                             model_name: str, sequence_traces: Optional[List[Trace]]) -> List[str]:
+        """
+        Write the unified model as a core file, Use Case shards and an index.
         
-        Args:
-            xmi_content: XMI content string
-            file_path: Output file path
+        Returns:
+            Names of the written files
         """
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(xmi_content)
-        logger.info(f"Saved XMI file: {file_path.name}")
+        writer = UnifiedShardWriter(generator, self.cli.get_output_dir(), self.cli.get_shard_size(),
+                                    self.cli.get_jobs())
+        result = writer.write(traces, model_name, sequence_traces, self._get_call_model(traces))
+        if result.core_file is None:
+            logger.warning(f"No XMI content generated for unified diagram: {model_name}")
+            return []
+        
+        print(f"  Generated unified XMI core: {result.core_file}")
+        print(f"    - 1 Component diagram (aggregated from all traces)")
+        print(f"    - 1 Deployment diagram (aggregated from all traces)")
+        print(f"  Generated {result.describe()}")
+        print(f"  Generated shard index: {result.index_file}")
+        return result.files
 
 
 def main(argv=None):
@@ -1,7 +1,7 @@
 """Trace model representing a complete distributed trace."""
 
 from dataclasses import dataclass, field
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Any
 from .span import Span
 from .process import Process
 
@@ -16,6 +16,13 @@ class Trace:
     warnings: List[str] = field(default_factory=list)
     source_name: Optional[str] = None
     
+    # Lazily built lookup indexes (see _build_indexes)
+    _span_index: Optional[Dict[str, Span]] = field(default=None, init=False, repr=False, compare=False)
+    _children_index: Optional[Dict[str, List[Span]]] = field(default=None, init=False, repr=False, compare=False)
+    
+    # Per-trace analysis results computed once and reused (e.g. 'timing')
+    analysis_cache: Dict[str, Any] = field(default_factory=dict, init=False, repr=False, compare=False)
+    
     @classmethod
     def from_dict(cls, data: dict) -> 'Trace':
         """Create a Trace from a dictionary."""
@@ -51,24 +58,62 @@ class Trace:
         process = self.get_process(span.process_id)
         return process.service_name if process else 'unknown'
     
+    def _build_indexes(self):
+        """Build the span ID and parent -> children indexes."""
+        span_index: Dict[str, Span] = {}
+        children_index: Dict[str, List[Span]] = {}
+        
+        # The first span of a duplicated span ID wins, as in a scan of `spans`
+        for span in self.spans:
+            span_index.setdefault(span.span_id, span)
+        
+        for span in self.get_spans_sorted_by_time():
+            parent_span_id = span.get_parent_span_id()
+            if parent_span_id:
+                children_index.setdefault(parent_span_id, []).append(span)
+        
+        self._span_index = span_index
+        self._children_index = children_index
+    
+    def invalidate_indexes(self):
+        """Drop the lookup indexes, e.g. after span timestamps were changed."""
+        self._span_index = None
+        self._children_index = None
+    
+    def get_span_index(self) -> Dict[str, Span]:
+        """Get the span ID -> Span index (built on first use)."""
+        if self._span_index is None:
+            self._build_indexes()
+        return self._span_index
+    
+    def get_children_index(self) -> Dict[str, List[Span]]:
+        """Get the parent span ID -> child spans index, children sorted by start time."""
+        if self._children_index is None:
+            self._build_indexes()
+        return self._children_index
+    
     def get_span(self, span_id: str) -> Optional[Span]:
         """Get a span by its ID."""
-        for span in self.spans:
-            if span.span_id == span_id:
-                return span
-        return None
+        return self.get_span_index().get(span_id)
     
     def get_root_spans(self) -> List[Span]:
         """Get all root spans (spans with no parent)."""
         return [span for span in self.spans if span.is_root_span()]
     
+    def get_entry_spans(self) -> List[Span]:
+        """
+        Get spans that start a call tree, sorted by start time.
+        Includes orphan spans whose parent is missing from the trace.
+        """
+        span_index = self.get_span_index()
+        return [
+            span for span in self.get_spans_sorted_by_time()
+            if span.get_parent_span_id() not in span_index
+        ]
+    
     def get_child_spans(self, parent_span_id: str) -> List[Span]:
         """Get child spans of a given parent span."""
-        children = []
-        for span in self.spans:
-            if span.get_parent_span_id() == parent_span_id:
-                children.append(span)
-        return children
+        return list(self.get_children_index().get(parent_span_id, []))
     
     def get_all_service_names(self) -> List[str]:
         """Get all unique service names in this trace, sorted."""
@@ -1,6 +1,21 @@
 """XMI rendering utilities."""
 
-from .xmi_writer import XmiWriter, XmiFormat
-from .marte_profile import MarteProfileWriter
+from .xmi_writer import XmiDocumentBuilder, XmiWriter, XmiFormat
+from .xmi_stream import XmiStreamWriter
+from .xmi_serializer import XmiSerializer, WRITE_BUFFER_SIZE
+from .xmi_files import (
+    COMPRESSIONS,
+    open_xmi_file,
+    open_xmi_reader,
+    get_compression,
+    get_xmi_filename,
+    strip_xmi_extension
+)
+from .xmi_ids import XmiIdGenerator
+from .marte_profile import MarteProfileWriter, MARTE_NAMESPACES
+from .lqn_writer import LqnWriter
 
-__all__ = ['XmiWriter', 'XmiFormat', 'MarteProfileWriter']
+__all__ = ['XmiDocumentBuilder', 'XmiWriter', 'XmiStreamWriter', 'XmiSerializer', 'WRITE_BUFFER_SIZE',
+           'XmiFormat', 'COMPRESSIONS', 'open_xmi_file', 'open_xmi_reader', 'get_compression',
+           'get_xmi_filename', 'strip_xmi_extension', 'XmiIdGenerator', 'MarteProfileWriter', 'MARTE_NAMESPACES',
+           'LqnWriter']
@@ -0,0 +1,150 @@
+"""Layered Queueing Network (LQN) model writer."""
+
+import logging
+import re
+from typing import List, Dict, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+
+# Convergence value, iteration limit, print interval and under-relaxation
+# written to the general information section
+LQN_CONVERGENCE = 1e-05
+LQN_ITERATION_LIMIT = 100
+LQN_PRINT_INTERVAL = 1
+LQN_UNDER_RELAXATION = 0.9
+
+
+class LqnWriter:
+    """
+    Writes an LQN model in the SRVN text format read by lqns and lqsim.
+    
+    The model is built from aggregate summaries only (see TraceAggregator):
+    services become tasks, each on its own processor; entries are the
+    operations through which requests enter a service, with their mean
+    self-time demand as phase-1 service time; synchronous calls carry the
+    mean number of calls per invocation of the caller. Every root entry with
+    a measured workload is driven by its own reference task of users.
+    Times are in milliseconds.
+    """
+    
+    def __init__(self, model_name: str = "UnifiedModel"):
+        """
+        Initialize the writer.
+        
+        Args:
+            model_name: Title of the model
+        """
+        self.model_name = model_name
+        self._names: Dict[Tuple[str, str], str] = {}
+        self._used_names: set = set()
+    
+    def _get_name(self, kind: str, key: str) -> str:
+        """
+        Get the unique LQN identifier of a model element, sanitized on first use.
+        
+        Args:
+            kind: Element kind ('processor', 'task', 'entry', 'users' for
+                  a reference task or 'request' for its entry)
+            key: Element name, e.g. the service or "service:operation"
+        """
+        name = self._names.get((kind, key))
+        if name is None:
+            kind_suffix = {'processor': '_cpu', 'users': '_users', 'request': '_request'}.get(kind, '')
+            base = re.sub(r'[^A-Za-z0-9_]', '_', key + kind_suffix).strip('_') or 'x'
+            if base[0].isdigit():
+                base = f"_{base}"
+            name = base
+            counter = 1
+            while name in self._used_names:
+                counter += 1
+                name = f"{base}_{counter}"
+            self._used_names.add(name)
+            self._names[(kind, key)] = name
+        return name
+    
+    def generate(self, aggregator, workloads: Dict[str, Tuple[int, float]]) -> str:
+        """
+        Generate the LQN model of an aggregate.
+        
+        Args:
+            aggregator: TraceAggregator with entry statistics
+            workloads: Map of root entry "service:operation" -> (population,
+                       think time in ms) of its reference task; root entries
+                       without a measured workload get no reference task
+        
+        Returns:
+            Model text in SRVN format
+        """
+        self._names.clear()
+        self._used_names.clear()
+        
+        entries = aggregator.get_entries()
+        task_entries: Dict[str, List[Tuple[str, str]]] = {}
+        for entry in entries:
+            task_entries.setdefault(entry[0], []).append(entry)
+        root_entries, unprofiled = [], []
+        for entry in sorted(aggregator.get_root_entries()):
+            if f"{entry[0]}:{entry[1]}" in workloads:
+                root_entries.append(entry)
+            else:
+                unprofiled.append(f"{entry[0]}:{entry[1]}")
+        if unprofiled:
+            logger.warning(f"No measured workload for {len(unprofiled)} root operation(s), "
+                           f"written without reference task: {', '.join(unprofiled)}")
+        
+        lines = [
+            f"# LQN model generated from {aggregator.trace_count} trace(s)",
+            f"G \"{self.model_name}\" {LQN_CONVERGENCE} {LQN_ITERATION_LIMIT} "
+            f"{LQN_PRINT_INTERVAL} {LQN_UNDER_RELAXATION} -1",
+            ""
+        ]
+        
+        # Processors: one per service, plus an infinite server for all users
+        lines.append("P 0")
+        if root_entries:
+            lines.append(f"p {self._get_name('processor', 'Users')} i")
+        for service in sorted(task_entries):
+            lines.append(f"p {self._get_name('processor', service)} f")
+        lines.append("-1")
+        lines.append("")
+        
+        # Tasks: reference tasks first, then one task per service
+        lines.append("T 0")
+        for entry in root_entries:
+            key = f"{entry[0]}:{entry[1]}"
+            population, think_time_ms = workloads[key]
+            task_line = (f"t {self._get_name('users', key)} r {self._get_name('request', key)} "
+                         f"-1 {self._get_name('processor', 'Users')}")
+            if think_time_ms > 0:
+                task_line += f" z {think_time_ms:.6g}"
+            lines.append(f"{task_line} m {population}")
+        for service in sorted(task_entries):
+            names = " ".join(
+                self._get_name('entry', f"{entry[0]}:{entry[1]}") for entry in task_entries[service]
+            )
+            lines.append(f"t {self._get_name('task', service)} n {names} -1 "
+                         f"{self._get_name('processor', service)}")
+        lines.append("-1")
+        lines.append("")
+        
+        # Entries: service demands and synchronous calls
+        lines.append("E 0")
+        for entry in root_entries:
+            key = f"{entry[0]}:{entry[1]}"
+            users_entry = self._get_name('request', key)
+            lines.append(f"s {users_entry} 0 -1")
+            lines.append(f"y {users_entry} {self._get_name('entry', key)} 1 -1")
+        for entry in entries:
+            name = self._get_name('entry', f"{entry[0]}:{entry[1]}")
+            lines.append(f"# {entry[0]}: {entry[1]}")
+            lines.append(f"s {name} {aggregator.get_entry_demand(entry) / 1000.0:.6g} -1")
+            for callee, mean_calls in sorted(aggregator.get_entry_calls(entry).items()):
+                lines.append(f"y {name} {self._get_name('entry', f'{callee[0]}:{callee[1]}')} "
+                             f"{mean_calls:.6g} -1")
+        lines.append("-1")
+        
+        logger.info(f"Generated LQN model with {len(task_entries)} task(s), "
+                   f"{len(entries)} entries and {len(root_entries)} reference task(s)")
+        return "\n".join(lines) + "\n"
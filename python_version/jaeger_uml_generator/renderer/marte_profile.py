@@ -11,11 +11,12 @@ Stereotypes implemented:
 - PaStep: Applied to Messages with timing information (hostDemand, prob, etc.)
 - GaExecHost: Applied to Nodes representing execution hosts
 - RtUnit: Applied to Components representing real-time units
+- GaWorkloadEvent: Applied to Interactions with measured arrival patterns
 """
 
 import xml.etree.ElementTree as ET
 from typing import Dict, Optional, List
-import uuid
+from .xmi_ids import XmiIdGenerator
 
 
 # MARTE Profile namespace
@@ -26,6 +27,8 @@ MARTE_PREFIX = "MARTE_AnalysisModel"
 GQAM_NS = f"{MARTE_NS}/GQAM"  # Generic Quantitative Analysis Modeling
 PAM_NS = f"{MARTE_NS}/PAM"    # Performance Analysis Modeling
 GRM_NS = f"{MARTE_NS}/GRM"    # Generic Resource Modeling
+# Prefixes of the sub-profile namespaces in the XMI document
+MARTE_NAMESPACES = {'MARTE_GQAM': GQAM_NS, 'MARTE_PAM': PAM_NS, 'MARTE_GRM': GRM_NS}
 
 # Papyrus MARTE pathmap
 PAPYRUS_MARTE_PATHMAP = "pathmap://Papyrus_MARTE_modelLibrary/MARTE_PrimitiveTypes.library.uml"
@@ -40,25 +43,25 @@ class MarteProfileWriter:
     that are added at the end of the XMI document, after the UML Model.
     """
     
-    def __init__(self, xmi_namespace: str):
+    def __init__(self, xmi_namespace: str, ids: Optional[XmiIdGenerator] = None):
         """
         Initialize MARTE profile writer.
         
         Args:
             xmi_namespace: XMI namespace to use (e.g., http://www.omg.org/spec/XMI/20131001)
+            ids: ID generator of the document (shared with its XmiWriter)
         """
         self.xmi_ns = xmi_namespace
+        self.ids = ids if ids is not None else XmiIdGenerator()
         self.stereotype_applications: List[ET.Element] = []
         
         # Register MARTE namespace
-        ET.register_namespace('MARTE_GQAM', GQAM_NS)
-        ET.register_namespace('MARTE_PAM', PAM_NS)
-        ET.register_namespace('MARTE_GRM', GRM_NS)
+        for prefix, namespace in MARTE_NAMESPACES.items():
+            ET.register_namespace(prefix, namespace)
     
-    @staticmethod
-    def generate_uuid() -> str:
-        """Generate a unique UUID."""
-        return f"_marte_{uuid.uuid4()}"
+    def generate_id(self, element_id: str, stereotype: str) -> str:
+        """Get the ID of a stereotype application from the ID of its base element."""
+        return self.ids.generate(element_id, stereotype)
     
     def add_profile_application(self, model: ET.Element) -> ET.Element:
         """
@@ -75,7 +78,8 @@ class MarteProfileWriter:
         """
         profile_app = ET.SubElement(model, "profileApplication")
         profile_app.set(f"{{{self.xmi_ns}}}type", "uml:ProfileApplication")
-        profile_app.set(f"{{{self.xmi_ns}}}id", self.generate_uuid())
+        profile_app.set(f"{{{self.xmi_ns}}}id",
+                        self.generate_id(model.get(f"{{{self.xmi_ns}}}id", ""), "profileApplication"))
         
         # Reference to applied profile (MARTE)
         applied_profile = ET.SubElement(profile_app, "appliedProfile")
@@ -102,7 +106,7 @@ class MarteProfileWriter:
             The stereotype application element
         """
         stereotype = ET.SubElement(root, f"{{{GQAM_NS}}}GaAnalysisContext")
-        stereotype.set(f"{{{self.xmi_ns}}}id", self.generate_uuid())
+        stereotype.set(f"{{{self.xmi_ns}}}id", self.generate_id(interaction_id, "GaAnalysisContext"))
         stereotype.set("base_NamedElement", interaction_id)
         
         # Add context parameters if provided
@@ -136,7 +140,7 @@ class MarteProfileWriter:
             The stereotype application element
         """
         stereotype = ET.SubElement(root, f"{{{PAM_NS}}}PaStep")
-        stereotype.set(f"{{{self.xmi_ns}}}id", self.generate_uuid())
+        stereotype.set(f"{{{self.xmi_ns}}}id", self.generate_id(message_id, "PaStep"))
         stereotype.set("base_NamedElement", message_id)
         
         # Host demand - the primary timing value from Jaeger spans
@@ -160,8 +164,11 @@ class MarteProfileWriter:
     def apply_ga_exec_host(self, root: ET.Element,
                            node_id: str,
                            speed_factor: float = 1.0,
+                           res_mult: int = 1,
                            comm_tx_ovh: Optional[float] = None,
-                           comm_rcv_ovh: Optional[float] = None) -> ET.Element:
+                           comm_rcv_ovh: Optional[float] = None,
+                           utilization: Optional[float] = None,
+                           throughput: Optional[float] = None) -> ET.Element:
         """
         Apply <<GaExecHost>> stereotype to a Node.
         
@@ -172,26 +179,39 @@ class MarteProfileWriter:
             root: Root XMI element
             node_id: ID of the Node element
             speed_factor: Relative processor speed (default 1.0)
+            res_mult: Resource multiplicity, e.g. the number of replicas
             comm_tx_ovh: Communication transmit overhead (ms)
             comm_rcv_ovh: Communication receive overhead (ms)
+            utilization: Measured utilization (0.0-1.0)
+            throughput: Measured throughput (requests per second)
             
         Returns:
             The stereotype application element
         """
         stereotype = ET.SubElement(root, f"{{{GRM_NS}}}GaExecHost")
-        stereotype.set(f"{{{self.xmi_ns}}}id", self.generate_uuid())
+        stereotype.set(f"{{{self.xmi_ns}}}id", self.generate_id(node_id, "GaExecHost"))
         stereotype.set("base_Classifier", node_id)
         
         # Speed factor (processing speed relative to reference)
         if speed_factor != 1.0:
             stereotype.set("speedFactor", f"{speed_factor:.2f}")
         
+        # Number of identical hosts (replicas) behind the node
+        if res_mult > 1:
+            stereotype.set("resMult", str(res_mult))
+        
         # Communication overhead values
         if comm_tx_ovh is not None:
             stereotype.set("commTxOvh", f"(value={comm_tx_ovh:.3f},unit=ms)")
         if comm_rcv_ovh is not None:
             stereotype.set("commRcvOvh", f"(value={comm_rcv_ovh:.3f},unit=ms)")
         
+        # Measured load values
+        if utilization is not None:
+            stereotype.set("utilization", f"(value={utilization:.4f},source=meas)")
+        if throughput is not None:
+            stereotype.set("throughput", f"(value={throughput:.3f},unit=Hz,source=meas)")
+        
         return stereotype
     
     def apply_rt_unit(self, root: ET.Element,
@@ -216,7 +236,7 @@ class MarteProfileWriter:
             The stereotype application element
         """
         stereotype = ET.SubElement(root, f"{{{GRM_NS}}}RtUnit")
-        stereotype.set(f"{{{self.xmi_ns}}}id", self.generate_uuid())
+        stereotype.set(f"{{{self.xmi_ns}}}id", self.generate_id(component_id, "RtUnit"))
         stereotype.set("base_BehavioredClassifier", component_id)
         
         # Active/passive
@@ -233,25 +253,41 @@ class MarteProfileWriter:
     def apply_ga_workload_event(self, root: ET.Element,
                                  element_id: str,
                                  pattern: str = "closed",
-                                 population: int = 1) -> ET.Element:
+                                 population: int = 1,
+                                 ext_delay_ms: Optional[float] = None,
+                                 inter_arrival_ms: Optional[float] = None) -> ET.Element:
         """
         Apply <<GaWorkloadEvent>> stereotype for workload modeling.
         
+        The arrival pattern is written as a VSL ArrivalPattern, e.g.
+        closed(population=5,extDelay=(value=120.000,unit=ms)) or
+        open(interArrTime=(value=40.000,unit=ms,statQ=mean,source=meas)).
+        
         Args:
             root: Root XMI element
             element_id: ID of the element to annotate
             pattern: Workload pattern ('closed' or 'open')
-            population: Number of concurrent workload instances
+            population: Number of concurrent workload instances (closed)
+            ext_delay_ms: Think time between requests of an instance (closed)
+            inter_arrival_ms: Mean time between arrivals (open)
             
         Returns:
             The stereotype application element
         """
         stereotype = ET.SubElement(root, f"{{{GQAM_NS}}}GaWorkloadEvent")
-        stereotype.set(f"{{{self.xmi_ns}}}id", self.generate_uuid())
+        stereotype.set(f"{{{self.xmi_ns}}}id", self.generate_id(element_id, "GaWorkloadEvent"))
         stereotype.set("base_NamedElement", element_id)
-        stereotype.set("pattern", pattern)
         
         if pattern == "closed":
-            stereotype.set("population", str(population))
+            params = [f"population={population}"]
+            if ext_delay_ms is not None:
+                params.append(f"extDelay=(value={ext_delay_ms:.3f},unit=ms)")
+            stereotype.set("pattern", f"closed({','.join(params)})")
+        elif inter_arrival_ms is not None:
+            stereotype.set("pattern",
+                           f"open(interArrTime=(value={inter_arrival_ms:.3f},unit=ms,"
+                           f"statQ=mean,source=meas))")
+        else:
+            stereotype.set("pattern", pattern)
         
         return stereotype
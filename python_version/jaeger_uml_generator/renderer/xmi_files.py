@@ -0,0 +1,113 @@
+"""Plain and compressed XMI files."""
+
+import gzip
+import io
+import lzma
+from pathlib import Path
+from typing import BinaryIO, Union
+from .xmi_serializer import WRITE_BUFFER_SIZE
+
+
+# File name extension per output compression
+XMI_EXTENSIONS = {'none': '.xmi', 'gz': '.xmi.gz', 'xz': '.xmi.xz'}
+COMPRESSIONS = tuple(XMI_EXTENSIONS)
+# zlib's default trade-off between speed and ratio
+GZIP_LEVEL = 6
+# xz's default preset: slower than gzip, for the better ratio of archived models
+XZ_PRESET = 6
+
+
+def get_compression(path: Union[str, Path]) -> str:
+    """
+    Get the compression of an XMI file from its extension.
+    
+    Args:
+        path: File path or name
+    
+    Returns:
+        'gz', 'xz' or 'none'
+    """
+    suffix = Path(path).suffix.lower()
+    if suffix == '.gz':
+        return 'gz'
+    if suffix == '.xz':
+        return 'xz'
+    return 'none'
+
+
+def get_xmi_filename(stem: str, compression: str = 'none') -> str:
+    """
+    Get the name of an XMI output file.
+    
+    Args:
+        stem: File name without extension
+        compression: 'none', 'gz' or 'xz'
+    
+    Returns:
+        File name, e.g. "UnifiedModel.xmi.gz"
+    """
+    return f"{stem}{XMI_EXTENSIONS[compression]}"
+
+
+def open_xmi_file(path: Union[str, Path]) -> BinaryIO:
+    """
+    Open an XMI file for writing in binary mode, compressed according to its extension.
+    
+    Written bytes are buffered and go straight into the compressor, so the
+    uncompressed document is never stored. Compressed files are written
+    reproducibly (no timestamp in the gzip header).
+    
+    Args:
+        path: File path ending in .xmi, .xmi.gz or .xmi.xz
+    
+    Returns:
+        Buffered binary file handle
+    """
+    compression = get_compression(path)
+    if compression == 'gz':
+        stream = gzip.GzipFile(path, 'wb', GZIP_LEVEL, mtime=0)
+    elif compression == 'xz':
+        stream = lzma.LZMAFile(path, 'wb', preset=XZ_PRESET)
+    else:
+        return open(path, 'wb', buffering=WRITE_BUFFER_SIZE)
+    return io.BufferedWriter(stream, WRITE_BUFFER_SIZE)
+
+
+def open_xmi_reader(path: Union[str, Path]) -> BinaryIO:
+    """
+    Open an XMI file for reading in binary mode, decompressed according to its extension.
+    
+    Reads any file open_xmi_file() wrote, e.g. to parse an archived model
+    with ElementTree without decompressing it to disk first.
+    
+    Args:
+        path: File path ending in .xmi, .xmi.gz or .xmi.xz
+    
+    Returns:
+        Buffered binary file handle
+    """
+    compression = get_compression(path)
+    if compression == 'gz':
+        stream = gzip.GzipFile(path, 'rb')
+    elif compression == 'xz':
+        stream = lzma.LZMAFile(path, 'rb')
+    else:
+        return open(path, 'rb', buffering=WRITE_BUFFER_SIZE)
+    return io.BufferedReader(stream, WRITE_BUFFER_SIZE)
+
+
+def strip_xmi_extension(name: str) -> str:
+    """
+    Remove the XMI extension from a file name.
+    
+    Args:
+        name: File name, e.g. "UnifiedModel.xmi.gz"
+    
+    Returns:
+        Name without .xmi, .xmi.gz or .xmi.xz (or .gz, .xz)
+    """
+    if get_compression(name) != 'none':
+        name = name[:-3]
+    if name.lower().endswith('.xmi'):
+        name = name[:-4]
+    return name
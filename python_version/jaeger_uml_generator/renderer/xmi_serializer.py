@@ -0,0 +1,179 @@
+"""Fast serialization of XMI element trees, pretty-printed or compact."""
+
+import re
+import xml.etree.ElementTree as ET
+from typing import Dict, List, Optional
+
+
+# Indentation per nesting level of pretty-printed documents
+INDENT = "  "
+XML_DECLARATION = '<?xml version="1.0" encoding="UTF-8"?>\n'
+# Buffer size of the files XMI documents are streamed to
+WRITE_BUFFER_SIZE = 1 << 20
+
+# Characters that must be escaped in attribute values
+_ATTRIBUTE_SPECIALS = re.compile('[&<>"\r\n\t]')
+
+
+def escape_text(text: str) -> str:
+    """Escape character data."""
+    if "&" in text:
+        text = text.replace("&", "&amp;")
+    if "<" in text:
+        text = text.replace("<", "&lt;")
+    if ">" in text:
+        text = text.replace(">", "&gt;")
+    return text
+
+
+def escape_attribute(value: str) -> str:
+    """Escape an attribute value."""
+    value = escape_text(value)
+    if "\"" in value:
+        value = value.replace("\"", "&quot;")
+    if "\r" in value:
+        value = value.replace("\r", "&#13;")
+    if "\n" in value:
+        value = value.replace("\n", "&#10;")
+    if "\t" in value:
+        value = value.replace("\t", "&#09;")
+    return value
+
+
+class XmiSerializer:
+    """
+    Serializes element trees as XMI text.
+    
+    Pretty-printed output has the layout of ET.indent() followed by
+    ET.tostring(), without modifying the tree; compact output has no
+    whitespace between elements at all. Namespaced names
+    ("{namespace}local") are written with the prefixes the serializer is
+    created with, all of which are declared on the root element.
+    """
+    
+    def __init__(self, namespaces: Dict[str, str], indent: Optional[str] = INDENT):
+        """
+        Initialize the serializer.
+        
+        Args:
+            namespaces: Namespaces of the document, prefix -> URI
+            indent: Indentation per nesting level, None for compact output
+        """
+        self.namespaces = dict(namespaces)
+        self.indent = indent
+        self._prefixes = {namespace: prefix for prefix, namespace in self.namespaces.items()}
+        self._qnames: Dict[str, str] = {}
+        # Attribute name -> text before its value, e.g. ' xmi:id="'
+        self._attribute_prefixes: Dict[str, str] = {}
+        # Line break and indentation before an element at each level
+        self._newlines: List[str] = []
+    
+    def get_declarations(self) -> str:
+        """Get the namespace declarations of the root element, sorted by prefix."""
+        return "".join(
+            f' xmlns:{prefix}="{escape_attribute(self.namespaces[prefix])}"'
+            for prefix in sorted(self.namespaces)
+        )
+    
+    def newline(self, level: int) -> str:
+        """Get the whitespace before an element (or end tag) at a nesting level."""
+        if self.indent is None:
+            return ""
+        newlines = self._newlines
+        while len(newlines) <= level:
+            newlines.append("\n" + self.indent * len(newlines))
+        return newlines[level]
+    
+    def qname(self, name: str) -> str:
+        """Get the prefixed name of a tag or attribute written as {namespace}local."""
+        qname = self._qnames.get(name)
+        if qname is None:
+            if name[:1] == "{":
+                namespace, local = name[1:].split("}", 1)
+                prefix = self._prefixes.get(namespace)
+                if prefix is None:
+                    raise ValueError(f"Namespace {namespace} is not declared by the XMI document")
+                qname = f"{prefix}:{local}"
+            else:
+                qname = name
+            self._qnames[name] = qname
+        return qname
+    
+    def format_attributes(self, element: ET.Element) -> str:
+        """Format the attributes of an element."""
+        attrib = element.attrib
+        prefixes = self._attribute_prefixes
+        try:
+            # One scan of all values: escaping is rarely needed
+            if _ATTRIBUTE_SPECIALS.search("".join(attrib.values())):
+                return "".join([f'{prefixes[key]}{escape_attribute(value)}"' for key, value in attrib.items()])
+            return "".join([f'{prefixes[key]}{value}"' for key, value in attrib.items()])
+        except KeyError:
+            for key in attrib:
+                if key not in prefixes:
+                    prefixes[key] = f' {self.qname(key)}="'
+            return self.format_attributes(element)
+    
+    def format_start_tag(self, element: ET.Element, declarations: str = "", empty: bool = False) -> str:
+        """
+        Format the start tag of an element.
+        
+        Args:
+            element: Element
+            declarations: Namespace declarations (root element only)
+            empty: Close the tag as an empty element
+        """
+        attributes = self.format_attributes(element) if element.attrib else ""
+        return f"<{self.qname(element.tag)}{declarations}{attributes}{' />' if empty else '>'}"
+    
+    def format_end_tag(self, element: ET.Element) -> str:
+        """Format the end tag of an element."""
+        return f"</{self.qname(element.tag)}>"
+    
+    def serialize(self, element: ET.Element, level: int, out: List[str], declarations: str = ""):
+        """
+        Append an element and its subtree.
+        
+        Args:
+            element: Element to serialize
+            level: Nesting level of the element
+            out: Output fragments
+            declarations: Namespace declarations (root element only)
+        """
+        tag = self._qnames.get(element.tag) or self.qname(element.tag)
+        attributes = self.format_attributes(element) if element.attrib else ""
+        
+        if len(element):
+            text = element.text
+            child_newline = self.newline(level + 1)
+            out.append(f"<{tag}{declarations}{attributes}>")
+            if text and text.strip():
+                out.append(escape_text(text))
+            else:
+                out.append(child_newline)
+            first = True
+            for child in element:
+                if first:
+                    first = False
+                else:
+                    out.append(child_newline)
+                self.serialize(child, level + 1, out)
+            out.append(f"{self.newline(level)}</{tag}>")
+        elif element.text:
+            out.append(f"<{tag}{declarations}{attributes}>{escape_text(element.text)}</{tag}>")
+        else:
+            out.append(f"<{tag}{declarations}{attributes} />")
+    
+    def to_string(self, root: ET.Element) -> str:
+        """
+        Serialize a document.
+        
+        Args:
+            root: Root element
+        
+        Returns:
+            XML declaration and document
+        """
+        out = [XML_DECLARATION]
+        self.serialize(root, 0, out, self.get_declarations())
+        return "".join(out)
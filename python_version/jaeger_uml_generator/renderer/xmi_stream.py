@@ -0,0 +1,183 @@
+"""Streaming XMI writer that emits elements as soon as they are complete."""
+
+import logging
+import shutil
+import tempfile
+import xml.etree.ElementTree as ET
+from typing import BinaryIO, Dict, List, Optional
+from .xmi_writer import XmiDocumentBuilder, XmiFormat
+from .xmi_serializer import XML_DECLARATION
+
+
+logger = logging.getLogger(__name__)
+
+
+class _OpenElement:
+    """An element whose start tag may be written but whose end tag is not."""
+    
+    __slots__ = ('element', 'level', 'started', 'declarations')
+    
+    def __init__(self, element: ET.Element, level: int, declarations: str = ""):
+        self.element = element
+        self.level = level
+        self.started = False
+        self.declarations = declarations
+
+
+class XmiStreamWriter(XmiDocumentBuilder):
+    """
+    Document builder that writes the document to a file while it is being built.
+    
+    Elements are created with the same API as XmiWriter, but the document
+    is never held in memory as a whole. The generator marks containers
+    (e.g. a package whose use cases are generated one by one) with
+    open_element() and close_element(), and calls flush() when a child is
+    complete: the completed children of the innermost open element are
+    then serialized, written and detached from the tree. Stereotype
+    applications added to the root while the Model is open belong after
+    the Model, so they are spooled to a temporary file and copied to the
+    output by finish().
+    
+    The output is the one of XmiWriter.document_to_string().
+    """
+    
+    def __init__(self, output: BinaryIO, format: XmiFormat = XmiFormat.PAPYRUS,
+                 compact: bool = False, namespaces: Optional[Dict[str, str]] = None):
+        """
+        Initialize the writer.
+        
+        Args:
+            output: Binary file handle the document is written to (ideally
+                    buffered, see WRITE_BUFFER_SIZE)
+            format: XmiFormat enum value (PAPYRUS or MAGICDRAW)
+            compact: Write the document without indentation
+            namespaces: Additional namespaces used by the document, prefix -> URI
+                        (e.g. the MARTE sub-profiles)
+        """
+        super().__init__(format, compact, namespaces)
+        self.output = output
+        self.serializer = self.create_serializer()
+        
+        self._model: Optional[ET.Element] = None
+        self._stack: List[_OpenElement] = []
+        self._spool = None
+        self.bytes_written = 0
+    
+    def create_xmi_document(self, model_name: str) -> ET.Element:
+        """
+        Start a new XMI document and open its root and Model elements.
+        
+        Args:
+            model_name: Name of the UML model
+        
+        Returns:
+            Root XMI element
+        """
+        root = super().create_xmi_document(model_name)
+        self._model = super().get_model_element(root)
+        
+        self._stack = [_OpenElement(root, 0, self.serializer.get_declarations())]
+        self._write([XML_DECLARATION])
+        self.open_element(self._model)
+        return root
+    
+    def get_model_element(self, root: ET.Element) -> Optional[ET.Element]:
+        """Get the Model element of the current document (detached from the root while open)."""
+        return self._model
+    
+    def open_element(self, element: ET.Element):
+        """
+        Open an element: write the siblings created before it and start it.
+        
+        Args:
+            element: Child of the innermost open element
+        """
+        parent = self._stack[-1]
+        children = list(parent.element)
+        position = next(i for i, child in enumerate(children) if child is element)
+        
+        out: List[str] = []
+        for child in children[:position]:
+            self._serialize_child(parent, child, out)
+        self._begin_child(parent, out)
+        self._write(out)
+        
+        del parent.element[:position + 1]
+        self._stack.append(_OpenElement(element, parent.level + 1))
+    
+    def flush(self):
+        """Write and detach the completed children of the innermost open element."""
+        entry = self._stack[-1]
+        out: List[str] = []
+        for child in entry.element:
+            self._serialize_child(entry, child, out)
+        del entry.element[:]
+        self._write(out)
+    
+    def close_element(self, element: ET.Element):
+        """
+        Write the remaining children and the end tag of the innermost open element.
+        
+        Args:
+            element: Innermost open element
+        """
+        entry = self._stack[-1]
+        if entry.element is not element:
+            raise ValueError(f"Cannot close {element.tag}: it is not the innermost open element")
+        
+        self.flush()
+        serializer = self.serializer
+        if entry.started:
+            out = [serializer.newline(entry.level), serializer.format_end_tag(element)]
+        else:
+            out = [serializer.format_start_tag(element, entry.declarations, empty=True)]
+        self._write(out)
+        self._stack.pop()
+    
+    def finish(self):
+        """Close all open elements, append the spooled stereotypes and end the document."""
+        while len(self._stack) > 1:
+            self.close_element(self._stack[-1].element)
+        
+        if self._spool is not None:
+            self.output.flush()
+            self._spool.seek(0)
+            shutil.copyfileobj(self._spool, self.output)
+            self.bytes_written += self._spool.tell()
+            self._spool.close()
+            self._spool = None
+        
+        self.close_element(self._stack[0].element)
+        self.output.flush()
+        logger.debug(f"Streamed {self.bytes_written} byte(s) of XMI")
+    
+    def _begin_child(self, entry: _OpenElement, out: List[str]):
+        """Append the pending start tag of an open element and the indentation of its next child."""
+        if not entry.started:
+            out.append(self.serializer.format_start_tag(entry.element, entry.declarations))
+            entry.started = True
+        out.append(self.serializer.newline(entry.level + 1))
+    
+    def _serialize_child(self, entry: _OpenElement, child: ET.Element, out: List[str]):
+        """Append a completed child of an open element."""
+        self._begin_child(entry, out)
+        self.serializer.serialize(child, entry.level + 1, out)
+    
+    def _write(self, out: List[str]):
+        """Write output fragments; stereotypes added to the root meanwhile go to the spool."""
+        if out:
+            data = "".join(out).encode('utf-8')
+            self.output.write(data)
+            self.bytes_written += len(data)
+        
+        root = self._stack[0].element if self._stack else None
+        if root is None or len(self._stack) < 2 or not len(root):
+            return
+        if self._spool is None:
+            self._spool = tempfile.TemporaryFile()
+        spooled: List[str] = []
+        for child in root:
+            spooled.append(self.serializer.newline(1))
+            self.serializer.serialize(child, 1, spooled)
+        del root[:]
+        self._spool.write("".join(spooled).encode('utf-8'))
@@ -1,9 +1,10 @@
 """XMI writer for generating UML diagrams in XMI 2.5.1 format compatible with Eclipse Papyrus and MagicDraw."""
 
 import xml.etree.ElementTree as ET
-import uuid
 from enum import Enum
-from typing import Optional
+from typing import Dict, Optional
+from .xmi_ids import XmiIdGenerator
+from .xmi_serializer import XmiSerializer, INDENT
 
 
 class XmiFormat(Enum):
@@ -12,8 +13,14 @@ class XmiFormat(Enum):
     MAGICDRAW = "magicdraw"  # MagicDraw format
 
 
-class XmiWriter:
-    """Utility class for creating XMI documents compatible with Eclipse Papyrus or MagicDraw."""
+class XmiDocumentBuilder:
+    """
+    Creates the elements of XMI documents compatible with Eclipse Papyrus or MagicDraw.
+    
+    How a document is output is left to the subclasses: XmiWriter keeps it
+    in memory and serializes it as a whole, XmiStreamWriter writes it to a
+    file while it is built.
+    """
     
     # Papyrus (Eclipse) namespaces
     PAPYRUS_XMI_NS = "http://www.omg.org/spec/XMI/20131001"
@@ -23,14 +30,21 @@ class XmiWriter:
     MAGICDRAW_XMI_NS = "http://www.omg.org/spec/XMI/20131001"
     MAGICDRAW_UML_NS = "http://www.omg.org/spec/UML/20131001"
     
-    def __init__(self, format: XmiFormat = XmiFormat.PAPYRUS):
+    def __init__(self, format: XmiFormat = XmiFormat.PAPYRUS, compact: bool = False,
+                 namespaces: Optional[Dict[str, str]] = None):
         """
-        Initialize XMI writer with specified format.
+        Initialize the builder with specified format.
         
         Args:
             format: XmiFormat enum value (PAPYRUS or MAGICDRAW)
+            compact: Serialize documents without indentation
+            namespaces: Additional namespaces used by documents, prefix -> URI
+                        (e.g. the MARTE sub-profiles)
         """
         self.format = format
+        self.compact = compact
+        # Deterministic element IDs, reset for every document
+        self.ids = XmiIdGenerator()
         
         # Select namespaces based on format
         if format == XmiFormat.MAGICDRAW:
@@ -39,14 +53,31 @@ class XmiWriter:
         else:
             self.XMI_NAMESPACE = self.PAPYRUS_XMI_NS
             self.UML_NAMESPACE = self.PAPYRUS_UML_NS
+        # Namespace prefixes, declared on the root of every document
+        self.namespaces: Dict[str, str] = {'xmi': self.XMI_NAMESPACE, 'uml': self.UML_NAMESPACE}
+        self.namespaces.update(namespaces or {})
         # Register namespace prefixes to avoid ns0:, ns1: prefixes
-        ET.register_namespace('xmi', self.XMI_NAMESPACE)
-        ET.register_namespace('uml', self.UML_NAMESPACE)
+        for prefix, namespace in self.namespaces.items():
+            ET.register_namespace(prefix, namespace)
     
-    @staticmethod
-    def generate_uuid() -> str:
-        """Generate a unique UUID for XMI elements."""
-        return str(uuid.uuid4())
+    def create_serializer(self) -> XmiSerializer:
+        """Create a serializer for documents of this writer."""
+        return XmiSerializer(self.namespaces, None if self.compact else INDENT)
+    
+    def generate_id(self, parent: Optional[ET.Element], kind: str, name: str = "") -> str:
+        """
+        Generate the ID of an XMI element from its semantic path.
+        
+        Args:
+            parent: Owning element (its ID scopes the new one), None at the top level
+            kind: Element kind, e.g. the UML type or the XML tag
+            name: Element name or other distinguishing key
+            
+        Returns:
+            ID, identical across runs for identical input
+        """
+        scope = parent.get(f"{{{self.XMI_NAMESPACE}}}id", "") if parent is not None else ""
+        return self.ids.generate(scope, kind, name)
     
     def create_xmi_document(self, model_name: str) -> ET.Element:
         """
@@ -58,13 +89,15 @@ class XmiWriter:
         Returns:
             Root XMI element
         """
+        self.ids.reset()
+        
         # Create root XMI element with proper namespace
         root = ET.Element(f"{{{self.XMI_NAMESPACE}}}XMI")
         root.set(f"{{{self.XMI_NAMESPACE}}}version", "2.5.1")
         
         # Create Model element
         model = ET.SubElement(root, f"{{{self.UML_NAMESPACE}}}Model")
-        model.set(f"{{{self.XMI_NAMESPACE}}}id", self.generate_uuid())
+        model.set(f"{{{self.XMI_NAMESPACE}}}id", self.generate_id(None, "Model", model_name))
         model.set("name", model_name)
         
         return root
@@ -85,6 +118,29 @@ class XmiWriter:
                 return child
         return None
     
+    def open_element(self, element: ET.Element):
+        """
+        Mark an element as open: children are still being added to it.
+        
+        A no-op for documents kept in memory until they are serialized;
+        streaming writers (XmiStreamWriter) emit the completed elements
+        before it and start the element.
+        
+        Args:
+            element: Last child of the innermost open element
+        """
+    
+    def flush(self):
+        """Emit the completed children of the innermost open element (no-op here)."""
+    
+    def close_element(self, element: ET.Element):
+        """
+        Mark an open element as complete (no-op here).
+        
+        Args:
+            element: Innermost open element
+        """
+    
     def create_packaged_element(self, parent: ET.Element, element_type: str, 
                                  name: str, **kwargs) -> tuple[ET.Element, str]:
         """
@@ -99,8 +155,8 @@ class XmiWriter:
         Returns:
             Tuple of (element, element_id)
         """
+        element_id = self.generate_id(parent, element_type, name)
         element = ET.SubElement(parent, "packagedElement")
-        element_id = self.generate_uuid()
         element.set(f"{{{self.XMI_NAMESPACE}}}type", f"uml:{element_type}")
         element.set(f"{{{self.XMI_NAMESPACE}}}id", element_id)
         element.set("name", name)
@@ -123,8 +179,8 @@ class XmiWriter:
         Returns:
             Tuple of (element, element_id)
         """
+        element_id = self.generate_id(parent, element_name, kwargs.get('name', ''))
         element = ET.SubElement(parent, element_name)
-        element_id = self.generate_uuid()
         element.set(f"{{{self.XMI_NAMESPACE}}}id", element_id)
         
         for key, value in kwargs.items():
@@ -132,27 +188,6 @@ class XmiWriter:
         
         return element, element_id
     
-    def document_to_string(self, root: ET.Element) -> str:
-        """
-        Convert XML element tree to a formatted string.
-        
-        Args:
-            root: Root element
-            
-        Returns:
-            Formatted XML string
-        """
-        # Use indent for Python 3.9+
-        try:
-            ET.indent(root, space="  ")
-        except AttributeError:
-            pass  # Python < 3.9, no indent available
-        
-        xml_str = ET.tostring(root, encoding='unicode', method='xml')
-        
-        # Add XML declaration
-        return f'<?xml version="1.0" encoding="UTF-8"?>\n{xml_str}'
-    
     def add_comment(self, parent: ET.Element, comment_text: str) -> ET.Element:
         """
         Add a comment element to a UML element.
@@ -165,7 +200,7 @@ class XmiWriter:
             Comment element
         """
         comment = ET.SubElement(parent, "ownedComment")
-        comment.set(f"{{{self.XMI_NAMESPACE}}}id", self.generate_uuid())
+        comment.set(f"{{{self.XMI_NAMESPACE}}}id", self.generate_id(parent, "ownedComment"))
         
         body = ET.SubElement(comment, "body")
         body.text = comment_text
@@ -200,8 +235,8 @@ class XmiWriter:
         Returns:
             Tuple of (usage element, usage_id)
         """
+        usage_id = self.generate_id(parent, "Usage", f"{client_id}->{supplier_id}")
         usage = ET.SubElement(parent, "packagedElement")
-        usage_id = self.generate_uuid()
         usage.set(f"{{{self.XMI_NAMESPACE}}}type", "uml:Usage")
         usage.set(f"{{{self.XMI_NAMESPACE}}}id", usage_id)
         usage.set("name", name)
@@ -230,8 +265,8 @@ class XmiWriter:
         Returns:
             Tuple of (realization element, realization_id)
         """
+        realization_id = self.generate_id(parent, "InterfaceRealization", f"{client_id}->{supplier_id}")
         realization = ET.SubElement(parent, "packagedElement")
-        realization_id = self.generate_uuid()
         realization.set(f"{{{self.XMI_NAMESPACE}}}type", "uml:InterfaceRealization")
         realization.set(f"{{{self.XMI_NAMESPACE}}}id", realization_id)
         realization.set("name", name)
@@ -273,3 +308,19 @@ class XmiWriter:
                 )
         
         return interface, interface_id
+
+
+class XmiWriter(XmiDocumentBuilder):
+    """Utility class for creating XMI documents in memory and serializing them."""
+    
+    def document_to_string(self, root: ET.Element) -> str:
+        """
+        Convert XML element tree to a string, indented unless the writer is compact.
+        
+        Args:
+            root: Root element
+            
+        Returns:
+            XML string with declaration
+        """
+        return self.create_serializer().to_string(root)
@@ -5,13 +5,22 @@ from .name_utils import (
     clean_trace_name, 
     sanitize_xml_name, 
     extract_base_name,
-    extract_simple_operation_name
+    extract_simple_operation_name,
+    stable_digest
 )
+from .operation_templates import OperationNameTemplater, parse_operation_pattern
+from .build_manifest import BuildManifest, CORPUS_UNIT, hash_files
 
 __all__ = [
     'clean_operation_name', 
     'clean_trace_name', 
     'sanitize_xml_name', 
     'extract_base_name',
-    'extract_simple_operation_name'
+    'extract_simple_operation_name',
+    'stable_digest',
+    'OperationNameTemplater',
+    'parse_operation_pattern',
+    'BuildManifest',
+    'CORPUS_UNIT',
+    'hash_files'
 ]
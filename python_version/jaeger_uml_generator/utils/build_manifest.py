@@ -0,0 +1,143 @@
+"""Content-addressed manifest of generated outputs for incremental builds."""
+
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import List, Dict, Any
+
+
+logger = logging.getLogger(__name__)
+
+
+MANIFEST_FILENAME = ".jaeger-uml-manifest.json"
+MANIFEST_FORMAT = 1
+# Unit of the outputs built from all inputs together (merged model, reports)
+CORPUS_UNIT = "corpus"
+# Bytes read at a time when hashing input files
+HASH_CHUNK_SIZE = 1 << 20
+
+
+def hash_file(path: Path) -> str:
+    """
+    Get the SHA-256 content hash of a file.
+    
+    Args:
+        path: File path
+    
+    Returns:
+        Hex digest
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def hash_files(paths: List[Path]) -> Dict[str, str]:
+    """
+    Hash input files.
+    
+    Args:
+        paths: Input file paths
+    
+    Returns:
+        Map of resolved path -> content hash, in the given order
+    """
+    return {str(Path(path).resolve()): hash_file(path) for path in paths}
+
+
+class BuildManifest:
+    """
+    Records which outputs were built from which inputs.
+    
+    The manifest lives in the output directory. It is keyed by the tool
+    version and the options that shape the outputs: when either differs,
+    the previous manifest is discarded and everything is rebuilt. Within a
+    key, every build unit (e.g. the outputs of one input file, or the merged
+    model of all of them) is stored with the content hashes of its inputs
+    and the files it wrote. A unit is up to date when its inputs hash the
+    same and all of its outputs still exist.
+    """
+    
+    def __init__(self, output_dir: Path, tool_version: str, options: Dict[str, Any]):
+        """
+        Load the manifest of an output directory.
+        
+        Args:
+            output_dir: Output directory of the build
+            tool_version: Version of the generator
+            options: Options the outputs depend on (JSON-serializable)
+        """
+        self.output_dir = Path(output_dir)
+        self.path = self.output_dir / MANIFEST_FILENAME
+        options_text = json.dumps(options, sort_keys=True, default=str)
+        self.key = hashlib.sha256(f"{tool_version}\n{options_text}".encode('utf-8')).hexdigest()
+        self.units: Dict[str, Dict[str, Any]] = {}
+        
+        self._load()
+    
+    def _load(self):
+        """Read the existing manifest if it was written with the same key."""
+        if not self.path.is_file():
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable build manifest {self.path.name}: {e}")
+            return
+        
+        if data.get('format') != MANIFEST_FORMAT or data.get('key') != self.key:
+            logger.info("Tool version or options changed, rebuilding all outputs")
+            return
+        self.units = data.get('units', {})
+    
+    def is_current(self, unit: str, inputs: Dict[str, str]) -> bool:
+        """
+        Check whether a unit was built from the same inputs and its outputs exist.
+        
+        Args:
+            unit: Unit name
+            inputs: Map of input path -> content hash
+        """
+        entry = self.units.get(unit)
+        if entry is None or entry.get('inputs') != inputs:
+            return False
+        return all((self.output_dir / name).is_file() for name in entry.get('outputs', []))
+    
+    def get_outputs(self, unit: str) -> List[str]:
+        """Get the recorded output files of a unit."""
+        entry = self.units.get(unit)
+        return list(entry.get('outputs', [])) if entry else []
+    
+    def record(self, unit: str, inputs: Dict[str, str], outputs: List[str]):
+        """
+        Record the outputs built for a unit.
+        
+        Args:
+            unit: Unit name
+            inputs: Map of input path -> content hash
+            outputs: Names of the files written in the output directory
+        """
+        self.units[unit] = {'inputs': dict(inputs), 'outputs': sorted(outputs)}
+    
+    def forget(self, unit: str):
+        """Drop a unit, so that it is rebuilt by the next run."""
+        self.units.pop(unit, None)
+    
+    def save(self):
+        """Write the manifest, replacing the previous one atomically."""
+        data = {'format': MANIFEST_FORMAT, 'key': self.key, 'units': self.units}
+        temp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=1, sort_keys=True)
+        os.replace(temp_path, self.path)
+        logger.debug(f"Saved build manifest with {len(self.units)} unit(s)")
+    
+    @staticmethod
+    def get_trace_unit(path: str) -> str:
+        """Get the unit name of the per-trace outputs of an input file."""
+        return f"traces:{path}"
@@ -1,8 +1,17 @@
 """Utility functions for name cleaning and formatting."""
 
+import hashlib
+import json
 import re
+from functools import lru_cache
+from typing import Any
 
 
+# Distinct operation names whose cleaned form is memoized per process
+OPERATION_NAME_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=OPERATION_NAME_CACHE_SIZE)
 def clean_operation_name(operation_name: str) -> str:
     """
     Clean an operation name for use in UML diagrams.
@@ -19,8 +28,8 @@ def clean_operation_name(operation_name: str) -> str:
     # Remove HTTP method prefixes
     cleaned = re.sub(r'^(GET|POST|PUT|DELETE|PATCH|HEAD|OPTIONS)\s+', '', operation_name)
     
-    # Replace special characters with underscores
-    cleaned = re.sub(r'[^\w\-/.]', '_', cleaned)
+    # Replace special characters with underscores (keeping {placeholders})
+    cleaned = re.sub(r'[^\w\-/.{}]', '_', cleaned)
     
     # Remove leading/trailing underscores
     cleaned = cleaned.strip('_')
@@ -84,6 +93,7 @@ def extract_base_name(name: str) -> str:
     return cleaned
 
 
+@lru_cache(maxsize=OPERATION_NAME_CACHE_SIZE)
 def extract_simple_operation_name(operation_name: str) -> str:
     """
     Extract only the simple operation name from a full path.
@@ -93,6 +103,7 @@ def extract_simple_operation_name(operation_name: str) -> str:
         - "/hipstershop.EmailService/SendOrderConfirmation" -> "SendOrderConfirmation"
         - "grpc.hipstershop.CurrencyService/Convert" -> "Convert"
         - "GET /api/users" -> "users"
+        - "GET /api/users/{id}/orders/{id}" -> "orders"
         - "frontend" -> "frontend"
     
     Args:
@@ -107,6 +118,9 @@ def extract_simple_operation_name(operation_name: str) -> str:
     # First clean the operation name
     cleaned = clean_operation_name(operation_name)
     
+    # Drop trailing template placeholders such as "/{id}"
+    cleaned = re.sub(r'(/\{[^/{}]*\})+/?$', '', cleaned)
+    
     # Extract part after the last "/" if present
     if '/' in cleaned:
         cleaned = cleaned.rsplit('/', 1)[-1]
@@ -139,3 +153,20 @@ def sanitize_xml_name(name: str) -> str:
         sanitized = 'n_' + sanitized
     
     return sanitized
+
+
+def stable_digest(value: Any, length: int = 8) -> str:
+    """
+    Get a short hex digest of a value that is the same in every run.
+    
+    Unlike hash(), it does not depend on the interpreter's hash seed.
+    
+    Args:
+        value: JSON-serializable value (dict keys are sorted)
+        length: Number of hex digits
+        
+    Returns:
+        Hex digest
+    """
+    text = json.dumps(value, sort_keys=True, default=str)
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=(length + 1) // 2).hexdigest()[:length]
@@ -0,0 +1,150 @@
+"""Templating of high-cardinality operation names."""
+
+import logging
+import re
+from typing import List, Dict, Optional, Tuple, Pattern
+from ..models import Trace
+
+
+logger = logging.getLogger(__name__)
+
+
+# Path segments replaced by placeholders
+UUID_SEGMENT = re.compile(
+    r'^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$'
+)
+NUMERIC_SEGMENT = re.compile(r'^\d+$')
+# At least 8 hex chars with at least one digit, so plain words are kept
+HEX_SEGMENT = re.compile(r'^(?=[^/]*\d)[0-9a-fA-F]{8,}$')
+
+# Maximum number of raw names cached before the cache is reset
+DEFAULT_CACHE_SIZE = 100000
+
+
+class OperationNameTemplater:
+    """
+    Collapses variable parts of operation names into templates.
+    
+    Numeric, UUID and hex path segments become {id}, {uuid} and {hex}, e.g.
+    "GET /api/users/8812/orders/55" -> "GET /api/users/{id}/orders/{id}".
+    User-defined patterns are applied first, as (regex, replacement) pairs.
+    Results are cached per raw name, so each distinct name is templated once.
+    """
+    
+    def __init__(self, patterns: Optional[List[Tuple[str, str]]] = None,
+                 cache_size: int = DEFAULT_CACHE_SIZE):
+        """
+        Initialize the templater.
+        
+        Args:
+            patterns: Optional list of (regex, replacement) pairs
+            cache_size: Maximum number of cached raw names
+        """
+        self.patterns: List[Tuple[Pattern, str]] = [
+            (re.compile(regex), replacement) for regex, replacement in (patterns or [])
+        ]
+        self.cache_size = cache_size
+        self._cache: Dict[str, str] = {}
+    
+    def template(self, operation_name: str) -> str:
+        """
+        Get the template for an operation name.
+        
+        Args:
+            operation_name: Raw operation name
+        
+        Returns:
+            Templated operation name
+        """
+        cached = self._cache.get(operation_name)
+        if cached is not None:
+            return cached
+        
+        templated = self._template(operation_name)
+        
+        if len(self._cache) >= self.cache_size:
+            self._cache.clear()
+        self._cache[operation_name] = templated
+        
+        return templated
+    
+    def _template(self, operation_name: str) -> str:
+        """Template an operation name without using the cache."""
+        if not operation_name:
+            return operation_name
+        
+        templated = operation_name
+        for pattern, replacement in self.patterns:
+            templated = pattern.sub(replacement, templated)
+        
+        # Built-in rules only match segments containing digits
+        if '/' not in templated or not any(c.isdigit() for c in templated):
+            return templated
+        
+        # Drop query strings, they carry request-specific values
+        templated = templated.split('?', 1)[0]
+        
+        segments = templated.split('/')
+        for i, segment in enumerate(segments):
+            if not segment or segment[0] == '{':
+                continue
+            if NUMERIC_SEGMENT.match(segment):
+                segments[i] = '{id}'
+            elif UUID_SEGMENT.match(segment):
+                segments[i] = '{uuid}'
+            elif HEX_SEGMENT.match(segment):
+                segments[i] = '{hex}'
+        
+        return '/'.join(segments)
+    
+    def template_traces(self, traces: List[Trace]) -> int:
+        """
+        Replace span operation names with their templates, in place.
+        
+        Args:
+            traces: List of Trace objects
+        
+        Returns:
+            Number of spans whose operation name changed
+        """
+        changed = 0
+        templates = set()
+        
+        for trace in traces:
+            for span in trace.spans:
+                templated = self.template(span.operation_name)
+                templates.add(templated)
+                if templated != span.operation_name:
+                    span.operation_name = templated
+                    changed += 1
+        
+        logger.info(f"Templated operation names into {len(templates)} distinct name(s) "
+                   f"({changed} span(s) renamed)")
+        return changed
+
+
+def parse_operation_pattern(spec: str) -> Tuple[str, str]:
+    """
+    Parse a user pattern of the form REGEX=REPLACEMENT.
+    
+    The last '=' separates the replacement, so regexes may contain '='.
+    
+    Args:
+        spec: Pattern specification
+    
+    Returns:
+        Tuple of (regex, replacement)
+    
+    Raises:
+        ValueError: If the specification or the regex is invalid
+    """
+    if '=' not in spec:
+        raise ValueError(f"Invalid operation pattern (expected REGEX=REPLACEMENT): {spec}")
+    
+    regex, replacement = spec.rsplit('=', 1)
+    try:
+        re.compile(regex)
+    except re.error as e:
+        raise ValueError(f"Invalid regex in operation pattern '{spec}': {e}")
+    
+    return regex, replacement
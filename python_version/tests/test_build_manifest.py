@@ -0,0 +1,169 @@
+"""Tests for the build manifest and incremental rebuilds of an output directory."""
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from typing import Dict
+
+from jaeger_uml_generator.utils import BuildManifest, CORPUS_UNIT, hash_files
+from jaeger_uml_generator.utils.build_manifest import MANIFEST_FILENAME
+
+
+PACKAGE_DIR = Path(__file__).resolve().parents[1]
+TRACES_DIR = PACKAGE_DIR.parent / 'traces'
+
+REPORTS = ['UnifiedModel.lqn', 'capacity-report.txt', 'dependency-graph.txt', 'simulation-report.txt']
+TRACE_FILES = ['checkout.xmi', 'frontend.xmi', 'frontend2.xmi', 'payment.xmi']
+# Timestamp given to every output before a rebuild, to tell rewritten files apart
+OLD_MTIME_NS = 1_000_000_000 * 10 ** 9
+
+
+class BuildManifestTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.output_dir = Path(self.tmp.name)
+        self.input_file = self.output_dir / 'input.json'
+        self.input_file.write_text('{"data": []}', encoding='utf-8')
+        self.inputs = hash_files([self.input_file])
+        (self.output_dir / 'trace.xmi').write_text('<xmi/>', encoding='utf-8')
+    
+    def tearDown(self):
+        self.tmp.cleanup()
+    
+    def save_manifest(self, version: str = '1.0', options=None) -> BuildManifest:
+        """Record the output of the input file in a new manifest and save it."""
+        manifest = BuildManifest(self.output_dir, version, options or {'compact': False})
+        manifest.record('traces:input.json', self.inputs, ['trace.xmi'])
+        manifest.save()
+        return manifest
+    
+    def test_unit_is_current_until_inputs_or_outputs_change(self):
+        self.save_manifest()
+        manifest = BuildManifest(self.output_dir, '1.0', {'compact': False})
+        self.assertTrue(manifest.is_current('traces:input.json', self.inputs))
+        self.assertEqual(manifest.get_outputs('traces:input.json'), ['trace.xmi'])
+        self.assertFalse(manifest.is_current(CORPUS_UNIT, self.inputs))
+        
+        # Changed input content
+        self.input_file.write_text('{"data": [{}]}', encoding='utf-8')
+        self.assertFalse(manifest.is_current('traces:input.json', hash_files([self.input_file])))
+        
+        # Deleted output
+        (self.output_dir / 'trace.xmi').unlink()
+        self.assertFalse(manifest.is_current('traces:input.json', self.inputs))
+    
+    def test_version_or_options_change_discards_all_units(self):
+        self.save_manifest()
+        self.assertFalse(BuildManifest(self.output_dir, '1.1', {'compact': False}).units)
+        self.assertFalse(BuildManifest(self.output_dir, '1.0', {'compact': True}).units)
+        self.assertTrue(BuildManifest(self.output_dir, '1.0', {'compact': False}).units)
+    
+    def test_forget_and_unreadable_manifest(self):
+        manifest = self.save_manifest()
+        manifest.forget('traces:input.json')
+        manifest.save()
+        self.assertFalse(BuildManifest(self.output_dir, '1.0', {'compact': False}).units)
+        
+        (self.output_dir / MANIFEST_FILENAME).write_text('{not json', encoding='utf-8')
+        with self.assertLogs('jaeger_uml_generator.utils.build_manifest', 'WARNING'):
+            self.assertFalse(BuildManifest(self.output_dir, '1.0', {'compact': False}).units)
+
+
+class IncrementalBuildTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.input_dir = Path(self.tmp.name) / 'input'
+        self.output_dir = Path(self.tmp.name) / 'output'
+        shutil.copytree(TRACES_DIR, self.input_dir)
+    
+    def tearDown(self):
+        self.tmp.cleanup()
+    
+    def build(self, *options: str) -> str:
+        """Run the generator with per-trace files and all reports, and get its output."""
+        completed = subprocess.run(
+            [sys.executable, '-m', 'jaeger_uml_generator.main', '--input-dir', str(self.input_dir),
+             '--output-dir', str(self.output_dir), '--graph-report', '--lqn', '--mva',
+             '--simulate', '500', '--sim-seed', '1', *options],
+            cwd=PACKAGE_DIR, check=True, capture_output=True, text=True
+        )
+        return completed.stdout
+    
+    def age_outputs(self) -> Dict[str, bytes]:
+        """Backdate every output file and get the contents of all of them."""
+        contents = {}
+        for path in self.output_dir.iterdir():
+            if path.name != MANIFEST_FILENAME:
+                os.utime(path, ns=(OLD_MTIME_NS, OLD_MTIME_NS))
+                contents[path.name] = path.read_bytes()
+        return contents
+    
+    def get_rewritten(self):
+        """Get the names of the output files written since age_outputs()."""
+        return sorted(path.name for path in self.output_dir.iterdir()
+                      if path.name != MANIFEST_FILENAME and path.stat().st_mtime_ns != OLD_MTIME_NS)
+    
+    def test_nothing_changed_rebuilds_nothing(self):
+        self.build()
+        self.assertEqual(sorted(self.age_outputs()), sorted(REPORTS + TRACE_FILES))
+        
+        self.assertIn("All outputs are up to date", self.build())
+        self.assertEqual(self.get_rewritten(), [])
+    
+    def test_changed_input_file_rebuilds_its_outputs_and_the_reports(self):
+        self.build()
+        self.age_outputs()
+        
+        # Same traces, different bytes
+        path = self.input_dir / 'traccia_payment.json'
+        path.write_text(json.dumps(json.loads(path.read_text(encoding='utf-8')), indent=4), encoding='utf-8')
+        output = self.build()
+        self.assertIn("Rebuilding per-trace outputs of 1 of 4 input file(s)", output)
+        self.assertEqual(self.get_rewritten(), sorted(REPORTS + ['payment.xmi']))
+    
+    def test_changed_options_rebuild_everything(self):
+        self.build()
+        self.age_outputs()
+        
+        output = self.build('--compact')
+        self.assertIn("Rebuilding per-trace outputs of 4 of 4 input file(s)", output)
+        self.assertEqual(self.get_rewritten(), sorted(REPORTS + TRACE_FILES))
+    
+    def test_deleted_trace_output_rebuilds_only_that_file(self):
+        self.build()
+        contents = self.age_outputs()
+        
+        (self.output_dir / 'checkout.xmi').unlink()
+        output = self.build()
+        self.assertIn("Rebuilding per-trace outputs of 1 of 4 input file(s)", output)
+        self.assertNotIn("outputs of all traces together", output)
+        
+        # Reports of all traces stay as they were, not redone from one file
+        self.assertEqual(self.get_rewritten(), ['checkout.xmi'])
+        for name in REPORTS + TRACE_FILES:
+            self.assertEqual((self.output_dir / name).read_bytes(), contents[name], name)
+        
+        self.assertIn("All outputs are up to date", self.build())
+    
+    def test_superseded_trace_records_no_output(self):
+        # Both files write frontend.xmi; the later file in name order wins
+        shutil.copy(self.input_dir / 'traccia_checkout.json', self.input_dir / 'trace_frontend.json')
+        self.build()
+        
+        manifest = json.loads((self.output_dir / MANIFEST_FILENAME).read_text(encoding='utf-8'))
+        outputs = {Path(unit.split(':', 1)[1]).name: entry['outputs']
+                   for unit, entry in manifest['units'].items() if unit != CORPUS_UNIT}
+        self.assertEqual(outputs['trace_frontend.json'], ['frontend.xmi'])
+        self.assertEqual(outputs['taccia_frontend.json'], [])
+        self.assertEqual(outputs['traccia_checkout.json'], ['checkout.xmi'])
+
+
+if __name__ == '__main__':
+    unittest.main()
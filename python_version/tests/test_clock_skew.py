@@ -0,0 +1,150 @@
+"""Tests for the clock-skew adjustment of span timestamps."""
+
+import csv
+import json
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+from jaeger_uml_generator.models import Trace, Span, Process, Reference
+from jaeger_uml_generator.analyzer import adjust_clock_skew
+
+
+PACKAGE_DIR = Path(__file__).resolve().parents[1]
+
+
+def build_trace(server_start: int, server_duration: int = 400, server_host: str = '10.0.0.2',
+                server_kind: str = 'server') -> Trace:
+    """
+    Build a frontend request (1000-2000us) whose client span (1100-1900us)
+    calls a cart server span, which runs a local database query.
+    """
+    trace_id = 't1'
+    root = Span(trace_id, 'a', 'GET /', 1000, 1000, 'p1', [], {'span.kind': 'server'})
+    client = Span(trace_id, 'b', 'GetCart', 1100, 800, 'p1',
+                  [Reference('CHILD_OF', trace_id, 'a')], {'span.kind': 'client'})
+    server = Span(trace_id, 'c', 'GetCart', server_start, server_duration, 'p2',
+                  [Reference('CHILD_OF', trace_id, 'b')], {'span.kind': server_kind})
+    query = Span(trace_id, 'd', 'SELECT', server_start + 100, 100, 'p2',
+                 [Reference('CHILD_OF', trace_id, 'c')])
+    processes = {
+        'p1': Process('frontend', {'ip': '10.0.0.1'}),
+        'p2': Process('cart', {'ip': server_host})
+    }
+    return Trace(trace_id, [root, client, server, query], processes)
+
+
+def get_starts(trace: Trace):
+    """Get the start time of every span by span ID."""
+    return {span.span_id: span.start_time for span in trace.spans}
+
+
+class ClockSkewTest(unittest.TestCase):
+    
+    def test_child_starting_before_its_parent_is_centred(self):
+        trace = build_trace(server_start=500)
+        adjustment = adjust_clock_skew(trace)
+        
+        # Half of the 400us gap on each side: the server starts at 1300us;
+        # its same-host child keeps its position relative to it
+        self.assertEqual(get_starts(trace), {'a': 1000, 'b': 1100, 'c': 1300, 'd': 1400})
+        self.assertEqual(adjustment.span_offsets, {'c': 800, 'd': 800})
+        self.assertEqual(adjustment.host_offsets, {'10.0.0.2': 800})
+        # Time-ordered indexes are rebuilt from the shifted timestamps
+        self.assertEqual([span.span_id for span in trace.get_spans_sorted_by_time()], ['a', 'b', 'c', 'd'])
+    
+    def test_child_ending_after_its_parent_is_centred(self):
+        trace = build_trace(server_start=1800)
+        adjustment = adjust_clock_skew(trace)
+        
+        self.assertEqual(get_starts(trace), {'a': 1000, 'b': 1100, 'c': 1300, 'd': 1400})
+        self.assertEqual(adjustment.get_span_offset('c'), -500)
+    
+    def test_child_longer_than_its_parent_only_starts_with_it(self):
+        trace = build_trace(server_start=1000, server_duration=900)
+        adjust_clock_skew(trace)
+        self.assertEqual(get_starts(trace)['c'], 1100)
+    
+    def test_adjustment_is_applied_once(self):
+        trace = build_trace(server_start=500)
+        adjustment = adjust_clock_skew(trace)
+        self.assertIs(adjust_clock_skew(trace), adjustment)
+        self.assertEqual(get_starts(trace)['c'], 1300)
+    
+    def test_same_host_spans_are_never_adjusted(self):
+        # The cart process runs on the frontend's host: one clock
+        trace = build_trace(server_start=500, server_host='10.0.0.1')
+        adjustment = adjust_clock_skew(trace)
+        
+        self.assertEqual(get_starts(trace), {'a': 1000, 'b': 1100, 'c': 500, 'd': 600})
+        self.assertEqual(adjustment.adjusted_span_count, 0)
+        self.assertEqual(adjustment.host_offsets, {})
+    
+    def test_only_client_server_pairs_are_adjusted(self):
+        trace = build_trace(server_start=500, server_kind='producer')
+        self.assertEqual(adjust_clock_skew(trace).adjusted_span_count, 0)
+        self.assertEqual(get_starts(trace)['c'], 500)
+
+
+def build_skewed_input(path: Path):
+    """
+    Write a Jaeger JSON file of one request at 12:00:00.5 whose cart server
+    span was timed by a clock 1.5s behind, so it seems to start at 11:59:59.
+    """
+    start = 1_700_049_600_500_000
+    
+    def span(span_id, operation, start_time, duration, process_id, kind, parent=None):
+        return {
+            'traceID': 'skewed', 'spanID': span_id, 'operationName': operation,
+            'references': [{'refType': 'CHILD_OF', 'traceID': 'skewed', 'spanID': parent}] if parent else [],
+            'startTime': start_time, 'duration': duration, 'processID': process_id,
+            'tags': [{'key': 'span.kind', 'type': 'string', 'value': kind}]
+        }
+    
+    trace = {
+        'traceID': 'skewed',
+        'spans': [
+            span('a', 'GET /', start, 3000, 'p1', 'server'),
+            span('b', 'GetCart', start + 100, 2000, 'p1', 'client', 'a'),
+            span('c', 'GetCart', start - 1_500_000, 1000, 'p2', 'server', 'b')
+        ],
+        'processes': {
+            'p1': {'serviceName': 'frontend', 'tags': [{'key': 'ip', 'type': 'string', 'value': '10.0.0.1'}]},
+            'p2': {'serviceName': 'cart', 'tags': [{'key': 'ip', 'type': 'string', 'value': '10.0.0.2'}]}
+        }
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'data': [trace]}, f)
+
+
+class ClockSkewCommandLineTest(unittest.TestCase):
+    
+    def get_call_windows(self, extra_args):
+        """Run the window series on the skewed input; get the window of every call edge."""
+        with tempfile.TemporaryDirectory() as tmp:
+            input_dir = Path(tmp) / 'traces'
+            input_dir.mkdir()
+            build_skewed_input(input_dir / 'skewed.json')
+            output_dir = Path(tmp) / 'output'
+            subprocess.run(
+                [sys.executable, '-m', 'jaeger_uml_generator.main', '--input-dir', str(input_dir),
+                 '--output-dir', str(output_dir), '--window', '1s'] + extra_args,
+                cwd=PACKAGE_DIR, check=True, capture_output=True
+            )
+            with open(output_dir / 'window-series.csv', encoding='utf-8', newline='') as f:
+                return {(row['caller'], row['callee'], row['window_start'])
+                        for row in csv.DictReader(f) if row['count'] != '0'}
+    
+    def test_calls_are_adjusted_before_analysis(self):
+        # Centred in its client span, the call starts in the request's second
+        self.assertEqual(self.get_call_windows([]), {('frontend', 'cart', '2023-11-15T12:00:00+00:00')})
+    
+    def test_adjustment_can_be_turned_off(self):
+        self.assertEqual(self.get_call_windows(['--no-clock-skew-adjustment']),
+                         {('frontend', 'cart', '2023-11-15T11:59:59+00:00')})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+"""Tests for the sweep-line concurrency analysis."""
+
+import unittest
+
+from jaeger_uml_generator.models import Trace, Span, Process, Reference
+from jaeger_uml_generator.analyzer import ConcurrencyAnalyzer, sweep_intervals
+
+
+def build_request(trace_id: str, start: int, call_start: int, call_duration: int) -> Trace:
+    """
+    Build a 100us frontend request with a nested frontend span and one cart
+    call at the given offsets.
+    """
+    root = Span(trace_id, 'a', 'GET /', start, 100, 'p1')
+    render = Span(trace_id, 'b', 'render', start + 5, 90, 'p1', [Reference('CHILD_OF', trace_id, 'a')])
+    call = Span(trace_id, 'c', 'GetCart', start + call_start, call_duration, 'p2',
+                [Reference('CHILD_OF', trace_id, 'b')])
+    return Trace(trace_id, [root, render, call], {'p1': Process('frontend'), 'p2': Process('cart')})
+
+
+class SweepIntervalsTest(unittest.TestCase):
+    
+    def test_nested_intervals(self):
+        profile = sweep_intervals([(0, 100), (10, 50), (20, 30)], 200)
+        self.assertEqual(profile.max_concurrency, 3)
+        self.assertEqual(profile.total_time_us, 150)
+        self.assertEqual(profile.busy_time_us, 100)
+        self.assertAlmostEqual(profile.avg_concurrency, 0.75)
+        self.assertAlmostEqual(profile.avg_busy_concurrency, 1.5)
+        self.assertAlmostEqual(profile.utilization, 0.5)
+    
+    def test_touching_intervals_are_not_concurrent(self):
+        # Each request ends exactly when the next starts
+        profile = sweep_intervals([(20, 30), (0, 10), (10, 20)], 30)
+        self.assertEqual(profile.max_concurrency, 1)
+        self.assertEqual(profile.busy_time_us, 30)
+        self.assertAlmostEqual(profile.avg_concurrency, 1.0)
+        self.assertAlmostEqual(profile.utilization, 1.0)
+    
+    def test_disjoint_and_overlapping_intervals(self):
+        profile = sweep_intervals([(0, 10), (50, 60), (55, 70), (5, 5)], 100)
+        self.assertEqual(profile.span_count, 4)
+        self.assertEqual(profile.max_concurrency, 2)
+        self.assertEqual(profile.total_time_us, 35)
+        # Busy from 0 to 10 and from 50 to 70; the zero-length request adds nothing
+        self.assertEqual(profile.busy_time_us, 30)
+        self.assertAlmostEqual(profile.avg_concurrency, 0.35)
+        self.assertAlmostEqual(profile.avg_busy_concurrency, 35 / 30)
+        self.assertAlmostEqual(profile.throughput_per_s, 4 / 100e-6)
+    
+    def test_empty_window(self):
+        profile = sweep_intervals([], 0)
+        self.assertEqual((profile.max_concurrency, profile.avg_concurrency, profile.utilization), (0, 0.0, 0.0))
+
+
+class ConcurrencyAnalyzerTest(unittest.TestCase):
+    
+    def test_service_and_node_profiles(self):
+        traces = [
+            build_request('t1', 0, 10, 30),     # cart busy 10-40
+            build_request('t2', 20, 10, 30),    # cart busy 30-60: overlaps t1's call
+            build_request('t3', 300, 0, 100),   # touching nothing, window ends at 400
+        ]
+        analyzer = ConcurrencyAnalyzer(traces, {'frontend': 'web', 'cart': 'web'})
+        
+        # Nested frontend spans belong to the request already in flight
+        frontend = analyzer.get_profile_for_service('frontend')
+        self.assertEqual(frontend.span_count, 3)
+        self.assertEqual(frontend.max_concurrency, 2)
+        self.assertEqual(frontend.total_time_us, 300)
+        self.assertEqual(frontend.busy_time_us, 220)
+        self.assertEqual(frontend.window_us, 400)
+        self.assertAlmostEqual(frontend.avg_concurrency, 0.75)
+        
+        cart = analyzer.get_profile_for_service('cart')
+        self.assertEqual((cart.span_count, cart.max_concurrency, cart.busy_time_us), (3, 2, 150))
+        
+        # Both services on one node: requests entering either count
+        web = analyzer.get_profile_for_node('web')
+        self.assertEqual(web.span_count, 6)
+        self.assertEqual(web.max_concurrency, 4)
+        self.assertEqual(web.busy_time_us, 220)
+        self.assertEqual(web.entry_requests, {'frontend:GET /': 6})
+        self.assertAlmostEqual(web.get_scaled_throughput_per_s(lambda entry_operation: 0.5),
+                               2 * web.throughput_per_s)
+        self.assertEqual(set(analyzer.get_node_profiles()), {'web'})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,38 @@
+"""Tests for self-time and critical path analysis."""
+
+import sys
+import unittest
+
+from jaeger_uml_generator.models import Trace, Span, Process, Reference
+from jaeger_uml_generator.analyzer.critical_path import analyze_trace_timing
+
+
+def build_chain_trace(depth: int) -> Trace:
+    """Build a trace of nested spans: span i has start i and end 2 * depth - i."""
+    spans = []
+    for i in range(depth):
+        references = [Reference('CHILD_OF', 't1', f"s{i - 1}")] if i else []
+        spans.append(Span('t1', f"s{i}", f"op{i}", i, 2 * depth - 2 * i, 'p1', references))
+    return Trace('t1', spans, {'p1': Process('svc')})
+
+
+class CriticalPathTest(unittest.TestCase):
+    
+    def test_nested_spans_contribute_their_self_time(self):
+        analysis = analyze_trace_timing(build_chain_trace(5))
+        
+        self.assertEqual(analysis.critical_path, [f"s{i}" for i in range(5)])
+        self.assertEqual(set(analysis.critical_times.values()), {2})
+        self.assertEqual(analysis.get_critical_path_duration(), 10)
+        self.assertEqual(analysis.get_self_time('s0'), 2)
+    
+    def test_deep_trace_does_not_hit_the_recursion_limit(self):
+        depth = sys.getrecursionlimit() * 2
+        analysis = analyze_trace_timing(build_chain_trace(depth))
+        
+        self.assertEqual(len(analysis.critical_path), depth)
+        self.assertEqual(analysis.get_critical_path_duration(), 2 * depth)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+"""Tests that the generated model does not depend on the run."""
+
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+from jaeger_uml_generator.input import JsonFileReader
+
+
+PACKAGE_DIR = Path(__file__).resolve().parents[1]
+TRACES_DIR = PACKAGE_DIR.parent / 'traces'
+
+
+def build_model(output_dir: Path, hash_seed: str) -> bytes:
+    """Run the generator on the sample traces and get the unified model's bytes."""
+    env = dict(os.environ, PYTHONHASHSEED=hash_seed)
+    subprocess.run(
+        [sys.executable, '-m', 'jaeger_uml_generator.main', '--input-dir', str(TRACES_DIR),
+         '--output-dir', str(output_dir), '--merge-traces', '--no-build-cache'],
+        cwd=PACKAGE_DIR, env=env, check=True, capture_output=True
+    )
+    return (output_dir / 'UnifiedModel.xmi').read_bytes()
+
+
+class DeterministicOutputTest(unittest.TestCase):
+    
+    def test_input_files_are_read_in_name_order(self):
+        files = JsonFileReader(str(TRACES_DIR)).list_files()
+        self.assertEqual(files, sorted(files))
+    
+    def test_model_is_identical_across_runs(self):
+        # Different hash seeds change the iteration order of sets of strings
+        with tempfile.TemporaryDirectory() as tmp:
+            first = build_model(Path(tmp) / 'first', '1')
+            second = build_model(Path(tmp) / 'second', '2')
+        self.assertTrue(first)
+        self.assertEqual(first, second)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+"""Tests for the Space-Saving heavy-hitter counter."""
+
+import random
+import unittest
+from collections import Counter
+
+from jaeger_uml_generator.analyzer import SpaceSavingCounter
+
+
+class SpaceSavingCounterTest(unittest.TestCase):
+    
+    def test_counts_are_bounded_by_the_error(self):
+        rng = random.Random(7)
+        # Skewed stream: a few heavy items and a long tail
+        stream = [f"op{int(rng.paretovariate(1.2))}" for _ in range(20000)]
+        true_counts = Counter(stream)
+        counter = SpaceSavingCounter(20)
+        for item in stream:
+            counter.add(item)
+        
+        self.assertEqual(len(counter), 20)
+        self.assertEqual(counter.total, len(stream))
+        for item in counter:
+            count, error = counter.get_count(item), counter.get_error(item)
+            self.assertLessEqual(count - error, true_counts[item])
+            self.assertLessEqual(true_counts[item], count)
+        
+        # Every item more frequent than total / capacity is tracked
+        for item, count in true_counts.items():
+            if count > len(stream) / 20:
+                self.assertIn(item, counter)
+    
+    def test_add_returns_the_evicted_item(self):
+        counter = SpaceSavingCounter(2)
+        self.assertIsNone(counter.add('a'))
+        self.assertIsNone(counter.add('a'))
+        self.assertIsNone(counter.add('b'))
+        
+        # 'b' has the minimum count: 'c' replaces it and inherits its count
+        self.assertEqual(counter.add('c'), 'b')
+        self.assertEqual(counter.get_count('c'), 2)
+        self.assertEqual(counter.get_error('c'), 1)
+        self.assertNotIn('b', counter)
+        self.assertIsNone(counter.add('a'))
+        self.assertEqual(counter.top(), [('a', 3), ('c', 2)])
+    
+    def test_capacity_must_be_positive(self):
+        with self.assertRaises(ValueError):
+            SpaceSavingCounter(0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+"""Tests for the latency sketch and the trace set diff built on it."""
+
+import random
+import unittest
+
+from jaeger_uml_generator.models import Trace, Span, Process, Reference
+from jaeger_uml_generator.analyzer import LatencySketch, TraceAggregator, TraceSetDiff, mann_whitney_test
+
+
+def build_sketch(values) -> LatencySketch:
+    """Build a sketch of the given values."""
+    sketch = LatencySketch()
+    for value in values:
+        sketch.add(value)
+    return sketch
+
+
+def sample_latencies(seed: int, count: int, scale: float = 1.0):
+    """Draw log-normal latencies around 1ms, in microseconds."""
+    rng = random.Random(seed)
+    return [scale * rng.lognormvariate(7, 0.3) for _ in range(count)]
+
+
+def build_corpus(latencies) -> TraceAggregator:
+    """Aggregate one frontend-to-cart call per latency."""
+    traces = []
+    for i, latency in enumerate(latencies):
+        trace_id = f"t{i}"
+        root = Span(trace_id, 'a', 'GET /', 0, int(latency) + 100, 'p1')
+        call = Span(trace_id, 'b', 'GetCart', 10, int(latency), 'p2', [Reference('CHILD_OF', trace_id, 'a')])
+        traces.append(Trace(trace_id, [root, call], {'p1': Process('frontend'), 'p2': Process('cart')}))
+    return TraceAggregator(traces)
+
+
+class LatencySketchTest(unittest.TestCase):
+    
+    def test_quantiles_are_within_the_relative_accuracy(self):
+        rng = random.Random(3)
+        # Six orders of magnitude, plus some zero durations
+        values = [rng.paretovariate(0.5) for _ in range(5000)] + [0.0] * 50
+        sketch = build_sketch(values)
+        values.sort()
+        
+        for q in (0.0, 0.01, 0.25, 0.5, 0.9, 0.95, 0.99, 0.999, 1.0):
+            exact = values[int(q * (len(values) - 1))]
+            self.assertLessEqual(abs(sketch.quantile(q) - exact), sketch.relative_accuracy * exact,
+                                 f"quantile {q}")
+        self.assertEqual(sketch.quantile(0.005), 0.0)
+        self.assertEqual(LatencySketch().quantile(0.5), 0.0)
+    
+    def test_merge_is_associative(self):
+        parts = [sample_latencies(seed, 500, scale) for seed, scale in ((1, 1.0), (2, 3.0), (3, 0.2))]
+        
+        left = build_sketch(parts[0])
+        left.merge(build_sketch(parts[1]))
+        left.merge(build_sketch(parts[2]))
+        
+        right = build_sketch(parts[1])
+        right.merge(build_sketch(parts[2]))
+        merged = build_sketch(parts[0])
+        merged.merge(right)
+        
+        # Both equal the sketch of all values at once
+        whole = build_sketch(parts[0] + parts[1] + parts[2])
+        for sketch in (left, merged):
+            self.assertEqual(sketch.buckets, whole.buckets)
+            self.assertEqual((sketch.count, sketch.min, sketch.max), (whole.count, whole.min, whole.max))
+            self.assertAlmostEqual(sketch.mean, whole.mean)
+            self.assertEqual([sketch.quantile(q) for q in (0.5, 0.95, 0.99)],
+                             [whole.quantile(q) for q in (0.5, 0.95, 0.99)])
+        
+        with self.assertRaises(ValueError):
+            left.merge(LatencySketch(0.05))
+
+
+class MannWhitneyTest(unittest.TestCase):
+    
+    def test_identical_distributions_are_not_significant(self):
+        z_score, p_value = mann_whitney_test(build_sketch(sample_latencies(1, 2000)),
+                                             build_sketch(sample_latencies(2, 2000)))
+        self.assertGreater(p_value, 0.05)
+        
+        # Same values, all tied bucket by bucket
+        z_score, p_value = mann_whitney_test(build_sketch(sample_latencies(1, 500)),
+                                             build_sketch(sample_latencies(1, 500)))
+        self.assertAlmostEqual(z_score, 0.0)
+        self.assertAlmostEqual(p_value, 1.0)
+    
+    def test_shifted_distribution_is_significant(self):
+        baseline = build_sketch(sample_latencies(1, 500))
+        candidate = build_sketch(sample_latencies(2, 500, scale=1.2))
+        
+        z_score, p_value = mann_whitney_test(baseline, candidate)
+        self.assertGreater(z_score, 0)
+        self.assertLess(p_value, 1e-6)
+        
+        # Faster candidate: negative z
+        z_score, p_value = mann_whitney_test(candidate, baseline)
+        self.assertLess(z_score, 0)
+        self.assertLess(p_value, 1e-6)
+    
+    def test_empty_sketch_is_not_significant(self):
+        self.assertEqual(mann_whitney_test(LatencySketch(), build_sketch([1.0, 2.0])), (0.0, 1.0))
+
+
+class TraceSetDiffTest(unittest.TestCase):
+    
+    def test_shifts_below_the_minimum_are_not_flagged(self):
+        baseline = build_corpus(sample_latencies(1, 3000))
+        
+        # 5% slower: statistically significant with this many calls, but small
+        diff = TraceSetDiff(baseline, build_corpus(sample_latencies(2, 3000, scale=1.05)))
+        shift = diff.get_edge_shift('frontend', 'cart')
+        self.assertLess(shift.p_value, diff.alpha)
+        self.assertLess(abs(shift.get_relative_shift(0.5)), diff.min_relative_shift)
+        self.assertFalse(shift.significant)
+        self.assertFalse(diff.has_changes())
+        
+        # 25% slower: flagged as a regression
+        diff = TraceSetDiff(baseline, build_corpus(sample_latencies(2, 3000, scale=1.25)))
+        shift = diff.get_edge_shift('frontend', 'cart')
+        self.assertTrue(shift.significant)
+        self.assertTrue(shift.is_regression)
+        self.assertEqual(diff.get_regressions(), [shift])
+        self.assertIn("[REGRESSION] frontend -> cart", diff.format_report())
+
+
+if __name__ == '__main__':
+    unittest.main()
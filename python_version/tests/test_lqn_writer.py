@@ -0,0 +1,171 @@
+"""Tests for the LQN model written from the sample traces."""
+
+import unittest
+from pathlib import Path
+
+from jaeger_uml_generator.models import Trace, Span, Process, Reference
+from jaeger_uml_generator.input import JsonFileReader
+from jaeger_uml_generator.analyzer import CallModel
+from jaeger_uml_generator.renderer import LqnWriter
+
+
+TRACES_DIR = Path(__file__).resolve().parents[2] / 'traces'
+
+FRONTEND = 'frontend_frontend'
+PLACE_ORDER = 'checkoutservice_hipstershop_CheckoutService_PlaceOrder'
+CHECKOUT_CONVERT = 'checkoutservice_hipstershop_CurrencyService_Convert'
+CONVERT = 'currencyservice_grpc_hipstershop_CurrencyService_Convert'
+GET_CURRENCIES = 'currencyservice_grpc_hipstershop_CurrencyService_GetSupportedCurrencies'
+SEND_CONFIRMATION = 'emailservice__hipstershop_EmailService_SendOrderConfirmation'
+CHARGE = 'paymentservice_grpc_hipstershop_PaymentService_Charge'
+GET_PRODUCT = 'productcatalogservice_hipstershop_ProductCatalogService_GetProduct'
+LIST_PRODUCTS = 'productcatalogservice_hipstershop_ProductCatalogService_ListProducts'
+LIST_RECOMMENDATIONS = 'recommendationservice__hipstershop_RecommendationService_ListRecommendations'
+
+# Model of build_synthetic_traces(): a frontend request calling db Query
+# 1.5 times on average, measured as one user thinking 3.5ms
+SYNTHETIC_MODEL = """\
+# LQN model generated from 2 trace(s)
+G "shop" 1e-05 100 1 0.9 -1
+
+P 0
+p Users_cpu i
+p db_cpu f
+p frontend_cpu f
+-1
+
+T 0
+t frontend_GET___users r frontend_GET___request -1 Users_cpu z 3.5 m 1
+t db n db_Query -1 db_cpu
+t frontend n frontend_GET -1 frontend_cpu
+-1
+
+E 0
+s frontend_GET___request 0 -1
+y frontend_GET___request frontend_GET 1 -1
+# db: Query
+s db_Query 1 -1
+# frontend: GET /
+s frontend_GET 1.5 -1
+y frontend_GET db_Query 1.5 -1
+-1
+"""
+
+
+def build_synthetic_traces():
+    """Build two 3ms frontend requests 10ms apart, calling a 1ms db query twice and once."""
+    traces = []
+    for i, queries in enumerate((2, 1)):
+        trace_id = f"t{i}"
+        start = i * 10000
+        spans = [Span(trace_id, 'a', 'GET /', start, 3000, 'p1')]
+        for k in range(queries):
+            spans.append(Span(trace_id, f"q{k}", 'Query', start + 500 + k * 1100, 1000, 'p2',
+                              [Reference('CHILD_OF', trace_id, 'a')]))
+        traces.append(Trace(trace_id, spans, {'p1': Process('frontend', {}), 'p2': Process('db', {})}))
+    return traces
+
+
+def parse_model(model: str):
+    """Get the task lines, service demands and mean calls of an LQN model."""
+    tasks, demands, calls = {}, {}, {}
+    for line in model.splitlines():
+        fields = line.split()
+        if not fields:
+            continue
+        if fields[0] == 't':
+            tasks[fields[1]] = fields[2:]
+        elif fields[0] == 's':
+            demands[fields[1]] = float(fields[2])
+        elif fields[0] == 'y':
+            calls[(fields[1], fields[2])] = float(fields[3])
+    return tasks, demands, calls
+
+
+class LqnWriterTest(unittest.TestCase):
+    
+    @classmethod
+    def setUpClass(cls):
+        traces = JsonFileReader(str(TRACES_DIR)).read_traces()
+        cls.call_model = CallModel(traces)
+        cls.workloads = {
+            entry_operation: profile.get_closed_parameters()
+            for entry_operation, profile in cls.call_model.get_workload_profiles().items()
+        }
+    
+    def test_model_of_sample_traces(self):
+        model = LqnWriter().generate(self.call_model.aggregator, self.workloads)
+        tasks, demands, calls = parse_model(model)
+        
+        # Three traces enter at the frontend, one at a checkout client span;
+        # the orphan currency and payment spans are no requests of their own
+        reference_tasks = sorted(name for name, fields in tasks.items() if fields[0] == 'r')
+        self.assertEqual(reference_tasks, ['checkoutservice_hipstershop_CurrencyService_Convert_users',
+                                           'frontend_frontend_users'])
+        self.assertEqual(tasks['frontend'][:3], ['n', FRONTEND, '-1'])
+        self.assertEqual(tasks['currencyservice'][:4], ['n', CONVERT, GET_CURRENCIES, '-1'])
+        self.assertEqual(tasks['productcatalogservice'][:4], ['n', GET_PRODUCT, LIST_PRODUCTS, '-1'])
+        self.assertEqual(tasks['checkoutservice'][:4], ['n', PLACE_ORDER, CHECKOUT_CONVERT, '-1'])
+        self.assertEqual(tasks['paymentservice'][:3], ['n', CHARGE, '-1'])
+        
+        # Mean calls per invocation of the caller
+        self.assertEqual(calls, {
+            ('checkoutservice_hipstershop_CurrencyService_Convert_request', CHECKOUT_CONVERT): 1.0,
+            ('frontend_frontend_request', FRONTEND): 1.0,
+            # 1 order, 11 product lookups, 1 listing and 2 recommendations in 3 requests
+            (FRONTEND, PLACE_ORDER): round(1 / 3, 6),
+            (FRONTEND, GET_PRODUCT): round(11 / 3, 5),
+            (FRONTEND, LIST_PRODUCTS): round(1 / 3, 6),
+            (FRONTEND, LIST_RECOMMENDATIONS): round(2 / 3, 6),
+            (PLACE_ORDER, GET_PRODUCT): 3.0,
+            (PLACE_ORDER, SEND_CONFIRMATION): 1.0,
+            (LIST_RECOMMENDATIONS, LIST_PRODUCTS): 1.0
+        })
+        
+        # Mean self time per invocation (ms) of the leaf entries: span durations
+        self.assertAlmostEqual(demands[CHECKOUT_CONVERT], 1.031)
+        self.assertAlmostEqual(demands[CHARGE], 0.213)
+        self.assertAlmostEqual(demands[SEND_CONFIRMATION], 0.166)
+        self.assertAlmostEqual(demands[CONVERT], 0.794 / 11, places=6)
+        self.assertAlmostEqual(demands[GET_CURRENCIES], (0.139 + 0.125 + 0.172) / 3, places=6)
+        self.assertAlmostEqual(demands[GET_PRODUCT], 0.691 / 14, places=6)
+        self.assertAlmostEqual(demands[LIST_PRODUCTS], (0.082 + 0.050 + 0.103) / 3, places=6)
+        self.assertEqual(demands['frontend_frontend_request'], 0.0)
+    
+    def test_roots_without_workload_get_no_reference_task(self):
+        workloads = {'frontend:frontend': self.workloads['frontend:frontend']}
+        model = LqnWriter().generate(self.call_model.aggregator, workloads)
+        tasks, demands, calls = parse_model(model)
+        
+        self.assertEqual(sorted(name for name, fields in tasks.items() if fields[0] == 'r'),
+                         ['frontend_frontend_users'])
+        self.assertNotIn('checkoutservice_hipstershop_CurrencyService_Convert_request', demands)
+        # The entry itself stays on its service's task
+        self.assertIn(CHECKOUT_CONVERT, tasks['checkoutservice'])
+        
+        model = LqnWriter().generate(self.call_model.aggregator, {})
+        self.assertNotIn('Users_cpu', model)
+
+    
+    def test_model_of_synthetic_traces_matches_golden_model(self):
+        call_model = CallModel(build_synthetic_traces())
+        workloads = {
+            entry_operation: profile.get_closed_parameters()
+            for entry_operation, profile in call_model.get_workload_profiles().items()
+        }
+        model = LqnWriter('shop').generate(call_model.aggregator, workloads)
+        self.assertEqual(model, SYNTHETIC_MODEL)
+        
+        # Parsed back: tasks with their entries, the reference task of the
+        # profiled root and the mean synchronous calls
+        tasks, demands, calls = parse_model(model)
+        self.assertEqual(tasks['frontend_GET___users'][:3], ['r', 'frontend_GET___request', '-1'])
+        self.assertEqual(tasks['frontend'][:3], ['n', 'frontend_GET', '-1'])
+        self.assertEqual(tasks['db'][:3], ['n', 'db_Query', '-1'])
+        self.assertEqual(demands, {'frontend_GET___request': 0.0, 'db_Query': 1.0, 'frontend_GET': 1.5})
+        self.assertEqual(calls, {('frontend_GET___request', 'frontend_GET'): 1.0,
+                                 ('frontend_GET', 'db_Query'): 1.5})
+
+
+if __name__ == '__main__':
+    unittest.main()
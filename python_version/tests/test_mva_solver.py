@@ -0,0 +1,106 @@
+"""Tests for the MVA capacity model against closed-form closed-network results."""
+
+import unittest
+from pathlib import Path
+
+from jaeger_uml_generator.input import JsonFileReader
+from jaeger_uml_generator.analyzer import CallModel, CapacityModel
+
+
+TRACES_DIR = Path(__file__).resolve().parents[2] / 'traces'
+
+
+def machine_repairman_throughput(users: int, servers: int, demand: float, think_time: float) -> float:
+    """
+    Get the exact throughput (per second) of the M/M/c//N machine repairman model.
+    
+    Args:
+        users: Number of users N
+        servers: Number of servers c
+        demand: Mean service time per request (ms)
+        think_time: Mean think time per user (ms)
+    
+    Returns:
+        Requests completed per second
+    """
+    # Birth-death chain over the number of users at the station
+    weights = [1.0]
+    for n in range(1, users + 1):
+        weights.append(weights[-1] * (users - n + 1) * demand / (think_time * min(n, servers)))
+    busy = sum(weight * min(n, servers) for n, weight in enumerate(weights)) / sum(weights)
+    return busy / demand * 1000.0
+
+
+def single_station(users: int, servers: int) -> CapacityModel:
+    """Build a one-class, one-station network with 1ms demand and think time."""
+    return CapacityModel(['request'], ['service'], [[1.0]], [users], [1.0], servers=[servers])
+
+
+class CapacityModelTest(unittest.TestCase):
+    
+    def test_single_server_matches_machine_repairman(self):
+        model = single_station(5, 1)
+        expected = machine_repairman_throughput(5, 1, 1.0, 1.0)
+        
+        exact = model.solve(1.0, 1.0, 'exact')
+        self.assertAlmostEqual(exact.throughputs[0], expected, places=6)
+        self.assertAlmostEqual(exact.utilizations[0], expected / 1000.0, places=9)
+        # Little's law over the whole cycle: N = X * (R + Z)
+        self.assertAlmostEqual(exact.throughputs[0] / 1000.0 * (exact.response_times_ms[0] + 1.0), 5.0)
+        
+        approximate = model.solve(1.0, 1.0, 'approximate')
+        self.assertAlmostEqual(approximate.throughputs[0], expected, delta=0.05 * expected)
+    
+    def test_replicas_match_multi_server_machine_repairman(self):
+        for users, servers in [(3, 2), (10, 3)]:
+            model = single_station(users, servers)
+            expected = machine_repairman_throughput(users, servers, 1.0, 1.0)
+            for method, tolerance in [('exact', 0.1), ('approximate', 0.12)]:
+                result = model.solve(1.0, 1.0, method)
+                self.assertAlmostEqual(result.throughputs[0], expected, delta=tolerance * expected,
+                                       msg=f"N={users}, c={servers}, {method}")
+                # Never above the bounds of N users or c busy servers
+                self.assertLessEqual(result.throughputs[0], min(users / 2.0, servers) * 1000.0 + 1e-6)
+            
+            # A single server would be the bottleneck well below that
+            single = single_station(users, 1).solve(1.0, 1.0, 'exact')
+            self.assertLess(single.throughputs[0], 0.8 * expected)
+    
+    def test_replicas_at_light_and_heavy_load(self):
+        # One user never queues: X = 1 / (D + Z) whatever the servers
+        for method in ('exact', 'approximate'):
+            result = single_station(1, 3).solve(1.0, 1.0, method)
+            self.assertAlmostEqual(result.throughputs[0], 500.0)
+            self.assertAlmostEqual(result.response_times_ms[0], 1.0)
+        
+        # Saturated: c servers complete c / D requests, each server fully busy
+        exact = single_station(40, 2).solve(1.0, 1.0, 'exact')
+        self.assertAlmostEqual(exact.throughputs[0], 2000.0, places=3)
+        self.assertAlmostEqual(exact.utilizations[0], 1.0, places=6)
+        approximate = single_station(40, 2).solve(1.0, 1.0, 'approximate')
+        self.assertAlmostEqual(approximate.throughputs[0], 2000.0, delta=20.0)
+    
+    def test_replicas_of_sample_traces(self):
+        call_model = CallModel(JsonFileReader(str(TRACES_DIR)).read_traces())
+        workloads = {
+            entry_operation: profile.get_closed_parameters()
+            for entry_operation, profile in call_model.get_workload_profiles().items()
+        }
+        single = CapacityModel.from_aggregator(call_model.aggregator, workloads)
+        replicated = CapacityModel.from_aggregator(call_model.aggregator, workloads, {'frontend': 3})
+        
+        frontend = replicated.stations.index('frontend')
+        self.assertEqual(replicated.servers[frontend], 3)
+        self.assertEqual(sum(replicated.servers), len(replicated.stations) + 2)
+        self.assertEqual(single.servers, [1] * len(single.stations))
+        
+        # Same demands, a third of the load per frontend server
+        single_result = single.solve(1.0, 1.0, 'exact')
+        replicated_result = replicated.solve(1.0, 1.0, 'exact')
+        self.assertGreaterEqual(replicated_result.throughputs[0], single_result.throughputs[0])
+        self.assertLess(replicated_result.utilizations[frontend], single_result.utilizations[frontend] / 2)
+        self.assertIn("(3 servers)", replicated.format_report([(1.0, 1.0, replicated_result)], top_stations=20))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+"""Tests for the replica and load annotations of deployment nodes."""
+
+import unittest
+import xml.etree.ElementTree as ET
+
+from jaeger_uml_generator.models import Trace, Span, Process, Reference
+from jaeger_uml_generator.analyzer import CallModel
+from jaeger_uml_generator.generators import UnifiedXmiGenerator
+
+
+XMI_ID = '{http://www.omg.org/spec/XMI/20131001}id'
+XMI_TYPE = '{http://www.omg.org/spec/XMI/20131001}type'
+
+
+def build_request(index: int, start: int, call_offset: int, call_duration: int, cart_pod: str) -> Trace:
+    """Build a 1ms frontend request calling one cart replica at an offset."""
+    trace_id = f"t{index}"
+    root = Span(trace_id, 'a', 'GET /', start, 1000, 'p1')
+    call = Span(trace_id, 'b', 'GetCart', start + call_offset, call_duration, 'p2',
+                [Reference('CHILD_OF', trace_id, 'a')], {'span.kind': 'server'})
+    processes = {
+        'p1': Process('frontend', {'hostname': 'frontend-5f7c9d8b6a-q2w3e'}),
+        'p2': Process('cart', {'hostname': f"cart-7d5c8f9b8a-{cart_pod}"})
+    }
+    return Trace(trace_id, [root, call], processes)
+
+
+class NodeResourcesTest(unittest.TestCase):
+    
+    @classmethod
+    def setUpClass(cls):
+        # Two requests 5ms apart, served by different cart replicas
+        cls.traces = [
+            build_request(0, 0, 100, 700, 'xk7pt'),
+            build_request(1, 5000, 150, 600, 'ab12c')
+        ]
+        cls.call_model = CallModel(cls.traces)
+    
+    def test_replicas_busy_time_and_overheads(self):
+        resources = self.call_model.get_node_resources()
+        self.assertEqual(set(resources), {'frontend', 'cart'})
+        
+        cart = resources['cart']
+        self.assertEqual(cart.instances, {'cart-7d5c8f9b8a-xk7pt', 'cart-7d5c8f9b8a-ab12c'})
+        self.assertEqual(cart.replicas, 2)
+        self.assertEqual(cart.busy_time_us, 1300)
+        self.assertEqual(cart.window_us, 6000)
+        self.assertAlmostEqual(cart.utilization, 1300 / (6000 * 2))
+        self.assertIsNone(cart.comm_tx_ms)
+        
+        # Self time of the requests; gaps before and after each call
+        frontend = resources['frontend']
+        self.assertEqual(frontend.replicas, 1)
+        self.assertEqual(frontend.busy_time_us, 300 + 400)
+        self.assertEqual(frontend.call_count, 2)
+        self.assertAlmostEqual(frontend.comm_tx_ms, (0.100 + 0.150) / 2)
+        self.assertAlmostEqual(frontend.comm_rcv_ms, (0.200 + 0.250) / 2)
+        
+        self.assertEqual(self.call_model.get_service_replicas(), {'frontend': 1, 'cart': 2})
+    
+    def test_ga_exec_host_annotations(self):
+        generator = UnifiedXmiGenerator('papyrus')
+        root = ET.fromstring(generator.generate(self.traces, call_model=self.call_model).encode('utf-8'))
+        
+        nodes = {element.get('name'): element for element in root.iter('packagedElement')
+                 if element.get(XMI_TYPE) == 'uml:Node'}
+        hosts = {element.get('base_Classifier'): element
+                 for element in root.iter() if element.tag.endswith('}GaExecHost')}
+        
+        cart = hosts[nodes['cart'].get(XMI_ID)]
+        self.assertEqual(cart.get('resMult'), '2')
+        self.assertEqual(cart.get('utilization'), '(value=0.1083,source=meas)')
+        self.assertEqual(cart.get('throughput'), '(value=333.333,unit=Hz,source=meas)')
+        self.assertIsNone(cart.get('commTxOvh'))
+        self.assertIn("Resources: replicas=2; busy time=1.300ms; utilization per replica=0.1083",
+                      [comment.findtext('body') for comment in nodes['cart'].iter('ownedComment')])
+        
+        frontend = hosts[nodes['frontend'].get(XMI_ID)]
+        self.assertIsNone(frontend.get('resMult'))
+        self.assertEqual(frontend.get('utilization'), '(value=0.1167,source=meas)')
+        self.assertEqual(frontend.get('commTxOvh'), '(value=0.125,unit=ms)')
+        self.assertEqual(frontend.get('commRcvOvh'), '(value=0.225,unit=ms)')
+
+
+if __name__ == '__main__':
+    unittest.main()
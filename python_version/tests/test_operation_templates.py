@@ -0,0 +1,78 @@
+"""Tests for operation name templating and cleaning."""
+
+import unittest
+
+from jaeger_uml_generator.models import Trace, Span, Process
+from jaeger_uml_generator.utils import (
+    OperationNameTemplater,
+    parse_operation_pattern,
+    clean_operation_name,
+    extract_simple_operation_name
+)
+
+
+class OperationNameTemplaterTest(unittest.TestCase):
+    
+    def test_variable_segments_collapse_into_one_template(self):
+        templater = OperationNameTemplater()
+        names = [
+            "GET /api/users/8812/orders/55",
+            "GET /api/users/17/orders/3?expand=items",
+            "GET /api/users/9/orders/123456",
+        ]
+        self.assertEqual({templater.template(name) for name in names}, {"GET /api/users/{id}/orders/{id}"})
+        
+        self.assertEqual(templater.template("GET /carts/3f2a9c1e-7b4d-4e8f-a1b2-c3d4e5f60718"),
+                         "GET /carts/{uuid}")
+        self.assertEqual(templater.template("/sessions/9f86d081884c7d65/items"), "/sessions/{hex}/items")
+    
+    def test_low_cardinality_names_are_unchanged(self):
+        templater = OperationNameTemplater()
+        for name in ("hipstershop.CartService/GetCart", "GET /api/users", "/api/v2/products",
+                     "/decade/deadbeef", "/api/{id}/items", "frontend", ""):
+            self.assertEqual(templater.template(name), name)
+    
+    def test_user_patterns_are_applied_first(self):
+        templater = OperationNameTemplater([parse_operation_pattern(r"user-[a-z]+=user-{name}")])
+        self.assertEqual(templater.template("GET /profiles/user-alice/posts/42"),
+                         "GET /profiles/user-{name}/posts/{id}")
+        
+        with self.assertRaises(ValueError):
+            parse_operation_pattern("no-replacement")
+        with self.assertRaises(ValueError):
+            parse_operation_pattern("([unbalanced=x")
+        self.assertEqual(parse_operation_pattern("a=b=c"), ("a=b", "c"))
+    
+    def test_template_traces_renames_spans(self):
+        spans = [Span('t1', f"s{i}", f"GET /orders/{i}", i, 10, 'p1') for i in range(5)]
+        spans.append(Span('t1', 'home', "GET /", 9, 10, 'p1'))
+        trace = Trace('t1', spans, {'p1': Process('frontend')})
+        
+        self.assertEqual(OperationNameTemplater().template_traces([trace]), 5)
+        self.assertEqual({span.operation_name for span in trace.spans}, {"GET /orders/{id}", "GET /"})
+    
+    def test_cache_is_bounded(self):
+        templater = OperationNameTemplater(cache_size=2)
+        for i in range(5):
+            self.assertEqual(templater.template(f"/orders/{i}"), "/orders/{id}")
+            self.assertLessEqual(len(templater._cache), 2)
+
+
+class OperationNameCleaningTest(unittest.TestCase):
+    
+    def test_placeholders_keep_their_braces(self):
+        self.assertEqual(clean_operation_name("GET /api/users/{id}/orders"), "/api/users/{id}/orders")
+        self.assertEqual(clean_operation_name("POST /cart items"), "/cart_items")
+    
+    def test_trailing_placeholders_are_dropped_from_simple_names(self):
+        self.assertEqual(extract_simple_operation_name("GET /api/users/{id}"), "users")
+        self.assertEqual(extract_simple_operation_name("GET /api/users/{id}/orders/{id}"), "orders")
+        self.assertEqual(extract_simple_operation_name("/carts/{uuid}/{id}/"), "carts")
+        self.assertEqual(extract_simple_operation_name("/{id}"), "unknown")
+        self.assertEqual(extract_simple_operation_name("hipstershop.CartService/EmptyCart"), "EmptyCart")
+        self.assertEqual(extract_simple_operation_name("grpc.hipstershop.CurrencyService/Convert"), "Convert")
+        self.assertEqual(extract_simple_operation_name("frontend"), "frontend")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+"""Tests for the call graph simulator against queueing theory and the MVA model."""
+
+import math
+import random
+import unittest
+from typing import List, Optional
+
+from jaeger_uml_generator.models import Trace, Span, Process, Reference
+from jaeger_uml_generator.analyzer import CallModel, CapacityModel, CallGraphSimulator
+
+
+# Requests per simulation run and traces per synthetic corpus
+REQUESTS = 100000
+SAMPLES = 2000
+
+
+def exponential_sample(mean_us: float) -> List[int]:
+    """Get SAMPLES durations (microseconds) at evenly spaced quantiles of an exponential distribution."""
+    durations = [max(1, round(-mean_us * math.log(1.0 - (i + 0.5) / SAMPLES))) for i in range(SAMPLES)]
+    random.Random(1).shuffle(durations)
+    return durations
+
+
+def build_traces(db_mean_us: float, frontend_mean_us: Optional[float] = None) -> List[Trace]:
+    """
+    Build traces with exponentially distributed self times.
+    
+    Args:
+        db_mean_us: Mean self time of the db 'Query' entry
+        frontend_mean_us: Mean self time of a frontend 'GET /' entry calling
+                          Query once, or None for requests entering at Query
+    
+    Returns:
+        List of traces
+    """
+    traces = []
+    frontend_times = exponential_sample(frontend_mean_us) if frontend_mean_us else None
+    for i, db_time in enumerate(exponential_sample(db_mean_us)):
+        trace_id = f"t{i}"
+        start = i * 10000
+        if frontend_times is None:
+            spans = [Span(trace_id, 'a', 'Query', start, db_time, 'p1')]
+            traces.append(Trace(trace_id, spans, {'p1': Process('db', {})}))
+            continue
+        frontend_time = frontend_times[i]
+        spans = [
+            Span(trace_id, 'a', 'GET /', start, frontend_time + db_time, 'p1'),
+            Span(trace_id, 'b', 'Query', start + frontend_time, db_time, 'p2',
+                 [Reference('CHILD_OF', trace_id, 'a')])
+        ]
+        traces.append(Trace(trace_id, spans, {'p1': Process('frontend', {}), 'p2': Process('db', {})}))
+    return traces
+
+
+class CallGraphSimulatorTest(unittest.TestCase):
+    
+    @classmethod
+    def setUpClass(cls):
+        # Exponential service times with a mean of 1ms
+        cls.single_tier = CallModel(build_traces(1000.0)).aggregator
+        cls.two_tier = CallModel(build_traces(1000.0, 400.0)).aggregator
+    
+    def test_single_server_matches_mm1(self):
+        for rate in (500.0, 800.0):
+            result = CallGraphSimulator(self.single_tier, {'db:Query': rate}).run(REQUESTS, seed=1)
+            utilization = rate / 1000.0
+            self.assertAlmostEqual(result.utilizations[0], utilization, delta=0.02)
+            
+            # Response time is exponential with rate mu - lambda
+            response_time_us = 1000.0 / (1.0 - utilization)
+            latencies = result.latencies[0]
+            self.assertEqual(latencies.count, REQUESTS - REQUESTS // 10)
+            self.assertAlmostEqual(latencies.mean, response_time_us, delta=0.08 * response_time_us)
+            self.assertAlmostEqual(latencies.quantile(0.5), math.log(2) * response_time_us,
+                                   delta=0.08 * response_time_us)
+    
+    def test_replicas_match_mmc(self):
+        # M/M/2 at 1500 requests per second: offered load a = 1.5, rho = 0.75
+        result = CallGraphSimulator(self.single_tier, {'db:Query': 1500.0}, {'db': 2}).run(REQUESTS, seed=1)
+        self.assertAlmostEqual(result.utilizations[0], 0.75, delta=0.02)
+        
+        # Erlang C probability of waiting, then W = C / (c * mu - lambda) + 1 / mu
+        offered, servers, rho = 1.5, 2, 0.75
+        tail = offered ** servers / math.factorial(servers) / (1.0 - rho)
+        waiting = tail / (sum(offered ** k / math.factorial(k) for k in range(servers)) + tail)
+        response_time_us = 1000.0 * (waiting / (servers - offered) + 1.0)
+        self.assertAlmostEqual(result.latencies[0].mean, response_time_us, delta=0.08 * response_time_us)
+    
+    def test_call_graph_matches_mva(self):
+        rate = 600.0
+        simulator = CallGraphSimulator(self.two_tier, {'frontend:GET /': rate})
+        result = simulator.run(REQUESTS, seed=1)
+        
+        # Open load approximated by a closed MVA model with many users thinking
+        # long enough to arrive at the same rate
+        users = 200
+        model = CapacityModel.from_aggregator(self.two_tier, {'frontend:GET /': (users, users / rate * 1000.0)})
+        solution = model.solve(1.0, 1.0, 'exact')
+        self.assertEqual(model.stations, simulator.stations)
+        self.assertAlmostEqual(solution.throughputs[0], rate, delta=0.02 * rate)
+        for k, station in enumerate(model.stations):
+            self.assertAlmostEqual(result.utilizations[k], solution.utilizations[k], delta=0.02, msg=station)
+        
+        # Both near the open product-form result 1 / (1 - 0.6) + 0.4 / (1 - 0.24)
+        response_time_ms = 1.0 / (1.0 - 0.6) + 0.4 / (1.0 - 0.24)
+        self.assertAlmostEqual(solution.response_times_ms[0], response_time_ms, delta=0.05 * response_time_ms)
+        self.assertAlmostEqual(result.latencies[0].mean / 1000.0, solution.response_times_ms[0],
+                               delta=0.08 * response_time_ms)
+    
+    def test_seeded_runs_are_reproducible(self):
+        simulator = CallGraphSimulator(self.two_tier, {'frontend:GET /': 600.0})
+        first = simulator.run(2000, seed=7)
+        second = simulator.run(2000, seed=7)
+        self.assertEqual(first.utilizations, second.utilizations)
+        self.assertEqual(first.latencies[0].mean, second.latencies[0].mean)
+        self.assertEqual(first.requests, 2000)
+
+
+if __name__ == '__main__':
+    unittest.main()
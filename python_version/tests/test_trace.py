@@ -0,0 +1,51 @@
+"""Tests for the lazily built lookup indexes of a trace."""
+
+import unittest
+
+from jaeger_uml_generator.models import Trace, Span, Process, Reference
+
+
+def build_trace() -> Trace:
+    """Build a trace whose spans are listed out of start order."""
+    def child(span_id: str, start: int) -> Span:
+        return Span('t', span_id, f"op-{span_id}", start, 10, 'p1', [Reference('CHILD_OF', 't', 'root')])
+    
+    root = Span('t', 'root', 'GET /', 0, 100, 'p1')
+    return Trace('t', [child('c', 30), root, child('a', 10), child('b', 20)], {'p1': Process('frontend')})
+
+
+class TraceIndexTest(unittest.TestCase):
+    
+    def test_child_spans_are_sorted_by_start_time(self):
+        trace = build_trace()
+        self.assertEqual([span.span_id for span in trace.get_child_spans('root')], ['a', 'b', 'c'])
+        self.assertEqual(trace.get_child_spans('a'), [])
+        
+        # A copy: callers cannot change the index
+        trace.get_child_spans('root').clear()
+        self.assertEqual(len(trace.get_child_spans('root')), 3)
+    
+    def test_first_of_duplicate_span_ids_wins(self):
+        trace = build_trace()
+        duplicate = Span('t', 'a', 'duplicate', 50, 10, 'p1')
+        trace.spans.append(duplicate)
+        trace.invalidate_indexes()
+        
+        self.assertEqual(trace.get_span('a').operation_name, 'op-a')
+        self.assertIsNone(trace.get_span('missing'))
+    
+    def test_indexes_are_rebuilt_after_invalidation(self):
+        trace = build_trace()
+        self.assertIsNone(trace.get_span('d'))
+        
+        trace.spans.append(Span('t', 'd', 'op-d', 5, 10, 'p1', [Reference('CHILD_OF', 't', 'root')]))
+        # Built on first use and kept until invalidated
+        self.assertIsNone(trace.get_span('d'))
+        
+        trace.invalidate_indexes()
+        self.assertEqual(trace.get_span('d').operation_name, 'op-d')
+        self.assertEqual([span.span_id for span in trace.get_child_spans('root')], ['d', 'a', 'b', 'c'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+"""Tests for the bounded entry statistics of the trace aggregator."""
+
+import unittest
+
+from jaeger_uml_generator.models import Trace, Span, Process, Reference
+from jaeger_uml_generator.analyzer import TraceAggregator, WorkloadCharacterizer, CapacityModel
+
+
+def build_call(index: int, operation: str) -> Trace:
+    """Build a trace of a frontend operation calling cart:GetCart."""
+    trace_id = f"t{index}"
+    root = Span(trace_id, 'a', operation, 0, 100, 'p1')
+    call = Span(trace_id, 'b', 'GetCart', 10, 50, 'p2', [Reference('CHILD_OF', trace_id, 'a')])
+    return Trace(trace_id, [root, call], {'p1': Process('frontend'), 'p2': Process('cart')})
+
+
+class TraceAggregatorEntriesTest(unittest.TestCase):
+    
+    def test_entry_statistics(self):
+        aggregator = TraceAggregator([build_call(i, 'GET /') for i in range(3)])
+        
+        self.assertEqual(aggregator.get_entries(), [('cart', 'GetCart'), ('frontend', 'GET /')])
+        self.assertEqual(aggregator.get_root_entries(), {('frontend', 'GET /'): 3})
+        self.assertEqual(aggregator.get_entry_calls(('frontend', 'GET /')), {('cart', 'GetCart'): 1.0})
+        self.assertEqual(aggregator.get_entry_demand(('frontend', 'GET /')), 50.0)
+    
+    def test_orphan_spans_are_not_roots(self):
+        # The currency call's parent was not recorded
+        traces = []
+        for i in range(3):
+            call = build_call(i, 'GET /')
+            orphan = Span(call.trace_id, 'c', 'Convert', 20, 10, 'p3',
+                          [Reference('CHILD_OF', call.trace_id, 'missing')])
+            traces.append(Trace(call.trace_id, call.spans + [orphan],
+                                dict(call.processes, p3=Process('currency'))))
+        aggregator = TraceAggregator(traces)
+        
+        self.assertEqual(aggregator.get_root_entries(), {('frontend', 'GET /'): 3})
+        self.assertIn(('currency', 'Convert'), aggregator.get_entries())
+        
+        # Same roots as the measured workload profiles
+        characterizer = WorkloadCharacterizer()
+        characterizer.add_traces(traces)
+        profiles = characterizer.finish()
+        self.assertEqual(set(profiles), {'frontend:GET /'})
+        
+        workloads = {name: profile.get_closed_parameters() for name, profile in profiles.items()}
+        model = CapacityModel.from_aggregator(aggregator, workloads)
+        self.assertEqual(model.classes, ['frontend:GET /'])
+        self.assertEqual(model.unprofiled, [])
+        
+        # Roots without a measured workload are left out, not defaulted
+        model = CapacityModel.from_aggregator(aggregator, {})
+        self.assertEqual(model.classes, [])
+        self.assertEqual(model.unprofiled, ['frontend:GET /'])
+    
+    def test_evicted_entries_are_dropped_from_the_call_graph(self):
+        # One entry per service: every new operation evicts the previous one
+        aggregator = TraceAggregator([build_call(0, 'GET /')], operation_capacity=1)
+        self.assertEqual(aggregator.entry_callers[('cart', 'GetCart')], {('frontend', 'GET /')})
+        
+        aggregator.add_trace(build_call(1, 'POST /'))
+        self.assertEqual(aggregator.get_entries(), [('cart', 'GetCart'), ('frontend', 'POST /')])
+        self.assertNotIn(('frontend', 'GET /'), aggregator.entry_calls)
+        self.assertNotIn(('frontend', 'GET /'), aggregator.root_entries)
+        self.assertEqual(aggregator.entry_callers[('cart', 'GetCart')], {('frontend', 'POST /')})
+        
+        # An evicted callee disappears from its callers' calls
+        evicting = build_call(2, 'POST /')
+        evicting.spans[1].operation_name = 'GetItems'
+        aggregator.add_trace(evicting)
+        self.assertNotIn(('cart', 'GetCart'), aggregator.entry_callers)
+        self.assertNotIn(('cart', 'GetCart'), aggregator.entry_self_times)
+        self.assertEqual(list(aggregator.get_entry_calls(('frontend', 'POST /'))), [('cart', 'GetItems')])
+    
+    def test_distinct_entries_are_bounded_by_the_operation_capacity(self):
+        # Raw ids in operation names: every request has its own entry
+        traces = [build_call(i, f"GET /orders/{i}") for i in range(500)]
+        traces += [build_call(1000 + i, 'GET /') for i in range(50)]
+        aggregator = TraceAggregator(traces, operation_capacity=10)
+        
+        frontend_entries = [entry for entry in aggregator.get_entries() if entry[0] == 'frontend']
+        self.assertEqual(len(frontend_entries), 10)
+        self.assertIn(('frontend', 'GET /'), frontend_entries)
+        self.assertLessEqual(len(aggregator.root_entries), 10)
+        self.assertLessEqual(len(aggregator.entry_self_times), 11)
+        self.assertLessEqual(len(aggregator.entry_calls), 10)
+        self.assertLessEqual(len(aggregator.entry_callers[('cart', 'GetCart')]), 10)
+        for entry in aggregator.get_entries():
+            self.assertLessEqual(set(aggregator.get_entry_calls(entry)), set(aggregator.get_entries()))
+
+
+if __name__ == '__main__':
+    unittest.main()
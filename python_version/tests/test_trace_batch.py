@@ -0,0 +1,83 @@
+"""Tests that per-trace generation does not depend on the number of jobs."""
+
+import copy
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from typing import Dict
+
+from jaeger_uml_generator.input import JsonFileReader
+from jaeger_uml_generator.generators import TraceBatchGenerator, TraceOutputSettings, plan_trace_outputs
+from jaeger_uml_generator.generators.trace_batch import BATCH_CHUNK_SIZE
+
+
+PACKAGE_DIR = Path(__file__).resolve().parents[1]
+TRACES_DIR = PACKAGE_DIR.parent / 'traces'
+
+
+def read_files(directory: Path) -> Dict[str, bytes]:
+    """Get the contents of every file in a directory by name."""
+    return {path.name: path.read_bytes() for path in sorted(directory.iterdir()) if path.is_file()}
+
+
+class TraceBatchGeneratorTest(unittest.TestCase):
+    
+    @classmethod
+    def setUpClass(cls):
+        # Enough copies of the sample traces for several chunks per worker
+        samples = JsonFileReader(str(TRACES_DIR)).read_traces()
+        cls.traces = []
+        while len(cls.traces) < 3 * BATCH_CHUNK_SIZE:
+            for trace in samples:
+                trace = copy.deepcopy(trace)
+                trace.source_name = f"copy{len(cls.traces)}-{trace.source_name}"
+                cls.traces.append(trace)
+        # Two traces writing the same file: only the later one is kept
+        duplicate = copy.deepcopy(samples[0])
+        duplicate.source_name = cls.traces[1].source_name
+        cls.traces.append(duplicate)
+    
+    def generate(self, output_dir: Path, diagram_type: str, jobs: int):
+        """Generate the files of all traces with a number of jobs."""
+        output_dir.mkdir()
+        settings = TraceOutputSettings(output_dir, diagram_type)
+        return TraceBatchGenerator(settings, jobs).generate(self.traces)
+    
+    def test_two_jobs_write_the_same_files_as_one(self):
+        planned, superseded = plan_trace_outputs(self.traces, 'all')
+        self.assertEqual(superseded, 1)
+        
+        for diagram_type in ('all', 'sequence'):
+            with tempfile.TemporaryDirectory() as tmp:
+                serial = self.generate(Path(tmp) / 'serial', diagram_type, 1)
+                parallel = self.generate(Path(tmp) / 'parallel', diagram_type, 2)
+                
+                self.assertEqual(parallel.jobs, 2)
+                self.assertEqual(parallel.generated, serial.generated)
+                self.assertEqual(len(serial.generated), len(planned))
+                self.assertEqual((parallel.superseded, parallel.failed), (serial.superseded, serial.failed))
+                
+                serial_files = read_files(Path(tmp) / 'serial')
+                self.assertEqual(sorted(serial_files), sorted(serial.generated))
+                self.assertEqual(read_files(Path(tmp) / 'parallel'), serial_files, diagram_type)
+    
+    def test_command_line_jobs_do_not_change_the_output(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            outputs = []
+            for jobs in ('1', '2'):
+                output_dir = Path(tmp) / f"jobs{jobs}"
+                subprocess.run(
+                    [sys.executable, '-m', 'jaeger_uml_generator.main', '--input-dir', str(TRACES_DIR),
+                     '--output-dir', str(output_dir), '--jobs', jobs, '--no-build-cache'],
+                    cwd=PACKAGE_DIR, check=True, capture_output=True
+                )
+                outputs.append(read_files(output_dir))
+        
+        self.assertTrue(any(name.endswith('.xmi') for name in outputs[0]))
+        self.assertEqual(outputs[1], outputs[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+"""Tests for MinHash similarity and the clustering of traces."""
+
+import random
+import unittest
+
+from jaeger_uml_generator.models import Trace, Span, Process, Reference
+from jaeger_uml_generator.analyzer import MinHasher, cluster_traces, get_call_paths
+from jaeger_uml_generator.analyzer.trace_clustering import choose_bands
+
+
+def build_request(index: int, services) -> Trace:
+    """Build a frontend request calling each service once; its duration identifies it."""
+    trace_id = f"t{index}"
+    spans = [Span(trace_id, 'root', 'GET /home', 0, 1000 + index, 'p0')]
+    processes = {'p0': Process('frontend')}
+    for k, service in enumerate(sorted(services)):
+        spans.append(Span(trace_id, f"c{k}", 'Get', 10 + k, 10, f"p{service + 1}",
+                          [Reference('CHILD_OF', trace_id, 'root')]))
+        processes[f"p{service + 1}"] = Process(f"svc{service}")
+    return Trace(trace_id, spans, processes)
+
+
+def get_partition(clusters):
+    """Get the clusters as sets of member traces (identified by duration)."""
+    return {frozenset(cluster.durations_us) for cluster in clusters}
+
+
+class MinHasherTest(unittest.TestCase):
+    
+    def test_similarity_estimates_jaccard(self):
+        hasher = MinHasher(256)
+        base = {f"/frontend|GET/svc{i}|Get" for i in range(100)}
+        for overlap in (0, 20, 50, 80, 100):
+            other = {f"/frontend|GET/svc{i}|Get" for i in range(100 - overlap, 200 - overlap)}
+            jaccard = len(base & other) / len(base | other)
+            estimate = MinHasher.similarity(hasher.signature(base), hasher.signature(other))
+            self.assertAlmostEqual(estimate, jaccard, delta=0.1, msg=f"overlap {overlap}")
+    
+    def test_signatures_are_reproducible(self):
+        items = {'a', 'b', 'c'}
+        signature = MinHasher().signature(items)
+        self.assertEqual(len(signature), 64)
+        self.assertEqual(MinHasher().signature(set(sorted(items, reverse=True))), signature)
+        self.assertEqual(MinHasher.similarity(signature, signature), 1.0)
+        self.assertNotEqual(MinHasher(seed=2).signature(items), signature)
+        self.assertEqual(MinHasher.similarity(MinHasher().signature(set()), signature), 0.0)
+    
+    def test_bands_match_the_threshold(self):
+        bands, rows = choose_bands(64, 0.6)
+        self.assertEqual(bands * rows, 64)
+        self.assertAlmostEqual((1 / bands) ** (1 / rows), 0.6, delta=0.1)
+        self.assertEqual(choose_bands(64, 0.99), (1, 64))
+
+
+class ClusterTracesTest(unittest.TestCase):
+    
+    def test_call_paths(self):
+        self.assertEqual(get_call_paths(build_request(0, [2, 1])),
+                         {'/frontend|home', '/frontend|home/svc1|Get', '/frontend|home/svc2|Get'})
+    
+    def test_clusters_do_not_depend_on_input_order(self):
+        # Overlapping shapes, each occurring twice; comparing candidates with
+        # the first shape of their bucket only split them three different ways
+        rng = random.Random(53)
+        shapes = set()
+        while len(shapes) < 8:
+            shapes.add(frozenset(rng.sample(range(10), rng.randint(3, 7))))
+        shapes = sorted(shapes, key=sorted) * 2
+        traces = [build_request(index, shape) for index, shape in enumerate(shapes)]
+        
+        expected = get_partition(cluster_traces(traces, 0.6))
+        self.assertEqual(len(expected), 4)
+        for seed in range(30):
+            shuffled = list(traces)
+            random.Random(seed).shuffle(shuffled)
+            self.assertEqual(get_partition(cluster_traces(shuffled, 0.6)), expected, f"order {seed}")
+        
+        # Identical traces are always in the same cluster
+        for index in range(8):
+            self.assertTrue(any({1000 + index, 1008 + index} <= members for members in expected))
+    
+    def test_cluster_counts_cover_every_trace(self):
+        traces = [build_request(index, range(index % 3, index % 3 + 6)) for index in range(9)]
+        traces.append(build_request(9, [8, 9]))
+        clusters = cluster_traces(traces, 0.6)
+        
+        self.assertEqual(sum(cluster.count for cluster in clusters), 10)
+        self.assertEqual(sorted(cluster.shape_count for cluster in clusters), [1, 3])
+        # Different call paths only: below any threshold
+        self.assertEqual(len(cluster_traces(traces, 1.0)), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,255 @@
+"""Tests for trace sampling and the scaling of sampled measurements."""
+
+import json
+import re
+import subprocess
+import sys
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+from jaeger_uml_generator.models import Trace, Span, Process, Reference
+from jaeger_uml_generator.input import (
+    TraceReader,
+    HashTraceSampler,
+    ReservoirTraceSampler,
+    StratifiedTraceSampler,
+    SamplingTraceReader,
+    create_sampler
+)
+from jaeger_uml_generator.analyzer import CallModel
+from jaeger_uml_generator.generators import UnifiedXmiGenerator
+
+
+PACKAGE_DIR = Path(__file__).resolve().parents[1]
+
+# One checkout (POST /cart -> cart) for every 20 page views (GET / -> catalog)
+REQUESTS = 420
+CHECKOUT_EVERY = 21
+
+
+def build_request(index: int) -> Trace:
+    """Build the index-th request of the corpus, arriving every millisecond."""
+    trace_id = f"{index + 1:016x}"
+    operation, backend = ('POST /cart', 'cart') if index % CHECKOUT_EVERY == 0 else ('GET /', 'catalog')
+    start = 1_700_000_000_000_000 + index * 1000
+    root = Span(trace_id, f"{index:08x}01", operation, start, 500, 'p1')
+    call = Span(trace_id, f"{index:08x}02", 'Get', start + 100, 200, 'p2',
+                [Reference('CHILD_OF', trace_id, root.span_id)])
+    processes = {
+        'p1': Process('frontend', {'hostname': 'frontend'}),
+        'p2': Process(backend, {'hostname': backend})
+    }
+    return Trace(trace_id, [root, call], processes)
+
+
+def build_corpus():
+    """Build all requests of the corpus."""
+    return [build_request(index) for index in range(REQUESTS)]
+
+
+def sample_stratified(traces, size: int = 20):
+    """Offer traces to a stratified sampler and end the stream; get the sampler and its sample."""
+    sampler = StratifiedTraceSampler(size, seed=1)
+    for trace in traces:
+        sampler.offer(trace)
+    return sampler, sampler.finish()
+
+
+def to_jaeger_json(trace: Trace) -> dict:
+    """Convert a trace to the Jaeger JSON format read by JsonFileReader."""
+    return {
+        'traceID': trace.trace_id,
+        'spans': [{
+            'traceID': span.trace_id,
+            'spanID': span.span_id,
+            'operationName': span.operation_name,
+            'references': [{'refType': ref.ref_type, 'traceID': ref.trace_id, 'spanID': ref.span_id}
+                           for ref in span.references],
+            'startTime': span.start_time,
+            'duration': span.duration,
+            'processID': span.process_id,
+            'tags': []
+        } for span in trace.spans],
+        'processes': {
+            process_id: {'serviceName': process.service_name,
+                         'tags': [{'key': key, 'type': 'string', 'value': value}
+                                  for key, value in process.tags.items()]}
+            for process_id, process in trace.processes.items()
+        }
+    }
+
+
+def offer_all(sampler, traces):
+    """Offer traces to a sampler and get every trace it keeps."""
+    kept = []
+    for trace in traces:
+        kept.extend(sampler.offer(trace))
+    return kept + sampler.finish()
+
+
+def get_ids(traces):
+    """Get the trace IDs of traces."""
+    return [trace.trace_id for trace in traces]
+
+
+class ListReader(TraceReader):
+    """Reader of traces already in memory, in chunks of 50."""
+    
+    def __init__(self, traces):
+        self.traces = traces
+    
+    def read_traces(self):
+        return list(self.traces)
+    
+    def iter_traces(self):
+        for start in range(0, len(self.traces), 50):
+            yield self.traces[start:start + 50]
+
+
+class TraceSamplerTest(unittest.TestCase):
+    
+    def test_hash_sampling_is_the_same_in_every_run(self):
+        kept = get_ids(offer_all(HashTraceSampler(0.25), build_corpus()))
+        self.assertEqual(get_ids(offer_all(HashTraceSampler(0.25), build_corpus())), kept)
+        self.assertAlmostEqual(len(kept) / REQUESTS, 0.25, delta=0.06)
+        
+        # Independent of the other traces of the input and of their order
+        sampler = HashTraceSampler(0.25)
+        subset = build_corpus()[::-3]
+        self.assertEqual(set(get_ids(offer_all(sampler, subset))), set(kept) & set(get_ids(subset)))
+        self.assertEqual(sampler.seen, len(subset))
+        
+        # A higher rate keeps a superset
+        self.assertTrue(set(kept) <= set(get_ids(offer_all(HashTraceSampler(0.5), build_corpus()))))
+        self.assertEqual(len(offer_all(HashTraceSampler(1.0), build_corpus())), REQUESTS)
+        with self.assertRaises(ValueError):
+            HashTraceSampler(0)
+    
+    def test_reservoir_is_bounded_and_seeded(self):
+        sampler = ReservoirTraceSampler(50, seed=7)
+        for trace in build_corpus():
+            self.assertEqual(sampler.offer(trace), [])
+            self.assertLessEqual(len(sampler._reservoir), 50)
+        sample = sampler.finish()
+        self.assertEqual(len(set(get_ids(sample))), 50)
+        self.assertEqual((sampler.seen, sampler.kept), (REQUESTS, 50))
+        self.assertAlmostEqual(sampler.effective_rate, 50 / REQUESTS)
+        self.assertEqual(sampler.get_stratum_rates(), {})
+        
+        self.assertEqual(get_ids(offer_all(ReservoirTraceSampler(50, seed=7), build_corpus())), get_ids(sample))
+        self.assertNotEqual(get_ids(offer_all(ReservoirTraceSampler(50, seed=8), build_corpus())),
+                            get_ids(sample))
+        
+        # Fewer traces than the size: all are kept
+        self.assertEqual(len(offer_all(ReservoirTraceSampler(500), build_corpus())), REQUESTS)
+    
+    def test_reservoir_is_uniform(self):
+        # Each trace is kept with probability size / seen
+        kept = [0] * REQUESTS
+        for seed in range(200):
+            for trace in offer_all(ReservoirTraceSampler(42, seed=seed), build_corpus()):
+                kept[int(trace.trace_id, 16) - 1] += 1
+        first, last = sum(kept[:REQUESTS // 2]), sum(kept[REQUESTS // 2:])
+        self.assertAlmostEqual(first / (first + last), 0.5, delta=0.03)
+    
+    def test_stratified_counts_and_rates(self):
+        sampler = StratifiedTraceSampler(30, seed=3)
+        sample = offer_all(sampler, build_corpus())
+        
+        strata = {}
+        for trace in sample:
+            stratum = sampler.get_stratum(trace)
+            strata[stratum] = strata.get(stratum, 0) + 1
+        self.assertEqual(strata, {'frontend:GET /': 30, 'frontend:POST /cart': 20})
+        self.assertEqual(sampler.get_stratum_rates(), {'frontend:GET /': 30 / 400, 'frontend:POST /cart': 1.0})
+        self.assertAlmostEqual(sampler.effective_rate, 50 / REQUESTS)
+        
+        again = StratifiedTraceSampler(30, seed=3)
+        self.assertEqual(get_ids(offer_all(again, build_corpus())), get_ids(sample))
+    
+    def test_strata_use_normalized_operations(self):
+        traces = build_corpus()
+        for trace in traces:
+            root = trace.get_entry_spans()[0]
+            root.operation_name = f"{root.operation_name}?session={trace.trace_id}"
+        
+        sampler = StratifiedTraceSampler(5, seed=1, normalize_operation=lambda name: name.split('?')[0])
+        self.assertEqual(len(offer_all(sampler, traces)), 10)
+        self.assertEqual(sorted(sampler.get_stratum_rates()), ['frontend:GET /', 'frontend:POST /cart'])
+    
+    def test_sampling_reader(self):
+        sampler = create_sampler('reservoir', size=30, seed=1)
+        reader = SamplingTraceReader(ListReader(build_corpus()), sampler)
+        self.assertEqual(get_ids(reader.read_traces()),
+                         get_ids(offer_all(ReservoirTraceSampler(30, seed=1), build_corpus())))
+        
+        # Hash sampling releases kept traces chunk by chunk
+        reader = SamplingTraceReader(ListReader(build_corpus()), create_sampler('hash', rate=0.5))
+        chunks = list(reader.iter_traces())
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(sum(len(chunk) for chunk in chunks), reader.sampler.kept)
+        
+        with self.assertRaises(ValueError):
+            create_sampler('systematic')
+
+
+class StratifiedScalingTest(unittest.TestCase):
+    
+    def test_strata_are_scaled_by_their_own_rate(self):
+        full_model = CallModel(build_corpus())
+        sampler, sample = sample_stratified(build_corpus())
+        rates = sampler.get_stratum_rates()
+        self.assertEqual(rates, {'frontend:GET /': 20 / 400, 'frontend:POST /cart': 1.0})
+        
+        generator = UnifiedXmiGenerator('papyrus', sample_rate=sampler.effective_rate, stratum_rates=rates)
+        sample_model = CallModel(sample)
+        root = ET.fromstring(generator.generate(sample, call_model=sample_model).encode('utf-8'))
+        
+        # Per-entry workloads of the full corpus, within sampling noise
+        full_profiles = full_model.get_workload_profiles()
+        for entry_operation, profile in sample_model.get_workload_profiles().items():
+            scaled = profile.arrival_rate_per_s / generator.get_sample_rate(entry_operation)
+            self.assertAlmostEqual(scaled / full_profiles[entry_operation].arrival_rate_per_s, 1.0, delta=0.1)
+        
+        # Node throughputs: page views and checkouts each scaled by their rate
+        full_nodes = full_model.get_node_concurrency()
+        sample_nodes = sample_model.get_node_concurrency()
+        node_ids = {element.get('name'): element.get('{http://www.omg.org/spec/XMI/20131001}id')
+                    for element in root.iter('packagedElement')}
+        throughputs = {element.get('base_Classifier'): element.get('throughput')
+                       for element in root.iter() if element.tag.endswith('GaExecHost')}
+        for node in ('frontend', 'catalog', 'cart'):
+            scaled = sample_nodes[node].get_scaled_throughput_per_s(generator.get_sample_rate)
+            self.assertAlmostEqual(scaled / full_nodes[node].throughput_per_s, 1.0, delta=0.1, msg=node)
+            self.assertEqual(throughputs[node_ids[node]], f"(value={scaled:.3f},unit=Hz,source=meas)")
+        
+        # One rate for all traces would give page views and checkouts the same weight
+        biased = sample_nodes['catalog'].throughput_per_s / sampler.effective_rate
+        self.assertLess(biased / full_nodes['catalog'].throughput_per_s, 0.6)
+    
+    def test_simulated_request_mix_follows_the_corpus(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            input_dir = Path(tmp) / 'traces'
+            input_dir.mkdir()
+            with open(input_dir / 'traces.json', 'w', encoding='utf-8') as f:
+                json.dump({'data': [to_jaeger_json(trace) for trace in build_corpus()]}, f)
+            
+            output_dir = Path(tmp) / 'output'
+            subprocess.run(
+                [sys.executable, '-m', 'jaeger_uml_generator.main', '--input-dir', str(input_dir),
+                 '--output-dir', str(output_dir), '--merge-traces', '--no-build-cache',
+                 '--sample', 'stratified', '--sample-size', '20', '--sample-seed', '1',
+                 '--simulate', '4200', '--sim-seed', '1'],
+                cwd=PACKAGE_DIR, check=True, capture_output=True
+            )
+            report = (output_dir / 'simulation-report.txt').read_text(encoding='utf-8')
+        
+        # 20 page views per checkout, not the 1:1 mix of the sample
+        counts = dict(re.findall(r"^  frontend:([^:]+): n=(\d+)", report, re.MULTILINE))
+        self.assertAlmostEqual(int(counts['GET /']) / int(counts['POST /cart']), 20, delta=4)
+
+
+if __name__ == '__main__':
+    unittest.main()
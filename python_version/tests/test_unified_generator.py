@@ -0,0 +1,46 @@
+"""Tests for the components of the unified model."""
+
+import unittest
+import xml.etree.ElementTree as ET
+
+from jaeger_uml_generator.models import Trace, Span, Process, Reference
+from jaeger_uml_generator.generators import UnifiedXmiGenerator
+
+
+XMI_TYPE = '{http://www.omg.org/spec/XMI/20131001}type'
+
+
+def build_call(index: int, operation: str) -> Trace:
+    """Build a trace of a frontend request calling one cart operation."""
+    trace_id = f"t{index}"
+    root = Span(trace_id, 'a', 'GET /', 0, 100, 'p1')
+    call = Span(trace_id, 'b', operation, 10, 50, 'p2', [Reference('CHILD_OF', trace_id, 'a')])
+    return Trace(trace_id, [root, call], {'p1': Process('frontend'), 'p2': Process('cart')})
+
+
+class UnifiedComponentsTest(unittest.TestCase):
+    
+    def test_components_list_the_most_called_operations(self):
+        # Op00 to Op24 are called 25 down to 1 times
+        operations = [f"Op{i:02d}" for i in range(25)]
+        traces = [build_call(i * 100 + k, operation)
+                  for i, operation in enumerate(operations) for k in range(25 - i)]
+        generator = UnifiedXmiGenerator('papyrus', include_marte=False)
+        root = ET.fromstring(generator.generate(traces, sequence_traces=[traces[0], traces[-1]]).encode('utf-8'))
+        
+        components = {element.get('name'): element for element in root.iter('packagedElement')
+                      if element.get(XMI_TYPE) == 'uml:Component'}
+        cart = components['cart']
+        self.assertEqual([element.get('name') for element in cart.iter('ownedOperation')],
+                         operations[:UnifiedXmiGenerator.MAX_OPERATIONS])
+        self.assertIn("+5 more operations", [comment.findtext('body') for comment in cart.iter('ownedComment')])
+        
+        # A call to a listed operation references it; others keep only the name
+        messages = {message.get('name'): message for message in root.iter('message')}
+        self.assertEqual(messages['Op00'].get('signature'), generator.operation_ids['cart']['Op00'])
+        self.assertIsNone(messages['Op24'].get('signature'))
+        self.assertNotIn('Op24', generator.operation_ids['cart'])
+
+
+if __name__ == '__main__':
+    unittest.main()
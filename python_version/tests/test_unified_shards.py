@@ -0,0 +1,57 @@
+"""Tests for the unified model split into a core file and Use Case shards."""
+
+import contextlib
+import io
+import json
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+from jaeger_uml_generator.cli import CommandLine
+from jaeger_uml_generator.input import JsonFileReader
+from jaeger_uml_generator.generators import UnifiedXmiGenerator, UnifiedShardWriter
+
+
+TRACES_DIR = Path(__file__).resolve().parents[2] / 'traces'
+XMI_ID = "{http://www.omg.org/spec/XMI/20131001}id"
+
+
+class UnifiedShardWriterTest(unittest.TestCase):
+    
+    def test_shards_reference_the_plain_core(self):
+        traces = JsonFileReader(str(TRACES_DIR)).read_traces()
+        with tempfile.TemporaryDirectory() as tmp:
+            output_dir = Path(tmp)
+            result = UnifiedShardWriter(UnifiedXmiGenerator('papyrus'), output_dir, 2).write(traces)
+            
+            self.assertEqual(result.core_file, "UnifiedModel-core.xmi")
+            self.assertEqual(result.shard_files, ["UnifiedModel-usecases-0001.xmi",
+                                                  "UnifiedModel-usecases-0002.xmi"])
+            with open(output_dir / result.index_file, encoding='utf-8') as f:
+                index = json.load(f)
+            self.assertEqual(index['core'], result.core_file)
+            
+            core = ET.parse(output_dir / result.core_file)
+            core_ids = {element.get(XMI_ID) for element in core.iter()}
+            hrefs = [element.get('href') for shard in result.shard_files
+                     for element in ET.parse(output_dir / shard).iter('signature')]
+            self.assertTrue(hrefs)
+            for href in hrefs:
+                core_file, element_id = href.split('#')
+                self.assertEqual(core_file, result.core_file)
+                self.assertIn(element_id, core_ids)
+    
+    def test_sharding_rejects_compressed_output(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            base = ['--input-dir', str(TRACES_DIR), '--output-dir', tmp,
+                    '--merge-traces', '--shard-size', '2']
+            with contextlib.redirect_stderr(io.StringIO()) as stderr:
+                self.assertFalse(CommandLine().parse_args(base + ['--compress', 'gz']))
+                self.assertFalse(CommandLine().parse_args(base + ['--model-name', 'Model.xmi.xz']))
+            self.assertIn("--shard-size cannot be combined with compressed output", stderr.getvalue())
+            self.assertTrue(CommandLine().parse_args(base))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+"""Tests for the time-windowed call aggregation."""
+
+import contextlib
+import io
+import tempfile
+import unittest
+
+from jaeger_uml_generator.models import Trace, Span, Process, Reference
+from jaeger_uml_generator.analyzer import WindowedAggregator, parse_window_size
+from jaeger_uml_generator.cli import CommandLine
+
+
+def build_call(index: int, start: int, duration: int) -> Trace:
+    """Build a trace of a frontend request whose cart call starts at `start`."""
+    trace_id = f"t{index}"
+    root = Span(trace_id, 'a', 'GET /', start - 10, duration + 20, 'p1')
+    call = Span(trace_id, 'b', 'GetCart', start, duration, 'p2', [Reference('CHILD_OF', trace_id, 'a')])
+    return Trace(trace_id, [root, call], {'p1': Process('frontend'), 'p2': Process('cart')})
+
+
+class WindowSizeTest(unittest.TestCase):
+    
+    def test_valid_sizes(self):
+        self.assertEqual(parse_window_size('30s'), 30_000_000)
+        self.assertEqual(parse_window_size(' 5m '), 300_000_000)
+        self.assertEqual(parse_window_size('1h'), 3_600_000_000)
+        self.assertEqual(parse_window_size('2d'), 172_800_000_000)
+    
+    def test_malformed_sizes_are_rejected(self):
+        for spec in ('', None, '0s', '5', 'm', '5x', '1.5m', '-1m', '5 min', '1h30m'):
+            with self.assertRaises(ValueError, msg=repr(spec)):
+                parse_window_size(spec)
+    
+    def test_command_line_rejects_malformed_size(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            stderr = io.StringIO()
+            with contextlib.redirect_stderr(stderr):
+                self.assertFalse(CommandLine().parse_args(['--input-dir', tmp, '--window', '5x']))
+            self.assertIn("Invalid window size", stderr.getvalue())
+            self.assertTrue(CommandLine().parse_args(['--input-dir', tmp, '--window', '5m']))
+
+
+class WindowedAggregatorTest(unittest.TestCase):
+    
+    def test_calls_land_in_the_window_of_their_start(self):
+        window = parse_window_size('1m')
+        base = 1_700_000_040 * 1_000_000  # a minute boundary
+        aggregator = WindowedAggregator(window)
+        aggregator.add_traces([
+            build_call(0, base, 1000),               # first microsecond of a window
+            build_call(1, base + window - 1, 3000),  # last microsecond, ends in the next
+            build_call(2, base + window, 5000),      # first microsecond of the next
+            build_call(3, base + 3 * window, 7000),  # after an empty window
+        ])
+        
+        self.assertEqual(sorted(aggregator.windows), [base, base + window, base + 3 * window])
+        self.assertEqual(aggregator.get_edges(), [('frontend', 'cart')])
+        series = aggregator.get_series('frontend', 'cart')
+        self.assertEqual([point['count'] for point in series], [2, 1, 1])
+        self.assertAlmostEqual(series[0]['mean_ms'], 2.0, places=1)
+        self.assertAlmostEqual(series[0]['throughput_per_s'], 2 / 60)
+        self.assertAlmostEqual(series[1]['p50_ms'], 5.0, delta=0.05)
+        
+        # Same-service spans are no calls; other edges get zero-count points
+        self.assertEqual([point['count'] for point in aggregator.get_series('cart', 'frontend')], [0, 0, 0])
+        
+        output = io.StringIO()
+        self.assertEqual(aggregator.write_csv(output), 3)
+        self.assertTrue(output.getvalue().splitlines()[1].startswith("2023-11-14T22:14:00+00:00,frontend,cart,2,"))
+    
+    def test_window_size_must_be_positive(self):
+        with self.assertRaises(ValueError):
+            WindowedAggregator(0)
+
+
+if __name__ == '__main__':
+    unittest.main()
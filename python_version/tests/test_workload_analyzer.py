@@ -0,0 +1,62 @@
+"""Tests for the one-pass workload characterization."""
+
+import unittest
+
+from jaeger_uml_generator.models import Trace, Span, Process
+from jaeger_uml_generator.analyzer import WorkloadCharacterizer, get_mixed_closed_parameters
+
+
+def build_request(trace_id: str, start: int, duration: int, operation: str = 'GET /') -> Trace:
+    """Build a single-span trace of the frontend."""
+    span = Span(trace_id, f"{trace_id}-root", operation, start, duration, 'p1')
+    return Trace(trace_id, [span], {'p1': Process('frontend')})
+
+
+class WorkloadCharacterizerTest(unittest.TestCase):
+    
+    def test_inter_arrivals_and_concurrency(self):
+        # Arrivals at 0, 100, 300 and 600 us; the first two overlap
+        traces = [
+            build_request('t3', 300, 50),
+            build_request('t1', 0, 150),
+            build_request('t4', 600, 100),
+            build_request('t2', 100, 100),
+        ]
+        characterizer = WorkloadCharacterizer()
+        characterizer.add_traces(traces)
+        profile = characterizer.finish()['frontend:GET /']
+        
+        self.assertEqual(profile.count, 4)
+        self.assertEqual(profile.window_us, 700)
+        self.assertAlmostEqual(profile.mean_inter_arrival_ms, 0.2)
+        # Gaps 100, 200, 300: sample standard deviation 100
+        self.assertAlmostEqual(profile.inter_arrival_cv, 0.5)
+        self.assertEqual(profile.concurrency.max_concurrency, 2)
+        self.assertEqual(profile.concurrency.total_time_us, 400)
+        self.assertEqual(profile.concurrency.busy_time_us, 350)
+    
+    def test_back_to_back_requests_are_not_concurrent(self):
+        characterizer = WorkloadCharacterizer()
+        characterizer.add_traces([build_request('t1', 0, 100), build_request('t2', 100, 100)])
+        profile = characterizer.finish()['frontend:GET /']
+        
+        self.assertEqual(profile.concurrency.max_concurrency, 1)
+        self.assertEqual(profile.concurrency.busy_time_us, 200)
+    
+    def test_out_of_order_arrival_is_rejected(self):
+        characterizer = WorkloadCharacterizer()
+        characterizer.add_trace(build_request('t1', 100, 10))
+        with self.assertRaises(ValueError):
+            characterizer.add_trace(build_request('t2', 50, 10))
+    
+    def test_mixed_closed_parameters_of_one_profile(self):
+        characterizer = WorkloadCharacterizer()
+        characterizer.add_traces([build_request(f"t{i}", i * 1000, 500) for i in range(10)])
+        profile = characterizer.finish()['frontend:GET /']
+        
+        self.assertEqual(get_mixed_closed_parameters([(profile, 2.0)]),
+                         profile.get_closed_parameters(2.0))
+
+
+if __name__ == '__main__':
+    unittest.main()
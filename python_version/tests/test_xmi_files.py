@@ -0,0 +1,61 @@
+"""Tests for plain and compressed XMI output files."""
+
+import gzip
+import lzma
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+from jaeger_uml_generator.input import JsonFileReader
+from jaeger_uml_generator.generators import UnifiedXmiGenerator
+from jaeger_uml_generator.renderer import (
+    get_compression,
+    get_xmi_filename,
+    strip_xmi_extension,
+    open_xmi_reader
+)
+
+
+TRACES_DIR = Path(__file__).resolve().parents[2] / 'traces'
+
+
+class XmiFilesTest(unittest.TestCase):
+    
+    def test_file_names(self):
+        self.assertEqual(get_xmi_filename("Model", 'xz'), "Model.xmi.xz")
+        self.assertEqual(get_compression("Model.XMI.GZ"), 'gz')
+        self.assertEqual(strip_xmi_extension("Model.xmi.gz"), "Model")
+        self.assertEqual(strip_xmi_extension("Model.xmi"), "Model")
+    
+    def test_compressed_model_decompresses_to_plain_model(self):
+        traces = JsonFileReader(str(TRACES_DIR)).read_traces()
+        generator = UnifiedXmiGenerator('papyrus')
+        with tempfile.TemporaryDirectory() as tmp:
+            output_dir = Path(tmp)
+            for compression in ('none', 'gz', 'xz'):
+                path = output_dir / get_xmi_filename("UnifiedModel", compression)
+                self.assertTrue(generator.write(traces, path, "UnifiedModel"))
+            
+            plain = (output_dir / "UnifiedModel.xmi").read_bytes()
+            self.assertTrue(plain.startswith(b'<?xml'))
+            with gzip.open(output_dir / "UnifiedModel.xmi.gz", 'rb') as f:
+                self.assertEqual(f.read(), plain)
+            with lzma.open(output_dir / "UnifiedModel.xmi.xz", 'rb') as f:
+                self.assertEqual(f.read(), plain)
+            
+            # The tool's own reader opens every file it wrote
+            for compression in ('none', 'gz', 'xz'):
+                with open_xmi_reader(output_dir / get_xmi_filename("UnifiedModel", compression)) as f:
+                    self.assertEqual(f.read(), plain)
+            with open_xmi_reader(output_dir / "UnifiedModel.xmi.xz") as f:
+                self.assertEqual(ET.parse(f).getroot().tag, ET.fromstring(plain).tag)
+            
+            # No timestamp in the gzip header: identical input, identical file
+            compressed = (output_dir / "UnifiedModel.xmi.gz").read_bytes()
+            generator.write(traces, output_dir / "UnifiedModel.xmi.gz", "UnifiedModel")
+            self.assertEqual((output_dir / "UnifiedModel.xmi.gz").read_bytes(), compressed)
+
+
+if __name__ == '__main__':
+    unittest.main()
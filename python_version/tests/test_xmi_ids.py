@@ -0,0 +1,46 @@
+"""Tests for the deterministic XMI ID generator."""
+
+import unittest
+
+from jaeger_uml_generator.renderer import XmiIdGenerator
+
+
+def generate_use_cases(ids: XmiIdGenerator, scoped: bool):
+    """Generate the IDs of two Use Cases with the same name and their messages."""
+    generated = []
+    for _ in range(2):
+        usecase_id = ids.generate("_pkg", "UseCase", "GET /")
+        generated.append(usecase_id)
+        if scoped:
+            ids.begin_scope()
+        interaction_id = ids.generate(usecase_id, "Interaction", "GET /")
+        generated.append(interaction_id)
+        generated += [ids.generate(interaction_id, "ownedComment") for _ in range(2)]
+        if scoped:
+            ids.end_scope()
+    return generated
+
+
+class XmiIdGeneratorTest(unittest.TestCase):
+    
+    def test_scopes_do_not_change_ids(self):
+        unscoped = generate_use_cases(XmiIdGenerator(), scoped=False)
+        self.assertEqual(len(set(unscoped)), len(unscoped))
+        
+        ids = XmiIdGenerator()
+        self.assertEqual(generate_use_cases(ids, scoped=True), unscoped)
+        # Only the Use Cases outlive their scopes
+        self.assertEqual(len(ids._ids), 2)
+        self.assertEqual(len(ids._occurrences), 1)
+    
+    def test_scopes_do_not_nest(self):
+        ids = XmiIdGenerator()
+        ids.begin_scope()
+        with self.assertRaises(ValueError):
+            ids.begin_scope()
+        ids.reset()
+        ids.begin_scope()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+"""Tests that XmiSerializer writes the same document as ElementTree."""
+
+import io
+import unittest
+import xml.etree.ElementTree as ET
+
+from jaeger_uml_generator.renderer import (
+    XmiDocumentBuilder,
+    XmiWriter,
+    XmiStreamWriter,
+    XmiSerializer,
+    XmiFormat,
+    MARTE_NAMESPACES
+)
+
+
+PAM_NAMESPACE = MARTE_NAMESPACES['MARTE_PAM']
+
+
+def build_document(writer: XmiDocumentBuilder) -> ET.Element:
+    """Build a small model with nested elements, stereotypes and characters to escape."""
+    xmi_ns = writer.XMI_NAMESPACE
+    root = writer.create_xmi_document("Model <&> \"quoted\"")
+    model = writer.get_model_element(root)
+    components_pkg, _ = writer.create_package(model, "Components")
+    component, component_id = writer.create_packaged_element(components_pkg, "Component", "cart & co")
+    writer.create_owned_element(component, "ownedOperation", name="GET /items?id=<1>&all")
+    writer.add_comment(component, "Line one\nline two\twith <tags> & \"quotes\" and ünïcode")
+    writer.flush()
+    
+    usecases_pkg, _ = writer.create_package(model, "UseCases")
+    writer.open_element(usecases_pkg)
+    for case in range(3):
+        usecase, _ = writer.create_packaged_element(usecases_pkg, "UseCase", f"case {case}")
+        interaction = ET.SubElement(usecase, "ownedBehavior")
+        interaction.set(f"{{{xmi_ns}}}type", "uml:Interaction")
+        interaction.set(f"{{{xmi_ns}}}id", writer.generate_id(usecase, "Interaction"))
+        ET.SubElement(interaction, "lifeline", name="front\rend")
+        step = ET.SubElement(root, f"{{{PAM_NAMESPACE}}}PaStep")
+        step.set(f"{{{xmi_ns}}}id", writer.generate_id(interaction, "PaStep"))
+        step.set("base_NamedElement", component_id)
+        step.set("hostDemand", "(value=1.250,unit=ms)")
+        writer.flush()
+    writer.close_element(usecases_pkg)
+    return root
+
+
+def canonical(element: ET.Element):
+    """Get a comparable form of a parsed tree, ignoring whitespace between elements."""
+    text = element.text if element.text and element.text.strip() else None
+    return (element.tag, sorted(element.attrib.items()), text,
+            [canonical(child) for child in element])
+
+
+class XmiSerializerTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.writer = XmiWriter(XmiFormat.PAPYRUS, namespaces=MARTE_NAMESPACES)
+        self.root = build_document(self.writer)
+        self.expected = canonical(ET.fromstring(ET.tostring(self.root, encoding='unicode')))
+    
+    def test_indented_output_parses_to_element_tree_output(self):
+        text = self.writer.document_to_string(self.root)
+        self.assertEqual(canonical(ET.fromstring(text.encode('utf-8'))), self.expected)
+        
+        # Same layout as ET.indent(), which modifies the tree
+        ET.indent(self.root, space="  ")
+        indented = ET.tostring(self.root, encoding='unicode')
+        self.assertEqual(text.split("\n", 2)[2].strip(), indented.split("\n", 1)[1].strip())
+    
+    def test_compact_output_parses_to_element_tree_output(self):
+        text = XmiSerializer(self.writer.namespaces, None).to_string(self.root)
+        self.assertNotIn("\n  <", text)
+        self.assertEqual(canonical(ET.fromstring(text.encode('utf-8'))), self.expected)
+    
+    def test_streamed_output_equals_in_memory_output(self):
+        output = io.BytesIO()
+        writer = XmiStreamWriter(output, XmiFormat.PAPYRUS, namespaces=MARTE_NAMESPACES)
+        build_document(writer)
+        writer.finish()
+        self.assertEqual(output.getvalue().decode('utf-8'), self.writer.document_to_string(self.root))
+
+
+if __name__ == '__main__':
+    unittest.main()